@@ -2,11 +2,13 @@
 FastAPI dependency injection.
 """
 from functools import lru_cache
+from typing import Optional
 from fastapi import Depends
 
 from app.config.settings import Settings, get_settings
 from app.services.insight_service import InsightService
 from app.core.vector_store import VectorStoreService
+from app.core.llm.semantic_cache import SemanticResponseCache
 
 
 @lru_cache()
@@ -40,14 +42,7 @@ def get_vector_store_service(settings: Settings = Depends(get_cached_settings))
     if _vector_store_cache is not None:
         return _vector_store_cache
     
-    service = VectorStoreService(
-        enabled=settings.vector_store_enabled,
-        mode=settings.vector_store_mode,
-        qdrant_url=settings.qdrant_url,
-        qdrant_api_key=settings.qdrant_api_key,
-        embedding_model=settings.embedding_model,
-        collection_name=settings.vector_collection_name,
-    )
+    service = VectorStoreService(**settings.get_vector_store_options())
     
     # Auto-load corpus on initialization
     if service.is_available():
@@ -59,9 +54,56 @@ def get_vector_store_service(settings: Settings = Depends(get_cached_settings))
     return service
 
 
+def save_vector_store_state():
+    """Persist vector store caches (called on application shutdown)."""
+    if _vector_store_cache is not None:
+        _vector_store_cache.save_embedding_cache()
+
+
+async def close_vector_store():
+    """Close the vector store's async client (called on application shutdown)."""
+    if _vector_store_cache is not None:
+        await _vector_store_cache.aclose()
+
+
+# Cache for semantic response cache (module-level singleton)
+_semantic_cache = None
+
+
+def get_semantic_cache(
+    settings: Settings = Depends(get_cached_settings),
+    vector_store: VectorStoreService = Depends(get_vector_store_service),
+) -> Optional[SemanticResponseCache]:
+    """
+    Get or create the shared semantic response cache.
+    
+    Args:
+        settings: Settings instance (injected via dependency)
+        vector_store: Vector store service whose encoder embeds prompts
+        
+    Returns:
+        SemanticResponseCache instance, or None if disabled or no encoder is loaded
+    """
+    global _semantic_cache
+    
+    if not settings.semantic_cache_enabled or not vector_store.is_available() or vector_store.encoder is None:
+        return None
+    
+    if _semantic_cache is None:
+        _semantic_cache = SemanticResponseCache(
+            embed_fn=vector_store.embed,
+            threshold=settings.semantic_cache_threshold,
+            ttl=settings.semantic_cache_ttl,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+    
+    return _semantic_cache
+
+
 def get_insight_service(
     settings: Settings = Depends(get_cached_settings),
     vector_store: VectorStoreService = Depends(get_vector_store_service),
+    semantic_cache: Optional[SemanticResponseCache] = Depends(get_semantic_cache),
 ) -> InsightService:
     """
     Create and return an InsightService instance.
@@ -69,6 +111,7 @@ def get_insight_service(
     Args:
         settings: Settings instance (injected via dependency)
         vector_store: Vector store service instance (injected via dependency)
+        semantic_cache: Semantic response cache (injected via dependency)
         
     Returns:
         InsightService instance configured with current settings
@@ -80,9 +123,15 @@ def get_insight_service(
     return InsightService(
         llm_provider=provider,
         api_key=api_key,
-        model=settings.openai_model,
+        model=settings.get_model(provider),
         translation_enabled=settings.translation_enabled,
         translation_mock=settings.translation_mock,
         vector_store_service=vector_store,
+        max_input_tokens=settings.llm_max_input_tokens,
+        semantic_cache=semantic_cache,
+        provider_options=settings.get_provider_options(provider),
+        cassette_options=settings.get_cassette_options(),
+        prompt_layout=settings.prompt_layout,
+        generation_options=settings.get_generation_options(),
     )
 
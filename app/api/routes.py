@@ -13,8 +13,10 @@ from app.api.schemas import (
     ErrorResponse,
 )
 from app.api.dependencies import get_insight_service
+from app.core.metrics import get_metrics
 from app.services.insight_service import InsightService
 from app.services.validator_service import ValidationError
+from app.core.llm.providers.base_provider import RateLimitError
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,7 @@ router = APIRouter(prefix="/api/v1", tags=["insights"])
     responses={
         200: {"description": "Successfully generated insight"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
+        429: {"model": ErrorResponse, "description": "LLM provider rate limit exceeded"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
@@ -53,7 +56,7 @@ async def generate_insight(
     try:
         logger.info(f"Received insight request for {request.name}")
         
-        result = insight_service.generate_insight(
+        result = await insight_service.agenerate_insight(
             name=request.name,
             birth_date=request.birth_date,
             birth_time=request.birth_time,
@@ -67,6 +70,11 @@ async def generate_insight(
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
         
+    except RateLimitError as e:
+        logger.warning(f"LLM provider rate limited: {e}")
+        headers = {"Retry-After": str(int(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=429, detail="LLM provider rate limit exceeded", headers=headers)
+        
     except Exception as e:
         logger.error(f"Error generating insight: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to generate insight")
@@ -135,6 +143,21 @@ async def health_check(
         raise HTTPException(status_code=500, detail="Health check failed")
 
 
+@router.get(
+    "/metrics",
+    summary="Metrics",
+    description="In-process counters and summaries (prompt tokens, etc.).",
+)
+async def get_metrics_snapshot():
+    """
+    Metrics endpoint.
+    
+    Returns:
+        Snapshot of all in-process metrics
+    """
+    return get_metrics().snapshot()
+
+
 @router.get(
     "/",
     summary="API Root",
@@ -154,6 +177,7 @@ async def root():
             "generate_insight": "/api/v1/insight",
             "zodiac_info": "/api/v1/zodiac",
             "health": "/api/v1/health",
+            "metrics": "/api/v1/metrics",
             "docs": "/docs",
         },
     }
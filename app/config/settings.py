@@ -25,23 +25,103 @@ class Settings(BaseSettings):
     port: int = 8000
     
     # LLM Settings
-    llm_provider: str = "openai"  # "openai", "mock"
+    llm_provider: str = "openai"  # "openai", "mock", "local"
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-3.5-turbo"
-    llm_max_tokens: int = 150
+    llm_max_tokens: int = 150  # Upper bound; the cap is derived from insight_max_words
+    llm_max_input_tokens: Optional[int] = None  # Prompt token budget, e.g. 1024 (None for no limit)
+    prompt_layout: str = "standard"  # "standard" or "prefix" (cache-friendly)
+    insight_min_words: int = 30
+    insight_max_words: int = 50
+    llm_early_stop: bool = True  # Stop streaming at the first sentence end past insight_min_words
     llm_temperature: float = 0.7
     
+    # Mock Provider Simulation Settings (for load tests)
+    mock_latency_mode: str = "none"  # "none", "fixed", "lognormal", "percentiles"
+    mock_latency_ms: float = 0.0  # Fixed latency or lognormal median
+    mock_latency_sigma: float = 0.5  # Lognormal shape
+    mock_latency_percentiles: Optional[str] = None  # e.g. "50:800,90:1500,99:3000"
+    mock_error_rate: float = 0.0
+    mock_rate_limit_rate: float = 0.0
+    mock_token_delay_ms: float = 0.0  # Delay between streamed tokens
+    mock_seed: Optional[int] = None
+    
+    # Record/Replay Settings (deterministic offline benchmarks)
+    llm_cassette_mode: str = "off"  # "off", "record", "replay", "auto"
+    llm_cassette_path: str = "cassettes/llm_calls.cassette"
+    llm_cassette_replay_timing: bool = True  # Sleep for recorded latencies on replay
+    llm_cassette_timing_scale: float = 1.0
+    
+    # Local CPU Provider Settings
+    local_model_name: str = "HuggingFaceTB/SmolLM2-135M-Instruct"  # Any HF causal LM
+    local_max_batch_size: int = 8
+    local_max_wait_ms: float = 20.0  # Max time to wait for a batch to fill
+    local_num_threads: Optional[int] = None  # Torch threads (None for default)
+    
     # Translation Settings
     translation_enabled: bool = False
     translation_mock: bool = False
     
     # Vector Store Settings
     vector_store_enabled: bool = True
-    vector_store_mode: str = "memory"  # "memory" or "server"
+    vector_store_mode: str = "memory"  # "memory", "server", "disk" (embedded, persistent) or "numpy"
     qdrant_url: Optional[str] = None  # For server mode: "http://localhost:6333"
     qdrant_api_key: Optional[str] = None
+    qdrant_path: str = "cache/qdrant"  # Embedded storage directory (disk mode)
+    qdrant_follower_timeout: float = 60.0  # Seconds a read-only process waits for the storage owner to load the corpus
+    qdrant_follower_refresh_interval: float = 5.0  # Seconds between a read-only process's checks for storage changes (0 = never)
+    qdrant_prefer_grpc: bool = False  # Use gRPC (port qdrant_grpc_port) instead of REST in server mode
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout: Optional[float] = None  # Request timeout in seconds (None for the client default)
+    qdrant_payload_indexes: str = "zodiac,category"  # Keyword-indexed payload fields (server mode)
+    qdrant_hnsw_m: Optional[int] = None  # HNSW graph degree (None = Qdrant default, 16)
+    qdrant_hnsw_ef_construct: Optional[int] = None  # HNSW build beam width (None = Qdrant default, 100)
+    qdrant_search_ef: Optional[int] = None  # HNSW search beam width (None = Qdrant default)
+    qdrant_quantization: Optional[str] = None  # None or "int8" (scalar quantization)
+    qdrant_quantization_rescore: bool = True  # Re-rank quantized candidates with original vectors
+    qdrant_quantization_oversampling: Optional[float] = None  # e.g. 2.0 fetches 2x top_k candidates
+    qdrant_on_disk: bool = False  # Keep original vectors on disk (memory-mapped)
+    vector_retrieval_mode: str = "dense"  # "dense", "hybrid" (dense + BM25) or "sparse" (BM25, no encoder)
+    vector_hybrid_candidates: int = 20  # Candidates per retriever fused in hybrid mode
+    vector_rrf_k: int = 60  # Reciprocal rank fusion constant
+    vector_filter_include_groups: bool = False  # Sign filter also matches "Fire Signs", "Fixed Signs", ...
+    vector_partition_by_zodiac: bool = False  # Per-sign sub-indexes (numpy) / tenant index on "zodiac" (server)
+    vector_versioned_collections: bool = False  # Blue/green corpus versions behind an alias, with rollback
     embedding_model: str = "all-MiniLM-L6-v2"  # Sentence-transformers model
+    embedding_backend: str = "torch"  # "torch" (sentence-transformers), "onnx" (ONNX Runtime, CPU) or "remote"
+    embedding_onnx_quantize: bool = True  # Run the int8 dynamically quantized graph (onnx backend)
+    embedding_onnx_dir: str = "cache/onnx"  # Exported/quantized ONNX graphs (onnx backend)
+    embedding_num_threads: Optional[int] = None  # ONNX Runtime intra-op threads (None = all cores)
+    embedding_batching_enabled: bool = False  # Micro-batch concurrent query encodes into shared forward passes
+    embedding_max_batch_size: int = 32  # Texts per micro-batch
+    embedding_max_wait_ms: float = 2.0  # Max wait for a micro-batch to fill
+    embedding_server_socket: str = "/tmp/astrological-embeddings.sock"  # Embedding server socket ("remote" backend)
+    embedding_server_backend: str = "torch"  # Backend the embedding server itself runs ("torch" or "onnx")
+    embedding_server_max_batch_size: int = 64  # Texts per forward pass in the embedding server
+    embedding_server_max_wait_ms: float = 5.0  # Max wait for a server batch to fill
+    embedding_server_timeout: float = 30.0  # Seconds a worker waits for an embedding reply
     vector_collection_name: str = "astrological_knowledge"
+    embedding_cache_size: int = 1024  # Cached query embeddings (0 disables)
+    embedding_cache_path: Optional[str] = None  # e.g. "cache/embeddings.npz" to persist across restarts
+    vector_context_top_k: int = 3  # Passages retrieved per insight
+    vector_context_cache_enabled: bool = True  # Precompute per-sign context at corpus load
+    embedding_store_dir: Optional[str] = "cache/corpus_embeddings"  # Memory-mapped corpus embeddings (None to disable)
+    ingest_chunk_size: int = 1024  # Items per upsert and checkpoint when streaming a corpus
+    ingest_encode_batch_size: int = 64  # Texts per encoder forward pass
+    ingest_workers: int = 0  # Encoder processes for streaming ingestion (0 = in-process)
+    ingest_checkpoint_path: Optional[str] = "cache/ingest_checkpoint.json"  # Resume point (None to disable)
+    
+    # Batch Generation Settings
+    batch_backend: str = "local"  # "local" (file-based stand-in) or "openai"
+    batch_work_dir: str = "batch_jobs"
+    batch_poll_interval: float = 30.0  # Seconds between job status polls
+    insight_store_path: str = "batch_jobs/insights.json"
+    
+    # Semantic Cache Settings (requires the vector store's embedding model)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for a hit
+    semantic_cache_ttl: int = 86400  # 24 hours in seconds
+    semantic_cache_max_entries: int = 10000
     
     # Caching Settings (for future use)
     cache_enabled: bool = False
@@ -72,6 +152,190 @@ class Settings(BaseSettings):
             "temperature": self.llm_temperature,
         }
 
+    def get_provider_options(self, provider: str) -> dict:
+        """
+        Get provider-specific options for the given provider.
+        
+        Args:
+            provider: Provider name
+            
+        Returns:
+            Dictionary of extra provider constructor options
+        """
+        if provider == "mock":
+            return {
+                "latency_mode": self.mock_latency_mode,
+                "latency_ms": self.mock_latency_ms,
+                "latency_sigma": self.mock_latency_sigma,
+                "latency_percentiles": self.mock_latency_percentiles,
+                "error_rate": self.mock_error_rate,
+                "rate_limit_rate": self.mock_rate_limit_rate,
+                "token_delay_ms": self.mock_token_delay_ms,
+                "seed": self.mock_seed,
+            }
+        if provider == "local":
+            return {
+                "max_batch_size": self.local_max_batch_size,
+                "max_wait_ms": self.local_max_wait_ms,
+                "num_threads": self.local_num_threads,
+                "temperature": self.llm_temperature,
+            }
+        return {}
+
+    def get_cassette_options(self) -> Optional[dict]:
+        """
+        Get record/replay cassette options.
+        
+        Returns:
+            Dictionary of cassette options, or None if record/replay is off
+        """
+        if self.llm_cassette_mode == "off":
+            return None
+        return {
+            "path": self.llm_cassette_path,
+            "mode": self.llm_cassette_mode,
+            "replay_timing": self.llm_cassette_replay_timing,
+            "timing_scale": self.llm_cassette_timing_scale,
+        }
+
+    def get_generation_options(self) -> dict:
+        """
+        Get insight length and early-stop options.
+        
+        Returns:
+            Dictionary of generation options
+        """
+        return {
+            "max_tokens": self.llm_max_tokens,
+            "min_words": self.insight_min_words,
+            "max_words": self.insight_max_words,
+            "early_stop": self.llm_early_stop,
+        }
+
+    def get_vector_store_options(self) -> dict:
+        """
+        Get vector store constructor options.
+        
+        Returns:
+            Dictionary of VectorStoreService keyword arguments
+        """
+        return {
+            "enabled": self.vector_store_enabled,
+            "mode": self.vector_store_mode,
+            "qdrant_url": self.qdrant_url,
+            "qdrant_api_key": self.qdrant_api_key,
+            "qdrant_path": self.qdrant_path,
+            "follower_timeout": self.qdrant_follower_timeout,
+            "follower_refresh_interval": self.qdrant_follower_refresh_interval,
+            "qdrant_prefer_grpc": self.qdrant_prefer_grpc,
+            "qdrant_grpc_port": self.qdrant_grpc_port,
+            "qdrant_timeout": self.qdrant_timeout,
+            "collection_options": self.get_collection_options(),
+            "zodiac_filter_groups": self.vector_filter_include_groups,
+            "partition_by_zodiac": self.vector_partition_by_zodiac,
+            "versioned_collections": self.vector_versioned_collections,
+            "retrieval_mode": self.vector_retrieval_mode,
+            "hybrid_candidates": self.vector_hybrid_candidates,
+            "rrf_k": self.vector_rrf_k,
+            "embedding_model": self.embedding_model,
+            "collection_name": self.vector_collection_name,
+            "embedding_cache_size": self.embedding_cache_size,
+            "embedding_cache_path": self.embedding_cache_path,
+            "context_cache_enabled": self.vector_context_cache_enabled,
+            "context_top_k": self.vector_context_top_k,
+            "embedding_store_dir": self.embedding_store_dir,
+            "embedding_backend": self.embedding_backend,
+            "encoder_options": self.get_encoder_options(self.embedding_backend),
+            "embedding_batching": self.get_embedding_batching_options(),
+        }
+
+    def get_collection_options(self) -> dict:
+        """
+        Get Qdrant collection tuning options.
+        
+        Returns:
+            Dictionary of index, HNSW, quantization and storage options
+        """
+        return {
+            "payload_indexes": tuple(
+                field.strip() for field in self.qdrant_payload_indexes.split(",") if field.strip()
+            ),
+            "hnsw_m": self.qdrant_hnsw_m,
+            "hnsw_ef_construct": self.qdrant_hnsw_ef_construct,
+            "search_ef": self.qdrant_search_ef,
+            "quantization": self.qdrant_quantization,
+            "quantization_rescore": self.qdrant_quantization_rescore,
+            "quantization_oversampling": self.qdrant_quantization_oversampling,
+            "on_disk": self.qdrant_on_disk,
+        }
+
+    def get_encoder_options(self, backend: str) -> dict:
+        """
+        Get backend-specific options for the embedding encoder.
+        
+        Args:
+            backend: Embedding backend name
+            
+        Returns:
+            Dictionary of extra encoder constructor options
+        """
+        if backend == "onnx":
+            return {
+                "quantize": self.embedding_onnx_quantize,
+                "export_dir": self.embedding_onnx_dir,
+                "num_threads": self.embedding_num_threads,
+            }
+        if backend == "remote":
+            return {
+                "socket_path": self.embedding_server_socket,
+                "timeout": self.embedding_server_timeout,
+            }
+        return {}
+
+    def get_embedding_batching_options(self) -> Optional[dict]:
+        """
+        Get micro-batching options for query embeddings.
+        
+        Returns:
+            Dictionary of BatchingEncoder options, or None if batching is off
+        """
+        if not self.embedding_batching_enabled:
+            return None
+        return {
+            "max_batch_size": self.embedding_max_batch_size,
+            "max_wait_ms": self.embedding_max_wait_ms,
+        }
+
+    def get_ingestion_options(self) -> dict:
+        """
+        Get streaming corpus ingestion options.
+        
+        Returns:
+            Dictionary of CorpusIngestor keyword arguments
+        """
+        return {
+            "chunk_size": self.ingest_chunk_size,
+            "encode_batch_size": self.ingest_encode_batch_size,
+            "workers": self.ingest_workers,
+            "checkpoint_path": self.ingest_checkpoint_path,
+        }
+
+    def get_model(self, provider: str) -> Optional[str]:
+        """
+        Get the model name for the given provider.
+        
+        Args:
+            provider: Provider name
+            
+        Returns:
+            Model name, or None for the mock provider (which has no model)
+        """
+        if provider == "local":
+            return self.local_model_name
+        if provider == "mock":
+            return None
+        return self.openai_model
+
     def is_openai_configured(self) -> bool:
         """
         Check if OpenAI is properly configured.
@@ -0,0 +1,132 @@
+"""
+Dynamic batching of concurrent work items on a dedicated worker thread.
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DynamicBatcher:
+    """
+    Collect concurrently submitted items into batches for a batch function.
+
+    A worker thread takes the first queued item, then keeps collecting until
+    either ``max_batch_size`` items are gathered or ``max_wait_ms`` has passed
+    since the first item arrived. The batch function receives the list of
+    items and must return one result per item, in order. Results (or the
+    batch's exception) are delivered through futures.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        name: str = "batcher",
+    ):
+        """
+        Initialize and start the batcher.
+
+        Args:
+            process_batch: Function mapping a list of items to a list of results
+            max_batch_size: Maximum items per batch
+            max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds
+            name: Name used for the worker thread and log messages
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for batched processing.
+
+        Args:
+            item: Work item passed to the batch function
+
+        Returns:
+            Future resolving to the item's result
+
+        Raises:
+            RuntimeError: If the batcher has been closed
+        """
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def queue_depth(self) -> int:
+        """Approximate number of items waiting to be batched."""
+        return self._queue.qsize()
+
+    def _collect(self, first: Tuple[Any, Future]) -> Tuple[List[Tuple[Any, Future]], bool]:
+        """Gather a batch starting with ``first``; returns (batch, stop_requested)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        """Worker loop: collect batches and resolve their futures."""
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch, stop = self._collect(first)
+            # Skip items whose callers cancelled while they were queued
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop accepting items and wait for queued work to finish.
+
+        Args:
+            timeout: Maximum seconds to wait for the worker thread
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,381 @@
+"""
+Batch completion backends for offline (non-realtime) insight generation.
+
+Job files use the OpenAI batch JSONL format, one request per line:
+
+    {"custom_id": "...", "method": "POST", "url": "/v1/chat/completions",
+     "body": {"model": "...", "messages": [...], "max_tokens": 150}}
+
+Result files contain one line per request with the matching ``custom_id``
+and either a ``response`` body or an ``error``.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import json
+import logging
+import uuid
+
+from .providers.base_provider import BaseLLMProvider, ProviderResult
+from .providers.mock_provider import MockProvider
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Terminal job states (mirrors the OpenAI batch API)
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    """
+    Iterate over the records of a JSONL file, skipping blank lines.
+
+    Args:
+        path: Path to the JSONL file
+
+    Yields:
+        Parsed JSON records
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def extract_content(result: Dict) -> Optional[str]:
+    """
+    Extract the generated text from a batch result record.
+
+    Args:
+        result: One record from a batch result file
+
+    Returns:
+        Generated text, or None if the request failed
+    """
+    if result.get("error"):
+        return None
+
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+
+    choices = response.get("body", {}).get("choices", [])
+    if not choices:
+        return None
+
+    content = choices[0].get("message", {}).get("content")
+    return content.strip() if content else None
+
+
+def extract_usage(result: Dict) -> Optional[ProviderResult]:
+    """
+    Extract model and token usage from a batch result record.
+
+    Args:
+        result: One record from a batch result file
+
+    Returns:
+        ProviderResult with usage (text left empty), or None if not reported
+    """
+    body = (result.get("response") or {}).get("body") or {}
+    usage = body.get("usage")
+    if not usage:
+        return None
+
+    return ProviderResult(
+        text="",
+        model=body.get("model"),
+        prompt_tokens=usage.get("prompt_tokens"),
+        completion_tokens=usage.get("completion_tokens"),
+        cached_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0,
+    )
+
+
+class BaseBatchBackend(ABC):
+    """
+    Abstract base class for batch-capable completion backends.
+    """
+
+    # Provider label for usage metrics
+    name = "batch"
+
+    @abstractmethod
+    def submit(self, job_file: Path) -> str:
+        """
+        Submit a JSONL job file for asynchronous processing.
+
+        Args:
+            job_file: Path to the JSONL job file
+
+        Returns:
+            Backend job ID
+        """
+        pass
+
+    @abstractmethod
+    def poll(self, job_id: str) -> Dict:
+        """
+        Get the current status of a job.
+
+        Args:
+            job_id: Backend job ID
+
+        Returns:
+            Dictionary with at least "status" and "request_counts"
+        """
+        pass
+
+    @abstractmethod
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        """
+        Download the result file of a completed job.
+
+        Args:
+            job_id: Backend job ID
+            output_path: Where to write the result JSONL
+
+        Returns:
+            Path to the written result file
+        """
+        pass
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """
+        Check if the backend is properly configured and available.
+
+        Returns:
+            True if backend is ready to use, False otherwise
+        """
+        pass
+
+
+class LocalBatchBackend(BaseBatchBackend):
+    """
+    File-based stand-in for a batch API.
+
+    Jobs are stored under ``work_dir/<job_id>/`` and processed with a local
+    provider the first time they are polled, so pipelines can be exercised
+    end-to-end without network access or API costs.
+    """
+
+    name = "local"
+
+    def __init__(self, work_dir: str = "batch_jobs", provider: Optional[BaseLLMProvider] = None):
+        """
+        Initialize local batch backend.
+
+        Args:
+            work_dir: Directory holding job inputs, outputs and status files
+            provider: Provider used to process requests (default: MockProvider)
+        """
+        self.work_dir = Path(work_dir)
+        self.provider = provider or MockProvider()
+
+    def _job_dir(self, job_id: str) -> Path:
+        job_dir = self.work_dir / job_id
+        if not job_dir.exists():
+            raise ValueError(f"Unknown batch job: {job_id}")
+        return job_dir
+
+    def _read_status(self, job_dir: Path) -> Dict:
+        with open(job_dir / "status.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_status(self, job_dir: Path, status: Dict):
+        with open(job_dir / "status.json", "w", encoding="utf-8") as f:
+            json.dump(status, f, indent=2)
+
+    def submit(self, job_file: Path) -> str:
+        """Copy the job file into the work directory and mark it as queued."""
+        job_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        job_dir = self.work_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        total = 0
+        with open(job_file, "r", encoding="utf-8") as src, \
+                open(job_dir / "input.jsonl", "w", encoding="utf-8") as dst:
+            for line in src:
+                if line.strip():
+                    dst.write(line if line.endswith("\n") else line + "\n")
+                    total += 1
+
+        self._write_status(job_dir, {
+            "id": job_id,
+            "status": "in_progress",
+            "created_at": datetime.now().isoformat(),
+            "request_counts": {"total": total, "completed": 0, "failed": 0},
+        })
+        logger.info(f"Submitted local batch job {job_id} with {total} requests")
+        return job_id
+
+    def _process(self, job_dir: Path, status: Dict) -> Dict:
+        """Run every request of a job through the local provider."""
+        completed = failed = 0
+        with open(job_dir / "output.jsonl", "w", encoding="utf-8") as out:
+            for request in iter_jsonl(job_dir / "input.jsonl"):
+                body = request.get("body", {})
+                prompt = next(
+                    (m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"),
+                    "",
+                )
+                record = {"id": f"req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"]}
+                try:
+                    content = self.provider.generate(prompt, body.get("max_tokens"))
+                    record["response"] = {
+                        "status_code": 200,
+                        "body": {
+                            "model": body.get("model"),
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                        },
+                    }
+                    record["error"] = None
+                    completed += 1
+                except Exception as e:
+                    record["response"] = None
+                    record["error"] = {"message": str(e)}
+                    failed += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        status["status"] = "completed"
+        status["completed_at"] = datetime.now().isoformat()
+        status["request_counts"].update({"completed": completed, "failed": failed})
+        self._write_status(job_dir, status)
+        return status
+
+    def poll(self, job_id: str) -> Dict:
+        """Return job status, processing queued jobs on first poll."""
+        job_dir = self._job_dir(job_id)
+        status = self._read_status(job_dir)
+        if status["status"] == "in_progress":
+            status = self._process(job_dir, status)
+        return status
+
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        """Copy the job's result file to ``output_path``."""
+        job_dir = self._job_dir(job_id)
+        status = self._read_status(job_dir)
+        if status["status"] != "completed":
+            raise Exception(f"Batch job {job_id} is not completed (status: {status['status']})")
+
+        output_path = Path(output_path)
+        output_path.write_bytes((job_dir / "output.jsonl").read_bytes())
+        return output_path
+
+    def is_available(self) -> bool:
+        """Local backend is available whenever its provider is."""
+        return self.provider.is_available()
+
+
+class OpenAIBatchBackend(BaseBatchBackend):
+    """
+    OpenAI Batch API backend (discounted, 24h completion window).
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: str, completion_window: str = "24h"):
+        """
+        Initialize OpenAI batch backend.
+
+        Args:
+            api_key: OpenAI API key
+            completion_window: Batch completion window accepted by the API
+        """
+        self.completion_window = completion_window
+        self.client = None
+
+        # Lazy import to avoid errors if openai is not installed
+        if api_key:
+            try:
+                from openai import OpenAI
+                self.client = OpenAI(api_key=api_key)
+            except ImportError:
+                logger.error("OpenAI library not installed. Install with: pip install openai")
+            except Exception as e:
+                logger.error(f"Error initializing OpenAI client: {e}")
+
+    def submit(self, job_file: Path) -> str:
+        """Upload the job file and create a batch."""
+        if not self.client:
+            raise Exception("OpenAI client not initialized. Check API key.")
+
+        with open(job_file, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} (input file {uploaded.id})")
+        return batch.id
+
+    def poll(self, job_id: str) -> Dict:
+        """Retrieve batch status from the API."""
+        if not self.client:
+            raise Exception("OpenAI client not initialized. Check API key.")
+
+        batch = self.client.batches.retrieve(job_id)
+        counts = batch.request_counts
+        return {
+            "id": batch.id,
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+            "request_counts": {
+                "total": counts.total if counts else 0,
+                "completed": counts.completed if counts else 0,
+                "failed": counts.failed if counts else 0,
+            },
+        }
+
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        """Download output (and error) files of a batch into one JSONL file."""
+        status = self.poll(job_id)
+        if status["status"] != "completed":
+            raise Exception(f"Batch job {job_id} is not completed (status: {status['status']})")
+
+        output_path = Path(output_path)
+        with open(output_path, "w", encoding="utf-8") as out:
+            for file_id in (status["output_file_id"], status["error_file_id"]):
+                if file_id:
+                    text = self.client.files.content(file_id).text
+                    if text and not text.endswith("\n"):
+                        text += "\n"
+                    out.write(text)
+        return output_path
+
+    def is_available(self) -> bool:
+        """Check if the OpenAI client is initialized."""
+        return self.client is not None
+
+
+def get_batch_backend(
+    backend: str = "local",
+    api_key: Optional[str] = None,
+    work_dir: str = "batch_jobs",
+) -> BaseBatchBackend:
+    """
+    Factory function to get a batch backend instance.
+
+    Args:
+        backend: Backend name ("local", "openai")
+        api_key: API key for the OpenAI backend
+        work_dir: Work directory for the local backend
+
+    Returns:
+        BaseBatchBackend instance
+
+    Raises:
+        ValueError: If backend name is invalid
+    """
+    backend = backend.lower()
+    if backend == "openai":
+        return OpenAIBatchBackend(api_key=api_key)
+    if backend == "local":
+        return LocalBatchBackend(work_dir=work_dir)
+    raise ValueError(f"Unknown batch backend: {backend}. Supported: 'local', 'openai'")
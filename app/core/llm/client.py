@@ -1,13 +1,18 @@
 """
 LLM client for managing different providers.
 """
-from typing import Optional
+from typing import Dict, Optional
 import logging
 
-from .providers.base_provider import BaseLLMProvider
-from .providers.openai_provider import OpenAIProvider
-from .providers.mock_provider import MockProvider
+from .providers.base_provider import BaseLLMProvider, ProviderResult
+from .providers.openai_provider import get_openai_provider
+from .providers.mock_provider import get_mock_provider
+from .providers.local_provider import DEFAULT_LOCAL_MODEL, get_local_provider
+from .providers.replay_provider import RecordReplayProvider, open_cassette
 from .prompt_builder import PromptBuilder
+from .tokenizer import TokenCounter
+from .usage import record_usage
+from .word_budget import DEFAULT_MAX_WORDS, DEFAULT_MIN_WORDS, WordBudget, max_tokens_for_words
 
 logger = logging.getLogger(__name__)
 
@@ -24,18 +29,49 @@ class LLMClient:
         provider_name: str = "mock",
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        max_input_tokens: Optional[int] = None,
+        provider_options: Optional[Dict] = None,
+        cassette_options: Optional[Dict] = None,
+        prompt_layout: str = "standard",
+        generation_options: Optional[Dict] = None,
     ):
         """
         Initialize LLM client with specified provider.
         
         Args:
-            provider_name: Name of provider ("openai", "mock")
+            provider_name: Name of provider ("openai", "mock", "local")
             api_key: API key for the provider (if needed)
             model: Model name (provider-specific)
+            max_input_tokens: Token budget for insight prompts (None for no limit)
+            provider_options: Extra provider-specific constructor options
+            cassette_options: Record/replay options ("path", "mode",
+                "replay_timing", "timing_scale"); None disables record/replay
+            prompt_layout: Insight prompt layout ("standard" or "prefix")
+            generation_options: Insight length options ("max_tokens",
+                "min_words", "max_words", "early_stop")
         """
+        options = generation_options or {}
+        min_words = options.get("min_words", DEFAULT_MIN_WORDS)
+        max_words = options.get("max_words", DEFAULT_MAX_WORDS)
+        # Cap completions near the requested length, never above the configured maximum
+        self.max_tokens = max_tokens_for_words(max_words, options.get("max_tokens", 150))
+        # Stop streaming at the first sentence end past the minimum length
+        self.stop_after_words = min_words if options.get("early_stop", False) else None
+
         self.provider_name = provider_name
-        self.provider = self._initialize_provider(provider_name, api_key, model)
-        self.prompt_builder = PromptBuilder()
+        self.model = model
+        self.provider_options = provider_options or {}
+        self.cassette_options = cassette_options
+        self.provider = self._wrap_with_cassette(
+            self._initialize_provider(provider_name, api_key, model), model
+        )
+        self.token_counter = TokenCounter(model)
+        self.prompt_builder = PromptBuilder(
+            token_counter=self.token_counter,
+            max_input_tokens=max_input_tokens,
+            layout=prompt_layout,
+            word_range=(min_words, max_words),
+        )
 
     def _initialize_provider(
         self,
@@ -62,27 +98,105 @@ class LLMClient:
         if provider_name == "openai":
             if not api_key:
                 logger.warning("OpenAI API key not provided, falling back to mock provider")
-                return MockProvider()
-            return OpenAIProvider(api_key=api_key, model=model or "gpt-3.5-turbo")
+                # Label (and price) the calls as the mock calls they are
+                self.provider_name = "mock"
+                self.model = None
+                return get_mock_provider()
+            return get_openai_provider(api_key=api_key, model=model or "gpt-3.5-turbo")
 
         elif provider_name == "mock":
-            return MockProvider()
+            return get_mock_provider(**self.provider_options)
+
+        elif provider_name == "local":
+            return get_local_provider(model=model or DEFAULT_LOCAL_MODEL, **self.provider_options)
 
         else:
             raise ValueError(
-                f"Unknown provider: {provider_name}. Supported: 'openai', 'mock'"
+                f"Unknown provider: {provider_name}. Supported: 'openai', 'mock', 'local'"
             )
 
-    def generate_insight(self, prompt: str, max_tokens: Optional[int] = 150) -> str:
+    def _wrap_with_cassette(
+        self,
+        provider: BaseLLMProvider,
+        model: Optional[str],
+    ) -> BaseLLMProvider:
         """
-        Generate insight using the configured provider.
+        Wrap a provider in a record/replay cassette if configured.
+        
+        Args:
+            provider: Initialized provider
+            model: Model name (part of the recording key)
+            
+        Returns:
+            The provider, or a RecordReplayProvider around it
+        """
+        if not self.cassette_options:
+            return provider
+
+        options = dict(self.cassette_options)
+        cassette = open_cassette(options.pop("path"))
+        logger.info(f"Using cassette {cassette.path} in '{options.get('mode', 'replay')}' mode")
+        return RecordReplayProvider(
+            provider,
+            cassette,
+            params={"provider": self.provider_name, "model": model},
+            **options,
+        )
+
+    def _stop_fn(self):
+        """Fresh word-budget stop callback, or None if early stopping is off."""
+        return WordBudget(self.stop_after_words).feed if self.stop_after_words else None
+
+    def _account(self, prompt: str, result: ProviderResult) -> ProviderResult:
+        """Fill in missing model and token counts, then record usage."""
+        result.model = result.model or self.model or self.provider_name
+        if result.prompt_tokens is None:
+            result.prompt_tokens = self.token_counter.count(prompt)
+            result.estimated_usage = True
+        if result.completion_tokens is None:
+            result.completion_tokens = self.token_counter.count(result.text)
+            result.estimated_usage = True
+        record_usage(result, self.provider_name)
+        return result
+
+    def generate_result(self, prompt: str, max_tokens: Optional[int] = None) -> ProviderResult:
+        """
+        Generate insight and record its token usage, cost and latency.
+        
+        With early stopping enabled the completion is streamed and cut at
+        the first sentence boundary past the minimum word count. Token
+        counts the provider does not report are estimated locally.
         
         Args:
             prompt: Input prompt
-            max_tokens: Maximum tokens to generate
+            max_tokens: Maximum tokens to generate (defaults to the derived cap)
             
         Returns:
-            Generated insight text
+            ProviderResult for the call
+            
+        Raises:
+            Exception: If provider is not available or generation fails
+        """
+        if not self.provider.is_available():
+            raise Exception(f"Provider '{self.provider_name}' is not available")
+
+        try:
+            result = self.provider.generate_result(prompt, max_tokens or self.max_tokens, self._stop_fn())
+        except Exception as e:
+            logger.error(f"Failed to generate insight: {e}")
+            raise
+        return self._account(prompt, result)
+
+    async def agenerate_result(self, prompt: str, max_tokens: Optional[int] = None) -> ProviderResult:
+        """
+        Async version of ``generate_result``.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate (defaults to the derived cap)
+            
+        Returns:
+            ProviderResult for the call
             
         Raises:
             Exception: If provider is not available or generation fails
@@ -91,11 +205,45 @@ class LLMClient:
             raise Exception(f"Provider '{self.provider_name}' is not available")
 
         try:
-            insight = self.provider.generate(prompt, max_tokens)
-            return insight
+            result = await self.provider.agenerate_result(
+                prompt, max_tokens or self.max_tokens, self._stop_fn()
+            )
         except Exception as e:
             logger.error(f"Failed to generate insight: {e}")
             raise
+        return self._account(prompt, result)
+
+    def generate_insight(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Generate insight using the configured provider.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate (defaults to the derived cap)
+            
+        Returns:
+            Generated insight text
+            
+        Raises:
+            Exception: If provider is not available or generation fails
+        """
+        return self.generate_result(prompt, max_tokens).text
+
+    async def agenerate_insight(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Generate insight without blocking the event loop.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate (defaults to the derived cap)
+            
+        Returns:
+            Generated insight text
+            
+        Raises:
+            Exception: If provider is not available or generation fails
+        """
+        return (await self.agenerate_result(prompt, max_tokens)).text
 
     def is_provider_available(self) -> bool:
         """
@@ -120,6 +268,7 @@ class LLMClient:
         provider_name: str,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        provider_options: Optional[Dict] = None,
     ):
         """
         Switch to a different provider.
@@ -128,8 +277,13 @@ class LLMClient:
             provider_name: Name of new provider
             api_key: API key for the provider
             model: Model name
+            provider_options: Extra provider-specific constructor options
         """
         logger.info(f"Switching provider from '{self.provider_name}' to '{provider_name}'")
         self.provider_name = provider_name
-        self.provider = self._initialize_provider(provider_name, api_key, model)
+        self.model = model
+        self.provider_options = provider_options or {}
+        self.provider = self._wrap_with_cassette(
+            self._initialize_provider(provider_name, api_key, model), model
+        )
 
@@ -0,0 +1,24 @@
+"""
+Formatting of retrieved passages for prompts.
+"""
+from typing import Dict, List
+
+
+def format_context(passages: List[Dict]) -> str:
+    """
+    Format retrieved passages as a prompt context section.
+    
+    Args:
+        passages: Retrieved documents (each with a "text" key)
+        
+    Returns:
+        Formatted context string, or "" if there are no passages
+    """
+    if not passages:
+        return ""
+    
+    context_parts = ["Relevant Astrological Knowledge:"]
+    for i, passage in enumerate(passages, 1):
+        context_parts.append(f"\n{i}. {passage['text']}")
+    
+    return "\n".join(context_parts)
@@ -2,7 +2,88 @@
 Prompt builder for generating LLM prompts.
 """
 from datetime import date
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import logging
+
+from app.core.zodiac.traits import ZODIAC_TRAITS
+from .context import format_context
+from .tokenizer import TokenCounter
+from .word_budget import DEFAULT_MAX_WORDS, DEFAULT_MIN_WORDS
+
+logger = logging.getLogger(__name__)
+
+# "standard": name and date first, guidelines last (original layout)
+# "prefix": most static to most variable, so providers can cache the prefix
+PROMPT_LAYOUTS = ("standard", "prefix")
+
+# Stand-in name used to count where a layout inserts the name
+NAME_SLOT_SENTINEL = "\x00name\x00"
+
+# Sign-agnostic guidelines that open every prefix-layout prompt
+PREFIX_GUIDELINES = """Guidelines:
+1. Create a personalized, encouraging message ({min_words}-{max_words} words)
+2. Reference the zodiac sign's characteristics naturally
+3. Be positive and actionable
+4. Use a warm, conversational tone
+5. Focus on opportunities and guidance for the day
+6. Avoid generic predictions"""
+
+# Static prompt prefixes (guidelines + sign traits) keyed by sign and word range
+_static_prefixes: Dict[tuple, str] = {}
+
+
+def _zodiac_information(zodiac_sign: str, traits: Dict) -> str:
+    """Format the zodiac information block of an insight prompt."""
+    positive_traits = ", ".join(traits.get("positive_traits", [])[:3])
+    keywords = ", ".join(traits.get("keywords", [])[:3])
+    return f"""Zodiac Information:
+- Sign: {zodiac_sign}
+- Element: {traits.get("element", "")}
+- Ruling Planet: {traits.get("ruling_planet", "")}
+- Key Traits: {positive_traits}
+- Keywords: {keywords}"""
+
+
+def get_static_prefix(
+    zodiac_sign: str,
+    traits: Dict,
+    word_range: tuple = (DEFAULT_MIN_WORDS, DEFAULT_MAX_WORDS),
+) -> str:
+    """
+    Get the static prompt prefix for a sign, building it on first use.
+    
+    Args:
+        zodiac_sign: Zodiac sign
+        traits: Dictionary of zodiac traits
+        word_range: (min, max) words requested for the insight
+        
+    Returns:
+        Guidelines followed by the sign's zodiac information
+    """
+    key = (zodiac_sign, *word_range)
+    prefix = _static_prefixes.get(key)
+    if prefix is None:
+        guidelines = PREFIX_GUIDELINES.format(min_words=word_range[0], max_words=word_range[1])
+        prefix = f"{guidelines}\n\n{_zodiac_information(zodiac_sign, traits)}"
+        _static_prefixes[key] = prefix
+    return prefix
+
+
+def precompute_static_prefixes(
+    word_range: tuple = (DEFAULT_MIN_WORDS, DEFAULT_MAX_WORDS),
+) -> int:
+    """
+    Build the static prompt prefix of every sign (call once at startup).
+    
+    Args:
+        word_range: (min, max) words requested for the insight
+        
+    Returns:
+        Number of prefixes built
+    """
+    for zodiac_sign, traits in ZODIAC_TRAITS.items():
+        get_static_prefix(zodiac_sign, traits, word_range)
+    return len(ZODIAC_TRAITS)
 
 
 class PromptBuilder:
@@ -10,7 +91,72 @@ class PromptBuilder:
     Build structured prompts for LLM insight generation.
     """
 
-    def build_insight_prompt(
+    def __init__(
+        self,
+        token_counter: Optional[TokenCounter] = None,
+        max_input_tokens: Optional[int] = None,
+        layout: str = "standard",
+        word_range: tuple = (DEFAULT_MIN_WORDS, DEFAULT_MAX_WORDS),
+    ):
+        """
+        Initialize prompt builder.
+        
+        Args:
+            token_counter: Token counter for the target model
+            max_input_tokens: Token budget for insight prompts (None for no limit)
+            layout: Insight prompt layout ("standard" or "prefix")
+            word_range: (min, max) words requested for the insight
+            
+        Raises:
+            ValueError: If layout is invalid
+        """
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Invalid prompt layout: {layout}. Must be one of {', '.join(PROMPT_LAYOUTS)}")
+
+        self.token_counter = token_counter or TokenCounter()
+        self.max_input_tokens = max_input_tokens
+        self.layout = layout
+        self.word_range = tuple(word_range)
+
+    def _standard_sections(
+        self, name: str, zodiac_sign: str, traits: Dict, current_date: date
+    ) -> tuple:
+        """Leading and trailing sections of the standard layout."""
+        header = f"""Generate a personalized daily astrological insight for {name}, a {zodiac_sign}.
+
+{_zodiac_information(zodiac_sign, traits)}
+
+Date: {current_date.strftime('%B %d, %Y')}"""
+
+        guidelines = f"""
+
+Guidelines:
+1. Create a personalized, encouraging message ({self.word_range[0]}-{self.word_range[1]} words)
+2. Reference {zodiac_sign} characteristics naturally
+3. Be positive and actionable
+4. Use a warm, conversational tone
+5. Focus on opportunities and guidance for the day
+6. Avoid generic predictions
+
+Generate the insight:"""
+
+        return ("header", header), ("guidelines", guidelines)
+
+    def _prefix_sections(
+        self, name: str, zodiac_sign: str, traits: Dict, current_date: date
+    ) -> tuple:
+        """Leading and trailing sections of the prefix-cacheable layout."""
+        prefix = get_static_prefix(zodiac_sign, traits, self.word_range)
+        suffix = f"""
+
+Date: {current_date.strftime('%B %d, %Y')}
+Name: {name}
+
+Generate a personalized daily astrological insight for {name}, a {zodiac_sign}:"""
+
+        return ("prefix", prefix), ("suffix", suffix)
+
+    def assemble_insight_prompt(
         self,
         name: str,
         zodiac_sign: str,
@@ -18,9 +164,18 @@ class PromptBuilder:
         birth_date: date,
         current_date: Optional[date] = None,
         additional_context: Optional[str] = None,
-    ) -> str:
+        context_passages: Optional[List[Dict]] = None,
+    ) -> Dict:
         """
-        Create a structured prompt for generating personalized daily insights.
+        Assemble an insight prompt within the input token budget.
+        
+        Retrieved passages are the only trimmable section: when the prompt
+        exceeds ``max_input_tokens`` the lowest-scoring passages are dropped
+        first. Free-form ``additional_context`` is kept or dropped as a whole.
+        
+        In the "prefix" layout content runs from most static to most
+        variable: guidelines, sign traits, retrieved context, date, name.
+        Everything up to the context is shared by all users of a sign.
         
         Args:
             name: User's name
@@ -28,48 +183,112 @@ class PromptBuilder:
             traits: Dictionary of zodiac traits
             birth_date: User's birth date
             current_date: Current date (defaults to today)
-            additional_context: Additional context from vector store (RAG)
+            additional_context: Preformatted context from vector store (RAG)
+            context_passages: Scored passages from vector store (RAG)
             
         Returns:
-            Formatted prompt string
+            Dictionary with the prompt, per-section token counts, total
+            tokens, the number of dropped passages and the number of times
+            the name was inserted
         """
         if current_date is None:
             current_date = date.today()
 
-        # Extract key traits for the prompt
-        positive_traits = ", ".join(traits.get("positive_traits", [])[:3])
-        keywords = ", ".join(traits.get("keywords", [])[:3])
-        element = traits.get("element", "")
-        ruling_planet = traits.get("ruling_planet", "")
+        sections = self._prefix_sections if self.layout == "prefix" else self._standard_sections
+        (leading_name, leading), (trailing_name, trailing) = sections(
+            name, zodiac_sign, traits, current_date
+        )
 
-        prompt = f"""Generate a personalized daily astrological insight for {name}, a {zodiac_sign}.
+        # Passages ordered best first; trimming pops from the end
+        passages = sorted(context_passages or [], key=lambda p: p.get("score", 0.0), reverse=True)
 
-Zodiac Information:
-- Sign: {zodiac_sign}
-- Element: {element}
-- Ruling Planet: {ruling_planet}
-- Key Traits: {positive_traits}
-- Keywords: {keywords}
+        def current_context() -> str:
+            if context_passages is not None:
+                return format_context(passages)
+            return additional_context or ""
 
-Date: {current_date.strftime('%B %d, %Y')}"""
+        def render(context: str) -> str:
+            return f"{leading}\n\n{context}{trailing}" if context else f"{leading}{trailing}"
 
-        # Add vector store context if available
-        if additional_context:
-            prompt += f"\n\n{additional_context}"
+        context = current_context()
+        prompt = render(context)
+        dropped = 0
+        if self.max_input_tokens:
+            while context and self.token_counter.count(prompt) > self.max_input_tokens:
+                if passages:
+                    passages.pop()
+                else:
+                    additional_context = None
+                dropped += 1
+                context = current_context()
+                prompt = render(context)
 
-        prompt += f"""
+            if dropped:
+                logger.info(
+                    f"Dropped {dropped} context passage(s) to fit {self.max_input_tokens} token budget"
+                )
 
-Guidelines:
-1. Create a personalized, encouraging message (30-50 words)
-2. Reference {zodiac_sign} characteristics naturally
-3. Be positive and actionable
-4. Use a warm, conversational tone
-5. Focus on opportunities and guidance for the day
-6. Avoid generic predictions
+        token_counts = {
+            leading_name: self.token_counter.count(leading),
+            "context": self.token_counter.count(context),
+            trailing_name: self.token_counter.count(trailing),
+        }
+        total_tokens = self.token_counter.count(prompt)
+        if self.max_input_tokens and total_tokens > self.max_input_tokens:
+            logger.warning(
+                f"Insight prompt uses {total_tokens} tokens, over the {self.max_input_tokens} "
+                "token budget with no context left to trim"
+            )
 
-Generate the insight:"""
+        # How often the layout inserts the name, so callers can tell it apart
+        # from the same word appearing elsewhere in the prompt
+        name_slots = sum(
+            section.count(NAME_SLOT_SENTINEL)
+            for _, section in sections(NAME_SLOT_SENTINEL, zodiac_sign, traits, current_date)
+        )
 
-        return prompt
+        return {
+            "prompt": prompt,
+            "token_counts": token_counts,
+            "total_tokens": total_tokens,
+            "dropped_passages": dropped,
+            "name_slots": name_slots,
+        }
+
+    def build_insight_prompt(
+        self,
+        name: str,
+        zodiac_sign: str,
+        traits: Dict,
+        birth_date: date,
+        current_date: Optional[date] = None,
+        additional_context: Optional[str] = None,
+        context_passages: Optional[List[Dict]] = None,
+    ) -> str:
+        """
+        Create a structured prompt for generating personalized daily insights.
+        
+        Args:
+            name: User's name
+            zodiac_sign: Zodiac sign
+            traits: Dictionary of zodiac traits
+            birth_date: User's birth date
+            current_date: Current date (defaults to today)
+            additional_context: Additional context from vector store (RAG)
+            context_passages: Scored passages from vector store (RAG)
+            
+        Returns:
+            Formatted prompt string
+        """
+        return self.assemble_insight_prompt(
+            name=name,
+            zodiac_sign=zodiac_sign,
+            traits=traits,
+            birth_date=birth_date,
+            current_date=current_date,
+            additional_context=additional_context,
+            context_passages=context_passages,
+        )["prompt"]
 
     def build_simple_prompt(self, zodiac_sign: str, trait_summary: str) -> str:
         """
@@ -1,9 +1,20 @@
 """
 LLM provider implementations.
 """
-from .base_provider import BaseLLMProvider
+from .base_provider import BaseLLMProvider, ProviderError, ProviderResult, RateLimitError
 from .openai_provider import OpenAIProvider
 from .mock_provider import MockProvider
+from .local_provider import LocalProvider
+from .replay_provider import RecordReplayProvider
 
-__all__ = ["BaseLLMProvider", "OpenAIProvider", "MockProvider"]
+__all__ = [
+    "BaseLLMProvider",
+    "ProviderError",
+    "ProviderResult",
+    "RateLimitError",
+    "OpenAIProvider",
+    "MockProvider",
+    "LocalProvider",
+    "RecordReplayProvider",
+]
 
@@ -2,7 +2,107 @@
 Base abstract class for LLM providers.
 """
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple
+import asyncio
+import time
+
+# Stream stop callback: receives each chunk, returns the final text to stop early
+StopFn = Callable[[str], Optional[str]]
+
+
+class ProviderError(Exception):
+    """Raised when a provider fails to generate a response."""
+    pass
+
+
+class RateLimitError(ProviderError):
+    """Raised when a provider rejects a request because of rate limiting."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class ProviderResult:
+    """
+    Outcome of a single provider call.
+    
+    Token counts are None when the provider does not report them, and
+    ``estimated_usage`` is set when they were estimated locally instead.
+    Timings are in seconds from the start of the call.
+    """
+
+    text: str
+    model: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: int = 0
+    latency: float = 0.0
+    time_to_first_token: Optional[float] = None
+    stopped_early: bool = False
+    estimated_usage: bool = False
+
+
+def consume_stream(
+    chunks: Iterator[str], stop: Optional[StopFn], start: float
+) -> Tuple[str, Optional[float], bool]:
+    """
+    Read a chunk stream until it ends or ``stop`` returns the final text.
+    
+    The stream is closed either way, so closing cancels upstream work.
+    
+    Args:
+        chunks: Iterator of text chunks
+        stop: Stop callback (None reads to the end)
+        start: ``time.perf_counter()`` value at the start of the call
+        
+    Returns:
+        Tuple of (text, time to first token, stopped early)
+    """
+    text = ""
+    first_token = None
+    try:
+        for chunk in chunks:
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            text += chunk
+            final = stop(chunk) if stop else None
+            if final is not None:
+                return final, first_token, True
+    finally:
+        chunks.close()
+    return text.strip(), first_token, False
+
+
+async def aconsume_stream(
+    chunks: AsyncIterator[str], stop: Optional[StopFn], start: float
+) -> Tuple[str, Optional[float], bool]:
+    """
+    Async version of ``consume_stream``.
+    
+    Args:
+        chunks: Async iterator of text chunks
+        stop: Stop callback (None reads to the end)
+        start: ``time.perf_counter()`` value at the start of the call
+        
+    Returns:
+        Tuple of (text, time to first token, stopped early)
+    """
+    text = ""
+    first_token = None
+    try:
+        async for chunk in chunks:
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            text += chunk
+            final = stop(chunk) if stop else None
+            if final is not None:
+                return final, first_token, True
+    finally:
+        await chunks.aclose()
+    return text.strip(), first_token, False
 
 
 class BaseLLMProvider(ABC):
@@ -30,6 +130,115 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    async def agenerate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Generate text without blocking the event loop.
+        
+        The default runs ``generate`` in a worker thread; providers with a
+        native async path should override this.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            
+        Returns:
+            Generated text
+        """
+        return await asyncio.to_thread(self.generate, prompt, max_tokens)
+
+    def stream(self, prompt: str, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Generate text as a stream of chunks.
+        
+        The default yields the full ``generate`` result as a single chunk;
+        providers with native streaming should override this.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Text chunks in generation order
+        """
+        yield self.generate(prompt, max_tokens)
+
+    async def astream(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Async version of ``stream``.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Text chunks in generation order
+        """
+        yield await self.agenerate(prompt, max_tokens)
+
+    def generate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Generate text and report model, token usage and timings.
+        
+        Without ``stop`` this times ``generate``; with ``stop`` it reads
+        ``stream`` until the callback returns the final text. Providers
+        that know their token usage should override this.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stream stop callback for early termination
+            
+        Returns:
+            ProviderResult for the call
+        """
+        start = time.perf_counter()
+        if stop is None:
+            text, first_token, stopped = self.generate(prompt, max_tokens), None, False
+        else:
+            text, first_token, stopped = consume_stream(self.stream(prompt, max_tokens), stop, start)
+        return ProviderResult(
+            text=text,
+            model=getattr(self, "model_name", None),
+            latency=time.perf_counter() - start,
+            time_to_first_token=first_token,
+            stopped_early=stopped,
+        )
+
+    async def agenerate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Async version of ``generate_result``.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stream stop callback for early termination
+            
+        Returns:
+            ProviderResult for the call
+        """
+        start = time.perf_counter()
+        if stop is None:
+            text, first_token, stopped = await self.agenerate(prompt, max_tokens), None, False
+        else:
+            text, first_token, stopped = await aconsume_stream(self.astream(prompt, max_tokens), stop, start)
+        return ProviderResult(
+            text=text,
+            model=getattr(self, "model_name", None),
+            latency=time.perf_counter() - start,
+            time_to_first_token=first_token,
+            stopped_early=stopped,
+        )
+
     @abstractmethod
     def is_available(self) -> bool:
         """
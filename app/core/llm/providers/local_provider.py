@@ -0,0 +1,295 @@
+"""
+Local CPU inference provider using a small Hugging Face causal LM.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.core.batching import DynamicBatcher
+from app.core.metrics import get_metrics
+from .base_provider import BaseLLMProvider, ProviderResult, StopFn
+from .openai_provider import SYSTEM_PROMPT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MODEL = "HuggingFaceTB/SmolLM2-135M-Instruct"
+DEFAULT_MAX_TOKENS = 150
+
+
+class LocalProvider(BaseLLMProvider):
+    """
+    Provider that runs a causal LM on CPU inside the process.
+
+    Concurrent ``generate``/``agenerate`` calls are collected into dynamic
+    batches (up to ``max_batch_size`` prompts, waiting at most ``max_wait_ms``)
+    and run on a dedicated worker thread, so async callers never block the
+    event loop. Any causal LM works; ``sshleifer/tiny-gpt2`` is small enough
+    for offline smoke tests.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_LOCAL_MODEL,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        num_threads: Optional[int] = None,
+        temperature: float = 0.7,
+    ):
+        """
+        Initialize local provider and load the model.
+
+        Args:
+            model: Hugging Face model name or local path
+            max_batch_size: Maximum prompts per generation batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+            num_threads: Torch intra-op threads (None keeps the torch default)
+            temperature: Sampling temperature (0 for greedy decoding)
+        """
+        self.model_name = model
+        self.temperature = temperature
+        self.model = None
+        self.tokenizer = None
+        self.batcher = None
+        self.last_tokens_per_second = 0.0
+
+        # Lazy import so transformers/torch stay optional dependencies
+        try:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            if num_threads:
+                torch.set_num_threads(num_threads)
+
+            logger.info(f"Loading local model: {model}")
+            self.tokenizer = AutoTokenizer.from_pretrained(model)
+            # Decoder-only models need left padding for batched generation
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+
+            self.model = AutoModelForCausalLM.from_pretrained(model, torch_dtype=torch.float32)
+            self.model.eval()
+            self._torch = torch
+
+            self.batcher = DynamicBatcher(
+                self._generate_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                name="local-llm-batcher",
+            )
+        except ImportError:
+            logger.error("Local provider requires transformers and torch. Install with: pip install transformers torch")
+        except Exception as e:
+            logger.error(f"Error loading local model '{model}': {e}")
+            self.model = None
+
+    def _format_prompt(self, prompt: str) -> str:
+        """Wrap a prompt in the model's chat template when it has one."""
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(
+                [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+        return f"{SYSTEM_PROMPT}\n\n{prompt}\n"
+
+    def _generate_batch(self, items: List[Tuple[str, Optional[int]]]) -> List[ProviderResult]:
+        """
+        Generate completions for a batch of (prompt, max_tokens) items.
+
+        Runs on the batcher's worker thread.
+        """
+        limits = [max_tokens or DEFAULT_MAX_TOKENS for _, max_tokens in items]
+        inputs = self.tokenizer(
+            [self._format_prompt(prompt) for prompt, _ in items],
+            return_tensors="pt",
+            padding=True,
+        )
+
+        generate_kwargs = {
+            "max_new_tokens": max(limits),
+            "pad_token_id": self.tokenizer.pad_token_id,
+        }
+        if self.temperature > 0:
+            generate_kwargs.update(do_sample=True, temperature=self.temperature)
+        else:
+            generate_kwargs["do_sample"] = False
+
+        start = time.perf_counter()
+        with self._torch.inference_mode():
+            output = self.model.generate(**inputs, **generate_kwargs)
+        elapsed = time.perf_counter() - start
+
+        # Keep only newly generated tokens, truncated to each request's limit
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+        prompt_lengths = inputs["attention_mask"].sum(dim=1).tolist()
+        results = []
+        generated = 0
+        for row, limit, prompt_tokens in zip(new_tokens, limits, prompt_lengths):
+            row = row[:limit]
+            row = row[row != self.tokenizer.pad_token_id]
+            generated += int(row.numel())
+            results.append(ProviderResult(
+                text=self.tokenizer.decode(row, skip_special_tokens=True).strip(),
+                model=self.model_name,
+                prompt_tokens=int(prompt_tokens),
+                completion_tokens=int(row.numel()),
+            ))
+
+        tokens_per_second = generated / elapsed if elapsed > 0 else 0.0
+        self.last_tokens_per_second = tokens_per_second
+
+        metrics = get_metrics()
+        metrics.observe("local_llm_batch_size", len(items), model=self.model_name)
+        metrics.observe("local_llm_tokens_per_second", tokens_per_second, model=self.model_name)
+        metrics.increment("local_llm_generated_tokens", generated, model=self.model_name)
+        logger.debug(
+            f"Local batch of {len(items)} generated {generated} tokens "
+            f"in {elapsed:.2f}s ({tokens_per_second:.1f} tokens/s)"
+        )
+        return results
+
+    def generate(self, prompt: str, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS) -> str:
+        """
+        Generate text with the local model, blocking until the batch completes.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Generated text
+
+        Raises:
+            Exception: If the model is not loaded or generation fails
+        """
+        if not self.is_available():
+            raise Exception(f"Local model '{self.model_name}' is not loaded")
+
+        return self.generate_result(prompt, max_tokens).text
+
+    async def agenerate(self, prompt: str, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS) -> str:
+        """
+        Generate text with the local model without blocking the event loop.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Generated text
+
+        Raises:
+            Exception: If the model is not loaded or generation fails
+        """
+        if not self.is_available():
+            raise Exception(f"Local model '{self.model_name}' is not loaded")
+
+        return (await self.agenerate_result(prompt, max_tokens)).text
+
+    def generate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Generate text and report token counts and latency (including batching wait).
+
+        Batched generation does not stream, so ``stop`` is applied to the
+        finished text.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stop callback used to trim the completion
+
+        Returns:
+            ProviderResult for the call
+
+        Raises:
+            Exception: If the model is not loaded or generation fails
+        """
+        if not self.is_available():
+            raise Exception(f"Local model '{self.model_name}' is not loaded")
+
+        start = time.perf_counter()
+        result = self.batcher.submit((prompt, max_tokens)).result()
+        return self._finish(result, stop, start)
+
+    async def agenerate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Async version of ``generate_result``.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stop callback used to trim the completion
+
+        Returns:
+            ProviderResult for the call
+
+        Raises:
+            Exception: If the model is not loaded or generation fails
+        """
+        if not self.is_available():
+            raise Exception(f"Local model '{self.model_name}' is not loaded")
+
+        start = time.perf_counter()
+        result = await asyncio.wrap_future(self.batcher.submit((prompt, max_tokens)))
+        return self._finish(result, stop, start)
+
+    @staticmethod
+    def _finish(result: ProviderResult, stop: Optional[StopFn], start: float) -> ProviderResult:
+        """Apply the stop callback and stamp the caller-observed latency."""
+        final = stop(result.text) if stop else None
+        if final is not None:
+            result.text = final
+            result.stopped_early = True
+        result.latency = time.perf_counter() - start
+        return result
+
+    def is_available(self) -> bool:
+        """
+        Check if the local model is loaded.
+
+        Returns:
+            True if model and batcher are ready
+        """
+        return self.model is not None and self.batcher is not None
+
+
+@lru_cache(maxsize=1)
+def get_local_provider(
+    model: str = DEFAULT_LOCAL_MODEL,
+    max_batch_size: int = 8,
+    max_wait_ms: float = 20.0,
+    num_threads: Optional[int] = None,
+    temperature: float = 0.7,
+) -> LocalProvider:
+    """
+    Get or create the process-wide local provider.
+
+    Loading a model is expensive, so every LLMClient shares one instance
+    (and one batching worker).
+
+    Returns:
+        LocalProvider instance
+    """
+    return LocalProvider(
+        model=model,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        num_threads=num_threads,
+        temperature=temperature,
+    )
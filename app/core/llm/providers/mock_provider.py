@@ -1,20 +1,162 @@
 """
 Mock LLM provider for testing without API calls.
 """
-from typing import Optional
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, Optional, Union
+import asyncio
+import math
 import random
+import time
 
-from .base_provider import BaseLLMProvider
+from .base_provider import BaseLLMProvider, ProviderError, RateLimitError
+
+
+def parse_percentiles(percentiles: Union[str, Dict[float, float], None]) -> Dict[float, float]:
+    """
+    Parse recorded latency percentiles.
+    
+    Args:
+        percentiles: Mapping of percentile to milliseconds, or a string such
+            as "50:800,90:1500,99:3000"
+            
+    Returns:
+        Dictionary of percentile (0-100) to latency in milliseconds
+        
+    Raises:
+        ValueError: If the string is malformed
+    """
+    if not percentiles:
+        return {}
+    if isinstance(percentiles, dict):
+        return {float(p): float(ms) for p, ms in percentiles.items()}
+
+    parsed = {}
+    for pair in percentiles.split(","):
+        p, ms = pair.split(":")
+        parsed[float(p)] = float(ms)
+    return parsed
+
+
+class LatencyModel:
+    """
+    Latency distribution for simulated LLM calls.
+    
+    Modes:
+    - "none": no delay
+    - "fixed": always ``latency_ms``
+    - "lognormal": lognormal with median ``latency_ms`` and shape ``sigma``
+    - "percentiles": inverse-CDF sampling from recorded percentiles, with
+      linear interpolation between points
+    """
+
+    MODES = ("none", "fixed", "lognormal", "percentiles")
+
+    def __init__(
+        self,
+        mode: str = "none",
+        latency_ms: float = 0.0,
+        sigma: float = 0.5,
+        percentiles: Union[str, Dict[float, float], None] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize latency model.
+        
+        Args:
+            mode: Distribution mode (see class docstring)
+            latency_ms: Fixed latency, or median for lognormal
+            sigma: Lognormal shape parameter
+            percentiles: Recorded percentiles for "percentiles" mode
+            rng: Random number generator
+            
+        Raises:
+            ValueError: If the mode is unknown or percentiles are missing
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid latency mode: {mode}. Must be one of {', '.join(self.MODES)}")
+
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.points = sorted(parse_percentiles(percentiles).items())
+        self.rng = rng or random.Random()
+
+        if mode == "percentiles" and not self.points:
+            raise ValueError("Percentile latency mode requires recorded percentiles")
+
+    def sample(self) -> float:
+        """
+        Draw a latency.
+        
+        Returns:
+            Latency in seconds
+        """
+        if self.mode == "fixed":
+            ms = self.latency_ms
+        elif self.mode == "lognormal":
+            ms = self.rng.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.sigma)
+        elif self.mode == "percentiles":
+            ms = self._sample_percentiles(self.rng.uniform(0.0, 100.0))
+        else:
+            ms = 0.0
+        return max(ms, 0.0) / 1000.0
+
+    def _sample_percentiles(self, u: float) -> float:
+        """Map a uniform draw in [0, 100] to milliseconds."""
+        if u <= self.points[0][0]:
+            return self.points[0][1]
+        for (p_low, ms_low), (p_high, ms_high) in zip(self.points, self.points[1:]):
+            if u <= p_high:
+                return ms_low + (ms_high - ms_low) * (u - p_low) / (p_high - p_low)
+        return self.points[-1][1]
 
 
 class MockProvider(BaseLLMProvider):
     """
     Mock provider that generates fake insights for testing.
     Useful for development and testing without incurring API costs.
+    
+    By default responses are instant. For load tests, a simulation mode adds
+    realistic latency (see LatencyModel), injected errors and rate-limit
+    responses, and token-by-token streaming with a per-token delay.
     """
 
-    def __init__(self):
-        """Initialize mock provider with template responses."""
+    def __init__(
+        self,
+        latency_mode: str = "none",
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.5,
+        latency_percentiles: Union[str, Dict[float, float], None] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        token_delay_ms: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize mock provider with template responses.
+        
+        Args:
+            latency_mode: "none", "fixed", "lognormal" or "percentiles"
+            latency_ms: Fixed latency, or median for lognormal (time to first token)
+            latency_sigma: Lognormal shape parameter
+            latency_percentiles: Recorded percentiles, e.g. "50:800,90:1500,99:3000"
+            error_rate: Probability (0-1) of a simulated provider error
+            rate_limit_rate: Probability (0-1) of a simulated rate-limit response
+            token_delay_ms: Delay between streamed tokens
+            seed: Random seed for reproducible simulations
+        """
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(
+            mode=latency_mode,
+            latency_ms=latency_ms,
+            sigma=latency_sigma,
+            percentiles=latency_percentiles,
+            rng=self.rng,
+        )
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.token_delay = max(token_delay_ms, 0.0) / 1000.0
+
         self.templates = [
             "Your {trait} nature will guide you through today's challenges. {advice}",
             "As a {sign}, today is perfect for {action}. Trust your {trait} instincts.",
@@ -65,17 +207,8 @@ class MockProvider(BaseLLMProvider):
             "building stability",
         ]
 
-    def generate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
-        """
-        Generate a mock insight based on the prompt.
-        
-        Args:
-            prompt: The input prompt (analyzed for context)
-            max_tokens: Not used in mock provider
-            
-        Returns:
-            A randomly generated insight
-        """
+    def _compose(self, prompt: str) -> str:
+        """Build a random insight from the templates."""
         # Extract zodiac sign from prompt if present
         sign = "unknown"
         for word in prompt.split():
@@ -86,17 +219,118 @@ class MockProvider(BaseLLMProvider):
                 sign = word.strip(",.!?").capitalize()
                 break
 
-        template = random.choice(self.templates)
+        template = self.rng.choice(self.templates)
         insight = template.format(
-            trait=random.choice(self.traits),
+            trait=self.rng.choice(self.traits),
             sign=sign,
-            advice=random.choice(self.advice),
-            action=random.choice(self.actions),
-            focus_area=random.choice(self.focus_areas),
+            advice=self.rng.choice(self.advice),
+            action=self.rng.choice(self.actions),
+            focus_area=self.rng.choice(self.focus_areas),
         )
 
         return insight
 
+    def _check_failures(self):
+        """
+        Raise a simulated failure according to the configured rates.
+        
+        Raises:
+            RateLimitError: With probability ``rate_limit_rate``
+            ProviderError: With probability ``error_rate``
+        """
+        draw = self.rng.random()
+        if draw < self.rate_limit_rate:
+            raise RateLimitError("Simulated rate limit exceeded", retry_after=1.0)
+        if draw < self.rate_limit_rate + self.error_rate:
+            raise ProviderError("Simulated provider error")
+
+    def _tokens(self, text: str, max_tokens: Optional[int]) -> list[str]:
+        """Split a response into whitespace-delimited stream chunks."""
+        words = text.split(" ")
+        if max_tokens:
+            words = words[:max_tokens]
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def generate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Generate a mock insight based on the prompt.
+        
+        Args:
+            prompt: The input prompt (analyzed for context)
+            max_tokens: Maximum number of words to return
+            
+        Returns:
+            A randomly generated insight
+            
+        Raises:
+            ProviderError: If a simulated failure is injected
+        """
+        return "".join(self.stream(prompt, max_tokens))
+
+    async def agenerate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Async version of ``generate`` that sleeps without blocking the event loop.
+        
+        Args:
+            prompt: The input prompt (analyzed for context)
+            max_tokens: Maximum number of words to return
+            
+        Returns:
+            A randomly generated insight
+            
+        Raises:
+            ProviderError: If a simulated failure is injected
+        """
+        return "".join([chunk async for chunk in self.astream(prompt, max_tokens)])
+
+    def stream(self, prompt: str, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Stream a mock insight word by word with simulated delays.
+        
+        Args:
+            prompt: The input prompt (analyzed for context)
+            max_tokens: Maximum number of words to stream
+            
+        Yields:
+            Insight chunks
+            
+        Raises:
+            ProviderError: If a simulated failure is injected
+        """
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        self._check_failures()
+
+        for i, token in enumerate(self._tokens(self._compose(prompt), max_tokens)):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield token
+
+    async def astream(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Async version of ``stream``.
+        
+        Args:
+            prompt: The input prompt (analyzed for context)
+            max_tokens: Maximum number of words to stream
+            
+        Yields:
+            Insight chunks
+            
+        Raises:
+            ProviderError: If a simulated failure is injected
+        """
+        delay = self.latency.sample()
+        if delay:
+            await asyncio.sleep(delay)
+        self._check_failures()
+
+        for i, token in enumerate(self._tokens(self._compose(prompt), max_tokens)):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
     def is_available(self) -> bool:
         """
         Mock provider is always available.
@@ -106,3 +340,36 @@ class MockProvider(BaseLLMProvider):
         """
         return True
 
+
+@lru_cache(maxsize=None)
+def get_mock_provider(
+    latency_mode: str = "none",
+    latency_ms: float = 0.0,
+    latency_sigma: float = 0.5,
+    latency_percentiles: Optional[str] = None,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    token_delay_ms: float = 0.0,
+    seed: Optional[int] = None,
+) -> MockProvider:
+    """
+    Get or create the process-wide mock provider for a configuration.
+    
+    LLMClients are built per request, so a fresh provider per client would
+    restart a seeded RNG and draw the same latency and failure every time.
+    Sharing one instance keeps simulated error rates and latency
+    distributions across requests.
+    
+    Returns:
+        MockProvider instance
+    """
+    return MockProvider(
+        latency_mode=latency_mode,
+        latency_ms=latency_ms,
+        latency_sigma=latency_sigma,
+        latency_percentiles=latency_percentiles,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        token_delay_ms=token_delay_ms,
+        seed=seed,
+    )
@@ -1,13 +1,64 @@
 """
 OpenAI LLM provider implementation.
 """
-from typing import Optional
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
 import logging
+import threading
+import time
 
-from .base_provider import BaseLLMProvider
+from ..tokenizer import TokenCounter
+from .base_provider import (
+    BaseLLMProvider,
+    ProviderResult,
+    RateLimitError,
+    StopFn,
+    aconsume_stream,
+    consume_stream,
+)
 
 logger = logging.getLogger(__name__)
 
+# System prompt shared by realtime and batch chat completion requests
+SYSTEM_PROMPT = "You are an expert astrologer providing personalized, encouraging daily insights."
+
+# Chat format overhead: tokens per message, plus the primed assistant reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait before retrying, from a rate-limited response's headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except ValueError:
+        # An HTTP date instead of seconds
+        pass
+    return None
+
+
+def _api_error(error: Exception) -> Exception:
+    """
+    Translate an OpenAI SDK error into the exception callers handle.
+    
+    Rate-limit responses (HTTP 429) become ``RateLimitError`` so they reach
+    the API's Retry-After handling; anything else is a generic failure.
+    
+    Args:
+        error: Exception raised by the OpenAI SDK
+        
+    Returns:
+        Exception to raise (chain the original as its cause)
+    """
+    from openai import RateLimitError as OpenAIRateLimitError
+    
+    if isinstance(error, OpenAIRateLimitError):
+        return RateLimitError(f"OpenAI rate limit exceeded: {error}", retry_after=_retry_after(error))
+    return Exception(f"Failed to generate insight: {str(error)}")
+
 
 class OpenAIProvider(BaseLLMProvider):
     """
@@ -25,17 +76,190 @@ class OpenAIProvider(BaseLLMProvider):
         self.api_key = api_key
         self.model = model
         self.client = None
+        self.async_client = None
+        self.token_counter = TokenCounter(model)
 
         # Lazy import to avoid errors if openai is not installed
         if api_key:
             try:
-                from openai import OpenAI
+                from openai import AsyncOpenAI, OpenAI
                 self.client = OpenAI(api_key=api_key)
+                self.async_client = AsyncOpenAI(api_key=api_key)
             except ImportError:
                 logger.error("OpenAI library not installed. Install with: pip install openai")
             except Exception as e:
                 logger.error(f"Error initializing OpenAI client: {e}")
 
+    def _request(self, prompt: str, max_tokens: Optional[int], stream: bool = False) -> dict:
+        """Build chat completion request arguments."""
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        }
+        if stream:
+            # Usage arrives in a final chunk, only if the stream is read to the end
+            request.update(stream=True, stream_options={"include_usage": True})
+        return request
+
+    def _apply_usage(self, result: ProviderResult, usage):
+        """Copy token usage reported by the API onto a result."""
+        if usage is None:
+            return
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        result.prompt_tokens = usage.prompt_tokens
+        result.completion_tokens = usage.completion_tokens
+        result.cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    def _estimate_usage(self, result: ProviderResult, prompt: str, streamed_chunks: int):
+        """
+        Estimate token usage for a stream closed before its usage chunk.
+        
+        The prompt count includes the system prompt and chat format
+        overhead. Each streamed content chunk carries one token, so the
+        chunks received count what was generated before the request was
+        cancelled (the trimmed text would undercount). Cached tokens are
+        unknown and left at 0.
+        """
+        result.prompt_tokens = (
+            self.token_counter.count(SYSTEM_PROMPT)
+            + self.token_counter.count(prompt)
+            + 2 * TOKENS_PER_MESSAGE
+            + TOKENS_PER_REPLY
+        )
+        result.completion_tokens = streamed_chunks
+        result.estimated_usage = True
+
+    def _stream_result(
+        self, prompt: str, text: str, first_token: Optional[float], stopped: bool, stats: dict
+    ) -> ProviderResult:
+        """Build the result of a streamed call from its text and stream stats."""
+        result = ProviderResult(
+            text=text, model=self.model, time_to_first_token=first_token, stopped_early=stopped
+        )
+        if stats["usage"] is not None:
+            self._apply_usage(result, stats["usage"])
+        else:
+            self._estimate_usage(result, prompt, stats["chunks"])
+        return result
+
+    def _stream_chunks(self, prompt: str, max_tokens: Optional[int], stats: dict) -> Iterator[str]:
+        """Yield content chunks, recording the usage chunk and chunk count in ``stats``."""
+        with self.client.chat.completions.create(**self._request(prompt, max_tokens, stream=True)) as response:
+            for chunk in response:
+                if getattr(chunk, "usage", None):
+                    stats["usage"] = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    stats["chunks"] += 1
+                    yield chunk.choices[0].delta.content
+
+    async def _astream_chunks(self, prompt: str, max_tokens: Optional[int], stats: dict) -> AsyncIterator[str]:
+        """Async version of ``_stream_chunks``."""
+        response = await self.async_client.chat.completions.create(
+            **self._request(prompt, max_tokens, stream=True)
+        )
+        async with response:
+            async for chunk in response:
+                if getattr(chunk, "usage", None):
+                    stats["usage"] = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    stats["chunks"] += 1
+                    yield chunk.choices[0].delta.content
+
+    def generate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = 150,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Generate text using OpenAI API and report usage and timings.
+        
+        With ``stop`` the completion is streamed; stopping early closes the
+        HTTP response, which cancels the request upstream. The API only
+        reports usage at the end of a stream, so usage of a stopped stream
+        is estimated and flagged with ``estimated_usage``.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate (default: 150)
+            stop: Stream stop callback for early termination
+            
+        Returns:
+            ProviderResult for the call
+            
+        Raises:
+            Exception: If generation fails or client not initialized
+        """
+        if not self.client:
+            raise Exception("OpenAI client not initialized. Check API key.")
+
+        start = time.perf_counter()
+        try:
+            if stop is None:
+                response = self.client.chat.completions.create(**self._request(prompt, max_tokens))
+                result = ProviderResult(text=response.choices[0].message.content.strip(), model=response.model)
+                self._apply_usage(result, getattr(response, "usage", None))
+            else:
+                stats = {"usage": None, "chunks": 0}
+                text, first_token, stopped = consume_stream(
+                    self._stream_chunks(prompt, max_tokens, stats), stop, start
+                )
+                result = self._stream_result(prompt, text, first_token, stopped, stats)
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise _api_error(e) from e
+
+        result.latency = time.perf_counter() - start
+        return result
+
+    async def agenerate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = 150,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Async version of ``generate_result``.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate (default: 150)
+            stop: Stream stop callback for early termination
+            
+        Returns:
+            ProviderResult for the call
+            
+        Raises:
+            Exception: If generation fails or client not initialized
+        """
+        if not self.async_client:
+            raise Exception("OpenAI client not initialized. Check API key.")
+
+        start = time.perf_counter()
+        try:
+            if stop is None:
+                response = await self.async_client.chat.completions.create(**self._request(prompt, max_tokens))
+                result = ProviderResult(text=response.choices[0].message.content.strip(), model=response.model)
+                self._apply_usage(result, getattr(response, "usage", None))
+            else:
+                stats = {"usage": None, "chunks": 0}
+                text, first_token, stopped = await aconsume_stream(
+                    self._astream_chunks(prompt, max_tokens, stats), stop, start
+                )
+                result = self._stream_result(prompt, text, first_token, stopped, stats)
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise _api_error(e) from e
+
+        result.latency = time.perf_counter() - start
+        return result
+
     def generate(self, prompt: str, max_tokens: Optional[int] = 150) -> str:
         """
         Generate text using OpenAI API.
@@ -47,6 +271,41 @@ class OpenAIProvider(BaseLLMProvider):
         Returns:
             Generated text
             
+        Raises:
+            Exception: If generation fails or client not initialized
+        """
+        return self.generate_result(prompt, max_tokens).text
+
+    async def agenerate(self, prompt: str, max_tokens: Optional[int] = 150) -> str:
+        """
+        Generate text using the async OpenAI client.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate (default: 150)
+            
+        Returns:
+            Generated text
+            
+        Raises:
+            Exception: If generation fails or client not initialized
+        """
+        return (await self.agenerate_result(prompt, max_tokens)).text
+
+    def stream(self, prompt: str, max_tokens: Optional[int] = 150) -> Iterator[str]:
+        """
+        Stream text from the OpenAI API.
+        
+        Closing the generator early closes the HTTP response, which cancels
+        the request upstream and stops further output tokens.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate (default: 150)
+            
+        Yields:
+            Text chunks in generation order
+            
         Raises:
             Exception: If generation fails or client not initialized
         """
@@ -54,24 +313,37 @@ class OpenAIProvider(BaseLLMProvider):
             raise Exception("OpenAI client not initialized. Check API key.")
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert astrologer providing personalized, encouraging daily insights.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens,
-            )
-
-            return response.choices[0].message.content.strip()
+            yield from self._stream_chunks(prompt, max_tokens, {"usage": None, "chunks": 0})
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise _api_error(e) from e
+
+    async def astream(self, prompt: str, max_tokens: Optional[int] = 150) -> AsyncIterator[str]:
+        """
+        Async version of ``stream``.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate (default: 150)
+            
+        Yields:
+            Text chunks in generation order
+            
+        Raises:
+            Exception: If generation fails or client not initialized
+        """
+        if not self.async_client:
+            raise Exception("OpenAI client not initialized. Check API key.")
 
+        chunks = self._astream_chunks(prompt, max_tokens, {"usage": None, "chunks": 0})
+        try:
+            async for chunk in chunks:
+                yield chunk
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
-            raise Exception(f"Failed to generate insight: {str(e)}")
+            raise _api_error(e) from e
+        finally:
+            await chunks.aclose()
 
     def is_available(self) -> bool:
         """
@@ -82,3 +354,49 @@ class OpenAIProvider(BaseLLMProvider):
         """
         return self.client is not None
 
+    async def aclose(self):
+        """Close the HTTP connection pools of both clients."""
+        if self.client is not None:
+            self.client.close()
+        if self.async_client is not None:
+            await self.async_client.close()
+
+
+# Process-wide providers, one per (api_key, model)
+_providers: Dict[Tuple[str, str], OpenAIProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_openai_provider(api_key: str, model: str = "gpt-3.5-turbo") -> OpenAIProvider:
+    """
+    Get or create the process-wide OpenAI provider for a key and model.
+    
+    LLMClients are built per request; sharing the provider reuses its HTTP
+    connection pools instead of opening (and leaking) new ones per request.
+    
+    Args:
+        api_key: OpenAI API key
+        model: Model to use
+        
+    Returns:
+        OpenAIProvider instance
+    """
+    with _providers_lock:
+        provider = _providers.get((api_key, model))
+        if provider is None:
+            provider = _providers[(api_key, model)] = OpenAIProvider(api_key=api_key, model=model)
+        return provider
+
+
+async def close_openai_providers():
+    """Close every process-wide OpenAI provider (called on application shutdown)."""
+    with _providers_lock:
+        providers = list(_providers.values())
+        _providers.clear()
+
+    for provider in providers:
+        try:
+            await provider.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing OpenAI client: {e}")
+
@@ -0,0 +1,348 @@
+"""
+Record/replay provider wrapper for deterministic offline benchmarks.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from .base_provider import BaseLLMProvider, ProviderError, ProviderResult, StopFn
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 16
+
+
+class Cassette:
+    """
+    Append-only on-disk store of recorded LLM calls.
+
+    Each line is ``<hex key>\\t<json record>`` where the key hashes the
+    prompt and generation parameters and the record holds the response and
+    its latency. An in-memory index maps each key to the (offset, length)
+    of its latest line, so lookups are a dict hit plus one read, regardless
+    of how many calls are recorded. Only the index is held in memory.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a cassette and index its records.
+
+        Args:
+            path: Path of the cassette file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, tuple] = {}
+        end = self._build_index()
+        self._file = open(self.path, "r+b")
+        # Drop a partial line left by an interrupted write, so the next
+        # record starts on its own line
+        if self._file.seek(0, 2) > end:
+            logger.warning(f"Truncating partial record at the end of cassette {self.path}")
+            self._file.truncate(end)
+        logger.info(f"Opened cassette {self.path} with {len(self._index)} recorded calls")
+
+    @staticmethod
+    def make_key(prompt: str, params: Dict) -> bytes:
+        """
+        Hash a prompt and its generation parameters into a lookup key.
+
+        Args:
+            prompt: Prompt text
+            params: Generation parameters (model, max_tokens, ...)
+
+        Returns:
+            Binary key
+        """
+        payload = json.dumps({"prompt": prompt, "params": params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+    def _build_index(self) -> int:
+        """
+        Scan the file once, keeping the last offset seen for each key.
+
+        Returns:
+            Offset just past the last complete line
+        """
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                key_hex, _, _ = line.partition(b"\t")
+                self._index[bytes.fromhex(key_hex.decode("ascii"))] = (offset, len(line))
+                offset += len(line)
+        return offset
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """
+        Get the record for a key.
+
+        Args:
+            key: Key from ``make_key``
+
+        Returns:
+            Record dictionary, or None if not recorded
+        """
+        location = self._index.get(key)
+        if location is None:
+            return None
+
+        offset, length = location
+        with self._lock:
+            self._file.seek(offset)
+            line = self._file.read(length)
+        return json.loads(line.partition(b"\t")[2])
+
+    def put(self, key: bytes, record: Dict):
+        """
+        Append a record for a key (later records win).
+
+        Args:
+            key: Key from ``make_key``
+            record: JSON-serializable record
+        """
+        line = (
+            key.hex() + "\t" + json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        ).encode("utf-8")
+
+        with self._lock:
+            self._file.seek(0, 2)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._index[key] = (offset, len(line))
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+@lru_cache(maxsize=None)
+def open_cassette(path: str) -> Cassette:
+    """
+    Get the process-wide Cassette for a path.
+
+    Args:
+        path: Path of the cassette file
+
+    Returns:
+        Cassette instance
+    """
+    return Cassette(path)
+
+
+class RecordReplayProvider(BaseLLMProvider):
+    """
+    Provider wrapper that records calls to a cassette or replays them.
+
+    Modes:
+    - "record": call the wrapped provider and record response and latency
+    - "replay": serve only from the cassette; unrecorded calls fail
+    - "auto": replay when recorded, otherwise call and record
+
+    Replays sleep for the recorded latency (scaled by ``timing_scale``) so
+    benchmarks reproduce production-like timings without network or cost.
+    """
+
+    MODES = ("record", "replay", "auto")
+
+    def __init__(
+        self,
+        provider: BaseLLMProvider,
+        cassette: Cassette,
+        mode: str = "replay",
+        params: Optional[Dict] = None,
+        replay_timing: bool = True,
+        timing_scale: float = 1.0,
+    ):
+        """
+        Initialize record/replay wrapper.
+
+        Args:
+            provider: Provider to record from
+            cassette: Cassette to record to and replay from
+            mode: "record", "replay" or "auto"
+            params: Fixed generation parameters included in the key (e.g. model)
+            replay_timing: Whether replays sleep for the recorded latency
+            timing_scale: Multiplier applied to recorded latencies
+
+        Raises:
+            ValueError: If mode is invalid
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid cassette mode: {mode}. Must be one of {', '.join(self.MODES)}")
+
+        self.provider = provider
+        self.cassette = cassette
+        self.mode = mode
+        self.params = params or {}
+        self.replay_timing = replay_timing
+        self.timing_scale = timing_scale
+
+    def _key(self, prompt: str, max_tokens: Optional[int]) -> bytes:
+        return Cassette.make_key(prompt, {**self.params, "max_tokens": max_tokens})
+
+    def _lookup(self, key: bytes) -> Optional[Dict]:
+        """Return the recorded call for a key, or None if it must be recorded."""
+        if self.mode == "record":
+            return None
+
+        record = self.cassette.get(key)
+        if record is None and self.mode == "replay":
+            raise ProviderError("No recorded response for this prompt in replay mode")
+        return record
+
+    def _replay_delay(self, record: Dict) -> float:
+        return record.get("latency", 0.0) * self.timing_scale if self.replay_timing else 0.0
+
+    def _record(self, key: bytes, result: ProviderResult):
+        self.cassette.put(key, {
+            "response": result.text,
+            "latency": round(result.latency, 6),
+            "model": result.model,
+            "prompt_tokens": result.prompt_tokens,
+            "completion_tokens": result.completion_tokens,
+            "cached_tokens": result.cached_tokens,
+            "estimated_usage": result.estimated_usage,
+        })
+
+    @staticmethod
+    def _replayed(record: Dict, latency: float) -> ProviderResult:
+        return ProviderResult(
+            text=record["response"],
+            model=record.get("model"),
+            prompt_tokens=record.get("prompt_tokens"),
+            completion_tokens=record.get("completion_tokens"),
+            cached_tokens=record.get("cached_tokens") or 0,
+            estimated_usage=record.get("estimated_usage", False),
+            latency=latency,
+        )
+
+    @staticmethod
+    def _apply_stop(result: ProviderResult, stop: Optional[StopFn]) -> ProviderResult:
+        """Trim a whole recorded or recorded-from completion with the stop callback."""
+        final = stop(result.text) if stop else None
+        if final is not None:
+            result.text = final
+            result.stopped_early = True
+        return result
+
+    def generate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Generate a result, replaying or recording according to the mode.
+
+        Recordings hold the full completion with its usage, so ``stop`` is
+        applied afterwards and replays stay independent of early stopping.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stop callback used to trim the completion
+
+        Returns:
+            ProviderResult with recorded usage and (replayed) latency
+
+        Raises:
+            ProviderError: If a call is not recorded in replay mode
+        """
+        key = self._key(prompt, max_tokens)
+        record = self._lookup(key)
+        if record is not None:
+            delay = self._replay_delay(record)
+            if delay:
+                time.sleep(delay)
+            return self._apply_stop(self._replayed(record, delay), stop)
+
+        result = self.provider.generate_result(prompt, max_tokens)
+        self._record(key, result)
+        return self._apply_stop(result, stop)
+
+    async def agenerate_result(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop: Optional[StopFn] = None,
+    ) -> ProviderResult:
+        """
+        Async version of ``generate_result``.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            stop: Stop callback used to trim the completion
+
+        Returns:
+            ProviderResult with recorded usage and (replayed) latency
+
+        Raises:
+            ProviderError: If a call is not recorded in replay mode
+        """
+        key = self._key(prompt, max_tokens)
+        record = self._lookup(key)
+        if record is not None:
+            delay = self._replay_delay(record)
+            if delay:
+                await asyncio.sleep(delay)
+            return self._apply_stop(self._replayed(record, delay), stop)
+
+        result = await self.provider.agenerate_result(prompt, max_tokens)
+        self._record(key, result)
+        return self._apply_stop(result, stop)
+
+    def generate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Generate text, replaying or recording according to the mode.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Generated (or replayed) text
+
+        Raises:
+            ProviderError: If a call is not recorded in replay mode
+        """
+        return self.generate_result(prompt, max_tokens).text
+
+    async def agenerate(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Async version of ``generate``.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Generated (or replayed) text
+
+        Raises:
+            ProviderError: If a call is not recorded in replay mode
+        """
+        return (await self.agenerate_result(prompt, max_tokens)).text
+
+    def is_available(self) -> bool:
+        """
+        Replay mode needs only the cassette; other modes need the wrapped provider.
+
+        Returns:
+            True if the wrapper can serve requests
+        """
+        return self.mode == "replay" or self.provider.is_available()
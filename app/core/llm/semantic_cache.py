@@ -0,0 +1,133 @@
+"""
+Semantic cache for LLM responses keyed by prompt embeddings.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+import itertools
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """
+    Cache LLM responses and serve them for semantically similar prompts.
+
+    Entries are grouped by a scope (e.g. sign, date and language) so only
+    prompts within the same scope can match. A lookup returns the stored
+    response of the most similar prompt if its cosine similarity reaches
+    the threshold. Entries expire after ``ttl`` seconds and the oldest are
+    evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], np.ndarray],
+        threshold: float = 0.95,
+        ttl: int = 86400,
+        max_entries: int = 10000,
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            embed_fn: Function returning a normalized embedding for a text
+            threshold: Minimum cosine similarity for a hit (0-1)
+            ttl: Entry lifetime in seconds
+            max_entries: Maximum number of cached responses
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        # entry_id -> (scope, created_at); insertion order is eviction order
+        self._order: "OrderedDict[int, tuple]" = OrderedDict()
+        # scope -> {entry_id: (embedding, response)}
+        self._scopes: Dict[Hashable, Dict[int, tuple]] = {}
+
+    def _remove(self, entry_id: int):
+        scope, _ = self._order.pop(entry_id)
+        entries = self._scopes.get(scope)
+        if entries is not None:
+            entries.pop(entry_id, None)
+            if not entries:
+                del self._scopes[scope]
+
+    def _expire(self, now: float):
+        """Drop expired entries (oldest first)."""
+        while self._order:
+            entry_id, (_, created_at) = next(iter(self._order.items()))
+            if now - created_at < self.ttl:
+                break
+            self._remove(entry_id)
+
+    def lookup(self, prompt: str, scope: Hashable) -> Optional[str]:
+        """
+        Find a cached response for a similar prompt in the same scope.
+
+        Args:
+            prompt: Prompt text
+            scope: Hashable scope key, e.g. (sign, date, language)
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            self._expire(time.time())
+            entries = list(self._scopes.get(scope, {}).values())
+
+        response = None
+        similarity = 0.0
+        if entries:
+            query = self.embed_fn(prompt)
+            matrix = np.stack([embedding for embedding, _ in entries])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity >= self.threshold:
+                response = entries[best][1]
+
+        get_metrics().increment("semantic_cache_requests", result="hit" if response else "miss")
+        if response is not None:
+            logger.info(f"Semantic cache hit (similarity {similarity:.3f})")
+        return response
+
+    def store(self, prompt: str, response: str, scope: Hashable):
+        """
+        Cache a response for a prompt.
+
+        Args:
+            prompt: Prompt text
+            response: LLM response to cache
+            scope: Hashable scope key, e.g. (sign, date, language)
+        """
+        embedding = np.asarray(self.embed_fn(prompt), dtype=np.float32)
+
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            while len(self._order) >= self.max_entries:
+                self._remove(next(iter(self._order)))
+
+            entry_id = next(self._ids)
+            self._order[entry_id] = (scope, now)
+            self._scopes.setdefault(scope, {})[entry_id] = (embedding, response)
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._order.clear()
+            self._scopes.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
@@ -0,0 +1,63 @@
+"""
+Token counting for prompt budgeting.
+"""
+from typing import Optional
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """
+    Count tokens the way the target model's tokenizer does.
+
+    Uses tiktoken when it is installed; otherwise falls back to a
+    characters-per-token estimate, which is close enough for budgeting.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        """
+        Initialize token counter.
+
+        Args:
+            model: Model name used to pick the tokenizer encoding
+        """
+        self.model = model
+        self.encoding = None
+
+        # Lazy import so tiktoken stays an optional dependency
+        try:
+            import tiktoken
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or "")
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            logger.debug("tiktoken not installed, using approximate token counts")
+        except Exception as e:
+            logger.warning(f"Error loading tokenizer, using approximate token counts: {e}")
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in a piece of text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
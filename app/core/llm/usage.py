@@ -0,0 +1,139 @@
+"""
+Token usage, cost and latency accounting for LLM calls.
+
+Every provider call is recorded in the metrics registry, labeled by
+provider, model and the endpoint that triggered it.
+"""
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+import logging
+
+from app.core.metrics import get_metrics
+from .providers.base_provider import ProviderResult
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+
+# Providers billed per token; others (mock, local) are free regardless of model label
+PRICED_PROVIDERS = ("openai",)
+
+# Batch API requests are billed at half the realtime price
+BATCH_PRICE_SCALE = 0.5
+
+# Endpoint label for calls made while handling the current request or job
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="internal")
+
+
+def set_endpoint(endpoint: str):
+    """
+    Set the endpoint label for LLM calls in the current context.
+
+    Args:
+        endpoint: Endpoint name, e.g. an API path, "cli" or "batch"
+
+    Returns:
+        Token for ``current_endpoint.reset``
+    """
+    return current_endpoint.set(endpoint)
+
+
+def get_model_price(model: Optional[str]) -> Optional[Tuple[float, float, float]]:
+    """
+    Look up the per-token price of a model.
+
+    Dated snapshots (e.g. "gpt-4o-mini-2024-07-18") use their base model's price.
+
+    Args:
+        model: Model name
+
+    Returns:
+        (input, cached input, output) USD per 1M tokens, or None if unknown
+    """
+    if not model:
+        return None
+    # Longest prefix first so "gpt-4o-mini" wins over "gpt-4o"
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model == name or model.startswith(f"{name}-"):
+            return MODEL_PRICES[name]
+    return None
+
+
+def estimate_cost(result: ProviderResult, price_scale: float = 1.0) -> float:
+    """
+    Estimate the USD cost of a call from its token usage.
+
+    Args:
+        result: Provider result with token counts
+        price_scale: Multiplier on list prices (e.g. 0.5 for batch requests)
+
+    Returns:
+        Cost in USD (0 for models without a known price)
+    """
+    price = get_model_price(result.model)
+    if price is None:
+        return 0.0
+
+    input_price, cached_price, output_price = price
+    prompt_tokens = result.prompt_tokens or 0
+    cached_tokens = min(result.cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + (result.completion_tokens or 0) * output_price
+    ) * price_scale / 1_000_000
+
+
+def record_usage(
+    result: ProviderResult,
+    provider: str,
+    endpoint: Optional[str] = None,
+    price_scale: float = 1.0,
+) -> float:
+    """
+    Record token usage, cost and timings of a call in the metrics registry.
+
+    Args:
+        result: Provider result
+        provider: Provider name
+        endpoint: Endpoint label (defaults to the current context's endpoint)
+        price_scale: Multiplier on list prices (e.g. 0.5 for batch requests)
+
+    Returns:
+        Estimated cost in USD
+    """
+    labels = {
+        "provider": provider,
+        "model": result.model or "unknown",
+        "endpoint": endpoint or current_endpoint.get(),
+    }
+    cost = estimate_cost(result, price_scale) if provider in PRICED_PROVIDERS else 0.0
+
+    metrics = get_metrics()
+    metrics.increment("llm_requests", **labels)
+    metrics.increment("llm_prompt_tokens", result.prompt_tokens or 0, **labels)
+    metrics.increment("llm_cached_prompt_tokens", result.cached_tokens, **labels)
+    metrics.increment("llm_completion_tokens", result.completion_tokens or 0, **labels)
+    metrics.increment("llm_cost_usd", cost, **labels)
+    metrics.observe("llm_latency_seconds", result.latency, **labels)
+    if result.time_to_first_token is not None:
+        metrics.observe("llm_time_to_first_token_seconds", result.time_to_first_token, **labels)
+    if result.stopped_early:
+        metrics.increment("llm_early_stops", **labels)
+    if result.estimated_usage:
+        metrics.increment("llm_estimated_usage", **labels)
+
+    logger.debug(
+        f"LLM call ({labels['provider']}/{labels['model']}): {result.prompt_tokens} prompt "
+        f"({result.cached_tokens} cached) + {result.completion_tokens} completion tokens"
+        f"{' (estimated)' if result.estimated_usage else ''}, "
+        f"{result.latency:.2f}s, ${cost:.6f}"
+    )
+    return cost
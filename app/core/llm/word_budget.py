@@ -0,0 +1,77 @@
+"""
+Word-budget helpers for bounding insight length during generation.
+"""
+from typing import Optional
+import math
+import re
+
+# Insight length requested in the prompt guidelines
+DEFAULT_MIN_WORDS = 30
+DEFAULT_MAX_WORDS = 50
+
+# Rough English tokens per word for BPE tokenizers, plus headroom so the
+# token cap only bites on completions well past the requested length
+TOKENS_PER_WORD = 1.4
+TOKEN_HEADROOM = 1.25
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?][\"'”’)\]]*(?=\s)")
+WORD = re.compile(r"\S+")
+
+
+def max_tokens_for_words(max_words: int, limit: Optional[int] = None) -> int:
+    """
+    Derive a completion token cap from a word count.
+
+    Args:
+        max_words: Maximum words requested
+        limit: Upper bound on the result (e.g. the configured max tokens)
+
+    Returns:
+        Maximum completion tokens
+    """
+    max_tokens = math.ceil(max_words * TOKENS_PER_WORD * TOKEN_HEADROOM)
+    return min(max_tokens, limit) if limit else max_tokens
+
+
+class WordBudget:
+    """
+    Track streamed text and detect when generation can stop.
+
+    Generation can stop at the first sentence boundary that ends at or
+    after ``target_words`` words. A boundary only counts once whitespace
+    follows it, so abbreviations and decimals at a chunk edge are not cut.
+    """
+
+    def __init__(self, target_words: int):
+        """
+        Initialize word budget.
+
+        Args:
+            target_words: Word count after which the next sentence end stops generation
+        """
+        self.target_words = target_words
+        self.text = ""
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Add a streamed chunk.
+
+        Args:
+            chunk: Next chunk of generated text
+
+        Returns:
+            The text up to the stopping sentence boundary once the budget
+            is reached, otherwise None
+        """
+        self.text += chunk
+
+        words = list(WORD.finditer(self.text))
+        if len(words) < self.target_words:
+            return None
+
+        # Search from the start of the target word so its own period counts
+        match = SENTENCE_END.search(self.text, words[self.target_words - 1].start())
+        if match is None:
+            return None
+        return self.text[:match.end()].strip()
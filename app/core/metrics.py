@@ -0,0 +1,148 @@
+"""
+In-process metrics registry.
+
+Counters, summaries and histograms are kept per metric name and label set,
+and exposed through the API metrics endpoint as a JSON snapshot.
+"""
+from collections import defaultdict
+from typing import Dict, Sequence, Tuple
+import bisect
+import threading
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, summaries and histograms.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        self._summaries: Dict[str, Dict[LabelKey, Dict[str, float]]] = defaultdict(dict)
+        self._histograms: Dict[str, Dict[LabelKey, Dict]] = defaultdict(dict)
+
+    @staticmethod
+    def _label_key(labels: Dict) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def increment(self, name: str, value: float = 1.0, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name
+            value: Amount to add
+            **labels: Label values identifying the series
+        """
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Record an observation in a summary (count, sum, min, max).
+
+        Args:
+            name: Metric name
+            value: Observed value
+            **labels: Label values identifying the series
+        """
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._summaries[name]
+            summary = series.get(key)
+            if summary is None:
+                series[key] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def observe_histogram(self, name: str, value: float, buckets: Sequence[float], **labels):
+        """
+        Record an observation in a histogram with fixed upper bounds.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            buckets: Sorted bucket upper bounds (inclusive); larger values
+                fall in an implicit "+Inf" bucket
+            **labels: Label values identifying the series
+        """
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = {"bounds": list(buckets), "counts": [0] * (len(buckets) + 1), "count": 0, "sum": 0.0}
+                series[key] = histogram
+            histogram["counts"][bisect.bisect_left(histogram["bounds"], value)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def snapshot(self) -> Dict:
+        """
+        Get a JSON-serializable snapshot of all metrics.
+
+        Returns:
+            Dictionary with "counters", "summaries" and "histograms"
+            (cumulative bucket counts, as in Prometheus)
+        """
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            summaries = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        **summary,
+                        "avg": summary["sum"] / summary["count"],
+                    }
+                    for key, summary in series.items()
+                ]
+                for name, series in self._summaries.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "buckets": [
+                            {"le": bound, "count": sum(histogram["counts"][:i + 1])}
+                            for i, bound in enumerate(histogram["bounds"] + ["+Inf"])
+                        ],
+                        "count": histogram["count"],
+                        "sum": histogram["sum"],
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "summaries": summaries, "histograms": histograms}
+
+    def reset(self):
+        """Clear all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._histograms.clear()
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the global metrics registry.
+
+    Returns:
+        MetricsRegistry instance
+    """
+    return metrics
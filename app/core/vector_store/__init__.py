@@ -1,7 +1,21 @@
 """
 Vector store module for astrological knowledge retrieval.
 """
-from .vector_service import VectorStoreService
+from .vector_service import VectorStoreService, format_context
+from .retrieval import reciprocal_rank_fusion
+from .bm25_index import BM25Index
+from .numpy_index import NumpyVectorIndex
+from .partitioned_index import PartitionedVectorIndex
+from .ingestion import CorpusIngestor, iter_corpus
 
-__all__ = ["VectorStoreService"]
+__all__ = [
+    "VectorStoreService",
+    "BM25Index",
+    "NumpyVectorIndex",
+    "PartitionedVectorIndex",
+    "CorpusIngestor",
+    "format_context",
+    "iter_corpus",
+    "reciprocal_rank_fusion",
+]
 
@@ -0,0 +1,371 @@
+"""
+In-process BM25 keyword index (inverted index over the corpus).
+"""
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+import math
+import re
+import threading
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "you your their they them these those into about over under more most can may".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into lowercase word tokens, dropping stopwords.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Tokens in order of appearance
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+# term (or zodiac value) -> (rows, values): term frequencies, or ones for zodiac values
+Postings = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+_NO_POSTING = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+class _BM25State(NamedTuple):
+    """Contents of a BM25Index; replaced, never modified."""
+
+    ids: List[str]
+    payloads: List[Dict]
+    rows: Dict[str, int]
+    term_counts: List[Counter]
+    # Tokens per document
+    lengths: np.ndarray
+    postings: Postings
+    zodiac_postings: Postings
+
+
+_EMPTY_STATE = _BM25State([], [], {}, [], np.empty(0, dtype=np.float32), {}, {})
+
+
+def _edit_postings(
+    postings: Postings,
+    dropped: Dict[str, Set[int]],
+    added: Dict[str, Dict[int, float]],
+) -> Postings:
+    """
+    Copy a postings table, rewriting only the keys that changed.
+
+    Args:
+        postings: Table to copy (left unmodified)
+        dropped: Rows to remove, per key
+        added: Values to add, per key and row
+
+    Returns:
+        The edited table; keys left without rows are removed
+    """
+    edited = dict(postings)
+    for key in dropped.keys() | added.keys():
+        rows, values = edited.get(key, _NO_POSTING)
+        if dropped.get(key):
+            keep = ~np.isin(rows, np.fromiter(dropped[key], dtype=np.int64))
+            rows, values = rows[keep], values[keep]
+        if added.get(key):
+            rows = np.concatenate([rows, np.fromiter(added[key], dtype=np.int64)])
+            values = np.concatenate([values, np.fromiter(added[key].values(), dtype=np.float32)])
+        if len(rows):
+            edited[key] = (rows, values)
+        else:
+            edited.pop(key, None)
+    return edited
+
+
+class _Edit:
+    """Postings changes collected by one writer, applied with ``_edit_postings``."""
+
+    def __init__(self):
+        self.dropped: Dict[str, Set[int]] = defaultdict(set)
+        self.added: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.zodiacs_dropped: Dict[str, Set[int]] = defaultdict(set)
+        self.zodiacs_added: Dict[str, Dict[int, float]] = defaultdict(dict)
+
+    def remove(self, row: int, term_counts: Counter, payload: Dict):
+        """Take a document out of ``row``."""
+        for term in term_counts:
+            self.dropped[term].add(row)
+            self.added[term].pop(row, None)
+        zodiac = payload.get("zodiac")
+        self.zodiacs_dropped[zodiac].add(row)
+        self.zodiacs_added[zodiac].pop(row, None)
+
+    def insert(self, row: int, term_counts: Counter, payload: Dict):
+        """Put a document in ``row``."""
+        for term, frequency in term_counts.items():
+            self.added[term][row] = frequency
+        self.zodiacs_added[payload.get("zodiac")][row] = 1.0
+
+    def apply(self, state: _BM25State, **fields) -> _BM25State:
+        """New state with the edited postings and the given fields replaced."""
+        return state._replace(
+            postings=_edit_postings(state.postings, self.dropped, self.added),
+            zodiac_postings=_edit_postings(state.zodiac_postings, self.zodiacs_dropped, self.zodiacs_added),
+            **fields,
+        )
+
+
+class BM25Index:
+    """
+    Okapi BM25 search over a small, in-memory corpus.
+
+    Each term's postings hold the matching rows and their term frequencies,
+    so scoring a query is one scatter-add per query term and needs no
+    embedding model. Exact keywords such as planet names, which dense
+    embeddings tend to blur, score directly. BM25 weights are computed
+    from the postings at query time, so a write only edits the postings
+    of the terms it touches.
+
+    Updates are copy-on-write, as in ``NumpyVectorIndex``: a writer builds
+    the new state on the side and swaps it in with one assignment, so
+    concurrent searches never see a partial update. Writers are serialized.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization (0 disables it)
+        """
+        self.k1 = k1
+        self.b = b
+        self._write_lock = threading.Lock()
+        self._state = _EMPTY_STATE
+
+    @property
+    def payloads(self) -> List[Dict]:
+        """Document payloads, one per row."""
+        return self._state.payloads
+
+    @property
+    def ids(self) -> List[str]:
+        """Document ids, one per row."""
+        return self._state.ids
+
+    @property
+    def count(self) -> int:
+        """Number of indexed documents."""
+        return len(self._state.ids)
+
+    def upsert(self, ids: Sequence[str], texts: Sequence[str], payloads: Sequence[Dict]):
+        """
+        Index documents, replacing those whose id is already indexed.
+
+        Args:
+            ids: Unique document ids
+            texts: Text of each document
+            payloads: One payload per document (must include "zodiac")
+
+        Raises:
+            ValueError: If the lengths do not match
+        """
+        if not len(ids) == len(texts) == len(payloads):
+            raise ValueError(f"Got {len(ids)} ids, {len(texts)} texts and {len(payloads)} payloads")
+
+        with self._write_lock:
+            state = self._state
+            new_ids = list(state.ids)
+            new_payloads = list(state.payloads)
+            new_term_counts = list(state.term_counts)
+            rows = dict(state.rows)
+            lengths = {}
+            edit = _Edit()
+
+            for doc_id, text, payload in zip(ids, texts, payloads):
+                term_counts = Counter(tokenize(text))
+                row = rows.get(doc_id)
+                if row is None:
+                    row = rows[doc_id] = len(new_ids)
+                    new_ids.append(doc_id)
+                    new_payloads.append(payload)
+                    new_term_counts.append(term_counts)
+                else:
+                    edit.remove(row, new_term_counts[row], new_payloads[row])
+                    new_payloads[row] = payload
+                    new_term_counts[row] = term_counts
+                edit.insert(row, term_counts, payload)
+                lengths[row] = sum(term_counts.values())
+
+            new_lengths = np.zeros(len(new_ids), dtype=np.float32)
+            new_lengths[:len(state.lengths)] = state.lengths
+            new_lengths[list(lengths)] = list(lengths.values())
+            self._state = edit.apply(
+                state,
+                ids=new_ids,
+                payloads=new_payloads,
+                rows=rows,
+                term_counts=new_term_counts,
+                lengths=new_lengths,
+            )
+
+    def get(self, ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Look up the payloads of indexed documents.
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Payload per known id
+        """
+        state = self._state
+        return {doc_id: state.payloads[state.rows[doc_id]] for doc_id in ids if doc_id in state.rows}
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Remove documents by id; unknown ids are ignored.
+
+        The last rows move into the freed ones, so only the postings of the
+        removed and moved documents change (and row order is not kept).
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Number of documents removed
+        """
+        with self._write_lock:
+            state = self._state
+            removed = {state.rows[doc_id] for doc_id in set(ids) if doc_id in state.rows}
+            if not removed:
+                return 0
+
+            count = len(state.ids) - len(removed)
+            holes = sorted(row for row in removed if row < count)
+            movers = [row for row in range(count, len(state.ids)) if row not in removed]
+            edit = _Edit()
+            for row in removed:
+                edit.remove(row, state.term_counts[row], state.payloads[row])
+
+            new_ids = state.ids[:count]
+            new_payloads = state.payloads[:count]
+            new_term_counts = state.term_counts[:count]
+            new_lengths = state.lengths[:count].copy()
+            rows = dict(state.rows)
+            for row in removed:
+                del rows[state.ids[row]]
+            for hole, mover in zip(holes, movers):
+                edit.remove(mover, state.term_counts[mover], state.payloads[mover])
+                edit.insert(hole, state.term_counts[mover], state.payloads[mover])
+                new_ids[hole] = state.ids[mover]
+                new_payloads[hole] = state.payloads[mover]
+                new_term_counts[hole] = state.term_counts[mover]
+                new_lengths[hole] = state.lengths[mover]
+                rows[state.ids[mover]] = hole
+
+            self._state = edit.apply(
+                state,
+                ids=new_ids,
+                payloads=new_payloads,
+                rows=rows,
+                term_counts=new_term_counts,
+                lengths=new_lengths,
+            )
+            return len(removed)
+
+    @staticmethod
+    def _mask(state: _BM25State, zodiac: Union[str, Sequence[str], None]) -> Optional[np.ndarray]:
+        if zodiac is None:
+            return None
+        mask = np.zeros(len(state.ids), dtype=bool)
+        for value in [zodiac] if isinstance(zodiac, str) else zodiac:
+            posting = state.zodiac_postings.get(value)
+            if posting is not None:
+                mask[posting[0]] = True
+        return mask
+
+    def _scores(self, state: _BM25State, query: str) -> np.ndarray:
+        """BM25 score of every document for a query."""
+        count = len(state.ids)
+        scores = np.zeros(count, dtype=np.float32)
+        average_length = float(state.lengths.mean()) if count else 0.0
+        if average_length <= 0:
+            average_length = 1.0
+
+        for term in set(tokenize(query)):
+            posting = state.postings.get(term)
+            if posting is None:
+                continue
+            rows, frequencies = posting
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            length_norms = self.k1 * (1 - self.b + self.b * state.lengths[rows] / average_length)
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + length_norms)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        zodiac: Union[str, Sequence[str], None] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Find the documents that best match a query's keywords.
+
+        Args:
+            query: Query text
+            limit: Maximum number of results
+            zodiac: Only match documents with this zodiac value, or one of
+                these values (optional)
+
+        Returns:
+            List of (BM25 score, payload) tuples, best first; documents
+            sharing no term with the query are never returned
+        """
+        return self.search_batch([query], limit, [zodiac])[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        limit: int = 3,
+        zodiacs: Optional[Sequence[Union[str, Sequence[str], None]]] = None,
+    ) -> List[List[Tuple[float, Dict]]]:
+        """
+        Search several queries.
+
+        Args:
+            queries: Query texts
+            limit: Maximum number of results per query
+            zodiacs: Zodiac filter per query (None entries match everything)
+
+        Returns:
+            One list of (BM25 score, payload) tuples per query, best first
+        """
+        # Read the state once: a concurrent write swaps in a new one
+        state = self._state
+        zodiacs = zodiacs if zodiacs is not None else [None] * len(queries)
+        results = []
+        for query, zodiac in zip(queries, zodiacs):
+            if not state.ids or limit <= 0:
+                results.append([])
+                continue
+
+            scores = self._scores(state, query)
+            mask = self._mask(state, zodiac)
+            if mask is not None:
+                scores[~mask] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            results.append([(float(scores[row]), state.payloads[row]) for row in candidates])
+        return results
+
+    def clear(self):
+        """Remove all documents."""
+        with self._write_lock:
+            self._state = _EMPTY_STATE
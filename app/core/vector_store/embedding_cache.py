@@ -0,0 +1,186 @@
+"""
+Bounded, thread-safe cache of text embeddings.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from app.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different queries share an entry."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings keyed by ``(model, normalized text)``.
+
+    Cached vectors are read-only numpy arrays. When ``path`` is set the
+    cache is loaded from disk on creation and written back by ``save``,
+    so a restarted process skips the encoder for texts it has seen before.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        path: Optional[str] = None,
+        metric: str = "embedding_cache_requests",
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            max_entries: Maximum number of cached embeddings
+            path: Optional ``.npz`` file to load from and save to
+            metric: Counter recording hits and misses
+        """
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.metric = metric
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._dirty = False
+
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self):
+        """Load persisted entries, ignoring an unreadable file."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys = json.loads(str(data["keys"]))
+                vectors = data["vectors"]
+            for (model, text), vector in zip(keys, vectors):
+                self._insert((model, text), vector)
+            self._dirty = False
+            logger.info(f"Loaded {len(self._entries)} cached embeddings from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache {self.path}: {e}")
+
+    def _insert(self, key: Tuple[str, str], vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def get_or_compute(
+        self,
+        model: str,
+        text: str,
+        compute_fn: Callable[[str], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Return the cached embedding of a text, computing it on a miss.
+
+        Args:
+            model: Embedding model name
+            text: Text to embed
+            compute_fn: Function embedding a text on a cache miss
+
+        Returns:
+            Read-only embedding vector
+        """
+        key = (model, normalize_text(text))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+
+        get_metrics().increment(self.metric, result="hit" if vector is not None else "miss")
+        if vector is not None:
+            return vector
+
+        # Computed outside the lock; concurrent misses for one key just race to insert
+        computed = compute_fn(key[1])
+        with self._lock:
+            self._insert(key, computed)
+            return self._entries[key]
+
+    def get_or_compute_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        compute_fn: Callable[[List[str]], np.ndarray],
+    ) -> List[np.ndarray]:
+        """
+        Return the cached embeddings of several texts, computing all misses in one call.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to embed
+            compute_fn: Function embedding a list of texts on cache misses
+
+        Returns:
+            Read-only embedding vectors, in the order of ``texts``
+        """
+        keys = [(model, normalize_text(text)) for text in texts]
+        with self._lock:
+            found = {}
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+
+        metrics = get_metrics()
+        hits = sum(key in found for key in keys)
+        if hits:
+            metrics.increment(self.metric, hits, result="hit")
+        if hits < len(keys):
+            metrics.increment(self.metric, len(keys) - hits, result="miss")
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            computed = compute_fn([key[1] for key in missing])
+            with self._lock:
+                for key, vector in zip(missing, computed):
+                    self._insert(key, vector)
+                    found[key] = self._entries.get(key, vector)
+
+        return [found[key] for key in keys]
+
+    def save(self):
+        """Write the cache to ``path`` (atomically) if it changed since loading."""
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = list(self._entries.keys())
+            vectors = list(self._entries.values())
+            self._dirty = False
+
+        if not vectors:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=np.array(json.dumps(keys)), vectors=np.stack(vectors))
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {len(keys)} cached embeddings to {self.path}")
+
+    def clear(self):
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
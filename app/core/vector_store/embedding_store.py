@@ -0,0 +1,167 @@
+"""
+On-disk, memory-mapped store of corpus embeddings.
+"""
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from .numpy_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusEmbeddingStore:
+    """
+    Versioned ``.npy`` artifacts of normalized corpus embeddings.
+
+    Each artifact is keyed by embedding model, dimension and corpus
+    content hash, so a changed corpus or model never loads stale vectors.
+    Artifacts are opened with ``mmap_mode="r"``: every worker process maps
+    the same file and shares its pages through the OS page cache instead
+    of re-encoding the corpus into private memory.
+
+    A JSON sidecar records each row's document content hash, so the
+    artifact of a previous corpus version can supply the vectors of
+    unchanged documents when the corpus is edited.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding embedding artifacts
+        """
+        self.directory = Path(directory)
+
+    @staticmethod
+    def _model_slug(model: str) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]+", "_", model).strip("_")
+
+    def artifact_path(self, corpus_hash: str, model: str, dim: int) -> Path:
+        """
+        Path of the artifact for a corpus version, model and dimension.
+
+        Args:
+            corpus_hash: Corpus content hash
+            model: Embedding model name
+            dim: Embedding dimension
+
+        Returns:
+            Artifact path
+        """
+        return self.directory / f"{self._model_slug(model)}-{dim}d-{corpus_hash}.npy"
+
+    def _glob(self, model: str, dim: int):
+        return self.directory.glob(f"{self._model_slug(model)}-{dim}d-*.npy")
+
+    def load(self, corpus_hash: str, model: str, dim: int, count: int) -> Optional[np.ndarray]:
+        """
+        Memory-map the embeddings for a corpus version, if present.
+
+        Args:
+            corpus_hash: Corpus content hash
+            model: Embedding model name
+            dim: Embedding dimension
+            count: Expected number of documents
+
+        Returns:
+            Read-only memory-mapped array of shape (count, dim), or None
+        """
+        path = self.artifact_path(corpus_hash, model, dim)
+        if not path.exists():
+            return None
+
+        try:
+            embeddings = np.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"Could not read embedding artifact {path}: {e}")
+            return None
+
+        if embeddings.shape != (count, dim) or embeddings.dtype != np.float32:
+            logger.warning(
+                f"Ignoring embedding artifact {path}: shape {embeddings.shape} {embeddings.dtype}, "
+                f"expected ({count}, {dim}) float32"
+            )
+            return None
+
+        logger.info(f"Memory-mapped {count} corpus embeddings from {path}")
+        return embeddings
+
+    def load_previous(self, model: str, dim: int) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """
+        Memory-map the newest artifact for a model, whatever its corpus version.
+
+        Args:
+            model: Embedding model name
+            dim: Embedding dimension
+
+        Returns:
+            (embeddings, per-row document content hashes), or None if no
+            artifact with a readable sidecar exists
+        """
+        if not self.directory.exists():
+            return None
+
+        for path in sorted(self._glob(model, dim), key=lambda p: p.stat().st_mtime, reverse=True):
+            try:
+                content_hashes = json.loads(path.with_suffix(".json").read_text())["content_hashes"]
+                embeddings = np.load(path, mmap_mode="r")
+            except Exception:
+                continue
+            if embeddings.shape == (len(content_hashes), dim) and embeddings.dtype == np.float32:
+                return embeddings, content_hashes
+        return None
+
+    def save(
+        self,
+        corpus_hash: str,
+        model: str,
+        dim: int,
+        embeddings: np.ndarray,
+        content_hashes: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """
+        Write normalized embeddings for a corpus version and map them back.
+
+        The file is written to a temporary name and renamed into place, so
+        concurrently starting workers never map a partial artifact. Older
+        artifacts for the same model and dimension are removed.
+
+        Args:
+            corpus_hash: Corpus content hash
+            model: Embedding model name
+            dim: Embedding dimension
+            embeddings: Embeddings of shape (n, dim)
+            content_hashes: Content hash of each row's document (optional)
+
+        Returns:
+            Read-only memory-mapped array of the saved embeddings
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.artifact_path(corpus_hash, model, dim)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+
+        # Sidecar first: once the artifact is visible, its hashes are too
+        if content_hashes is not None:
+            sidecar = path.with_suffix(".json")
+            tmp_sidecar = sidecar.with_name(f"{sidecar.stem}.{os.getpid()}.json.tmp")
+            tmp_sidecar.write_text(json.dumps({"content_hashes": list(content_hashes)}))
+            os.replace(tmp_sidecar, sidecar)
+
+        with open(tmp_path, "wb") as f:
+            np.save(f, normalize_rows(embeddings))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved {len(embeddings)} corpus embeddings to {path}")
+
+        for stale in self._glob(model, dim):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+                stale.with_suffix(".json").unlink(missing_ok=True)
+
+        return np.load(path, mmap_mode="r")
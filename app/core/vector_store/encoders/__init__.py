@@ -0,0 +1,49 @@
+"""
+Text embedding backends.
+"""
+from .base_encoder import BaseEncoder
+from .batching_encoder import BatchingEncoder
+from .embedding_server import EmbeddingServer
+from .onnx_encoder import OnnxEncoder
+from .remote_encoder import RemoteEncoder
+from .sentence_transformer_encoder import SentenceTransformerEncoder
+
+ENCODER_BACKENDS = ("torch", "onnx", "remote")
+
+
+def create_encoder(backend: str, model: str, **options) -> BaseEncoder:
+    """
+    Create an embedding backend.
+
+    Args:
+        backend: "torch" (sentence-transformers), "onnx" (ONNX Runtime) or
+            "remote" (the local embedding server)
+        model: Sentence-transformers model name or local path
+        **options: Backend constructor options
+
+    Returns:
+        Initialized encoder
+
+    Raises:
+        ValueError: If the backend name is invalid
+    """
+    backend = backend.lower()
+    if backend == "torch":
+        return SentenceTransformerEncoder(model, **options)
+    if backend == "onnx":
+        return OnnxEncoder(model, **options)
+    if backend == "remote":
+        return RemoteEncoder(model, **options)
+    raise ValueError(f"Unknown embedding backend: {backend}. Supported: 'torch', 'onnx', 'remote'")
+
+
+__all__ = [
+    "BaseEncoder",
+    "BatchingEncoder",
+    "EmbeddingServer",
+    "OnnxEncoder",
+    "RemoteEncoder",
+    "SentenceTransformerEncoder",
+    "ENCODER_BACKENDS",
+    "create_encoder",
+]
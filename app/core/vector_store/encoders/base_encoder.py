@@ -0,0 +1,62 @@
+"""
+Base abstract class for text embedding backends.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Union
+
+import numpy as np
+
+
+class BaseEncoder(ABC):
+    """
+    Abstract base class for sentence embedding backends.
+
+    ``cache_key`` identifies the model *and* the numerics of the backend,
+    so embeddings cached or persisted by one backend are never served by
+    another (e.g. int8 ONNX vectors differ slightly from torch ones).
+    """
+
+    model_name: str
+    cache_key: str
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Embedding dimension."""
+        pass
+
+    @abstractmethod
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        pool: Optional[Any] = None,
+    ) -> np.ndarray:
+        """
+        Embed one text or a list of texts.
+
+        Args:
+            texts: A text, or a list of texts
+            batch_size: Texts per forward pass
+            pool: Worker pool from ``start_pool`` (optional)
+
+        Returns:
+            float32 array of shape (dim,) for a single text, else (n, dim)
+        """
+        pass
+
+    def start_pool(self, workers: int) -> Optional[Any]:
+        """
+        Start worker processes for encoding large batches.
+
+        Args:
+            workers: Number of worker processes
+
+        Returns:
+            Pool handle for ``encode``, or None if the backend has no pool
+        """
+        return None
+
+    def stop_pool(self, pool: Optional[Any]):
+        """Stop a pool started by ``start_pool``."""
+        pass
@@ -0,0 +1,94 @@
+"""
+Encoder front-end that micro-batches concurrent encode calls.
+"""
+from typing import Any, List, Optional, Union
+import logging
+
+import numpy as np
+
+from app.core.batching import DynamicBatcher
+from app.core.metrics import get_metrics
+from .base_encoder import BaseEncoder
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class BatchingEncoder(BaseEncoder):
+    """
+    Coalesce concurrent encode calls into shared forward passes.
+
+    Concurrent searches each embed a single query, which leaves most of the
+    model's batch throughput unused. This wrapper queues their texts on a
+    ``DynamicBatcher`` that flushes when ``max_batch_size`` texts are queued
+    or ``max_wait_ms`` has passed since the first one, and hands each caller
+    its rows through futures. Calls that already carry a full batch, or a
+    worker pool, go straight to the wrapped encoder.
+
+    Batch sizes and the queue depth seen by each submission are recorded as
+    the ``embedding_batch_size`` and ``embedding_queue_depth`` histograms.
+    """
+
+    def __init__(self, encoder: BaseEncoder, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Wrap an encoder and start the batcher.
+
+        Args:
+            encoder: Encoder that computes the embeddings
+            max_batch_size: Maximum texts per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds
+        """
+        self.encoder = encoder
+        self.model_name = encoder.model_name
+        self.cache_key = encoder.cache_key
+        self.batcher = DynamicBatcher(
+            self._encode_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="embedding-batcher",
+        )
+
+    @property
+    def dimension(self) -> int:
+        return self.encoder.dimension
+
+    def _encode_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Batch function: one forward pass over texts from any number of callers."""
+        get_metrics().observe_histogram(
+            "embedding_batch_size", len(texts), BATCH_SIZE_BUCKETS, model=self.cache_key
+        )
+        embeddings = self.encoder.encode(list(texts), batch_size=len(texts))
+        return list(np.asarray(embeddings, dtype=np.float32))
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        pool: Optional[Any] = None,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if pool is not None or len(batch) >= self.batcher.max_batch_size:
+            # Already a full batch: queueing would only add latency
+            return self.encoder.encode(texts, batch_size=batch_size, pool=pool)
+        if not batch:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        get_metrics().observe_histogram(
+            "embedding_queue_depth", self.batcher.queue_depth(), QUEUE_DEPTH_BUCKETS, model=self.cache_key
+        )
+        futures = [self.batcher.submit(text) for text in batch]
+        embeddings = np.stack([future.result() for future in futures])
+        return embeddings[0] if single else embeddings
+
+    def start_pool(self, workers: int) -> Optional[Any]:
+        return self.encoder.start_pool(workers)
+
+    def stop_pool(self, pool: Optional[Any]):
+        self.encoder.stop_pool(pool)
+
+    def close(self):
+        """Stop the batcher after finishing queued texts."""
+        self.batcher.close()
@@ -0,0 +1,206 @@
+"""
+Embedding sidecar: one process owns the model and serves every worker over a Unix socket.
+"""
+from typing import List, Optional, Tuple
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+
+import numpy as np
+
+from .base_encoder import BaseEncoder
+from .batching_encoder import BatchingEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/astrological-embeddings.sock"
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def send_frame(sock: socket.socket, data: bytes):
+    """Send one length-prefixed frame."""
+    sock.sendall(_FRAME_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly ``size`` bytes (None if the peer closed first)."""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """
+    Receive one length-prefixed frame.
+
+    Returns:
+        Frame payload, or None if the peer closed the connection
+    """
+    header = _recv_exact(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = _FRAME_HEADER.unpack(header)
+    return _recv_exact(sock, size) if size else b""
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    """
+    Serve one client connection.
+
+    Each request is a JSON frame: ``{"op": "info"}`` or ``{"op": "encode",
+    "texts": [...]}``. The reply is a JSON header frame, followed for
+    ``encode`` by a frame of raw float32 embeddings of ``header["shape"]``.
+    """
+
+    def handle(self):
+        server: "EmbeddingServer" = self.server.embedding_server
+        while True:
+            frame = recv_frame(self.request)
+            if frame is None:
+                return
+
+            try:
+                request = json.loads(frame)
+                if request.get("op") == "info":
+                    send_frame(self.request, json.dumps({"ok": True, **server.info()}).encode("utf-8"))
+                elif request.get("op") == "encode":
+                    embeddings = server.encode(request["texts"])
+                    header = {"ok": True, "shape": list(embeddings.shape)}
+                    send_frame(self.request, json.dumps(header).encode("utf-8"))
+                    send_frame(self.request, embeddings.tobytes())
+                else:
+                    raise ValueError(f"Unknown op: {request.get('op')}")
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as e:
+                logger.error(f"Embedding request failed: {e}")
+                send_frame(self.request, json.dumps({"ok": False, "error": str(e)}).encode("utf-8"))
+
+
+class _EmbeddingUnixServer(socketserver.ThreadingUnixStreamServer):
+    # Every API worker thread may connect at once; the default backlog is 5
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class EmbeddingServer:
+    """
+    Serve an encoder to local processes over a Unix domain socket.
+
+    Each connection is handled on its own thread. The texts of concurrent
+    requests, from any number of API workers, are coalesced by a
+    ``BatchingEncoder`` into shared forward passes. Only this process loads
+    the model, so its memory is paid once per node rather than per worker.
+    """
+
+    def __init__(
+        self,
+        encoder: BaseEncoder,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Initialize the server and start its batcher.
+
+        Args:
+            encoder: Encoder that computes the embeddings
+            socket_path: Unix socket to listen on
+            max_batch_size: Maximum texts per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds
+        """
+        self.encoder = BatchingEncoder(encoder, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.socket_path = socket_path
+        self._server: Optional[_EmbeddingUnixServer] = None
+
+    def info(self) -> dict:
+        """Identity of the served encoder (model, cache key and dimension)."""
+        return {
+            "model_name": self.encoder.model_name,
+            "cache_key": self.encoder.cache_key,
+            "dimension": self.encoder.dimension,
+        }
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts through the shared batcher.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        return np.asarray(self.encoder.encode(list(texts)), dtype=np.float32)
+
+    def _remove_stale_socket(self):
+        """Delete a socket file left behind by a dead server."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"An embedding server is already listening on {self.socket_path}")
+
+    def serve_forever(self):
+        """
+        Listen on the socket until ``shutdown`` is called.
+
+        Raises:
+            RuntimeError: If another server is listening on the socket
+        """
+        self._remove_stale_socket()
+        self._server = _EmbeddingUnixServer(self.socket_path, _EmbeddingRequestHandler)
+        self._server.embedding_server = self
+        logger.info(f"Embedding server for {self.encoder.cache_key} listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.encoder.close()
+
+    def shutdown(self):
+        """Stop ``serve_forever`` (call from another thread)."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def read_reply(sock: socket.socket) -> Tuple[dict, Optional[bytes]]:
+    """
+    Read a server reply.
+
+    Returns:
+        JSON header, and the embedding bytes for ``encode`` replies
+
+    Raises:
+        ConnectionError: If the server closed the connection
+        RuntimeError: If the server reported an error
+    """
+    frame = recv_frame(sock)
+    if frame is None:
+        raise ConnectionError("Embedding server closed the connection")
+    header = json.loads(frame)
+    if not header.get("ok"):
+        raise RuntimeError(f"Embedding server error: {header.get('error')}")
+    if "shape" not in header:
+        return header, None
+    payload = recv_frame(sock)
+    if payload is None:
+        raise ConnectionError("Embedding server closed the connection")
+    return header, payload
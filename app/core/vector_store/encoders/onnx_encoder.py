@@ -0,0 +1,248 @@
+"""
+CPU embedding backend using ONNX Runtime, with optional int8 quantization.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from .base_encoder import BaseEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = "cache/onnx"
+ONNX_OPSET = 17
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def resolve_model_dir(model: str) -> Path:
+    """
+    Locate a sentence-transformers model on disk, downloading it if needed.
+
+    Plain names resolve to the ``sentence-transformers`` organization, as in
+    ``SentenceTransformer("all-MiniLM-L6-v2")``. Weights are only downloaded
+    when the repository has no ``onnx/model.onnx`` to start from.
+
+    Args:
+        model: Model name or local path
+
+    Returns:
+        Model directory
+    """
+    path = Path(model)
+    if path.is_dir():
+        return path
+
+    from huggingface_hub import snapshot_download
+
+    repo_id = model if "/" in model else f"sentence-transformers/{model}"
+    model_dir = Path(snapshot_download(repo_id, allow_patterns=["*.json", "*.txt", "onnx/model.onnx"]))
+    if not (model_dir / "onnx" / "model.onnx").exists():
+        model_dir = Path(snapshot_download(repo_id, allow_patterns=["*.json", "*.txt", "*.safetensors"]))
+    return model_dir
+
+
+def export_onnx(model_dir: Path, output: Path):
+    """
+    Export a transformer encoder to ONNX with dynamic batch and sequence axes.
+
+    Needs torch and transformers, but only once: the exported graph is
+    what the encoder runs afterwards.
+
+    Args:
+        model_dir: Model directory
+        output: Path of the ONNX file to write
+    """
+    import torch
+    from transformers import AutoModel
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            ).last_hidden_state
+
+    logger.info(f"Exporting {model_dir} to ONNX: {output}")
+    model = AutoModel.from_pretrained(model_dir)
+    model.eval()
+
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dummy = torch.ones((1, 8), dtype=torch.long)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f"{output.stem}.{os.getpid()}.tmp")
+    torch.onnx.export(
+        TokenEmbeddings(model),
+        (dummy, dummy, torch.zeros_like(dummy)),
+        str(tmp_path),
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+        opset_version=ONNX_OPSET,
+        dynamo=False,
+    )
+    os.replace(tmp_path, output)
+
+
+def quantize_onnx(source: Path, output: Path):
+    """
+    Apply int8 dynamic quantization to an ONNX model's weights.
+
+    Args:
+        source: fp32 ONNX model
+        output: Path of the quantized model to write
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    logger.info(f"Quantizing {source} to int8: {output}")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f"{output.stem}.{os.getpid()}.tmp")
+    quantize_dynamic(str(source), str(tmp_path), weight_type=QuantType.QInt8)
+    os.replace(tmp_path, output)
+
+
+class OnnxEncoder(BaseEncoder):
+    """
+    Encoder running a sentence-transformers model on ONNX Runtime.
+
+    Inference needs only onnxruntime, tokenizers and numpy, not PyTorch.
+    The graph comes from the model's ``onnx/model.onnx`` when it ships one,
+    otherwise it is exported from PyTorch once and cached in ``export_dir``;
+    the int8 dynamically quantized variant is cached there too. Pooling and
+    normalization follow the model's sentence-transformers configuration.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        quantize: bool = True,
+        export_dir: str = DEFAULT_EXPORT_DIR,
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Prepare the ONNX graph and start an inference session.
+
+        Args:
+            model: Sentence-transformers model name or local path
+            quantize: Run the int8 dynamically quantized graph
+            export_dir: Directory for exported and quantized graphs
+            num_threads: ONNX Runtime intra-op threads (None uses all cores)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model
+        self.quantize = quantize
+        self.cache_key = f"{model}@onnx-{'int8' if quantize else 'fp32'}"
+
+        model_dir = resolve_model_dir(model)
+        self.model_path = self._prepare_graph(model, model_dir, Path(export_dir), quantize)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        logger.info(f"Loading ONNX embedding model: {self.model_path}")
+        self.session = ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        config = _read_json(model_dir / "config.json")
+        tokenizer_config = _read_json(model_dir / "tokenizer_config.json")
+        st_config = _read_json(model_dir / "sentence_bert_config.json")
+        max_length = st_config.get("max_seq_length") or min(
+            tokenizer_config.get("model_max_length", 512),
+            config.get("max_position_embeddings", 512),
+        )
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        pad_token = tokenizer_config.get("pad_token") or "[PAD]"
+        pad_id = self.tokenizer.token_to_id(pad_token)
+        self.tokenizer.enable_padding(pad_id=pad_id if pad_id is not None else 0, pad_token=pad_token)
+
+        pooling = _read_json(model_dir / "1_Pooling" / "config.json")
+        self.pooling_mode = pooling.get("pooling_mode") or next(
+            (mode for mode in ("cls", "max", "mean")
+             if pooling.get(f"pooling_mode_{mode}_token") or pooling.get(f"pooling_mode_{mode}_tokens")),
+            "mean",
+        )
+        if self.pooling_mode not in ("cls", "max", "mean"):
+            raise ValueError(f"Unsupported pooling mode: {self.pooling_mode}")
+
+        modules = _read_json(model_dir / "modules.json") or []
+        self.normalize = any(module.get("type", "").endswith("Normalize") for module in modules)
+        self._dimension = (
+            pooling.get("embedding_dimension")
+            or pooling.get("word_embedding_dimension")
+            or config["hidden_size"]
+        )
+
+    @staticmethod
+    def _prepare_graph(model: str, model_dir: Path, export_dir: Path, quantize: bool) -> Path:
+        """Path of the graph to run, exporting and quantizing it on first use."""
+        graph_dir = export_dir / re.sub(r"[^A-Za-z0-9._-]+", "_", model).strip("_")
+        shipped = model_dir / "onnx" / "model.onnx"
+        source = shipped if shipped.exists() else graph_dir / "model.onnx"
+        if not source.exists():
+            export_onnx(model_dir, source)
+        if not quantize:
+            return source
+
+        quantized = graph_dir / "model_qint8.onnx"
+        if not quantized.exists():
+            quantize_onnx(source, quantized)
+        return quantized
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Pool token embeddings into one vector per text."""
+        if self.pooling_mode == "cls":
+            return token_embeddings[:, 0]
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.pooling_mode == "max":
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        pool: Optional[Any] = None,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        embeddings = np.empty((len(batch), self.dimension), dtype=np.float32)
+
+        # Longest texts first, so each batch pads to similar lengths
+        order = np.argsort([-len(text) for text in batch], kind="stable")
+        for start in range(0, len(batch), batch_size):
+            rows = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([batch[row] for row in rows])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            embeddings[rows] = self._pool(token_embeddings, attention_mask)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,118 @@
+"""
+Embedding backend that delegates to the local embedding server.
+"""
+from typing import Any, List, Optional, Union
+import json
+import logging
+import socket
+import threading
+import time
+
+import numpy as np
+
+from .base_encoder import BaseEncoder
+from .embedding_server import DEFAULT_SOCKET_PATH, read_reply, send_frame
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteEncoder(BaseEncoder):
+    """
+    Encoder client for an ``EmbeddingServer`` on the same node.
+
+    Holds no model: worker processes using it stay small and never import
+    torch or ONNX Runtime. Each thread keeps its own connection, so texts
+    from concurrent requests reach the server in parallel and are batched
+    there. The model name, cache key and dimension are the server's.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
+        """
+        Connect to the embedding server.
+
+        Args:
+            model: Expected model name (a mismatch with the server is logged)
+            socket_path: Unix socket of the embedding server
+            timeout: Seconds to wait for a reply
+            connect_timeout: Seconds to keep retrying the first connection,
+                e.g. while the server is still loading its model
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                info, _ = self._request({"op": "info"})
+                break
+            except (ConnectionError, FileNotFoundError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+        self.model_name = info["model_name"]
+        self.cache_key = info["cache_key"]
+        self._dimension = info["dimension"]
+        if model and model != self.model_name:
+            logger.warning(f"Embedding server runs {self.model_name}, not the configured {model}")
+        logger.info(f"Using embedding server at {socket_path} ({self.cache_key})")
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _connection(self) -> socket.socket:
+        """This thread's connection to the server, opened on first use."""
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                # Blocking connect waits for backlog room (with a timeout it fails with EAGAIN)
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            sock.settimeout(self.timeout)
+            self._local.sock = sock
+        return sock
+
+    def _close_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, request: dict):
+        """Send a request and read the reply, reconnecting once if the connection dropped."""
+        data = json.dumps(request).encode("utf-8")
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, data)
+                return read_reply(sock)
+            except ConnectionError:
+                self._close_connection()
+                if attempt:
+                    raise
+            except Exception:
+                # A timed-out or failed exchange leaves the stream mid-frame
+                self._close_connection()
+                raise
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        pool: Optional[Any] = None,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        header, payload = self._request({"op": "encode", "texts": [texts] if single else list(texts)})
+        embeddings = np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,57 @@
+"""
+PyTorch embedding backend using sentence-transformers.
+"""
+from typing import Any, List, Optional, Union
+import logging
+
+import numpy as np
+
+from .base_encoder import BaseEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceTransformerEncoder(BaseEncoder):
+    """Encoder running a sentence-transformers model on PyTorch."""
+
+    def __init__(self, model: str, device: Optional[str] = None):
+        """
+        Load the model.
+
+        Args:
+            model: Sentence-transformers model name or local path
+            device: Torch device (None lets sentence-transformers choose)
+        """
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model: {model}")
+        self.model_name = model
+        self.cache_key = model
+        self.model = SentenceTransformer(model, device=device)
+        self._dimension = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        pool: Optional[Any] = None,
+    ) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            pool=pool,
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def start_pool(self, workers: int) -> Optional[Any]:
+        return self.model.start_multi_process_pool(["cpu"] * workers)
+
+    def stop_pool(self, pool: Optional[Any]):
+        if pool is not None:
+            self.model.stop_multi_process_pool(pool)
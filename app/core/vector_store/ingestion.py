@@ -0,0 +1,327 @@
+"""
+Streaming, chunked ingestion of large corpora into the vector store.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from app.core.llm.batch import iter_jsonl
+from app.core.metrics import get_metrics
+from .vector_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+ProgressFn = Callable[[int], None]
+
+_WHITESPACE = re.compile(r"\s*")
+
+# Largest corpus item (in characters) buffered while it is being read
+MAX_ITEM_SIZE = 1 << 24
+
+
+def _iter_json_array(f: TextIO, key: str, block_size: int, max_item_size: int = MAX_ITEM_SIZE) -> Iterator[Dict]:
+    """Decode the elements of a top-level array (or ``{key: [...]}``) one at a time."""
+    decoder = json.JSONDecoder()
+    start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+
+    # Find the start of the array, reading only as far as needed
+    buf = f.read(block_size)
+    if buf.lstrip().startswith("["):
+        buf = buf.lstrip()
+        pos = 1
+    else:
+        while True:
+            match = start.search(buf)
+            if match:
+                pos = match.end()
+                break
+            chunk = f.read(block_size)
+            if not chunk:
+                raise ValueError(f'No "{key}" array found')
+            buf = buf[-(len(key) + 64):] + chunk
+
+    # Elements must be separated by exactly one comma: after "[" comes an
+    # element or "]", after an element "," or "]", after "," an element
+    expecting = "first"
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            chunk = f.read(block_size)
+            if not chunk:
+                raise ValueError("Unterminated corpus array")
+            buf, pos = chunk, 0
+            continue
+
+        char = buf[pos]
+        if expecting == "separator":
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' after a corpus item, found {char!r}")
+            pos += 1
+            expecting = "item"
+            continue
+        if char == "]":
+            if expecting == "first":
+                return
+            raise ValueError("Trailing comma in corpus array")
+        if char == ",":
+            raise ValueError("Expected a corpus item, found ','")
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            pending = len(buf) - pos
+            if pending > max_item_size:
+                raise ValueError(f"Corpus item exceeds {max_item_size} characters (or is malformed)")
+            # Read at least as much as is pending, so a large item is
+            # decoded O(log size) times rather than once per block
+            chunk = f.read(max(block_size, pending))
+            if not chunk:
+                raise
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        yield item
+        buf, pos = buf[end:], 0
+        expecting = "separator"
+
+
+def iter_corpus(path: Path, block_size: int = 1 << 16, max_item_size: int = MAX_ITEM_SIZE) -> Iterator[Dict]:
+    """
+    Stream corpus items without loading the whole file.
+
+    Args:
+        path: ``.jsonl`` file of items, or ``.json`` file holding a
+            ``{"corpus": [...]}`` object or a top-level list
+        block_size: Characters read at a time from ``.json`` files
+        max_item_size: Largest item, in characters, of ``.json`` files
+
+    Yields:
+        Corpus items, in file order
+
+    Raises:
+        ValueError: If a ``.json`` file is malformed or holds an item
+            larger than ``max_item_size``
+    """
+    if path.suffix == ".jsonl":
+        yield from iter_jsonl(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _iter_json_array(f, "corpus", block_size, max_item_size)
+
+
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """Content hash of a file, computed in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def chunked(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CorpusIngestor:
+    """
+    Ingest a corpus of any size with bounded memory.
+
+    Items are parsed incrementally and processed in fixed-size chunks.
+    Each chunk is encoded (optionally across several processes) while the
+    previous chunk is being upserted, and a checkpoint records the number
+    of items whose chunk has been committed, so an interrupted run resumes
+    after the last committed chunk.
+
+    Ingestion only upserts: documents deleted from the corpus are removed
+    by ``VectorStoreService.sync_corpus``.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreService,
+        chunk_size: int = 1024,
+        encode_batch_size: int = 64,
+        workers: int = 0,
+        checkpoint_path: Optional[str] = None,
+        skip_unchanged: bool = True,
+        max_pending: int = 2,
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            vector_store: Available vector store service
+            chunk_size: Items per upsert (and per checkpoint)
+            encode_batch_size: Texts per encoder forward pass
+            workers: Encoder processes (0 or 1 encodes in-process)
+            checkpoint_path: File recording progress for resuming (None disables resume)
+            skip_unchanged: Skip items whose stored content hash matches
+            max_pending: Upserted chunks allowed in flight while encoding
+        """
+        self.vector_store = vector_store
+        self.chunk_size = chunk_size
+        self.encode_batch_size = encode_batch_size
+        self.workers = workers
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.skip_unchanged = skip_unchanged
+        self.max_pending = max(1, max_pending)
+
+    def _read_checkpoint(self, corpus_path: Path, corpus_version: str) -> int:
+        """Items already committed for this corpus version."""
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return 0
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingestion checkpoint {self.checkpoint_path}: {e}")
+            return 0
+        if checkpoint.get("corpus") != str(corpus_path) or checkpoint.get("corpus_version") != corpus_version:
+            logger.info("Ingestion checkpoint is for another corpus version, starting over")
+            return 0
+        return int(checkpoint.get("committed", 0))
+
+    def _write_checkpoint(self, corpus_path: Path, corpus_version: str, committed: int):
+        """Atomically record the number of committed items."""
+        if self.checkpoint_path is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_text(json.dumps({
+            "corpus": str(corpus_path),
+            "corpus_version": corpus_version,
+            "committed": committed,
+        }))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _changed(self, chunk: List[Dict]) -> List[Dict]:
+        """Items of a chunk that are new or differ from what is stored."""
+        if not self.skip_unchanged:
+            return chunk
+        return self.vector_store.changed_documents(chunk)
+
+    def _upsert(self, chunk: List[Dict], changed: List[Dict], embeddings) -> int:
+        """
+        Upsert a chunk's changed items (on the upload thread).
+
+        The keyword index (hybrid mode) is diffed on its own, so it also
+        gets the chunk's unchanged items it lacks, e.g. in a new process.
+
+        Returns:
+            Number of items (re)indexed in the keyword index
+        """
+        if changed:
+            self.vector_store.upsert_documents(changed, embeddings)
+        return self.vector_store.index_keywords(chunk)
+
+    def ingest(
+        self,
+        corpus_path: str,
+        resume: bool = True,
+        progress: Optional[ProgressFn] = None,
+    ) -> Dict[str, int]:
+        """
+        Stream a corpus file into the vector store.
+
+        Args:
+            corpus_path: ``.json`` or ``.jsonl`` corpus file
+            resume: Continue after the last committed chunk of an
+                interrupted run over the same file contents
+            progress: Called with the number of committed items after each chunk
+
+        Returns:
+            Counts of "processed" items (including resumed ones), "upserted"
+            and "unchanged" items, and items "resumed" from the checkpoint
+
+        Raises:
+            RuntimeError: If the vector store is not available, has no
+                embedding model (sparse retrieval mode) or is a read-only
+                follower (disk mode)
+        """
+        if not self.vector_store.is_available():
+            raise RuntimeError("Vector store not available")
+        if self.vector_store.encoder is None:
+            raise RuntimeError("Streaming ingestion needs an embedding model (dense or hybrid retrieval)")
+        if self.vector_store.read_only:
+            raise RuntimeError("Vector store is a read-only follower of another process's Qdrant storage")
+
+        corpus_path = Path(corpus_path)
+        corpus_version = file_hash(corpus_path)
+        resumed = self._read_checkpoint(corpus_path, corpus_version) if resume else 0
+        if resumed:
+            logger.info(f"Resuming ingestion of {corpus_path} after {resumed} committed items")
+
+        self.vector_store.ensure_collection()
+
+        encoder = self.vector_store.encoder
+        pool = encoder.start_pool(self.workers) if self.workers > 1 else None
+        metrics = get_metrics()
+        counts = {"processed": resumed, "upserted": 0, "unchanged": 0, "resumed": resumed}
+        keywords_indexed = 0
+        started = time.perf_counter()
+
+        def commit(future, committed: int, upserted: int, unchanged: int):
+            nonlocal keywords_indexed
+            keywords_indexed += future.result()
+            counts["processed"] = committed
+            counts["upserted"] += upserted
+            counts["unchanged"] += unchanged
+            metrics.increment("corpus_ingest_documents", upserted, change="upserted")
+            metrics.increment("corpus_ingest_documents", unchanged, change="unchanged")
+            self._write_checkpoint(corpus_path, corpus_version, committed)
+            rate = (committed - resumed) / max(time.perf_counter() - started, 1e-9)
+            logger.info(f"Committed {committed} items ({rate:.0f} items/s)")
+            if progress is not None:
+                progress(committed)
+
+        try:
+            # One upload thread: chunk N is upserted while chunk N+1 is encoded
+            with ThreadPoolExecutor(max_workers=1) as uploader:
+                pending = deque()
+                committed = resumed
+                for chunk in chunked(islice(iter_corpus(corpus_path), resumed, None), self.chunk_size):
+                    committed += len(chunk)
+                    changed = self._changed(chunk)
+                    embeddings = None
+                    if changed:
+                        embeddings = self.vector_store.encode_documents(
+                            [item["text"] for item in changed],
+                            batch_size=self.encode_batch_size,
+                            pool=pool,
+                        )
+                    future = uploader.submit(self._upsert, chunk, changed, embeddings)
+                    pending.append((future, committed, len(changed), len(chunk) - len(changed)))
+
+                    while len(pending) > self.max_pending:
+                        commit(*pending.popleft())
+                while pending:
+                    commit(*pending.popleft())
+        finally:
+            if pool is not None:
+                encoder.stop_pool(pool)
+
+        if self.checkpoint_path is not None:
+            self.checkpoint_path.unlink(missing_ok=True)
+
+        self.vector_store.finish_ingestion(corpus_version, changed=counts["upserted"] > 0 or keywords_indexed > 0)
+        logger.info(
+            f"Ingested {corpus_path}: {counts['processed']} items, {counts['upserted']} upserted, "
+            f"{counts['unchanged']} unchanged, {counts['resumed']} resumed"
+        )
+        return counts
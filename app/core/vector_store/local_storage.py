@@ -0,0 +1,386 @@
+"""
+Helpers for sharing embedded (on-disk) Qdrant storage between processes.
+
+Qdrant's local mode (``QdrantClient(path=...)``) takes an exclusive lock on
+its storage directory, so only one process can open it. Other processes
+follow that writer read-only, from a consistent copy of the storage. The
+copy is made once per storage version, in a directory next to the storage,
+and shared by every follower.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Layout of a local Qdrant storage directory
+META_FILENAME = "meta.json"
+LOCK_FILENAME = ".lock"
+COLLECTION_STORAGE_GLOB = "collection/*/storage.sqlite"
+
+# Shared follower copies live in "<storage path><suffix>/<storage version>"
+FOLLOWER_COPIES_SUFFIX = "-followers"
+# Copies of older versions are deleted once they are this old (seconds)
+FOLLOWER_COPY_RETENTION = 60.0
+
+
+def is_storage_locked(path: str) -> bool:
+    """
+    Check whether another Qdrant client holds the storage directory.
+
+    Args:
+        path: Local Qdrant storage directory
+
+    Returns:
+        True if another process has the directory open
+    """
+    import portalocker
+
+    lock_path = os.path.join(path, LOCK_FILENAME)
+    if not os.path.exists(lock_path):
+        return False
+
+    with open(lock_path, "r+") as lock_file:
+        try:
+            portalocker.lock(lock_file, portalocker.LockFlags.EXCLUSIVE | portalocker.LockFlags.NON_BLOCKING)
+        except portalocker.exceptions.LockException:
+            return True
+        portalocker.unlock(lock_file)
+    return False
+
+
+def storage_version(path: str) -> Optional[str]:
+    """
+    Fingerprint the committed state of a local Qdrant storage directory.
+
+    Covers the collection metadata and the size and modification time of
+    every collection database, so any write by the owning process changes it.
+
+    Args:
+        path: Local Qdrant storage directory
+
+    Returns:
+        Version string, or None if ``path`` holds no Qdrant storage yet
+    """
+    source = Path(path)
+    digest = hashlib.sha256()
+    try:
+        digest.update((source / META_FILENAME).read_bytes())
+    except FileNotFoundError:
+        return None
+
+    for database in sorted(source.glob(COLLECTION_STORAGE_GLOB)):
+        try:
+            stat = database.stat()
+        except FileNotFoundError:
+            # Collection deleted meanwhile
+            continue
+        digest.update(f"{database.relative_to(source)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _read_meta(path: Path, attempts: int = 20) -> str:
+    """Read the collection metadata, retrying while the writer rewrites it."""
+    for attempt in range(attempts):
+        text = path.read_text(encoding="utf-8")
+        try:
+            json.loads(text)
+            return text
+        except json.JSONDecodeError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05)
+
+
+def copy_storage(path: str, target: str):
+    """
+    Copy a local Qdrant storage directory while its writer keeps running.
+
+    Each collection is copied with SQLite's online backup, so the copy is
+    consistent even if points are being written. The collection metadata
+    is copied first: a collection created meanwhile is left out rather than
+    half-copied.
+
+    Args:
+        path: Local Qdrant storage directory
+        target: Empty directory to copy into
+
+    Raises:
+        FileNotFoundError: If ``path`` holds no Qdrant storage
+    """
+    source = Path(path)
+    destination = Path(target)
+    meta_path = source / META_FILENAME
+    if not meta_path.exists():
+        raise FileNotFoundError(f"No Qdrant storage at {path}")
+
+    destination.mkdir(parents=True, exist_ok=True)
+    (destination / META_FILENAME).write_text(_read_meta(meta_path), encoding="utf-8")
+
+    for database in source.glob(COLLECTION_STORAGE_GLOB):
+        copy_path = destination / database.relative_to(source)
+        copy_path.parent.mkdir(parents=True, exist_ok=True)
+        reader = sqlite3.connect(f"{database.resolve().as_uri()}?mode=ro", uri=True)
+        writer = sqlite3.connect(copy_path)
+        try:
+            reader.backup(writer)
+        finally:
+            writer.close()
+            reader.close()
+    logger.debug(f"Copied Qdrant storage {path} to {target}")
+
+
+def shared_copy(path: str, copies_dir: str) -> Optional[tuple]:
+    """
+    Get the shared copy of a storage directory's current version, making it
+    if no follower has yet.
+
+    The copy is made in a staging directory and renamed into place, so
+    followers never see a partial copy; copies of older versions are
+    deleted once ``FOLLOWER_COPY_RETENTION`` has passed.
+
+    Args:
+        path: Local Qdrant storage directory
+        copies_dir: Directory holding the shared copies
+
+    Returns:
+        (storage version, copy directory), or None if ``path`` holds no
+        Qdrant storage yet
+    """
+    # Fingerprint before copying: writes made during the copy leave the
+    # version stale, so the next check copies again rather than missing them
+    version = storage_version(path)
+    if version is None:
+        return None
+
+    copies = Path(copies_dir)
+    target = copies / version
+    if not target.exists():
+        copies.mkdir(parents=True, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=copies)
+        try:
+            copy_storage(path, staging)
+            os.rename(staging, target)
+            logger.info(f"Copied Qdrant storage {path} (version {version}) for followers")
+        except OSError:
+            # Another follower published this version first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not target.exists():
+                raise
+
+    cutoff = time.time() - FOLLOWER_COPY_RETENTION
+    for old in copies.iterdir():
+        if old != target and not old.name.startswith(".") and old.stat().st_mtime < cutoff:
+            shutil.rmtree(old, ignore_errors=True)
+    return version, target
+
+
+def link_storage(source: str, target: str):
+    """
+    Lay out a storage directory that shares the collection databases of another.
+
+    Qdrant locks every directory it opens, so each follower needs its own;
+    the databases are hard-linked (copied where linking is not supported)
+    and only read, as followers never write.
+
+    Args:
+        source: Shared copy made by ``shared_copy``
+        target: Empty directory to lay out
+    """
+    source_path = Path(source)
+    destination = Path(target)
+    shutil.copyfile(source_path / META_FILENAME, destination / META_FILENAME)
+    for database in source_path.glob(COLLECTION_STORAGE_GLOB):
+        link_path = destination / database.relative_to(source_path)
+        link_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(database, link_path)
+        except OSError:
+            shutil.copyfile(database, link_path)
+
+
+class LocalStorageMixin:
+    """
+    Disk-mode lifecycle of ``VectorStoreService``.
+    
+    The first process to open ``qdrant_path`` owns it and writes the corpus;
+    every other process becomes a read-only follower serving the shared copy
+    of the writer's current storage version. Followers check for a new
+    version every ``follower_refresh_interval`` seconds and switch to it.
+    """
+    
+    def _open_disk_client(self):
+        """Open the embedded storage, or follow the process that already has it open."""
+        from qdrant_client import QdrantClient
+        
+        try:
+            logger.info(f"Opening embedded Qdrant storage: {self.qdrant_path}")
+            self.client = QdrantClient(path=self.qdrant_path)
+            return
+        except RuntimeError as e:
+            # Only the storage lock is expected here
+            if not is_storage_locked(self.qdrant_path):
+                raise
+            logger.debug(f"Qdrant storage lock is held: {e}")
+        
+        logger.info(f"Qdrant storage {self.qdrant_path} is open in another process; following it read-only")
+        self.read_only = True
+        self._follower_copies = f"{os.path.normpath(self.qdrant_path)}{FOLLOWER_COPIES_SUFFIX}"
+        self._wait_for_storage()
+        self._open_follower_client()
+    
+    def _wait_for_storage(self):
+        """Wait up to ``follower_timeout`` for the writer to create its storage metadata."""
+        deadline = time.monotonic() + self.follower_timeout
+        while storage_version(self.qdrant_path) is None:
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    f"No Qdrant storage at {self.qdrant_path} after {self.follower_timeout}s; "
+                    "serving an empty copy until the writer creates it"
+                )
+                return
+            time.sleep(0.5)
+    
+    def _open_follower_client(self):
+        """(Re)open this process's view of the writer's current storage version."""
+        from qdrant_client import QdrantClient
+        
+        with self._follower_lock:
+            copy = shared_copy(self.qdrant_path, self._follower_copies)
+            directory = tempfile.TemporaryDirectory(prefix="qdrant-follower-")
+            try:
+                if copy is not None:
+                    link_storage(str(copy[1]), directory.name)
+                client = QdrantClient(path=directory.name)
+            except Exception:
+                directory.cleanup()
+                raise
+        
+            # Searches may still be running on the replaced client: keep it
+            # open until the next swap
+            retired = self._retired_follower
+            self._retired_follower = (self.client, self._follower_dir)
+            self.client, self._follower_dir = client, directory
+            self._follower_version = copy[0] if copy is not None else None
+            if retired is not None:
+                self._close_follower(*retired)
+    
+    @staticmethod
+    def _close_follower(client, directory: Optional[tempfile.TemporaryDirectory]):
+        """Close a follower client and remove its directory."""
+        if client is not None:
+            client.close()
+        if directory is not None:
+            directory.cleanup()
+    
+    def _follower_stale(self) -> bool:
+        """Whether the writer's storage has changed since this follower opened it."""
+        version = storage_version(self.qdrant_path)
+        return version is not None and version != self._follower_version
+    
+    def _follow_writer(self, ids: List[str], content_hashes: List[str]) -> Dict[str, int]:
+        """
+        Wait for the writing process to hold this corpus, refreshing the copy.
+        
+        Returns:
+            Counts of corpus documents the followed storage still lacks
+            ("added", "updated"), has extra ("deleted") or holds ("unchanged")
+        """
+        deadline = time.monotonic() + self.follower_timeout
+        try:
+            while True:
+                stored = self._stored_hashes() if self._collection_exists() else {}
+                rows, removed, counts = self._corpus_diff(stored, ids, content_hashes)
+                if not rows and not removed:
+                    return counts
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"Followed Qdrant storage still differs from the corpus after {self.follower_timeout}s; "
+                        "serving it as is"
+                    )
+                    return counts
+                time.sleep(1.0)
+                if self._follower_stale():
+                    self._open_follower_client()
+        finally:
+            self._start_follower_refresh()
+    
+    def _start_follower_refresh(self):
+        """Start the background thread that picks up new storage versions."""
+        if self._follower_thread is not None or self.follower_refresh_interval <= 0:
+            return
+        self._follower_thread = threading.Thread(
+            target=self._run_follower_refresh, name="qdrant-follower", daemon=True
+        )
+        self._follower_thread.start()
+    
+    def _run_follower_refresh(self):
+        """Refresh loop of the follower thread."""
+        while not self._follower_stop.wait(self.follower_refresh_interval):
+            try:
+                self.refresh_follower()
+            except Exception as e:
+                logger.warning(f"Could not refresh followed Qdrant storage: {e}")
+    
+    def refresh_follower(self) -> bool:
+        """
+        Switch a read-only follower to the writer's latest storage version.
+        
+        Rebuilds what this process derives from the stored documents (the
+        keyword index and the precomputed context); searches keep using
+        the previous version until the new one is ready.
+        
+        Returns:
+            True if a new version was picked up
+        """
+        if not self.read_only or not self._follower_stale():
+            return False
+        
+        with self._follower_lock:
+            if not self._follower_stale():
+                return False
+            self._open_follower_client()
+        
+            snapshot = None
+            if self.versioned_collections:
+                self._active_snapshot = self._previous_snapshot = None
+                self._adopt_versions()
+                snapshot = self._active_snapshot
+            elif self._collection_exists():
+                snapshot = {
+                    "version": None,
+                    "collection": self.collection_name,
+                    "index": None,
+                    "sparse_index": None,
+                    "context_cache": None,
+                }
+            if snapshot is not None:
+                snapshot["corpus_version"] = self.corpus_version
+                self._activate_adopted(snapshot)
+        
+        get_metrics().increment("qdrant_follower_refreshes")
+        logger.info(f"Following Qdrant storage version {self._follower_version}")
+        return True
+    
+    def _close_local_storage(self):
+        """Release the storage lock, or stop following and drop the follower's copies."""
+        if self._follower_thread is not None:
+            self._follower_stop.set()
+            self._follower_thread.join(timeout=5.0)
+            self._follower_thread = None
+        if self._retired_follower is not None:
+            self._close_follower(*self._retired_follower)
+            self._retired_follower = None
+        self._close_follower(self.client, self._follower_dir)
+        self.client = None
+        self._follower_dir = None
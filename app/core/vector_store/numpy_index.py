@@ -0,0 +1,422 @@
+"""
+In-process cosine similarity index backed by a NumPy matrix.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+import threading
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize vectors row-wise into a contiguous float32 array.
+
+    Args:
+        vectors: Array of shape (n, dim) or (dim,)
+
+    Returns:
+        Normalized float32 array of the same shape
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# Smallest row capacity allocated when an index grows
+MIN_CAPACITY = 64
+
+
+class _Rows:
+    """
+    Preallocated vector rows and zodiac masks shared by successive index states.
+
+    A state only reads its first ``count`` rows, so a writer can append by
+    filling the free rows past the newest state, without copying the
+    matrix and without disturbing searches still reading older states.
+    """
+
+    def __init__(self, vectors: np.ndarray, zodiac_masks: Dict[str, np.ndarray], used: int):
+        self.vectors = vectors
+        # Boolean row mask per zodiac value, each as long as ``vectors``
+        self.zodiac_masks = zodiac_masks
+        # Rows claimed by the newest state built on this storage
+        self.used = used
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.vectors)
+
+    def claim(self, count: int, n: int) -> bool:
+        """
+        Reserve the ``n`` rows following a state of ``count`` rows.
+
+        Fails if they do not fit, or if another state (e.g. of a copied
+        index) already extends past ``count``.
+        """
+        with self._lock:
+            if self.used != count or count + n > self.capacity:
+                return False
+            self.used += n
+            return True
+
+
+class _IndexState(NamedTuple):
+    """Contents of a NumpyVectorIndex; replaced, never modified."""
+
+    storage: _Rows
+    count: int
+    payloads: List[Dict]
+    ids: List[str]
+    rows: Dict[str, int]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.storage.vectors[:self.count]
+
+    def zodiac_mask(self, zodiac: str) -> Optional[np.ndarray]:
+        mask = self.storage.zodiac_masks.get(zodiac)
+        return mask[:self.count] if mask is not None else None
+
+
+def _build_state(vectors: np.ndarray, payloads: List[Dict], ids: List[str]) -> _IndexState:
+    """Assemble an index state using ``vectors`` as its storage, deriving the row lookup and zodiac masks."""
+    count = len(ids)
+    zodiacs = np.array([payload.get("zodiac") for payload in payloads], dtype=object)
+    zodiac_masks = {}
+    for zodiac in set(zodiacs.tolist()):
+        mask = np.zeros(len(vectors), dtype=bool)
+        mask[:count] = zodiacs == zodiac
+        zodiac_masks[zodiac] = mask
+
+    return _IndexState(
+        storage=_Rows(vectors, zodiac_masks, count),
+        count=count,
+        payloads=payloads,
+        ids=ids,
+        rows={doc_id: row for row, doc_id in enumerate(ids)},
+    )
+
+
+def _copy_rows(state: _IndexState, capacity: int, used: int) -> _Rows:
+    """Copy a state's rows (and their zodiac masks) into new storage of ``capacity`` rows, ``used`` of them claimed."""
+    vectors = np.empty((capacity, state.storage.vectors.shape[1]), dtype=np.float32)
+    vectors[:state.count] = state.vectors
+    zodiac_masks = {}
+    for zodiac in list(state.storage.zodiac_masks):
+        mask = np.zeros(capacity, dtype=bool)
+        mask[:state.count] = state.zodiac_mask(zodiac)
+        zodiac_masks[zodiac] = mask
+    return _Rows(vectors, zodiac_masks, used)
+
+
+def _set_zodiac(storage: _Rows, rows: List[int], zodiac: Optional[str], value: bool):
+    """Mark rows as having (or no longer having) a zodiac value in the storage's masks."""
+    mask = storage.zodiac_masks.get(zodiac)
+    if mask is None:
+        if not value:
+            return
+        mask = storage.zodiac_masks[zodiac] = np.zeros(storage.capacity, dtype=bool)
+    mask[rows] = value
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine top-k search over a small, in-memory corpus.
+
+    Embeddings are stored normalized in one contiguous float32 matrix, so
+    a query is a single matrix-vector product. Per-zodiac row masks are
+    precomputed when documents are added, which makes the zodiac filter
+    a boolean mask instead of a payload scan. Top-k uses ``argpartition``
+    and only sorts the k best rows.
+
+    Updates are copy-on-write: a writer builds the new state on the side
+    and swaps it in with one reference assignment, so searches running
+    concurrently always see a complete, consistent index without taking
+    a lock. Writers are serialized. The matrix keeps spare rows (its
+    capacity doubles when full): added documents are written into rows
+    no published state reads yet, so loading a corpus in chunks copies
+    the matrix O(log n) times rather than once per chunk. Replacing or
+    deleting documents copies it.
+    """
+
+    def __init__(self, dim: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim
+        self._write_lock = threading.Lock()
+        self._state = _build_state(np.empty((0, dim), dtype=np.float32), [], [])
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalized embedding matrix (read-only view of the current state)."""
+        return self._state.vectors
+
+    @property
+    def payloads(self) -> List[Dict]:
+        """Document payloads, one per row."""
+        return self._state.payloads
+
+    @property
+    def ids(self) -> List[str]:
+        """Document ids, one per row."""
+        return self._state.ids
+
+    @property
+    def count(self) -> int:
+        """Number of indexed documents."""
+        return len(self._state.payloads)
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """(id, payload) pairs of every document, from one consistent state."""
+        state = self._state
+        return list(zip(state.ids, state.payloads))
+
+    def copy(self) -> "NumpyVectorIndex":
+        """
+        Copy the index in constant time.
+
+        States are never modified in place, so the copy shares the current
+        one; later writes to either index leave the other untouched.
+        """
+        clone = NumpyVectorIndex(self.dim)
+        clone._state = self._state
+        return clone
+
+    def _prepare(self, vectors: np.ndarray, payloads: Sequence[Dict], normalized: bool) -> np.ndarray:
+        """Validate (and normalize) a batch of vectors for ``payloads``."""
+        vectors = np.atleast_2d(vectors) if normalized else normalize_rows(np.atleast_2d(vectors))
+        if vectors.shape[1] != self.dim or len(vectors) != len(payloads):
+            raise ValueError(
+                f"Expected {len(payloads)} vectors of dimension {self.dim}, got shape {vectors.shape}"
+            )
+        return vectors
+
+    def add(self, vectors: np.ndarray, payloads: Sequence[Dict], normalized: bool = False):
+        """
+        Add documents to the index under positional ids.
+
+        Args:
+            vectors: Embeddings of shape (n, dim)
+            payloads: One payload per embedding (must include "zodiac")
+            normalized: Vectors are already normalized float32; the first
+                batch is then used as-is (e.g. a shared memory map), not copied
+
+        Raises:
+            ValueError: If shapes do not match
+        """
+        with self._write_lock:
+            count = self.count
+            ids = [str(row) for row in range(count, count + len(payloads))]
+            self._upsert(ids, vectors, payloads, normalized)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict],
+        normalized: bool = False,
+    ):
+        """
+        Insert documents, replacing those whose id is already indexed.
+
+        Args:
+            ids: Unique document ids
+            vectors: Embeddings of shape (n, dim)
+            payloads: One payload per embedding (must include "zodiac")
+            normalized: Vectors are already normalized float32; a first
+                batch of only new ids is then used as-is, not copied
+
+        Raises:
+            ValueError: If shapes do not match
+        """
+        with self._write_lock:
+            self._upsert(ids, vectors, payloads, normalized)
+
+    def _upsert(self, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict], normalized: bool):
+        """Build the upserted state on the side and swap it in (write lock held)."""
+        vectors = self._prepare(vectors, payloads, normalized)
+        state = self._state
+        replaced = [(i, state.rows[doc_id]) for i, doc_id in enumerate(ids) if doc_id in state.rows]
+        added = [i for i, doc_id in enumerate(ids) if doc_id not in state.rows]
+
+        if not state.ids and len(added) == len(ids) and normalized and vectors.dtype == np.float32:
+            self._state = _build_state(vectors, list(payloads), list(ids))
+            return
+
+        count = state.count
+        new_count = count + len(added)
+        storage = state.storage
+        # Replaced rows are visible to older states, so they are written to
+        # a copy; additions go to free rows, growing the capacity geometrically
+        if replaced or not storage.claim(count, len(added)):
+            capacity = storage.capacity
+            if new_count > capacity:
+                capacity = max(new_count, 2 * capacity, MIN_CAPACITY)
+            storage = _copy_rows(state, capacity, new_count)
+
+        new_payloads = list(state.payloads)
+        new_ids = list(state.ids)
+        for i, row in replaced:
+            storage.vectors[row] = vectors[i]
+            _set_zodiac(storage, [row], new_payloads[row].get("zodiac"), False)
+            _set_zodiac(storage, [row], payloads[i].get("zodiac"), True)
+            new_payloads[row] = payloads[i]
+
+        if added:
+            storage.vectors[count:new_count] = vectors[added]
+            rows_by_zodiac: Dict[str, List[int]] = {}
+            for row, i in enumerate(added, count):
+                new_ids.append(ids[i])
+                new_payloads.append(payloads[i])
+                rows_by_zodiac.setdefault(payloads[i].get("zodiac"), []).append(row)
+            for zodiac, rows in rows_by_zodiac.items():
+                _set_zodiac(storage, rows, zodiac, True)
+
+        new_rows = dict(state.rows)
+        new_rows.update((ids[i], row) for row, i in enumerate(added, count))
+        self._state = _IndexState(storage, new_count, new_payloads, new_ids, new_rows)
+
+    def get(self, ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Look up the payloads of indexed documents.
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Payload per known id
+        """
+        state = self._state
+        return {doc_id: state.payloads[state.rows[doc_id]] for doc_id in ids if doc_id in state.rows}
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Remove documents by id; unknown ids are ignored.
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Number of documents removed
+        """
+        with self._write_lock:
+            state = self._state
+            rows = [state.rows[doc_id] for doc_id in set(ids) if doc_id in state.rows]
+            if not rows:
+                return 0
+
+            keep = np.ones(len(state.ids), dtype=bool)
+            keep[rows] = False
+            self._state = _build_state(
+                np.ascontiguousarray(state.vectors[keep]),
+                [payload for payload, kept in zip(state.payloads, keep) if kept],
+                [doc_id for doc_id, kept in zip(state.ids, keep) if kept],
+            )
+            return len(rows)
+
+    @staticmethod
+    def _mask(state: _IndexState, zodiac: Union[str, Sequence[str], None]) -> Optional[np.ndarray]:
+        if zodiac is None:
+            return None
+        mask = np.zeros(state.count, dtype=bool)
+        for value in [zodiac] if isinstance(zodiac, str) else zodiac:
+            value_mask = state.zodiac_mask(value)
+            if value_mask is not None:
+                mask |= value_mask
+        return mask
+
+    @staticmethod
+    def _top_k(
+        state: _IndexState,
+        scores: np.ndarray,
+        limit: int,
+        score_threshold: Optional[float],
+    ) -> List[Tuple[float, Dict]]:
+        """Select the best ``limit`` rows of one score vector."""
+        if limit <= 0 or scores.size == 0:
+            return []
+
+        if limit < scores.size:
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            candidates = np.arange(scores.size)
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for row in candidates:
+            score = float(scores[row])
+            if score == -np.inf or (score_threshold is not None and score < score_threshold):
+                break
+            results.append((score, state.payloads[row]))
+        return results
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 3,
+        zodiac: Union[str, Sequence[str], None] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Find the documents most similar to a query.
+
+        Args:
+            query_vector: Query embedding of shape (dim,)
+            limit: Maximum number of results
+            zodiac: Only match documents with this zodiac value, or one of
+                these values (optional)
+            score_threshold: Minimum cosine similarity (optional)
+
+        Returns:
+            List of (score, payload) tuples, best first
+        """
+        return self.search_batch(
+            np.asarray(query_vector)[None, :], limit, [zodiac], score_threshold
+        )[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        limit: int = 3,
+        zodiacs: Optional[Sequence[Union[str, Sequence[str], None]]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[Tuple[float, Dict]]]:
+        """
+        Search several queries with one matrix product.
+
+        Args:
+            query_vectors: Query embeddings of shape (n, dim)
+            limit: Maximum number of results per query
+            zodiacs: Zodiac filter per query (None entries match everything)
+            score_threshold: Minimum cosine similarity (optional)
+
+        Returns:
+            One list of (score, payload) tuples per query, best first
+        """
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        # Read the state once: a concurrent write swaps in a new one
+        state = self._state
+        if not state.ids:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ state.vectors.T
+        zodiacs = zodiacs if zodiacs is not None else [None] * len(queries)
+
+        results = []
+        for row_scores, zodiac in zip(scores, zodiacs):
+            mask = self._mask(state, zodiac)
+            if mask is not None:
+                row_scores = np.where(mask, row_scores, -np.inf)
+            results.append(self._top_k(state, row_scores, limit, score_threshold))
+        return results
+
+    def clear(self):
+        """Remove all documents."""
+        with self._write_lock:
+            self._state = _build_state(np.empty((0, self.dim), dtype=np.float32), [], [])
@@ -0,0 +1,341 @@
+"""
+Cosine similarity index split into per-zodiac NumPy partitions.
+"""
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import threading
+
+import numpy as np
+
+from .numpy_index import NumpyVectorIndex, normalize_rows
+
+GENERAL_PARTITION = "general"
+
+
+class PartitionedVectorIndex:
+    """
+    Exact cosine top-k search over per-zodiac ``NumpyVectorIndex`` partitions.
+
+    Each sign's documents live in their own partition; documents for groups
+    of signs (e.g. "Fire Signs") share the "general" partition. A query
+    filtered by zodiac only scores the partitions its filter values fall in,
+    which for a single sign is about 1/12 of the corpus, instead of scoring
+    every row and masking. Unfiltered queries search every partition and
+    merge. Partitions can be replaced or dropped one at a time.
+
+    Writers build the new partition map on the side (copying only the
+    partitions they touch) and swap it in with one assignment, so
+    concurrent searches see each update entirely or not at all.
+    """
+
+    def __init__(self, dim: int, partitions: Iterable[str]):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim: Embedding dimension
+            partitions: Zodiac values that get their own partition (the signs);
+                any other value goes to the general partition
+        """
+        self.dim = dim
+        self.partition_names = frozenset(partitions)
+        self._write_lock = threading.Lock()
+        # (partition key -> partition, document id -> partition key); replaced
+        # as a whole by writers, so searches read one consistent pair
+        self._state: Tuple[Dict[str, NumpyVectorIndex], Dict[str, str]] = ({}, {})
+
+    def partition_key(self, zodiac: Optional[str]) -> str:
+        """Partition holding documents with this zodiac value."""
+        return zodiac if zodiac in self.partition_names else GENERAL_PARTITION
+
+    @property
+    def count(self) -> int:
+        """Number of indexed documents."""
+        return sum(partition.count for partition in self._state[0].values())
+
+    @property
+    def ids(self) -> List[str]:
+        """Document ids, partition by partition."""
+        return [doc_id for doc_id, _ in self.items()]
+
+    @property
+    def payloads(self) -> List[Dict]:
+        """Document payloads, in the same order as ``ids``."""
+        return [payload for _, payload in self.items()]
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """(id, payload) pairs of every document, from one consistent state."""
+        return [item for partition in self._state[0].values() for item in partition.items()]
+
+    def partition_sizes(self) -> Dict[str, int]:
+        """Number of documents per partition."""
+        return {key: partition.count for key, partition in sorted(self._state[0].items())}
+
+    @contextmanager
+    def _writing(self):
+        """
+        Yield editable copies of the partition map and id lookup, then swap
+        them in with one assignment.
+
+        Partitions are copied (in constant time) before they are modified,
+        so searches still using the previous state are unaffected.
+        """
+        with self._write_lock:
+            partitions, partition_of = self._state
+            edit = _Edit(self.dim, dict(partitions), dict(partition_of))
+            yield edit
+            self._state = (edit.partitions, edit.partition_of)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict],
+        normalized: bool = False,
+    ):
+        """
+        Insert documents into their partitions, replacing those whose id is
+        already indexed (moving them if their zodiac changed).
+
+        Args:
+            ids: Unique document ids
+            vectors: Embeddings of shape (n, dim)
+            payloads: One payload per embedding (must include "zodiac")
+            normalized: Vectors are already normalized float32
+
+        Raises:
+            ValueError: If shapes do not match
+        """
+        vectors = np.atleast_2d(vectors)
+        if vectors.shape[1] != self.dim or len(vectors) != len(payloads) or len(ids) != len(payloads):
+            raise ValueError(
+                f"Expected {len(payloads)} ids and vectors of dimension {self.dim}, "
+                f"got {len(ids)} ids and shape {vectors.shape}"
+            )
+
+        with self._writing() as edit:
+            self._upsert(edit, ids, vectors, payloads, normalized)
+
+    def _upsert(self, edit: "_Edit", ids, vectors: np.ndarray, payloads, normalized: bool):
+        """Apply an upsert to an edit in progress."""
+        rows_by_partition: Dict[str, List[int]] = {}
+        for row, payload in enumerate(payloads):
+            rows_by_partition.setdefault(self.partition_key(payload.get("zodiac")), []).append(row)
+
+        moved = [
+            doc_id for key, rows in rows_by_partition.items() for doc_id in (ids[row] for row in rows)
+            if edit.partition_of.get(doc_id, key) != key
+        ]
+        edit.remove(moved)
+
+        for key, rows in rows_by_partition.items():
+            edit.partition(key).upsert(
+                [ids[row] for row in rows], vectors[rows], [payloads[row] for row in rows], normalized
+            )
+            for row in rows:
+                edit.partition_of[ids[row]] = key
+
+    def get(self, ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Look up the payloads of indexed documents.
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Payload per known id
+        """
+        partitions, partition_of = self._state
+        found = {}
+        for doc_id in ids:
+            key = partition_of.get(doc_id)
+            if key is not None:
+                found.update(partitions[key].get([doc_id]))
+        return found
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Remove documents by id; unknown ids are ignored.
+
+        Args:
+            ids: Document ids
+
+        Returns:
+            Number of documents removed
+        """
+        with self._writing() as edit:
+            return edit.remove(set(ids))
+
+    def load_partition(
+        self,
+        key: str,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict],
+        normalized: bool = False,
+    ):
+        """
+        Replace the contents of one partition, leaving the others untouched.
+
+        Searches see either the old or the new partition, never an empty
+        or half-loaded one.
+
+        Args:
+            key: Partition key (a sign, or "general")
+            ids: Document ids
+            vectors: Embeddings of shape (n, dim)
+            payloads: Payloads, all of which must belong to ``key``
+            normalized: Vectors are already normalized float32
+
+        Raises:
+            ValueError: If a payload belongs to another partition
+        """
+        for payload in payloads:
+            if self.partition_key(payload.get("zodiac")) != key:
+                raise ValueError(f"Document with zodiac {payload.get('zodiac')!r} does not belong to partition {key!r}")
+
+        with self._writing() as edit:
+            partition = edit.partitions.get(key)
+            if partition is not None:
+                edit.remove(list(partition.ids))
+            if len(payloads):
+                self._upsert(edit, ids, np.atleast_2d(vectors), payloads, normalized)
+
+    def drop_partition(self, key: str) -> int:
+        """
+        Remove every document of one partition.
+
+        Args:
+            key: Partition key (a sign, or "general")
+
+        Returns:
+            Number of documents removed
+        """
+        with self._writing() as edit:
+            partition = edit.partitions.get(key)
+            return edit.remove(list(partition.ids)) if partition is not None else 0
+
+    def _routes(
+        self, partitions: Dict[str, NumpyVectorIndex], zodiac: Union[str, Sequence[str], None]
+    ) -> List[Tuple[str, Optional[List[str]]]]:
+        """Partitions a zodiac filter touches, each with the filter to apply inside it."""
+        if zodiac is None:
+            return [(key, None) for key in partitions]
+
+        values = [zodiac] if isinstance(zodiac, str) else list(zodiac)
+        # Sign partitions hold a single zodiac value, so they need no filter
+        routes = {self.partition_key(value): None for value in values}
+        if GENERAL_PARTITION in routes:
+            routes[GENERAL_PARTITION] = [value for value in values if self.partition_key(value) == GENERAL_PARTITION]
+        return [(key, value_filter) for key, value_filter in routes.items() if key in partitions]
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 3,
+        zodiac: Union[str, Sequence[str], None] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Find the documents most similar to a query.
+
+        Args:
+            query_vector: Query embedding of shape (dim,)
+            limit: Maximum number of results
+            zodiac: Only match documents with this zodiac value, or one of
+                these values (optional)
+            score_threshold: Minimum cosine similarity (optional)
+
+        Returns:
+            List of (score, payload) tuples, best first
+        """
+        return self.search_batch(
+            np.asarray(query_vector)[None, :], limit, [zodiac], score_threshold
+        )[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        limit: int = 3,
+        zodiacs: Optional[Sequence[Union[str, Sequence[str], None]]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[Tuple[float, Dict]]]:
+        """
+        Search several queries, one matrix product per touched partition.
+
+        Args:
+            query_vectors: Query embeddings of shape (n, dim)
+            limit: Maximum number of results per query
+            zodiacs: Zodiac filter per query (None entries match everything)
+            score_threshold: Minimum cosine similarity (optional)
+
+        Returns:
+            One list of (score, payload) tuples per query, best first
+        """
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        zodiacs = zodiacs if zodiacs is not None else [None] * len(queries)
+        # Read the state once: a concurrent write swaps in a new one
+        partitions = self._state[0]
+
+        # Group queries by partition, so each partition runs one batched search
+        routed: Dict[str, Tuple[List[int], list]] = {}
+        route_counts = []
+        for row, zodiac in enumerate(zodiacs):
+            routes = self._routes(partitions, zodiac)
+            route_counts.append(len(routes))
+            for key, value_filter in routes:
+                rows, filters = routed.setdefault(key, ([], []))
+                rows.append(row)
+                filters.append(value_filter)
+
+        candidates: List[List[Tuple[float, Dict]]] = [[] for _ in range(len(queries))]
+        for key, (rows, filters) in routed.items():
+            hits = partitions[key].search_batch(queries[rows], limit, filters, score_threshold)
+            for row, partition_hits in zip(rows, hits):
+                candidates[row].extend(partition_hits)
+
+        return [
+            hits if routes <= 1 else sorted(hits, key=lambda hit: hit[0], reverse=True)[:limit]
+            for hits, routes in zip(candidates, route_counts)
+        ]
+
+    def clear(self):
+        """Remove all documents."""
+        with self._write_lock:
+            self._state = ({}, {})
+
+
+class _Edit:
+    """Editable copy of a PartitionedVectorIndex state, built by one writer."""
+
+    def __init__(self, dim: int, partitions: Dict[str, NumpyVectorIndex], partition_of: Dict[str, str]):
+        self.dim = dim
+        self.partitions = partitions
+        self.partition_of = partition_of
+        # Partitions already copied for this edit (safe to modify)
+        self._copied = set()
+
+    def partition(self, key: str) -> NumpyVectorIndex:
+        """Editable partition for ``key``, created if missing."""
+        if key not in self._copied:
+            partition = self.partitions.get(key)
+            self.partitions[key] = partition.copy() if partition is not None else NumpyVectorIndex(self.dim)
+            self._copied.add(key)
+        return self.partitions[key]
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Remove documents from whichever partitions hold them."""
+        by_partition: Dict[str, List[str]] = {}
+        for doc_id in ids:
+            key = self.partition_of.pop(doc_id, None)
+            if key is not None:
+                by_partition.setdefault(key, []).append(doc_id)
+
+        removed = 0
+        for key, doc_ids in by_partition.items():
+            partition = self.partition(key)
+            removed += partition.delete(doc_ids)
+            if partition.count == 0:
+                del self.partitions[key]
+                self._copied.discard(key)
+        return removed
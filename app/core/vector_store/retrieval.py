@@ -0,0 +1,398 @@
+"""
+Retrieval for the vector store: dense, keyword (BM25) and hybrid search.
+
+Hybrid mode takes candidates from both retrievers and merges them with
+reciprocal rank fusion.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.zodiac.traits import ZODIAC_TRAITS
+
+logger = logging.getLogger(__name__)
+
+# "dense": embeddings, "hybrid": embeddings fused with BM25, "sparse": BM25 only
+RETRIEVAL_MODES = ("dense", "hybrid", "sparse")
+
+
+def zodiac_filter_values(zodiac: str, include_groups: bool = False) -> List[str]:
+    """
+    Zodiac payload values a zodiac filter matches.
+    
+    Args:
+        zodiac: Zodiac sign
+        include_groups: Also match the sign's element and modality documents
+        
+    Returns:
+        The sign, followed by its group buckets when requested
+    """
+    traits = ZODIAC_TRAITS.get(zodiac) if include_groups else None
+    if not traits:
+        return [zodiac]
+    return [zodiac, f"{traits['element']} Signs", f"{traits['modality']} Signs"]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[tuple]], k: int = 60, limit: Optional[int] = None) -> List[tuple]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+    
+    A document scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (ranks start at 1), so only ranks matter: retrievers whose scores live
+    on different scales (cosine similarity, BM25) can be combined as-is.
+    
+    Args:
+        rankings: Ranked lists of (score, payload) tuples, best first
+        k: Damping constant; larger values flatten the weight of top ranks
+        limit: Maximum number of results (None for all)
+        
+    Returns:
+        List of (fused score, payload) tuples, best first
+    """
+    fused: Dict[str, list] = {}
+    for ranking in rankings:
+        for rank, (_, payload) in enumerate(ranking, 1):
+            entry = fused.setdefault(payload.get("doc_id") or payload["text"], [0.0, payload])
+            entry[0] += 1.0 / (k + rank)
+    
+    results = sorted(((score, payload) for score, payload in fused.values()), key=lambda hit: hit[0], reverse=True)
+    return results[:limit] if limit is not None else results
+
+
+class RetrievalMixin:
+    """
+    Search methods of ``VectorStoreService``.
+    
+    Runs the configured retrievers over the vector backend (NumPy index or
+    Qdrant) and the keyword index, and fuses their results in hybrid mode.
+    Relies on the clients, indexes, encoder and options set up by
+    ``VectorStoreService.__init__``.
+    """
+    
+    def search(
+        self,
+        query: str,
+        zodiac: Optional[str] = None,
+        top_k: int = 3,
+        score_threshold: float = 0.5,
+    ) -> List[Dict]:
+        """
+        Search for relevant astrological knowledge.
+        
+        Args:
+            query: Search query
+            zodiac: Filter by zodiac sign (optional)
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score of dense results (0-1)
+            
+        Returns:
+            List of relevant documents with scores (cosine similarity in
+            dense mode, fused rank score in hybrid mode, BM25 score in
+            sparse mode)
+        """
+        if not self.is_available():
+            logger.warning("Vector store not available")
+            return []
+        
+        try:
+            results = self._format_hits(self._search_hits([query], [zodiac], top_k, score_threshold)[0])
+            
+            logger.info(f"Found {len(results)} relevant documents for query: {query[:50]}...")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}", exc_info=True)
+            return []
+    
+    @staticmethod
+    def _format_hits(hits: List[tuple]) -> List[Dict]:
+        """Turn (score, payload) tuples into result dictionaries."""
+        return [
+            {
+                "text": payload["text"],
+                "zodiac": payload["zodiac"],
+                "category": payload["category"],
+                "score": score,
+            }
+            for score, payload in hits
+        ]
+    
+    def search_many(
+        self,
+        queries: Sequence[str],
+        zodiacs: Optional[Sequence[Optional[str]]] = None,
+        top_k: int = 3,
+        score_threshold: float = 0.5,
+    ) -> List[List[Dict]]:
+        """
+        Search several queries with one encoder batch and one backend round-trip.
+        
+        Args:
+            queries: Search queries
+            zodiacs: Zodiac filter per query (None entries, or None for all,
+                search without a filter)
+            top_k: Number of results per query
+            score_threshold: Minimum similarity score of dense results (0-1)
+            
+        Returns:
+            One list of relevant documents with scores per query, in order
+        """
+        if not self.is_available():
+            logger.warning("Vector store not available")
+            return [[] for _ in queries]
+        if not queries:
+            return []
+        
+        zodiacs = list(zodiacs) if zodiacs is not None else [None] * len(queries)
+        if len(zodiacs) != len(queries):
+            raise ValueError(f"Got {len(zodiacs)} zodiac filters for {len(queries)} queries")
+        
+        try:
+            batches = self._search_hits(queries, zodiacs, top_k, score_threshold)
+            results = [self._format_hits(hits) for hits in batches]
+            logger.info(f"Found {sum(map(len, results))} relevant documents for {len(queries)} queries")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}", exc_info=True)
+            return [[] for _ in queries]
+    
+    def _search_hits(
+        self,
+        queries: Sequence[str],
+        zodiacs: Sequence[Optional[str]],
+        top_k: int,
+        score_threshold: float,
+    ) -> List[List[tuple]]:
+        """Run the configured retrievers, returning (score, payload) tuples per query."""
+        if self.retrieval_mode == "sparse":
+            return self._sparse_hits(queries, zodiacs, top_k)
+        
+        # Query embeddings are memoized across requests
+        query_vectors = self._encode_queries(queries)
+        dense = self._dense_hits(query_vectors, zodiacs, self._candidate_limit(top_k), score_threshold)
+        return self._fuse(dense, queries, zodiacs, top_k)
+    
+    def _candidate_limit(self, top_k: int) -> int:
+        """Results to take from each retriever (more than ``top_k`` when fusing)."""
+        return top_k if self.retrieval_mode == "dense" else max(top_k, self.hybrid_candidates)
+    
+    def _dense_hits(
+        self,
+        query_vectors: np.ndarray,
+        zodiacs: Sequence[Optional[str]],
+        limit: int,
+        score_threshold: float,
+    ) -> List[List[tuple]]:
+        """Search the vector backend, returning (score, payload) tuples per query."""
+        if self.index is not None:
+            return self.index.search_batch(
+                query_vectors, limit, [self._filter_values(zodiac) for zodiac in zodiacs], score_threshold
+            )
+        if len(query_vectors) == 1:
+            return [self._qdrant_search(query_vectors[0], zodiacs[0], limit, score_threshold)]
+        return self._qdrant_search_batch(query_vectors, zodiacs, limit, score_threshold)
+    
+    def _sparse_hits(self, queries: Sequence[str], zodiacs: Sequence[Optional[str]], limit: int) -> List[List[tuple]]:
+        """Search the BM25 keyword index, returning (score, payload) tuples per query."""
+        return self.sparse_index.search_batch(queries, limit, [self._filter_values(zodiac) for zodiac in zodiacs])
+    
+    def _fuse(
+        self,
+        dense: List[List[tuple]],
+        queries: Sequence[str],
+        zodiacs: Sequence[Optional[str]],
+        top_k: int,
+    ) -> List[List[tuple]]:
+        """
+        Fuse dense hits with keyword hits by reciprocal rank (hybrid mode only).
+        
+        The score threshold only applies to dense candidates: a keyword match
+        is kept even when its embedding similarity is low.
+        """
+        if self.retrieval_mode != "hybrid":
+            return dense
+        sparse = self._sparse_hits(queries, zodiacs, self._candidate_limit(top_k))
+        return [
+            reciprocal_rank_fusion([dense_hits, sparse_hits], self.rrf_k, top_k)
+            for dense_hits, sparse_hits in zip(dense, sparse)
+        ]
+    
+    def _filter_values(self, zodiac: Optional[str]) -> Optional[List[str]]:
+        """Zodiac payload values a search for ``zodiac`` matches (None for no filter)."""
+        if not zodiac:
+            return None
+        return zodiac_filter_values(zodiac, self.zodiac_filter_groups)
+    
+    def _qdrant_filter(self, zodiac: Optional[str]):
+        """Build the Qdrant payload filter for a zodiac (None for no filter)."""
+        values = self._filter_values(zodiac)
+        if values is None:
+            return None
+        
+        from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue
+        
+        # A single required condition, served by the keyword index on "zodiac"
+        match = MatchValue(value=values[0]) if len(values) == 1 else MatchAny(any=values)
+        return Filter(must=[FieldCondition(key="zodiac", match=match)])
+    
+    def _qdrant_search(
+        self,
+        query_vector: np.ndarray,
+        zodiac: Optional[str],
+        top_k: int,
+        score_threshold: float,
+    ) -> List[tuple]:
+        """Search Qdrant, returning (score, payload) tuples."""
+        response = self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector.tolist(),
+            limit=top_k,
+            query_filter=self._qdrant_filter(zodiac),
+            search_params=self._search_params(),
+            score_threshold=score_threshold,
+            with_payload=True,
+        )
+        return [(hit.score, hit.payload) for hit in response.points]
+    
+    def _qdrant_search_batch(
+        self,
+        query_vectors: np.ndarray,
+        zodiacs: Sequence[Optional[str]],
+        top_k: int,
+        score_threshold: float,
+    ) -> List[List[tuple]]:
+        """Search Qdrant with one batch request, returning (score, payload) tuples per query."""
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._query_requests(query_vectors, zodiacs, top_k, score_threshold),
+        )
+        return [[(hit.score, hit.payload) for hit in response.points] for response in responses]
+    
+    def _query_requests(
+        self,
+        query_vectors: np.ndarray,
+        zodiacs: Sequence[Optional[str]],
+        top_k: int,
+        score_threshold: float,
+    ) -> list:
+        """Build one Qdrant query request per query."""
+        from qdrant_client.models import QueryRequest
+        
+        params = self._search_params()
+        return [
+            QueryRequest(
+                query=query_vector.tolist(),
+                filter=self._qdrant_filter(zodiac),
+                params=params,
+                limit=top_k,
+                score_threshold=score_threshold,
+                with_payload=True,
+            )
+            for query_vector, zodiac in zip(query_vectors, zodiacs)
+        ]
+    
+    def _get_async_client(self):
+        """Async Qdrant client for server mode (None otherwise), reused across calls."""
+        if self.async_client is None and self._client_options is not None:
+            from qdrant_client import AsyncQdrantClient
+            
+            self.async_client = AsyncQdrantClient(**self._client_options)
+        return self.async_client
+    
+    async def _asearch_hits(
+        self,
+        query_vectors: np.ndarray,
+        zodiacs: Sequence[Optional[str]],
+        top_k: int,
+        score_threshold: float,
+    ) -> List[List[tuple]]:
+        """Search the vector backend without blocking the event loop."""
+        if self.index is not None:
+            # In-process matrix product: cheaper than a thread hop
+            return self._dense_hits(query_vectors, zodiacs, top_k, score_threshold)
+        
+        client = self._get_async_client()
+        if client is None:
+            # In-memory Qdrant lives in this client only; run it in a worker thread
+            return await asyncio.to_thread(
+                self._qdrant_search_batch, query_vectors, zodiacs, top_k, score_threshold
+            )
+        
+        responses = await client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._query_requests(query_vectors, zodiacs, top_k, score_threshold),
+        )
+        return [[(hit.score, hit.payload) for hit in response.points] for response in responses]
+    
+    async def asearch_many(
+        self,
+        queries: Sequence[str],
+        zodiacs: Optional[Sequence[Optional[str]]] = None,
+        top_k: int = 3,
+        score_threshold: float = 0.5,
+    ) -> List[List[Dict]]:
+        """
+        Async version of ``search_many``.
+        
+        Query encoding runs in a worker thread; in server mode the search
+        is awaited on the async Qdrant client (gRPC when preferred).
+        
+        Args:
+            queries: Search queries
+            zodiacs: Zodiac filter per query (optional)
+            top_k: Number of results per query
+            score_threshold: Minimum similarity score of dense results (0-1)
+            
+        Returns:
+            One list of relevant documents with scores per query, in order
+        """
+        if not self.is_available():
+            logger.warning("Vector store not available")
+            return [[] for _ in queries]
+        if not queries:
+            return []
+        
+        zodiacs = list(zodiacs) if zodiacs is not None else [None] * len(queries)
+        if len(zodiacs) != len(queries):
+            raise ValueError(f"Got {len(zodiacs)} zodiac filters for {len(queries)} queries")
+        
+        try:
+            if self.retrieval_mode == "sparse":
+                # In-process keyword scoring: cheaper than a thread hop
+                batches = self._sparse_hits(queries, zodiacs, top_k)
+            else:
+                query_vectors = await asyncio.to_thread(self._encode_queries, queries)
+                dense = await self._asearch_hits(query_vectors, zodiacs, self._candidate_limit(top_k), score_threshold)
+                batches = self._fuse(dense, queries, zodiacs, top_k)
+            
+            results = [self._format_hits(hits) for hits in batches]
+            logger.info(f"Found {sum(map(len, results))} relevant documents for {len(queries)} queries")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}", exc_info=True)
+            return [[] for _ in queries]
+    
+    async def asearch(
+        self,
+        query: str,
+        zodiac: Optional[str] = None,
+        top_k: int = 3,
+        score_threshold: float = 0.5,
+    ) -> List[Dict]:
+        """
+        Async version of ``search``.
+        
+        Args:
+            query: Search query
+            zodiac: Filter by zodiac sign (optional)
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score of dense results (0-1)
+            
+        Returns:
+            List of relevant documents with scores
+        """
+        return (await self.asearch_many([query], [zodiac], top_k, score_threshold))[0]
@@ -1,22 +1,95 @@
 """
 Vector store service for semantic retrieval of astrological knowledge.
 
-Uses Qdrant for vector storage and sentence-transformers for embeddings.
+Uses Qdrant for vector storage and sentence-transformers models (on PyTorch
+or ONNX Runtime) for embeddings, optionally fused with (or replaced by) an
+in-process BM25 keyword index.
+
+Search lives in ``retrieval``, blue/green corpus versions in ``versioning``
+and the disk-mode writer/follower lifecycle in ``local_storage``.
 """
+import hashlib
 import json
 import logging
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Union
 from functools import lru_cache
 
+import numpy as np
+
+from app.core.llm.context import format_context
+from app.core.metrics import get_metrics
+from app.core.zodiac.traits import ZODIAC_TRAITS
+from .bm25_index import BM25Index
+from .embedding_cache import EmbeddingCache
+from .embedding_store import CorpusEmbeddingStore
+from .encoders import BaseEncoder, BatchingEncoder, create_encoder
+from .local_storage import LocalStorageMixin
+from .numpy_index import NumpyVectorIndex, normalize_rows
+from .partitioned_index import PartitionedVectorIndex
+from .retrieval import RETRIEVAL_MODES, RetrievalMixin
+from .versioning import CorpusVersioningMixin
+
 logger = logging.getLogger(__name__)
 
 
-class VectorStoreService:
+def document_hash(item: Dict) -> str:
+    """
+    Hash the indexed content of a corpus item.
+    
+    Args:
+        item: Corpus item
+        
+    Returns:
+        Hex digest over the item's text, zodiac and category
+    """
+    content = json.dumps(
+        {"text": item["text"], "zodiac": item["zodiac"], "category": item["category"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+# Prompts embedded for the semantic response cache; only needs to cover a
+# prompt's lookup and store within one request
+PROMPT_EMBEDDING_CACHE_SIZE = 256
+
+# Qdrant collection tuning; None keeps the Qdrant default
+DEFAULT_COLLECTION_OPTIONS = {
+    "payload_indexes": ("zodiac", "category"),  # keyword indexes (server mode)
+    "hnsw_m": None,
+    "hnsw_ef_construct": None,
+    "search_ef": None,  # HNSW ef at query time
+    "quantization": None,  # None or "int8" (scalar quantization)
+    "quantization_rescore": True,  # re-rank quantized candidates with the original vectors
+    "quantization_oversampling": None,  # fetch limit * oversampling quantized candidates
+    "on_disk": False,  # keep original vectors on disk (memory-mapped)
+}
+
+
+def point_id(doc_id: str) -> str:
+    """
+    Stable point id of a corpus document (Qdrant ids must be ints or UUIDs).
+    
+    Args:
+        doc_id: Corpus item "id"
+        
+    Returns:
+        UUID string derived from the document id
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"astrological-corpus/{doc_id}"))
+
+
+class VectorStoreService(RetrievalMixin, CorpusVersioningMixin, LocalStorageMixin):
     """
     Service for managing and querying astrological knowledge using vector embeddings.
     
-    Supports both in-memory and server-based Qdrant instances.
+    Supports in-memory and server-based Qdrant instances, and a pure-NumPy
+    index for small corpora that do not need Qdrant at all.
     """
     
     def __init__(
@@ -27,253 +100,913 @@ class VectorStoreService:
         qdrant_api_key: Optional[str] = None,
         embedding_model: str = "all-MiniLM-L6-v2",
         collection_name: str = "astrological_knowledge",
+        embedding_cache_size: int = 1024,
+        embedding_cache_path: Optional[str] = None,
+        context_cache_enabled: bool = True,
+        context_top_k: int = 3,
+        embedding_store_dir: Optional[str] = None,
+        embedding_backend: str = "torch",
+        encoder_options: Optional[dict] = None,
+        embedding_batching: Optional[dict] = None,
+        qdrant_prefer_grpc: bool = False,
+        qdrant_grpc_port: int = 6334,
+        qdrant_timeout: Optional[float] = None,
+        collection_options: Optional[dict] = None,
+        zodiac_filter_groups: bool = False,
+        retrieval_mode: str = "dense",
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+        partition_by_zodiac: bool = False,
+        versioned_collections: bool = False,
+        qdrant_path: Optional[str] = None,
+        follower_timeout: float = 60.0,
+        follower_refresh_interval: float = 5.0,
     ):
         """
         Initialize the vector store service.
         
         Args:
             enabled: Whether vector store is enabled
-            mode: "memory" for in-memory or "server" for remote Qdrant
+            mode: "memory" for in-memory Qdrant, "server" for remote Qdrant,
+                "disk" for embedded Qdrant persisted to ``qdrant_path``
+                or "numpy" for the in-process NumPy index
             qdrant_url: URL for Qdrant server (required if mode="server")
             qdrant_api_key: API key for Qdrant server
             embedding_model: Name of sentence-transformers model
             collection_name: Name of the vector collection
+            embedding_cache_size: Maximum cached query embeddings (0 disables the cache)
+            embedding_cache_path: Optional file to persist cached embeddings to
+            context_cache_enabled: Precompute per-sign context when the corpus loads
+            context_top_k: Passages per sign to precompute
+            embedding_store_dir: Directory of persisted corpus embeddings
+                (None re-encodes the corpus on every load)
+            embedding_backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime)
+            encoder_options: Extra options for the embedding backend
+            embedding_batching: ``BatchingEncoder`` options ("max_batch_size",
+                "max_wait_ms") to micro-batch concurrent encodes (None disables)
+            qdrant_prefer_grpc: Talk to the Qdrant server over gRPC (server mode)
+            qdrant_grpc_port: Qdrant server gRPC port
+            qdrant_timeout: Qdrant request timeout in seconds (None for the client default)
+            collection_options: Qdrant collection tuning (see ``DEFAULT_COLLECTION_OPTIONS``)
+            zodiac_filter_groups: Let a zodiac filter also match the sign's element
+                and modality documents (e.g. "Fire Signs", "Fixed Signs")
+            retrieval_mode: "dense" (embeddings), "hybrid" (embeddings fused with
+                BM25 keyword search) or "sparse" (BM25 only, no embedding model)
+            hybrid_candidates: Candidates taken from each retriever before fusion
+            rrf_k: Reciprocal rank fusion constant
+            partition_by_zodiac: Partition documents by zodiac sign, so a search
+                filtered to one sign only touches that sign's documents (and the
+                shared "general" partition when groups are matched)
+            versioned_collections: Load the corpus blue/green: build each corpus
+                version separately, validate it and swap it in atomically
+                (``collection_name`` becomes a Qdrant alias), keeping the
+                replaced version for rollback
+            qdrant_path: Storage directory of disk mode
+            follower_timeout: Seconds a read-only follower waits for the process
+                writing ``qdrant_path`` to finish loading the corpus (disk mode)
+            follower_refresh_interval: Seconds between a read-only follower's
+                checks for changes to the storage it follows (0 to never
+                refresh; disk mode)
         """
         self.enabled = enabled
         self.mode = mode
         self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.collection_options = {**DEFAULT_COLLECTION_OPTIONS, **(collection_options or {})}
+        self.zodiac_filter_groups = zodiac_filter_groups
+        self.retrieval_mode = retrieval_mode
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.partition_by_zodiac = partition_by_zodiac
+        self.versioned_collections = versioned_collections
+        self.qdrant_path = qdrant_path
+        self.follower_timeout = follower_timeout
+        # Disk mode: another process owns the storage; this one only reads a copy of it
+        self.read_only = False
+        self.follower_refresh_interval = follower_refresh_interval
+        self._follower_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._follower_copies: Optional[str] = None
+        # Storage version the follower serves, and the client it replaced
+        self._follower_version: Optional[str] = None
+        self._retired_follower: Optional[tuple] = None
+        self._follower_lock = threading.RLock()
+        self._follower_stop = threading.Event()
+        self._follower_thread: Optional[threading.Thread] = None
         self.client = None
-        self.encoder = None
+        # Server mode only: async client, created on first use and reused
+        self.async_client = None
+        self._client_options: Optional[dict] = None
+        self.index: Optional[Union[NumpyVectorIndex, PartitionedVectorIndex]] = None
+        # Keyword index for hybrid and sparse retrieval, built from the corpus at load
+        self.sparse_index: Optional[BM25Index] = None
+        self.encoder: Optional[BaseEncoder] = None
+        self.embedding_cache = None
+        self.prompt_embedding_cache = None
+        self.embedding_store = CorpusEmbeddingStore(embedding_store_dir) if embedding_store_dir else None
         self.initialized = False
+        self.context_cache_enabled = context_cache_enabled
+        self.context_top_k = context_top_k
+        # Hash of the loaded corpus; the context cache is only valid for this version
+        self.corpus_version: Optional[str] = None
+        # (zodiac, top_k) -> (passages, formatted context)
+        self._context_cache: Dict[tuple, tuple] = {}
+        # Versioned collections: the live corpus version and the one it replaced
+        self.active_version: Optional[str] = None
+        self._active_snapshot: Optional[Dict] = None
+        self._previous_snapshot: Optional[Dict] = None
+        self._publish_lock = threading.Lock()
+        self._publish_executor: Optional[ThreadPoolExecutor] = None
         
         if not enabled:
             logger.info("Vector store is disabled")
             return
         
         try:
-            # Import dependencies only if enabled
-            from qdrant_client import QdrantClient
-            from qdrant_client.models import Distance, VectorParams, PointStruct
-            from sentence_transformers import SentenceTransformer
+            if retrieval_mode not in RETRIEVAL_MODES:
+                raise ValueError(f"Invalid retrieval mode: {retrieval_mode}. Must be 'dense', 'hybrid' or 'sparse'")
+            if retrieval_mode != "dense":
+                self.sparse_index = BM25Index()
+            if retrieval_mode == "sparse":
+                # Keyword search only: no embedding model, no vector backend
+                logger.info("Initializing BM25 keyword index (sparse retrieval)")
+                self.initialized = True
+                return
             
-            # Store imports for later use
-            self.Distance = Distance
-            self.VectorParams = VectorParams
-            self.PointStruct = PointStruct
+            # Import dependencies only if enabled
+            if mode != "numpy":
+                from qdrant_client import QdrantClient
+                from qdrant_client.models import Distance, VectorParams, PointStruct, PointIdsList
+                
+                # Store imports for later use
+                self.Distance = Distance
+                self.VectorParams = VectorParams
+                self.PointStruct = PointStruct
+                self.PointIdsList = PointIdsList
             
             # Initialize embedding model
-            logger.info(f"Loading embedding model: {embedding_model}")
-            self.encoder = SentenceTransformer(embedding_model)
-            self.vector_size = self.encoder.get_sentence_embedding_dimension()
+            self.encoder = create_encoder(embedding_backend, embedding_model, **(encoder_options or {}))
+            if embedding_batching is not None:
+                self.encoder = BatchingEncoder(self.encoder, **embedding_batching)
+            self.vector_size = self.encoder.dimension
+            if embedding_cache_size > 0:
+                self.embedding_cache = EmbeddingCache(embedding_cache_size, embedding_cache_path)
+            self.prompt_embedding_cache = EmbeddingCache(
+                PROMPT_EMBEDDING_CACHE_SIZE, metric="prompt_embedding_cache_requests"
+            )
             
-            # Initialize Qdrant client
-            if mode == "memory":
+            # Initialize Qdrant client (or the NumPy index)
+            if mode == "numpy":
+                logger.info(
+                    "Initializing in-process NumPy vector index"
+                    + (", partitioned by zodiac sign" if partition_by_zodiac else "")
+                )
+                self.index = self._new_index()
+            elif mode == "memory":
                 logger.info("Initializing in-memory Qdrant client")
                 self.client = QdrantClient(":memory:")
+            elif mode == "disk":
+                if not qdrant_path:
+                    raise ValueError("qdrant_path is required for disk mode")
+                self._open_disk_client()
             elif mode == "server":
                 if not qdrant_url:
                     raise ValueError("qdrant_url is required for server mode")
                 logger.info(f"Connecting to Qdrant server: {qdrant_url}")
-                self.client = QdrantClient(
-                    url=qdrant_url,
-                    api_key=qdrant_api_key,
-                )
+                self._client_options = {
+                    "url": qdrant_url,
+                    "api_key": qdrant_api_key,
+                    "prefer_grpc": qdrant_prefer_grpc,
+                    "grpc_port": qdrant_grpc_port,
+                    "timeout": qdrant_timeout,
+                }
+                self.client = QdrantClient(**self._client_options)
             else:
-                raise ValueError(f"Invalid mode: {mode}. Must be 'memory' or 'server'")
+                raise ValueError(f"Invalid mode: {mode}. Must be 'memory', 'server', 'disk' or 'numpy'")
             
             self.initialized = True
             logger.info("Vector store service initialized successfully")
             
         except ImportError as e:
             logger.error(f"Failed to import required libraries: {e}")
-            logger.error("Install with: pip install qdrant-client sentence-transformers")
+            logger.error("Install with: pip install qdrant-client sentence-transformers (onnxruntime for the onnx backend)")
             self.enabled = False
         except Exception as e:
             logger.error(f"Error initializing vector store: {e}")
             self.enabled = False
     
+    def _new_index(self) -> Union[NumpyVectorIndex, PartitionedVectorIndex]:
+        """Empty in-process vector index of the configured layout."""
+        if self.partition_by_zodiac:
+            return PartitionedVectorIndex(self.vector_size, ZODIAC_TRAITS)
+        return NumpyVectorIndex(self.vector_size)
+    
     def is_available(self) -> bool:
         """Check if vector store is available and ready."""
-        return self.enabled and self.initialized and self.client is not None
+        return self.enabled and self.initialized and (
+            self.client is not None or self.index is not None or self.sparse_index is not None
+        )
     
     def _create_collection(self):
         """Create the vector collection if it doesn't exist."""
-        if not self.is_available():
+        if not self.is_available() or self.client is None:
             return
         
         try:
             # Check if collection exists
-            collections = self.client.get_collections().collections
-            collection_exists = any(c.name == self.collection_name for c in collections)
-            
-            if not collection_exists:
+            if not self._collection_exists():
                 logger.info(f"Creating collection: {self.collection_name}")
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=self.VectorParams(
-                        size=self.vector_size,
-                        distance=self.Distance.COSINE,
-                    ),
+                    **self._collection_config(),
                 )
                 logger.info(f"Collection '{self.collection_name}' created successfully")
             else:
                 logger.info(f"Collection '{self.collection_name}' already exists")
+            
+            self._create_payload_indexes()
                 
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             raise
     
+    def _collection_exists(self) -> bool:
+        """Whether ``collection_name`` exists as a collection or an alias."""
+        collections = self.client.get_collections().collections
+        return any(c.name == self.collection_name for c in collections) or self._alias_target() is not None
+    
+    def _collection_config(self) -> Dict:
+        """Vector, HNSW and quantization settings for ``create_collection``."""
+        from qdrant_client.models import HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+        
+        options = self.collection_options
+        config = {
+            "vectors_config": self.VectorParams(
+                size=self.vector_size,
+                distance=self.Distance.COSINE,
+                on_disk=options["on_disk"] or None,
+            ),
+        }
+        if options["hnsw_m"] is not None or options["hnsw_ef_construct"] is not None:
+            config["hnsw_config"] = HnswConfigDiff(m=options["hnsw_m"], ef_construct=options["hnsw_ef_construct"])
+        if options["quantization"] == "int8":
+            config["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True),
+            )
+        elif options["quantization"]:
+            raise ValueError(f"Invalid quantization: {options['quantization']}. Must be 'int8' or None")
+        return config
+    
+    def _create_payload_indexes(self, collection_name: Optional[str] = None):
+        """Create missing keyword indexes, so filtered searches use an index instead of a scan."""
+        if self._client_options is None:
+            # Local Qdrant ignores payload indexes: every search is an exact scan
+            return
+        
+        from qdrant_client.models import KeywordIndexParams, KeywordIndexType, PayloadSchemaType
+        
+        collection_name = collection_name or self.collection_name
+        existing = self.client.get_collection(collection_name).payload_schema or {}
+        for field in self.collection_options["payload_indexes"]:
+            if field not in existing:
+                logger.info(f"Creating keyword payload index on '{field}'")
+                field_schema = PayloadSchemaType.KEYWORD
+                if field == "zodiac" and self.partition_by_zodiac:
+                    # Tenant index: Qdrant stores each sign's points together and
+                    # serves a sign-filtered search from that sign's segment only
+                    field_schema = KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field,
+                    field_schema=field_schema,
+                    wait=True,
+                )
+    
+    def _search_params(self):
+        """Query-time HNSW and quantization parameters (None for Qdrant defaults)."""
+        options = self.collection_options
+        if options["search_ef"] is None and not options["quantization"]:
+            return None
+        
+        from qdrant_client.models import QuantizationSearchParams, SearchParams
+        
+        quantization = None
+        if options["quantization"]:
+            quantization = QuantizationSearchParams(
+                rescore=options["quantization_rescore"],
+                oversampling=options["quantization_oversampling"],
+            )
+        return SearchParams(hnsw_ef=options["search_ef"], quantization=quantization)
+    
+    def _document_count(self) -> int:
+        """Number of documents currently stored."""
+        if self.index is not None:
+            return self.index.count
+        return self.client.get_collection(self.collection_name).points_count
+    
+    @staticmethod
+    def _payload(item: Dict) -> Dict:
+        """Build the stored payload of a corpus item."""
+        return {
+            "doc_id": item["id"],
+            "zodiac": item["zodiac"],
+            "category": item["category"],
+            "text": item["text"],
+            "content_hash": document_hash(item),
+        }
+    
+    def _stored_hashes(self, ids: Optional[Sequence] = None) -> Dict:
+        """
+        Map stored point ids to their content hash (None for legacy points).
+        
+        Args:
+            ids: Only look up these point ids (default: every stored point)
+        """
+        if self.index is not None:
+            payloads = self.index.get(ids) if ids is not None else dict(self.index.items())
+            return {doc_id: payload.get("content_hash") for doc_id, payload in payloads.items()}
+        
+        if ids is not None:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(ids),
+                with_payload=["content_hash"],
+                with_vectors=False,
+            )
+            return {point.id: (point.payload or {}).get("content_hash") for point in points}
+        
+        hashes = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=256,
+                offset=offset,
+                with_payload=["content_hash"],
+                with_vectors=False,
+            )
+            for point in points:
+                hashes[point.id] = (point.payload or {}).get("content_hash")
+            if offset is None:
+                return hashes
+    
+    def _encode_documents(self, texts: List[str], batch_size: int = 32, pool: Optional[dict] = None) -> np.ndarray:
+        """Embed corpus texts into normalized float32 rows (across a process pool if given)."""
+        logger.info(f"Generating embeddings for {len(texts)} documents...")
+        return normalize_rows(self.encoder.encode(texts, batch_size=batch_size, pool=pool))
+    
+    def _corpus_embeddings(
+        self,
+        corpus_items: List[Dict],
+        content_hashes: List[str],
+        corpus_version: str,
+        rows: List[int],
+    ) -> np.ndarray:
+        """
+        Get normalized embeddings of some corpus rows, encoding as little as possible.
+        
+        With an embedding store, the full corpus artifact is memory-mapped
+        (or built, reusing the vectors of documents whose content hash is
+        unchanged since the previous artifact); otherwise only ``rows`` are
+        encoded.
+        
+        Args:
+            corpus_items: Corpus items
+            content_hashes: Content hash of each item
+            corpus_version: Corpus content hash
+            rows: Increasing corpus row indices to return embeddings for
+            
+        Returns:
+            Normalized float32 embeddings of ``rows`` (the shared memory map
+            itself when ``rows`` covers the whole persisted corpus)
+        """
+        if self.embedding_store is None:
+            return self._encode_documents([corpus_items[row]["text"] for row in rows])
+        
+        embeddings = self.embedding_store.load(
+            corpus_version, self.encoder.cache_key, self.vector_size, len(corpus_items)
+        )
+        if embeddings is None:
+            previous = self.embedding_store.load_previous(self.encoder.cache_key, self.vector_size)
+            if previous is None and len(rows) < len(corpus_items):
+                # Nothing to reuse, and the backend only needs the changed rows
+                return self._encode_documents([corpus_items[row]["text"] for row in rows])
+            embeddings = self._build_corpus_artifact(corpus_items, content_hashes, corpus_version, previous)
+        
+        return embeddings if len(rows) == len(corpus_items) else np.asarray(embeddings[rows])
+    
+    def _build_corpus_artifact(
+        self,
+        corpus_items: List[Dict],
+        content_hashes: List[str],
+        corpus_version: str,
+        previous: Optional[tuple],
+    ) -> np.ndarray:
+        """Assemble and persist the corpus artifact, encoding only unknown documents."""
+        known = {}
+        if previous is not None:
+            known = {content_hash: row for row, content_hash in enumerate(previous[1])}
+        
+        embeddings = np.empty((len(corpus_items), self.vector_size), dtype=np.float32)
+        missing = []
+        for row, content_hash in enumerate(content_hashes):
+            if content_hash in known:
+                embeddings[row] = previous[0][known[content_hash]]
+            else:
+                missing.append(row)
+        if missing:
+            embeddings[missing] = self._encode_documents([corpus_items[row]["text"] for row in missing])
+        logger.info(f"Reused {len(corpus_items) - len(missing)} stored corpus embeddings")
+        
+        try:
+            return self.embedding_store.save(
+                corpus_version, self.encoder.cache_key, self.vector_size, embeddings, content_hashes
+            )
+        except OSError as e:
+            logger.warning(f"Could not persist corpus embeddings: {e}")
+            return embeddings
+    
+    def _upload(self, corpus_items: List[Dict], embeddings: np.ndarray, collection_name: Optional[str] = None):
+        """Upsert corpus items and their (normalized) embeddings under stable ids."""
+        ids = [point_id(item["id"]) for item in corpus_items]
+        if self.index is not None:
+            self.index.upsert(ids, embeddings, [self._payload(item) for item in corpus_items], normalized=True)
+            return
+        
+        # Create points
+        points = []
+        for doc_id, item, embedding in zip(ids, corpus_items, embeddings):
+            point = self.PointStruct(
+                id=doc_id,
+                vector=embedding.tolist(),
+                payload=self._payload(item),
+            )
+            points.append(point)
+        
+        # Upload to Qdrant
+        logger.info(f"Uploading {len(points)} points to Qdrant...")
+        self.client.upsert(
+            collection_name=collection_name or self.collection_name,
+            points=points,
+        )
+    
+    def _delete(self, ids: Sequence):
+        """Delete stored points by id."""
+        if self.index is not None:
+            self.index.delete(ids)
+            return
+        
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=self.PointIdsList(points=list(ids)),
+        )
+    
+    @staticmethod
+    def _corpus_diff(stored: Dict, ids: List[str], content_hashes: List[str]) -> tuple:
+        """
+        Compare the corpus with stored content hashes.
+        
+        Returns:
+            Corpus rows to (re)index, stored ids to delete, and the change counts
+        """
+        corpus_ids = set(ids)
+        rows = [row for row, doc_id in enumerate(ids) if stored.get(doc_id) != content_hashes[row]]
+        removed = [doc_id for doc_id in stored if doc_id not in corpus_ids]
+        counts = {
+            "added": sum(ids[row] not in stored for row in rows),
+            "updated": sum(ids[row] in stored for row in rows),
+            "deleted": len(removed),
+            "unchanged": len(ids) - len(rows),
+        }
+        return rows, removed, counts
+    
+    @staticmethod
+    def _read_corpus(corpus_path: Optional[str] = None) -> Optional[tuple]:
+        """
+        Read and validate the corpus file.
+        
+        Args:
+            corpus_path: Path to corpus JSON file (default: the bundled corpus)
+            
+        Returns:
+            Corpus items, their point ids, their content hashes and the corpus
+            version, or None if the corpus is missing, empty or invalid
+        """
+        # Default corpus path
+        if corpus_path is None:
+            corpus_path = Path(__file__).parent.parent.parent / "data" / "astrological_corpus.json"
+        else:
+            corpus_path = Path(corpus_path)
+        
+        if not corpus_path.exists():
+            logger.error(f"Corpus file not found: {corpus_path}")
+            return None
+        
+        # Load corpus
+        logger.info(f"Loading corpus from: {corpus_path}")
+        raw = corpus_path.read_bytes()
+        data = json.loads(raw)
+        corpus_version = hashlib.sha256(raw).hexdigest()[:16]
+        
+        corpus_items = data.get("corpus", [])
+        if not corpus_items:
+            logger.warning("Empty corpus")
+            return None
+        
+        ids = [point_id(item["id"]) for item in corpus_items]
+        if len(set(ids)) != len(ids):
+            logger.error("Corpus contains duplicate document ids")
+            return None
+        content_hashes = [document_hash(item) for item in corpus_items]
+        return corpus_items, ids, content_hashes, corpus_version
+    
     def load_corpus(self, corpus_path: Optional[str] = None) -> bool:
         """
         Load astrological corpus into the vector store.
         
+        Synchronizes incrementally (see ``sync_corpus``), so a store that
+        already holds an older corpus picks up edits without a rebuild.
+        With versioned collections, the corpus is published as a new
+        version instead (see ``publish_corpus``).
+        
         Args:
             corpus_path: Path to corpus JSON file
             
         Returns:
             True if successful, False otherwise
         """
+        if self.versioned_collections:
+            return self.publish_corpus(corpus_path) is not None
+        return self.sync_corpus(corpus_path) is not None
+    
+    def sync_corpus(self, corpus_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """
+        Bring the stored documents in line with the corpus file.
+        
+        Documents are identified by their corpus "id" and compared by content
+        hash: only new or changed documents are embedded and upserted, and
+        stored documents no longer in the corpus are deleted.
+        
+        Args:
+            corpus_path: Path to corpus JSON file
+            
+        Returns:
+            Counts of "added", "updated", "deleted" and "unchanged" documents,
+            or None if the corpus could not be loaded
+        """
         if not self.is_available():
             logger.warning("Vector store not available, skipping corpus load")
-            return False
+            return None
         
         try:
-            # Default corpus path
-            if corpus_path is None:
-                corpus_path = Path(__file__).parent.parent.parent / "data" / "astrological_corpus.json"
-            else:
-                corpus_path = Path(corpus_path)
+            corpus = self._read_corpus(corpus_path)
+            if corpus is None:
+                return None
+            corpus_items, ids, content_hashes, corpus_version = corpus
             
-            if not corpus_path.exists():
-                logger.error(f"Corpus file not found: {corpus_path}")
-                return False
-            
-            # Load corpus
-            logger.info(f"Loading corpus from: {corpus_path}")
-            with open(corpus_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            corpus_items = data.get("corpus", [])
-            if not corpus_items:
-                logger.warning("Empty corpus")
-                return False
-            
-            # Create collection
-            self._create_collection()
+            counts = None
+            changed = False
+            if self.read_only:
+                # The writing process embeds and stores the corpus
+                counts = self._follow_writer(ids, content_hashes)
+                changed = True
+            elif self.encoder is not None:
+                # Create collection
+                self._create_collection()
+                
+                # Diff the corpus against what is stored
+                rows, removed, counts = self._corpus_diff(self._stored_hashes(), ids, content_hashes)
+                if rows:
+                    embeddings = self._corpus_embeddings(corpus_items, content_hashes, corpus_version, rows)
+                    self._upload([corpus_items[row] for row in rows], embeddings)
+                if removed:
+                    self._delete(removed)
+                changed = bool(rows or removed)
             
-            # Check if collection already has data
-            collection_info = self.client.get_collection(self.collection_name)
-            if collection_info.points_count > 0:
-                logger.info(f"Collection already has {collection_info.points_count} points, skipping load")
-                return True
+            if self.sparse_index is not None:
+                # The keyword index lives in this process, so it is diffed on its own
+                indexed = {
+                    doc_id: payload.get("content_hash")
+                    for doc_id, payload in zip(self.sparse_index.ids, self.sparse_index.payloads)
+                }
+                rows, removed, sparse_counts = self._corpus_diff(indexed, ids, content_hashes)
+                if rows:
+                    self.sparse_index.upsert(
+                        [ids[row] for row in rows],
+                        [corpus_items[row]["text"] for row in rows],
+                        [self._payload(corpus_items[row]) for row in rows],
+                    )
+                if removed:
+                    self.sparse_index.delete(removed)
+                counts = counts or sparse_counts
+                changed = changed or bool(rows or removed)
             
-            # Prepare texts and metadata
-            texts = [item["text"] for item in corpus_items]
+            if changed:
+                # Stored documents changed: the precomputed context is stale
+                self._context_cache = {}
             
-            # Generate embeddings in batches
-            logger.info(f"Generating embeddings for {len(texts)} documents...")
-            embeddings = self.encoder.encode(
-                texts,
-                show_progress_bar=False,
-                convert_to_numpy=True,
+            metrics = get_metrics()
+            for change, count in counts.items():
+                metrics.increment("corpus_sync_documents", count, change=change)
+            logger.info(
+                f"Synchronized corpus {corpus_version}: {counts['added']} added, {counts['updated']} updated, "
+                f"{counts['deleted']} deleted, {counts['unchanged']} unchanged"
             )
             
-            # Create points
-            points = []
-            for idx, (item, embedding) in enumerate(zip(corpus_items, embeddings)):
-                point = self.PointStruct(
-                    id=idx,
-                    vector=embedding.tolist(),
-                    payload={
-                        "doc_id": item["id"],
-                        "zodiac": item["zodiac"],
-                        "category": item["category"],
-                        "text": item["text"],
-                    },
-                )
-                points.append(point)
-            
-            # Upload to Qdrant
-            logger.info(f"Uploading {len(points)} points to Qdrant...")
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points,
-            )
-            
-            logger.info(f"Successfully loaded {len(points)} documents into vector store")
-            return True
+            self._refresh_context_cache(corpus_version)
+            return counts
             
         except Exception as e:
             logger.error(f"Error loading corpus: {e}", exc_info=True)
-            return False
+            return None
     
-    def search(
-        self,
-        query: str,
-        zodiac: Optional[str] = None,
-        top_k: int = 3,
-        score_threshold: float = 0.5,
-    ) -> List[Dict]:
+    # Incremental ingestion API (used by CorpusIngestor)
+    
+    def ensure_collection(self):
+        """Create the vector collection and its payload indexes if missing."""
+        self._create_collection()
+    
+    def changed_documents(self, corpus_items: List[Dict]) -> List[Dict]:
         """
-        Search for relevant astrological knowledge.
+        Select the corpus items that are new or differ from what is stored.
         
         Args:
-            query: Search query
-            zodiac: Filter by zodiac sign (optional)
-            top_k: Number of results to return
-            score_threshold: Minimum similarity score (0-1)
+            corpus_items: Corpus items with "id" and content fields
             
         Returns:
-            List of relevant documents with scores
+            Items whose stored content hash is missing or different
         """
-        if not self.is_available():
-            logger.warning("Vector store not available")
-            return []
+        stored = self._stored_hashes([point_id(item["id"]) for item in corpus_items])
+        return [item for item in corpus_items if stored.get(point_id(item["id"])) != document_hash(item)]
+    
+    def encode_documents(self, texts: List[str], batch_size: int = 32, pool: Optional[dict] = None) -> np.ndarray:
+        """
+        Embed corpus texts into normalized float32 rows.
         
-        try:
-            # Generate query embedding
-            query_vector = self.encoder.encode(query, convert_to_numpy=True).tolist()
+        Args:
+            texts: Document texts
+            batch_size: Texts per encoder forward pass
+            pool: Encoder process pool from ``encoder.start_pool`` (optional)
             
-            # Prepare filters
-            query_filter = None
-            if zodiac:
-                from qdrant_client.models import Filter, FieldCondition, MatchValue
-                
-                # Search for exact zodiac match or general guidance
-                query_filter = Filter(
-                    should=[
-                        FieldCondition(
-                            key="zodiac",
-                            match=MatchValue(value=zodiac),
-                        ),
-                    ]
-                )
+        Returns:
+            Normalized embeddings of shape (len(texts), vector_size)
+        """
+        return self._encode_documents(texts, batch_size=batch_size, pool=pool)
+    
+    def upsert_documents(self, corpus_items: List[Dict], embeddings: np.ndarray):
+        """
+        Insert or replace corpus items under their stable ids.
+        
+        Args:
+            corpus_items: Corpus items
+            embeddings: Their normalized embeddings, one row per item
+        """
+        self._upload(corpus_items, embeddings)
+        self.index_keywords(corpus_items)
+    
+    def index_keywords(self, corpus_items: List[Dict]) -> int:
+        """
+        Insert or replace corpus items in the keyword index (hybrid mode).
+        
+        The keyword index lives in this process, so it is diffed on its own:
+        items it already holds with the same content hash are skipped.
+        
+        Args:
+            corpus_items: Corpus items
             
-            # Search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k,
-                query_filter=query_filter,
-                score_threshold=score_threshold,
+        Returns:
+            Number of items (re)indexed (0 without a keyword index)
+        """
+        if self.sparse_index is None:
+            return 0
+        
+        ids = [point_id(item["id"]) for item in corpus_items]
+        indexed = self.sparse_index.get(ids)
+        rows = [
+            row for row, doc_id in enumerate(ids)
+            if indexed.get(doc_id, {}).get("content_hash") != document_hash(corpus_items[row])
+        ]
+        if rows:
+            self.sparse_index.upsert(
+                [ids[row] for row in rows],
+                [corpus_items[row]["text"] for row in rows],
+                [self._payload(corpus_items[row]) for row in rows],
             )
+        return len(rows)
+    
+    def finish_ingestion(self, corpus_version: str, changed: bool):
+        """
+        Bring the precomputed retrieval context up to date after ingestion.
+        
+        Args:
+            corpus_version: Hash of the ingested corpus
+            changed: Whether any stored document was added or updated
+        """
+        if changed:
+            # Stored documents changed: the precomputed context is stale
+            self._context_cache = {}
+        self._refresh_context_cache(corpus_version)
+    
+    def rebuild_partition(self, zodiac: str, corpus_path: Optional[str] = None) -> Optional[int]:
+        """
+        Reload one zodiac partition from the corpus, leaving the others untouched.
+        
+        Embeddings come from the embedding store when its artifact is current
+        (otherwise only the partition's documents are encoded). Only available
+        with the partitioned NumPy index.
+        
+        Args:
+            zodiac: Zodiac sign, or "general" for the documents of sign groups
+            corpus_path: Path to corpus JSON file
             
-            # Format results
-            results = []
-            for hit in search_results:
-                results.append({
-                    "text": hit.payload["text"],
-                    "zodiac": hit.payload["zodiac"],
-                    "category": hit.payload["category"],
-                    "score": hit.score,
-                })
+        Returns:
+            Number of documents in the rebuilt partition, or None if the
+            corpus could not be loaded
             
-            logger.info(f"Found {len(results)} relevant documents for query: {query[:50]}...")
-            return results
+        Raises:
+            RuntimeError: If the index is not partitioned by zodiac
+        """
+        if not isinstance(self.index, PartitionedVectorIndex):
+            raise RuntimeError("Partition rebuilds need mode='numpy' with partition_by_zodiac enabled")
+        
+        corpus = self._read_corpus(corpus_path)
+        if corpus is None:
+            return None
+        corpus_items, ids, content_hashes, corpus_version = corpus
+        
+        key = self.index.partition_key(zodiac)
+        rows = [row for row, item in enumerate(corpus_items) if self.index.partition_key(item["zodiac"]) == key]
+        embeddings = np.empty((0, self.vector_size), dtype=np.float32)
+        if rows:
+            embeddings = self._corpus_embeddings(corpus_items, content_hashes, corpus_version, rows)
+        self.index.load_partition(
+            key,
+            [ids[row] for row in rows],
+            embeddings,
+            [self._payload(corpus_items[row]) for row in rows],
+            normalized=True,
+        )
+        logger.info(f"Rebuilt zodiac partition '{key}' with {len(rows)} documents")
+        
+        # The partition may have changed: recompute the precomputed context
+        self._context_cache = {}
+        self.corpus_version = None
+        self._refresh_context_cache(corpus_version)
+        return len(rows)
+    
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Embed a single text, served from the embedding cache when enabled."""
+        if self.embedding_cache is None:
+            return self.encoder.encode(text)
+        return self.embedding_cache.get_or_compute(
+            self.encoder.cache_key,
+            text,
+            self.encoder.encode,
+        )
+    
+    def _encode_queries(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed several texts in one encoder batch, skipping cached and repeated texts."""
+        if self.embedding_cache is not None:
+            return np.stack(self.embedding_cache.get_or_compute_many(
+                self.encoder.cache_key,
+                texts,
+                self.encoder.encode,
+            ))
+        
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, self.encoder.encode(unique)))
+        return np.stack([vectors[text] for text in texts])
+    
+    def save_embedding_cache(self):
+        """Persist the embedding cache if it has a path."""
+        if self.embedding_cache is not None:
+            self.embedding_cache.save()
+    
+    def embed(self, text: str):
+        """
+        Embed a text with the loaded encoder.
+        
+        Used for whole prompts (semantic response cache). Prompts rarely
+        repeat across requests, so they get a small cache of their own,
+        enough to embed a prompt once for its lookup and store, instead of
+        evicting retrieval queries from the query embedding cache.
+        
+        Args:
+            text: Text to embed
             
-        except Exception as e:
-            logger.error(f"Error searching vector store: {e}", exc_info=True)
+        Returns:
+            Normalized embedding as a numpy array
+            
+        Raises:
+            RuntimeError: If the vector store is not available or has no
+                embedding model (sparse retrieval mode)
+        """
+        if not self.is_available():
+            raise RuntimeError("Vector store not available")
+        if self.encoder is None:
+            raise RuntimeError("Sparse retrieval mode has no embedding model")
+        
+        vector = self.prompt_embedding_cache.get_or_compute(
+            self.encoder.cache_key, text, self.encoder.encode
+        )
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _refresh_context_cache(self, corpus_version: str):
+        """
+        Precompute context for every sign, unless already built for this corpus.
+        
+        Args:
+            corpus_version: Hash of the loaded corpus
+        """
+        if not self.context_cache_enabled:
+            return
+        if corpus_version == self.corpus_version and self._context_cache:
+            return
+        
+        # Invalidate before searching so stale entries are never served
+        self._context_cache = {}
+        self.corpus_version = corpus_version
+        
+        self._context_cache = self._search_contexts(list(ZODIAC_TRAITS), self.context_top_k)
+        logger.info(f"Precomputed retrieval context for {len(self._context_cache)} signs (corpus {corpus_version})")
+    
+    @staticmethod
+    def _context_query(zodiac: str) -> str:
+        """Retrieval query for a sign."""
+        return f"Daily guidance and personality insights for {zodiac}"
+    
+    def _search_context(self, zodiac: str, top_k: int) -> List[Dict]:
+        """Run the retrieval query for a sign."""
+        return self.search(query=self._context_query(zodiac), zodiac=zodiac, top_k=top_k)
+    
+    def _search_contexts(self, zodiacs: List[str], top_k: int) -> Dict[tuple, tuple]:
+        """Run the retrieval queries of several signs as one batch, keyed like the context cache."""
+        batches = self.search_many([self._context_query(zodiac) for zodiac in zodiacs], zodiacs, top_k)
+        return {
+            (zodiac, top_k): (passages, format_context(passages))
+            for zodiac, passages in zip(zodiacs, batches)
+        }
+    
+    def prefetch_context(self, zodiacs: Sequence[str], top_k: int = 3):
+        """
+        Cache the context of several signs, searching the missing ones in one batch.
+        
+        Lets bulk callers (e.g. batch jobs) avoid one search per user when
+        ``(zodiac, top_k)`` is not precomputed.
+        
+        Args:
+            zodiacs: Zodiac signs
+            top_k: Number of context items per sign
+        """
+        if not self.is_available():
+            return
+        
+        missing = [zodiac for zodiac in dict.fromkeys(zodiacs) if (zodiac, top_k) not in self._context_cache]
+        if missing:
+            self._context_cache = {**self._context_cache, **self._search_contexts(missing, top_k)}
+    
+    def get_context_passages(self, zodiac: str, top_k: int = 3) -> List[Dict]:
+        """
+        Retrieve scored passages for generating an insight.
+        
+        Served from the per-sign context cache when it holds ``(zodiac, top_k)``,
+        otherwise searched.
+        
+        Args:
+            zodiac: User's zodiac sign
+            top_k: Number of context items to retrieve
+            
+        Returns:
+            List of relevant documents with scores, best first
+        """
+        if not self.is_available():
+            return []
+        
+        cached = self._context_cache.get((zodiac, top_k))
+        if cached is not None:
+            return [dict(passage) for passage in cached[0]]
+        
+        return self._search_context(zodiac, top_k)
+    
+    async def aget_context_passages(self, zodiac: str, top_k: int = 3) -> List[Dict]:
+        """
+        Async version of ``get_context_passages``.
+        
+        Args:
+            zodiac: User's zodiac sign
+            top_k: Number of context items to retrieve
+            
+        Returns:
+            List of relevant documents with scores, best first
+        """
+        if not self.is_available():
             return []
+        
+        cached = self._context_cache.get((zodiac, top_k))
+        if cached is not None:
+            return [dict(passage) for passage in cached[0]]
+        
+        return await self.asearch(query=self._context_query(zodiac), zodiac=zodiac, top_k=top_k)
     
     def get_context_for_insight(
         self,
@@ -294,61 +1027,62 @@ class VectorStoreService:
         Returns:
             Formatted context string
         """
-        if not self.is_available():
-            return ""
-        
-        # Create search query
-        query = f"Daily guidance and personality insights for {zodiac}"
-        
-        # Search for relevant context
-        results = self.search(query=query, zodiac=zodiac, top_k=top_k)
-        
-        if not results:
-            return ""
+        cached = self._context_cache.get((zodiac, top_k))
+        if cached is not None and self.is_available():
+            return cached[1]
         
-        # Format context
-        context_parts = ["Relevant Astrological Knowledge:"]
-        for i, result in enumerate(results, 1):
-            context_parts.append(f"\n{i}. {result['text']}")
-        
-        return "\n".join(context_parts)
+        return format_context(self.get_context_passages(zodiac=zodiac, top_k=top_k))
+    
+    async def aclose(self):
+        """Close the async Qdrant client, if one was opened, the embedded storage and the embedding batcher."""
+        if self._publish_executor is not None:
+            self._publish_executor.shutdown(wait=False, cancel_futures=True)
+        if self.mode == "disk":
+            self._close_local_storage()
+        if isinstance(self.encoder, BatchingEncoder):
+            self.encoder.close()
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
     
     def clear_collection(self):
         """Clear all data from the collection."""
         if not self.is_available():
             return
+        if self.read_only:
+            logger.warning("Read-only follower: not clearing the collection")
+            return
         
         try:
-            self.client.delete_collection(self.collection_name)
+            if self.sparse_index is not None:
+                self.sparse_index.clear()
+            if self.index is not None:
+                self.index.clear()
+            elif self.client is not None:
+                if self._alias_target() is not None:
+                    from qdrant_client.models import DeleteAlias, DeleteAliasOperation
+                    
+                    self.client.update_collection_aliases(change_aliases_operations=[
+                        DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name)),
+                    ])
+                    # With nothing live or kept, every version collection is stale
+                    self._active_snapshot = self._previous_snapshot = None
+                    self._drop_stale_versions()
+                else:
+                    self.client.delete_collection(self.collection_name)
+            self._active_snapshot = self._previous_snapshot = None
+            self.active_version = None
+            self._context_cache = {}
+            self.corpus_version = None
             logger.info(f"Collection '{self.collection_name}' cleared")
         except Exception as e:
             logger.error(f"Error clearing collection: {e}")
 
 
-# Singleton instance (cached)
 @lru_cache(maxsize=1)
-def get_vector_store_service(
-    enabled: bool = True,
-    mode: str = "memory",
-    qdrant_url: Optional[str] = None,
-    qdrant_api_key: Optional[str] = None,
-    embedding_model: str = "all-MiniLM-L6-v2",
-    collection_name: str = "astrological_knowledge",
-) -> VectorStoreService:
-    """
-    Get or create a singleton vector store service instance.
-    
-    Returns:
-        VectorStoreService instance
-    """
-    service = VectorStoreService(
-        enabled=enabled,
-        mode=mode,
-        qdrant_url=qdrant_url,
-        qdrant_api_key=qdrant_api_key,
-        embedding_model=embedding_model,
-        collection_name=collection_name,
-    )
+def _cached_vector_store_service(options_key: str) -> VectorStoreService:
+    """Build and load the service for one JSON-encoded set of options."""
+    service = VectorStoreService(**json.loads(options_key))
     
     # Auto-load corpus on initialization
     if service.is_available():
@@ -356,3 +1090,20 @@ def get_vector_store_service(
     
     return service
 
+
+def get_vector_store_service(**options) -> VectorStoreService:
+    """
+    Get or create a singleton vector store service instance.
+    
+    Options are passed through unchanged, so every constructor setting
+    (collection, encoder and batching options included) takes effect.
+    
+    Args:
+        **options: ``VectorStoreService`` keyword arguments, e.g.
+            ``Settings.get_vector_store_options()``
+    
+    Returns:
+        VectorStoreService instance
+    """
+    # Option dicts are not hashable; key the cache on their JSON form
+    return _cached_vector_store_service(json.dumps(options, sort_keys=True))
@@ -0,0 +1,362 @@
+"""
+Blue/green corpus versions for the vector store.
+
+Each corpus version is built next to the live one (its own Qdrant
+collection, or its own in-process index), validated, and swapped in by
+repointing the ``collection_name`` alias. The replaced version is kept
+for rollback.
+"""
+import copy
+import hashlib
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.core.metrics import get_metrics
+from app.core.zodiac.traits import ZODIAC_TRAITS
+from .bm25_index import BM25Index
+
+if TYPE_CHECKING:
+    from .vector_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusVersioningMixin:
+    """
+    Publish, adopt and roll back corpus versions of ``VectorStoreService``.
+    
+    Snapshots describe a version: its "version" id, "corpus_version",
+    Qdrant "collection" or NumPy "index", keyword "sparse_index" and
+    precomputed "context_cache". The live snapshot and the one it replaced
+    are kept; publishes and rollbacks are serialized by ``_publish_lock``.
+    """
+    
+    def _version_collection(self, version: str) -> str:
+        """Name of the Qdrant collection holding a corpus version."""
+        return f"{self.collection_name}__{version}"
+    
+    def _version_id(self, corpus_version: str) -> str:
+        """Version of a corpus as indexed by this encoder (a new model means a new version)."""
+        encoder_key = self.encoder.cache_key if self.encoder is not None else "bm25"
+        return hashlib.sha256(f"{corpus_version}/{encoder_key}".encode("utf-8")).hexdigest()[:16]
+    
+    def _alias_target(self) -> Optional[str]:
+        """Collection the ``collection_name`` alias points to (None if it is not an alias)."""
+        if self.client is None:
+            return None
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return None
+    
+    def _point_alias(self, collection_name: str):
+        """Atomically repoint the ``collection_name`` alias at a version collection."""
+        from qdrant_client.models import CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation
+        
+        operations = []
+        if self._alias_target() is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name)))
+        elif self.client.collection_exists(self.collection_name):
+            # One-time migration from an unversioned collection of the same name
+            logger.warning(f"Replacing unversioned collection '{self.collection_name}' with an alias")
+            self.client.delete_collection(self.collection_name)
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection_name, alias_name=self.collection_name),
+        ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+    
+    def _adopt_versions(self):
+        """Pick up the live and previous version collections left by another process."""
+        if self._active_snapshot is not None or self.client is None:
+            return
+        target = self._alias_target()
+        if target is None:
+            return
+        
+        prefix = f"{self.collection_name}__"
+        snapshots = {
+            c.name: {
+                "version": c.name[len(prefix):],
+                "corpus_version": None,
+                "collection": c.name,
+                "index": None,
+                "sparse_index": None,
+                "context_cache": None,
+            }
+            for c in self.client.get_collections().collections
+            if c.name.startswith(prefix)
+        }
+        self._active_snapshot = snapshots.pop(target, None)
+        if self._active_snapshot is not None:
+            self.active_version = self._active_snapshot["version"]
+        if len(snapshots) == 1:
+            # Only the live and the replaced version are kept
+            self._previous_snapshot = next(iter(snapshots.values()))
+    
+    def _build_version(self, corpus: tuple) -> Dict:
+        """
+        Index a corpus version next to the live one.
+        
+        Returns:
+            Snapshot of the version: its collection (Qdrant) or index (NumPy),
+            keyword index and, once validated, precomputed context
+        """
+        corpus_items, ids, content_hashes, corpus_version = corpus
+        version = self._version_id(corpus_version)
+        payloads = [self._payload(item) for item in corpus_items]
+        snapshot = {
+            "version": version,
+            "corpus_version": corpus_version,
+            "collection": None,
+            "index": None,
+            "sparse_index": None,
+            "context_cache": None,
+        }
+        
+        if self.encoder is not None:
+            embeddings = self._corpus_embeddings(
+                corpus_items, content_hashes, corpus_version, list(range(len(corpus_items)))
+            )
+            if self.index is not None:
+                snapshot["index"] = self._new_index()
+                snapshot["index"].upsert(ids, embeddings, payloads, normalized=True)
+            else:
+                snapshot["collection"] = self._version_collection(version)
+                if self.client.collection_exists(snapshot["collection"]):
+                    # Left over by an interrupted build
+                    self.client.delete_collection(snapshot["collection"])
+                self.client.create_collection(collection_name=snapshot["collection"], **self._collection_config())
+                self._create_payload_indexes(snapshot["collection"])
+                self._upload(corpus_items, embeddings, snapshot["collection"])
+        
+        if self.sparse_index is not None:
+            snapshot["sparse_index"] = BM25Index()
+            snapshot["sparse_index"].upsert(ids, [item["text"] for item in corpus_items], payloads)
+        return snapshot
+    
+    def _version_view(self, snapshot: Dict) -> "VectorStoreService":
+        """Shallow copy of this service that searches a (not yet live) version."""
+        view = copy.copy(self)
+        view.index = snapshot["index"]
+        view.sparse_index = snapshot["sparse_index"]
+        if snapshot["collection"] is not None:
+            view.collection_name = snapshot["collection"]
+        view._context_cache = {}
+        return view
+    
+    def _prepare_version(self, snapshot: Dict):
+        """Fill in the keyword index and context of a version adopted from Qdrant."""
+        if self.sparse_index is not None and snapshot["sparse_index"] is None:
+            ids, texts, payloads = [], [], []
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=snapshot["collection"],
+                    limit=256,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False,
+                )
+                for point in points:
+                    ids.append(point.id)
+                    texts.append(point.payload["text"])
+                    payloads.append(point.payload)
+                if offset is None:
+                    break
+            snapshot["sparse_index"] = BM25Index()
+            snapshot["sparse_index"].upsert(ids, texts, payloads)
+        if snapshot["context_cache"] is None:
+            snapshot["context_cache"] = {}
+            if self.context_cache_enabled:
+                snapshot["context_cache"] = self._version_view(snapshot)._search_contexts(
+                    list(ZODIAC_TRAITS), self.context_top_k
+                )
+    
+    def _validate_version(self, snapshot: Dict, corpus_items: List[Dict]) -> Optional[str]:
+        """
+        Check a built version before it goes live.
+        
+        Returns:
+            Reason the version is invalid, or None if it can be swapped in
+        """
+        view = self._version_view(snapshot)
+        if view.encoder is not None and view._document_count() != len(corpus_items):
+            return f"holds {view._document_count()} of {len(corpus_items)} documents"
+        if view.sparse_index is not None and len(view.sparse_index.ids) != len(corpus_items):
+            return f"keyword index holds {len(view.sparse_index.ids)} of {len(corpus_items)} documents"
+        
+        if view.encoder is not None:
+            # Every sign with documents must retrieve something
+            signs = sorted({item["zodiac"] for item in corpus_items} & set(ZODIAC_TRAITS))
+            hits = view.search_many(
+                [self._context_query(sign) for sign in signs], signs, top_k=1, score_threshold=0.0
+            )
+            empty = [sign for sign, sign_hits in zip(signs, hits) if not sign_hits]
+            if empty:
+                return f"no results for {', '.join(empty)}"
+        return None
+    
+    def _activate(self, snapshot: Dict):
+        """Make a version live; the version it replaces becomes the rollback target."""
+        self._prepare_version(snapshot)
+        if snapshot["collection"] is not None:
+            self._point_alias(snapshot["collection"])
+        # Plain attribute swaps: in-flight searches finish on the version they started on
+        self.index = snapshot["index"]
+        self.sparse_index = snapshot["sparse_index"]
+        self._context_cache = snapshot["context_cache"]
+        self.corpus_version = snapshot["corpus_version"]
+        self.active_version = snapshot["version"]
+        self._previous_snapshot, self._active_snapshot = self._active_snapshot, snapshot
+    
+    def _drop_stale_versions(self):
+        """Delete version collections other than the live and the previous one."""
+        if self.client is None:
+            return
+        keep = {
+            snapshot["collection"]
+            for snapshot in (self._active_snapshot, self._previous_snapshot)
+            if snapshot is not None
+        }
+        prefix = f"{self.collection_name}__"
+        for c in self.client.get_collections().collections:
+            if c.name.startswith(prefix) and c.name not in keep:
+                logger.info(f"Deleting old corpus version collection '{c.name}'")
+                self.client.delete_collection(c.name)
+    
+    def publish_corpus(self, corpus_path: Optional[str] = None) -> Optional[str]:
+        """
+        Build the corpus as a new version and swap it in atomically (blue/green).
+        
+        The live version keeps serving searches while the new one is built
+        in its own collection (or in-process index) and validated. The swap
+        then repoints the ``collection_name`` alias, so no search ever sees
+        an empty or partial corpus. The replaced version is kept for
+        ``rollback_corpus``; older versions are deleted.
+        
+        Args:
+            corpus_path: Path to corpus JSON file
+            
+        Returns:
+            Live version id, or None if the corpus could not be loaded or the
+            new version failed validation (the live version is kept)
+        """
+        if not self.is_available():
+            logger.warning("Vector store not available, skipping corpus publish")
+            return None
+        if self.read_only:
+            # Followers serve whatever version the writing process publishes
+            if self.sync_corpus(corpus_path) is None:
+                return None
+            self._active_snapshot = self._previous_snapshot = None
+            self._adopt_versions()
+            return self.active_version
+        
+        metrics = get_metrics()
+        with self._publish_lock:
+            snapshot = None
+            try:
+                corpus = self._read_corpus(corpus_path)
+                if corpus is None:
+                    return None
+                corpus_items, _, _, corpus_version = corpus
+                
+                self._adopt_versions()
+                version = self._version_id(corpus_version)
+                if self._active_snapshot is not None and self._active_snapshot["version"] == version:
+                    if self._active_snapshot["context_cache"] is None:
+                        # Adopted from Qdrant: build the in-process parts
+                        self._active_snapshot["corpus_version"] = corpus_version
+                        self._activate_adopted(self._active_snapshot)
+                    metrics.increment("corpus_publishes", result="unchanged")
+                    logger.info(f"Corpus version {version} is already live")
+                    return version
+                
+                start = time.perf_counter()
+                snapshot = self._build_version(corpus)
+                error = self._validate_version(snapshot, corpus_items)
+                if error is not None:
+                    logger.error(f"Corpus version {version} failed validation ({error}); keeping the live version")
+                    metrics.increment("corpus_publishes", result="invalid")
+                    self._discard(snapshot)
+                    return None
+                
+                self._activate(snapshot)
+                self._drop_stale_versions()
+                metrics.increment("corpus_publishes", result="published")
+                metrics.observe("corpus_publish_ms", (time.perf_counter() - start) * 1000)
+                logger.info(f"Published corpus version {version} (corpus {corpus_version}, {len(corpus_items)} documents)")
+                return version
+                
+            except Exception as e:
+                logger.error(f"Error publishing corpus: {e}", exc_info=True)
+                metrics.increment("corpus_publishes", result="failed")
+                if snapshot is not None and snapshot is not self._active_snapshot:
+                    self._discard(snapshot)
+                return None
+    
+    def _activate_adopted(self, snapshot: Dict):
+        """Serve an adopted live version from this process (the alias already points at it)."""
+        self._prepare_version(snapshot)
+        self.sparse_index = snapshot["sparse_index"]
+        self._context_cache = snapshot["context_cache"]
+        self.corpus_version = snapshot["corpus_version"]
+    
+    def _discard(self, snapshot: Dict):
+        """Delete the collection of a version that never went live."""
+        if snapshot["collection"] is not None and snapshot["collection"] != self._alias_target():
+            try:
+                self.client.delete_collection(snapshot["collection"])
+            except Exception as e:
+                logger.warning(f"Could not delete collection '{snapshot['collection']}': {e}")
+    
+    def publish_corpus_in_background(self, corpus_path: Optional[str] = None) -> Future:
+        """
+        Run ``publish_corpus`` on a background thread.
+        
+        Searches keep being served from the live version meanwhile.
+        
+        Args:
+            corpus_path: Path to corpus JSON file
+            
+        Returns:
+            Future of the live version id (None on failure)
+        """
+        if self._publish_executor is None:
+            self._publish_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="corpus-publisher")
+        return self._publish_executor.submit(self.publish_corpus, corpus_path)
+    
+    def rollback_corpus(self) -> Optional[str]:
+        """
+        Swap the previous corpus version back in.
+        
+        The version rolled back from becomes the previous version, so a
+        second rollback rolls forward again.
+        
+        Returns:
+            Live version id after the rollback, or None if there is no
+            previous version
+        """
+        if not self.is_available():
+            return None
+        if self.read_only:
+            logger.warning("Read-only follower: roll back from the process that owns the Qdrant storage")
+            return None
+        
+        with self._publish_lock:
+            try:
+                self._adopt_versions()
+                if self._previous_snapshot is None:
+                    logger.warning("No previous corpus version to roll back to")
+                    return None
+                
+                self._activate(self._previous_snapshot)
+                get_metrics().increment("corpus_rollbacks")
+                logger.info(f"Rolled back to corpus version {self.active_version}")
+                return self.active_version
+                
+            except Exception as e:
+                logger.error(f"Error rolling back corpus: {e}", exc_info=True)
+                return None
@@ -5,8 +5,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
+from app.api.dependencies import close_vector_store, save_vector_store_state
 from app.api.routes import router
 from app.config.settings import get_settings
+from app.core.llm.prompt_builder import precompute_static_prefixes
+from app.core.llm.providers.openai_provider import close_openai_providers
+from app.core.llm.usage import set_endpoint
 
 # Configure logging
 logging.basicConfig(
@@ -44,6 +48,12 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Label LLM usage metrics with the endpoint that triggered the call
+    @app.middleware("http")
+    async def endpoint_label(request, call_next):
+        set_endpoint(request.url.path)
+        return await call_next(request)
+
     # Include API routes
     app.include_router(router)
 
@@ -53,11 +63,17 @@ def create_app() -> FastAPI:
         logger.info(f"Starting {settings.app_name}")
         logger.info(f"LLM Provider: {settings.get_effective_provider()}")
         logger.info(f"Debug mode: {settings.debug}")
+        if settings.prompt_layout == "prefix":
+            count = precompute_static_prefixes((settings.insight_min_words, settings.insight_max_words))
+            logger.info(f"Precomputed {count} static prompt prefixes")
 
     # Shutdown event
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info(f"Shutting down {settings.app_name}")
+        save_vector_store_state()
+        await close_vector_store()
+        await close_openai_providers()
 
     # Root endpoint
     @app.get("/")
@@ -0,0 +1,268 @@
+"""
+Batch insight generation service for offline (e.g. nightly) runs.
+"""
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import logging
+import time
+
+from app.core.llm.batch import (
+    BATCH_ENDPOINT,
+    TERMINAL_STATUSES,
+    BaseBatchBackend,
+    extract_content,
+    extract_usage,
+    iter_jsonl,
+)
+from app.core.llm.usage import BATCH_PRICE_SCALE, record_usage
+from app.core.llm.providers.openai_provider import SYSTEM_PROMPT
+from app.core.zodiac.traits import ZODIAC_TRAITS
+from app.services.insight_service import InsightService
+from app.services.insight_store import InsightStore
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInsightService:
+    """
+    Generate insights for many users through a batch completion backend.
+
+    The pipeline is:
+    1. Build prompts with the regular InsightService preparation steps
+    2. Write them to a JSONL job file
+    3. Submit the job and poll until it finishes
+    4. Ingest results into the InsightStore
+    """
+
+    def __init__(
+        self,
+        insight_service: InsightService,
+        backend: BaseBatchBackend,
+        store: InsightStore,
+        work_dir: str = "batch_jobs",
+        model: str = "gpt-3.5-turbo",
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        poll_interval: float = 30.0,
+    ):
+        """
+        Initialize the batch insight service.
+
+        Args:
+            insight_service: Service used for validation, RAG and prompt building
+            backend: Batch completion backend
+            store: Store that receives generated insights
+            work_dir: Directory for job and result files
+            model: Model name written into each request body
+            max_tokens: Maximum tokens per completion
+            temperature: Sampling temperature
+            poll_interval: Seconds between status polls
+        """
+        self.insight_service = insight_service
+        self.backend = backend
+        self.store = store
+        self.work_dir = Path(work_dir)
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.poll_interval = poll_interval
+
+    def build_job_file(
+        self,
+        users: List[Dict],
+        job_path: Path,
+        current_date: Optional[date] = None,
+    ) -> Dict:
+        """
+        Write one chat completion request per user to a JSONL job file.
+
+        Each user dict needs "user_id", "name", "birth_date", "birth_time",
+        "birth_place" and optionally "language". A sidecar ``.meta.json`` file
+        keeps what is needed to turn results back into insight records.
+
+        Args:
+            users: List of user dictionaries
+            job_path: Path of the JSONL job file to write
+            current_date: Date the insights are for (defaults to today)
+
+        Returns:
+            Dictionary with "written" and "skipped" counts
+        """
+        current_date = current_date or date.today()
+        job_path = Path(job_path)
+        job_path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = {"date": current_date.isoformat(), "requests": {}}
+        written = skipped = 0
+
+        # One batched search for every sign instead of one per user
+        vector_store = self.insight_service.vector_store
+        if vector_store is not None and vector_store.is_available():
+            vector_store.prefetch_context(list(ZODIAC_TRAITS), vector_store.context_top_k)
+
+        with open(job_path, "w", encoding="utf-8") as f:
+            for user in users:
+                user_id = str(user.get("user_id", ""))
+                try:
+                    prepared = self.insight_service.prepare_prompt(
+                        name=user.get("name"),
+                        birth_date=user.get("birth_date"),
+                        birth_time=user.get("birth_time"),
+                        birth_place=user.get("birth_place"),
+                        language=user.get("language", "en"),
+                        current_date=current_date,
+                    )
+                except Exception as e:
+                    logger.warning(f"Skipping user '{user_id}': {e}")
+                    skipped += 1
+                    continue
+
+                custom_id = f"{user_id}:{current_date.isoformat()}:{prepared['language']}"
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": self.model,
+                        "messages": [
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prepared["prompt"]},
+                        ],
+                        "temperature": self.temperature,
+                        "max_tokens": self.max_tokens,
+                    },
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+                meta["requests"][custom_id] = {
+                    "user_id": user_id,
+                    "zodiac": prepared["zodiac"],
+                    "language": prepared["language"],
+                    "metadata": {
+                        "element": prepared["traits"]["element"],
+                        "ruling_planet": prepared["traits"]["ruling_planet"],
+                        "modality": prepared["traits"]["modality"],
+                    },
+                }
+                written += 1
+
+        with open(self._meta_path(job_path), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        logger.info(f"Wrote batch job file {job_path} ({written} requests, {skipped} skipped)")
+        return {"written": written, "skipped": skipped}
+
+    @staticmethod
+    def _meta_path(job_path: Path) -> Path:
+        return Path(job_path).with_suffix(".meta.json")
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Poll a job until it reaches a terminal status.
+
+        Args:
+            job_id: Backend job ID
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Final job status dictionary
+
+        Raises:
+            TimeoutError: If the job does not finish within the timeout
+        """
+        start = time.monotonic()
+        while True:
+            status = self.backend.poll(job_id)
+            counts = status.get("request_counts", {})
+            logger.info(
+                f"Batch job {job_id}: {status['status']} "
+                f"({counts.get('completed', 0)}/{counts.get('total', 0)} completed)"
+            )
+            if status["status"] in TERMINAL_STATUSES:
+                return status
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Batch job {job_id} did not finish within {timeout}s")
+            time.sleep(self.poll_interval)
+
+    def ingest(self, results_path: Path, job_path: Path) -> Dict:
+        """
+        Ingest a batch result file into the insight store.
+
+        Args:
+            results_path: Path to the downloaded result JSONL
+            job_path: Path to the job file the results belong to
+
+        Returns:
+            Dictionary with "ingested" and "failed" counts
+        """
+        with open(self._meta_path(job_path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        ingested = failed = 0
+        for result in iter_jsonl(Path(results_path)):
+            usage = extract_usage(result)
+            if usage is not None:
+                record_usage(usage, self.backend.name, endpoint="batch", price_scale=BATCH_PRICE_SCALE)
+
+            request_meta = meta["requests"].get(result.get("custom_id"))
+            content = extract_content(result)
+            if request_meta is None or content is None:
+                logger.warning(f"No usable result for request '{result.get('custom_id')}'")
+                failed += 1
+                continue
+
+            insight, language = self.insight_service.translate_insight(
+                content, request_meta["language"]
+            )
+            record = InsightService.format_response(
+                request_meta["zodiac"], request_meta["metadata"], insight, language
+            )
+            self.store.put(request_meta["user_id"], meta["date"], request_meta["language"], record)
+            ingested += 1
+
+        self.store.save()
+        logger.info(f"Ingested {ingested} insights ({failed} failed)")
+        return {"ingested": ingested, "failed": failed}
+
+    def run(
+        self,
+        users: List[Dict],
+        current_date: Optional[date] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """
+        Run the full pipeline: build, submit, wait and ingest.
+
+        Args:
+            users: List of user dictionaries
+            current_date: Date the insights are for (defaults to today)
+            timeout: Maximum seconds to wait for the job
+
+        Returns:
+            Summary dictionary with job ID, status and counts
+
+        Raises:
+            Exception: If the backend is unavailable or the job does not complete
+        """
+        if not self.backend.is_available():
+            raise Exception("Batch backend is not available")
+
+        current_date = current_date or date.today()
+        job_path = self.work_dir / f"insights_{current_date.isoformat()}.jsonl"
+        built = self.build_job_file(users, job_path, current_date)
+        if built["written"] == 0:
+            logger.warning("No valid requests to submit")
+            return {"job_id": None, "status": "empty", **built, "ingested": 0, "failed": 0}
+
+        job_id = self.backend.submit(job_path)
+        status = self.wait(job_id, timeout=timeout)
+        if status["status"] != "completed":
+            raise Exception(f"Batch job {job_id} ended with status '{status['status']}'")
+
+        results_path = job_path.with_suffix(".results.jsonl")
+        self.backend.download_results(job_id, results_path)
+        ingested = self.ingest(results_path, job_path)
+
+        return {"job_id": job_id, "status": status["status"], **built, **ingested}
@@ -2,17 +2,26 @@
 Main insight service orchestrator.
 """
 from datetime import date, datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import asyncio
 import logging
+import re
 
 from app.core.zodiac.calculator import ZodiacCalculator
 from app.core.llm.client import LLMClient
+from app.core.llm.providers.base_provider import RateLimitError
+from app.core.llm.semantic_cache import SemanticResponseCache
+from app.core.metrics import get_metrics
+from app.core.zodiac.traits import ZODIAC_TRAITS
 from app.core.translation.translator import get_translator
 from app.core.vector_store import VectorStoreService
 from app.services.validator_service import ValidatorService, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Stands in for the user's name in semantically cached prompts and insights
+NAME_PLACEHOLDER = "{name}"
+
 
 class InsightService:
     """
@@ -35,17 +44,29 @@ class InsightService:
         translation_enabled: bool = False,
         translation_mock: bool = False,
         vector_store_service: Optional[VectorStoreService] = None,
+        max_input_tokens: Optional[int] = None,
+        semantic_cache: Optional[SemanticResponseCache] = None,
+        provider_options: Optional[Dict] = None,
+        cassette_options: Optional[Dict] = None,
+        prompt_layout: str = "standard",
+        generation_options: Optional[Dict] = None,
     ):
         """
         Initialize the insight service.
         
         Args:
-            llm_provider: LLM provider name ("openai", "mock")
+            llm_provider: LLM provider name ("openai", "mock", "local")
             api_key: API key for LLM provider
             model: Model name
             translation_enabled: Whether translation is enabled
             translation_mock: Whether to use mock translation
             vector_store_service: Vector store service instance (optional)
+            max_input_tokens: Token budget for insight prompts (None for no limit)
+            semantic_cache: Semantic response cache (optional)
+            provider_options: Extra provider-specific options (e.g. local batching)
+            cassette_options: Record/replay cassette options (None to disable)
+            prompt_layout: Insight prompt layout ("standard" or "prefix")
+            generation_options: Insight length and early-stop options
         """
         self.validator = ValidatorService()
         self.zodiac_calculator = ZodiacCalculator()
@@ -53,23 +74,33 @@ class InsightService:
             provider_name=llm_provider,
             api_key=api_key,
             model=model,
+            max_input_tokens=max_input_tokens,
+            provider_options=provider_options,
+            cassette_options=cassette_options,
+            prompt_layout=prompt_layout,
+            generation_options=generation_options,
         )
         self.translator = get_translator(
             enabled=translation_enabled,
             mock=translation_mock,
         )
         self.vector_store = vector_store_service
+        self.semantic_cache = semantic_cache
 
-    def generate_insight(
+    def prepare_prompt(
         self,
         name: str,
         birth_date: str,
         birth_time: str,
         birth_place: str,
         language: str = "en",
+        current_date: Optional[date] = None,
     ) -> Dict:
         """
-        Generate a personalized astrological insight.
+        Validate inputs, resolve the zodiac sign and build the LLM prompt.
+        
+        This covers every step before the LLM call, so callers that submit
+        prompts elsewhere (e.g. batch jobs) share the same preparation logic.
         
         Args:
             name: User's name
@@ -77,16 +108,64 @@ class InsightService:
             birth_time: Birth time in HH:MM format
             birth_place: Birth place
             language: Preferred language code
+            current_date: Date the insight is for (defaults to today)
             
         Returns:
-            Dictionary containing insight and metadata
+            Dictionary with the prompt, its token count, validated name,
+            insight date, zodiac sign, traits and validated language
             
         Raises:
             ValidationError: If input validation fails
-            Exception: If insight generation fails
+            Exception: If zodiac calculation or prompt building fails
         """
-        logger.info(f"Generating insight for {name}")
+        user = self._resolve_user(name, birth_date, birth_time, birth_place, language)
+        context_passages = self._retrieve_context(user["zodiac"])
+        return self._build_prompt(user, context_passages, current_date)
 
+    async def aprepare_prompt(
+        self,
+        name: str,
+        birth_date: str,
+        birth_time: str,
+        birth_place: str,
+        language: str = "en",
+        current_date: Optional[date] = None,
+    ) -> Dict:
+        """
+        Async version of ``prepare_prompt``.
+        
+        Retrieval awaits the vector store's async path instead of blocking a
+        worker thread on the network; prompt building runs in a worker thread.
+        
+        Args:
+            name: User's name
+            birth_date: Birth date in YYYY-MM-DD format
+            birth_time: Birth time in HH:MM format
+            birth_place: Birth place
+            language: Preferred language code
+            current_date: Date the insight is for (defaults to today)
+            
+        Returns:
+            Dictionary with the prompt, its token count, validated name,
+            insight date, zodiac sign, traits and validated language
+            
+        Raises:
+            ValidationError: If input validation fails
+            Exception: If zodiac calculation or prompt building fails
+        """
+        user = self._resolve_user(name, birth_date, birth_time, birth_place, language)
+        context_passages = await self._aretrieve_context(user["zodiac"])
+        return await asyncio.to_thread(self._build_prompt, user, context_passages, current_date)
+
+    def _resolve_user(
+        self,
+        name: str,
+        birth_date: str,
+        birth_time: str,
+        birth_place: str,
+        language: str,
+    ) -> Dict:
+        """Validate inputs and resolve the zodiac sign and its traits."""
         # Step 1: Validate inputs
         try:
             validated_name, validated_date, validated_time, validated_place, validated_lang = (
@@ -109,61 +188,138 @@ class InsightService:
         # Step 3: Get zodiac traits
         try:
             traits = self.zodiac_calculator.get_traits(zodiac_sign)
-            trait_summary = self.zodiac_calculator.get_trait_summary(zodiac_sign)
         except Exception as e:
             logger.error(f"Error getting zodiac traits: {e}")
             raise Exception(f"Failed to get zodiac traits: {str(e)}")
 
-        # Step 4: Retrieve relevant context from vector store (RAG)
-        retrieved_context = ""
-        if self.vector_store and self.vector_store.is_available():
-            try:
-                retrieved_context = self.vector_store.get_context_for_insight(
-                    zodiac=zodiac_sign,
-                    name=validated_name,
-                    birth_place=validated_place,
-                    top_k=3,
-                )
-                if retrieved_context:
-                    logger.info("Retrieved context from vector store")
-            except Exception as e:
-                logger.warning(f"Vector store retrieval failed, continuing without context: {e}")
-        
-        # Step 5: Build prompt and generate insight
+        return {
+            "name": validated_name,
+            "birth_date": validated_date,
+            "zodiac": zodiac_sign,
+            "traits": traits,
+            "language": validated_lang,
+        }
+
+    def _retrieve_context(self, zodiac_sign: str) -> List[Dict]:
+        """Retrieve relevant context from the vector store (RAG)."""
+        if not (self.vector_store and self.vector_store.is_available()):
+            return []
+        try:
+            context_passages = self.vector_store.get_context_passages(
+                zodiac=zodiac_sign,
+                top_k=self.vector_store.context_top_k,
+            )
+        except Exception as e:
+            logger.warning(f"Vector store retrieval failed, continuing without context: {e}")
+            return []
+        if context_passages:
+            logger.info("Retrieved context from vector store")
+        return context_passages
+
+    async def _aretrieve_context(self, zodiac_sign: str) -> List[Dict]:
+        """Retrieve relevant context from the vector store without blocking the event loop."""
+        if not (self.vector_store and self.vector_store.is_available()):
+            return []
+        try:
+            context_passages = await self.vector_store.aget_context_passages(
+                zodiac=zodiac_sign,
+                top_k=self.vector_store.context_top_k,
+            )
+        except Exception as e:
+            logger.warning(f"Vector store retrieval failed, continuing without context: {e}")
+            return []
+        if context_passages:
+            logger.info("Retrieved context from vector store")
+        return context_passages
+
+    def _build_prompt(
+        self,
+        user: Dict,
+        context_passages: List[Dict],
+        current_date: Optional[date] = None,
+    ) -> Dict:
+        """Build the LLM prompt within the input token budget."""
+        validated_name = user["name"]
+        validated_date = user["birth_date"]
+        zodiac_sign = user["zodiac"]
+        traits = user["traits"]
+
+        # Step 5: Build prompt within the input token budget
         try:
             prompt_builder = self.llm_client.get_prompt_builder()
-            prompt = prompt_builder.build_insight_prompt(
+            assembled = prompt_builder.assemble_insight_prompt(
                 name=validated_name,
                 zodiac_sign=zodiac_sign,
                 traits=traits,
                 birth_date=validated_date,
-                current_date=date.today(),
-                additional_context=retrieved_context,
+                current_date=current_date or date.today(),
+                context_passages=context_passages,
             )
+            prompt = assembled["prompt"]
+            logger.debug(f"Generated prompt ({assembled['total_tokens']} tokens): {prompt}")
+        except Exception as e:
+            logger.error(f"Error building prompt: {e}")
+            raise Exception(f"Failed to build prompt: {str(e)}")
+
+        metrics = get_metrics()
+        metrics.observe("prompt_tokens", assembled["total_tokens"], section="total")
+        for section, tokens in assembled["token_counts"].items():
+            metrics.observe("prompt_tokens", tokens, section=section)
+        if assembled["dropped_passages"]:
+            metrics.increment("prompt_passages_dropped", assembled["dropped_passages"])
+
+        return {
+            "prompt": prompt,
+            "prompt_tokens": assembled["total_tokens"],
+            "name": validated_name,
+            "name_slots": assembled["name_slots"],
+            "date": (current_date or date.today()).isoformat(),
+            "zodiac": zodiac_sign,
+            "traits": traits,
+            "language": user["language"],
+        }
+
+    def translate_insight(self, insight: str, language: str) -> tuple[str, str]:
+        """
+        Translate an English insight into the requested language.
+        
+        Args:
+            insight: Generated insight text (English)
+            language: Validated target language code
             
-            logger.debug(f"Generated prompt: {prompt}")
-            
-            insight = self.llm_client.generate_insight(prompt)
-            logger.info("Successfully generated insight")
-            
+        Returns:
+            Tuple of (insight text, language actually used)
+        """
+        if language == "en":
+            return insight, language
+
+        try:
+            insight = self.translator.translate(insight, language)
+            logger.info(f"Translated insight to {language}")
         except Exception as e:
-            logger.error(f"Error generating insight: {e}")
-            raise Exception(f"Failed to generate insight: {str(e)}")
+            logger.warning(f"Translation failed, using English: {e}")
+            language = "en"
 
-        # Step 6: Translate if needed
-        if validated_lang != "en":
-            try:
-                insight = self.translator.translate(insight, validated_lang)
-                logger.info(f"Translated insight to {validated_lang}")
-            except Exception as e:
-                logger.warning(f"Translation failed, using English: {e}")
-                validated_lang = "en"
-
-        # Step 7: Format and return response
-        response = {
+        return insight, language
+
+    @staticmethod
+    def format_response(zodiac_sign: str, traits: Dict, insight: str, language: str) -> Dict:
+        """
+        Format the insight response payload.
+        
+        Args:
+            zodiac_sign: Zodiac sign
+            traits: Dictionary of zodiac traits
+            insight: Final insight text
+            language: Language of the insight
+            
+        Returns:
+            Dictionary containing insight and metadata
+        """
+        return {
             "zodiac": zodiac_sign,
             "insight": insight,
-            "language": validated_lang,
+            "language": language,
             "generated_at": datetime.now().isoformat(),
             "metadata": {
                 "element": traits["element"],
@@ -172,7 +328,183 @@ class InsightService:
             },
         }
 
-        return response
+    def generate_insight(
+        self,
+        name: str,
+        birth_date: str,
+        birth_time: str,
+        birth_place: str,
+        language: str = "en",
+    ) -> Dict:
+        """
+        Generate a personalized astrological insight.
+        
+        Args:
+            name: User's name
+            birth_date: Birth date in YYYY-MM-DD format
+            birth_time: Birth time in HH:MM format
+            birth_place: Birth place
+            language: Preferred language code
+            
+        Returns:
+            Dictionary containing insight and metadata
+            
+        Raises:
+            ValidationError: If input validation fails
+            RateLimitError: If the LLM provider is rate limiting requests
+            Exception: If insight generation fails
+        """
+        logger.info(f"Generating insight for {name}")
+
+        # Steps 1-5: Validate, calculate zodiac, retrieve context and build prompt
+        prepared = self.prepare_prompt(name, birth_date, birth_time, birth_place, language)
+
+        # Step 6: Serve from the semantic cache if a similar prompt was answered
+        cache_scope = self._cache_scope(prepared)
+        cached = self._cache_lookup(prepared, cache_scope)
+        if cached is not None:
+            return self.format_response(
+                prepared["zodiac"], prepared["traits"], cached, prepared["language"]
+            )
+
+        # Step 7: Generate insight
+        try:
+            insight = self.llm_client.generate_insight(prepared["prompt"])
+            logger.info("Successfully generated insight")
+        except RateLimitError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating insight: {e}")
+            raise Exception(f"Failed to generate insight: {str(e)}")
+
+        # Steps 8-9: Translate, cache and format
+        return self._finalize_insight(prepared, insight, cache_scope)
+
+    async def agenerate_insight(
+        self,
+        name: str,
+        birth_date: str,
+        birth_time: str,
+        birth_place: str,
+        language: str = "en",
+    ) -> Dict:
+        """
+        Generate a personalized astrological insight without blocking the event loop.
+        
+        Context retrieval is awaited on the vector store's async path, prompt
+        building runs in a worker thread and the LLM call uses the provider's
+        async path, so providers such as the local batching provider can
+        serve many concurrent requests.
+        
+        Args:
+            name: User's name
+            birth_date: Birth date in YYYY-MM-DD format
+            birth_time: Birth time in HH:MM format
+            birth_place: Birth place
+            language: Preferred language code
+            
+        Returns:
+            Dictionary containing insight and metadata
+            
+        Raises:
+            ValidationError: If input validation fails
+            RateLimitError: If the LLM provider is rate limiting requests
+            Exception: If insight generation fails
+        """
+        logger.info(f"Generating insight for {name}")
+
+        # Steps 1-5: Validate, calculate zodiac, retrieve context and build prompt
+        prepared = await self.aprepare_prompt(name, birth_date, birth_time, birth_place, language)
+
+        # Step 6: Serve from the semantic cache if a similar prompt was answered
+        cache_scope = self._cache_scope(prepared)
+        cached = await asyncio.to_thread(self._cache_lookup, prepared, cache_scope)
+        if cached is not None:
+            return self.format_response(
+                prepared["zodiac"], prepared["traits"], cached, prepared["language"]
+            )
+
+        # Step 7: Generate insight
+        try:
+            insight = await self.llm_client.agenerate_insight(prepared["prompt"])
+            logger.info("Successfully generated insight")
+        except RateLimitError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating insight: {e}")
+            raise Exception(f"Failed to generate insight: {str(e)}")
+
+        # Steps 8-9: Translate, cache and format
+        return await asyncio.to_thread(self._finalize_insight, prepared, insight, cache_scope)
+
+    def _finalize_insight(self, prepared: Dict, insight: str, cache_scope: tuple) -> Dict:
+        """Translate, cache and format a freshly generated insight."""
+        insight, language = self.translate_insight(insight, prepared["language"])
+        if language == prepared["language"]:
+            self._cache_store(prepared, insight, cache_scope)
+
+        return self.format_response(prepared["zodiac"], prepared["traits"], insight, language)
+
+    def _cache_scope(self, prepared: Dict) -> tuple:
+        """Semantic cache scope: only insights of the same sign, date, language and length are shared."""
+        return (
+            prepared["zodiac"],
+            prepared["date"],
+            prepared["language"],
+            self.llm_client.prompt_builder.word_range,
+        )
+
+    @staticmethod
+    def _name_pattern(name: str) -> "re.Pattern":
+        """Pattern matching the name as a whole word."""
+        return re.compile(rf"\b{re.escape(name)}\b")
+
+    def _is_cacheable(self, prepared: Dict) -> bool:
+        """
+        Check whether the name can be masked out of the prompt unambiguously.
+        
+        A name that is also a sign ("Leo") or that appears elsewhere in the
+        prompt would be masked there too, so those users skip the cache.
+        """
+        name = prepared["name"]
+        if name.lower() in {sign.lower() for sign in ZODIAC_TRAITS}:
+            return False
+        pattern = re.compile(self._name_pattern(name).pattern, re.IGNORECASE)
+        return len(pattern.findall(prepared["prompt"])) == prepared["name_slots"]
+
+    @classmethod
+    def _mask_name(cls, text: str, name: str) -> str:
+        """Replace whole-word occurrences of the user's name with a placeholder."""
+        return cls._name_pattern(name).sub(NAME_PLACEHOLDER, text)
+
+    def _cache_lookup(self, prepared: Dict, scope: tuple) -> Optional[str]:
+        """Look up a cached insight, re-personalized for this user."""
+        if self.semantic_cache is None or not self._is_cacheable(prepared):
+            return None
+
+        try:
+            cached = self.semantic_cache.lookup(
+                self._mask_name(prepared["prompt"], prepared["name"]), scope
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        return cached.replace(NAME_PLACEHOLDER, prepared["name"]) if cached else None
+
+    def _cache_store(self, prepared: Dict, insight: str, scope: tuple):
+        """Store a generated insight in the semantic cache."""
+        if self.semantic_cache is None or not self._is_cacheable(prepared):
+            return
+
+        try:
+            self.semantic_cache.store(
+                self._mask_name(prepared["prompt"], prepared["name"]),
+                self._mask_name(insight, prepared["name"]),
+                scope,
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
 
     def get_zodiac_info(self, birth_date: str) -> Dict:
         """
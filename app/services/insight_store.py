@@ -0,0 +1,82 @@
+"""
+Storage for pre-generated insights.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class InsightStore:
+    """
+    Key-value store of generated insights keyed by user, date and language.
+
+    Records are kept in memory and persisted to a JSON file when a path is
+    configured, so a nightly batch run can fill the store for the API to read.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the insight store.
+
+        Args:
+            path: Optional JSON file to load from and save to
+        """
+        self.path = Path(path) if path else None
+        self._records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._records = json.load(f)
+            logger.info(f"Loaded {len(self._records)} insights from {self.path}")
+
+    @staticmethod
+    def make_key(user_id: str, insight_date: str, language: str) -> str:
+        """Build the storage key for an insight."""
+        return f"{user_id}:{insight_date}:{language}"
+
+    def put(self, user_id: str, insight_date: str, language: str, record: Dict):
+        """
+        Store an insight record.
+
+        Args:
+            user_id: User identifier
+            insight_date: ISO date the insight is for
+            language: Language code of the insight
+            record: Insight response payload
+        """
+        with self._lock:
+            self._records[self.make_key(user_id, insight_date, language)] = record
+
+    def get(self, user_id: str, insight_date: str, language: str) -> Optional[Dict]:
+        """
+        Get a stored insight record.
+
+        Returns:
+            Insight record, or None if not present
+        """
+        with self._lock:
+            return self._records.get(self.make_key(user_id, insight_date, language))
+
+    def save(self):
+        """Persist all records to the configured file (no-op without a path)."""
+        if not self.path:
+            return
+
+        with self._lock:
+            snapshot = dict(self._records)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+        logger.info(f"Saved {len(snapshot)} insights to {self.path}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
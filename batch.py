@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script to pre-generate insights for many users through a batch backend.
+
+Usage:
+    python batch.py --users users.json
+
+Or with a specific backend and date:
+    python batch.py --users users.jsonl --backend openai --date 2024-11-01
+"""
+import argparse
+import json
+import logging
+from datetime import date
+from pathlib import Path
+
+from app.config.settings import get_settings
+from app.core.llm.batch import get_batch_backend, iter_jsonl
+from app.core.vector_store import VectorStoreService
+from app.services.batch_service import BatchInsightService
+from app.services.insight_service import InsightService
+from app.services.insight_store import InsightStore
+
+
+def load_users(path: Path) -> list[dict]:
+    """Load users from a JSON list or a JSONL file."""
+    if path.suffix == ".jsonl":
+        return list(iter_jsonl(path))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    """Run the batch generation pipeline."""
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Batch-generate astrological insights")
+    parser.add_argument("--users", type=Path, required=True, help="JSON or JSONL file of users")
+    parser.add_argument("--backend", type=str, default=settings.batch_backend, choices=["local", "openai"], help=f"Batch backend (default: {settings.batch_backend})")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="Date the insights are for (YYYY-MM-DD, default: today)")
+    parser.add_argument("--timeout", type=float, default=None, help="Maximum seconds to wait for the job")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level.upper(),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    vector_store = VectorStoreService(**settings.get_vector_store_options())
+    if vector_store.is_available():
+        vector_store.load_corpus()
+
+    # Prompts are only prepared locally, so the mock provider is sufficient here
+    insight_service = InsightService(
+        llm_provider="mock",
+        model=settings.openai_model,
+        translation_enabled=settings.translation_enabled,
+        translation_mock=settings.translation_mock,
+        vector_store_service=vector_store,
+        max_input_tokens=settings.llm_max_input_tokens,
+        prompt_layout=settings.prompt_layout,
+        generation_options=settings.get_generation_options(),
+    )
+
+    batch_service = BatchInsightService(
+        insight_service=insight_service,
+        backend=get_batch_backend(args.backend, settings.openai_api_key, settings.batch_work_dir),
+        store=InsightStore(settings.insight_store_path),
+        work_dir=settings.batch_work_dir,
+        model=settings.openai_model,
+        max_tokens=insight_service.llm_client.max_tokens,
+        temperature=settings.llm_temperature,
+        poll_interval=settings.batch_poll_interval,
+    )
+
+    summary = batch_service.run(load_users(args.users), current_date=args.date, timeout=args.timeout)
+    vector_store.save_embedding_cache()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
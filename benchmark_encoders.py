@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Compare embedding backends: cosine parity, throughput and memory.
+
+Each backend runs in a fresh subprocess, so import time and peak RSS are
+measured in isolation. The torch (sentence-transformers) backend is the
+reference; every other backend's embeddings are checked against it.
+Concurrent single-text throughput is measured with and without the
+micro-batching front-end (BatchingEncoder).
+
+Usage:
+    python benchmark_encoders.py
+
+Or with more texts and a stricter parity bar:
+    python benchmark_encoders.py --texts 2000 --min-cosine 0.995
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from app.config.settings import get_settings
+
+CORPUS_PATH = Path(__file__).parent / "app" / "data" / "astrological_corpus.json"
+
+# (label, backend, encoder options)
+VARIANTS = [
+    ("torch", "torch", {}),
+    ("onnx-fp32", "onnx", {"quantize": False}),
+    ("onnx-int8", "onnx", {"quantize": True}),
+]
+
+
+def load_texts(count: int) -> list:
+    """Corpus texts and retrieval queries, repeated up to ``count`` texts."""
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        texts = [item["text"] for item in json.load(f)["corpus"]]
+    texts += [f"Daily guidance and personality insights for {item}" for item in ("Aries", "Leo", "Pisces")]
+    return [texts[i % len(texts)] for i in range(max(count, len(texts)))]
+
+
+def concurrent_throughput(encoder, texts: list, concurrency: int) -> float:
+    """Single-text encodes per second, issued from ``concurrency`` threads."""
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(encoder.encode, texts[:concurrency]))  # warm-up
+        start = time.perf_counter()
+        list(executor.map(encoder.encode, texts))
+        return len(texts) / (time.perf_counter() - start)
+
+
+def run_worker(args):
+    """Embed the texts with one backend and report timings (subprocess entry point)."""
+    start = time.perf_counter()
+    from app.core.vector_store.encoders import BatchingEncoder, create_encoder
+    options = json.loads(args.options)
+    if args.backend == "onnx":
+        options.setdefault("export_dir", args.onnx_dir)
+    encoder = create_encoder(args.backend, args.model, **options)
+    load_seconds = time.perf_counter() - start
+    if args.prepare:
+        return
+
+    texts = load_texts(args.texts)
+    encoder.encode(texts[:args.batch_size], batch_size=args.batch_size)  # warm-up
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts, batch_size=args.batch_size)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts[:args.single]:
+        encoder.encode(text)
+    single_ms = (time.perf_counter() - start) * 1000 / max(args.single, 1)
+
+    concurrent_per_s = concurrent_throughput(encoder, texts, args.concurrency)
+    batching = BatchingEncoder(encoder, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+    batched_per_s = concurrent_throughput(batching, texts, args.concurrency)
+    batching.close()
+
+    np.save(args.output, embeddings)
+    print(json.dumps({
+        "load_s": load_seconds,
+        "texts_per_s": len(texts) / encode_seconds,
+        "single_ms": single_ms,
+        "concurrent_per_s": concurrent_per_s,
+        "batched_per_s": batched_per_s,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "torch_imported": "torch" in sys.modules,
+    }))
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    """Run every backend and print a comparison."""
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Benchmark torch vs ONNX embedding backends")
+    parser.add_argument("--model", type=str, default=settings.embedding_model, help=f"Embedding model (default: {settings.embedding_model})")
+    parser.add_argument("--texts", type=int, default=512, help="Texts to embed per backend (default: 512)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per forward pass (default: 32)")
+    parser.add_argument("--single", type=int, default=100, help="Timed single-text encodes (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Threads issuing single-text encodes (default: 16)")
+    parser.add_argument("--max-wait-ms", type=float, default=settings.embedding_max_wait_ms, help=f"Micro-batch max wait (default: {settings.embedding_max_wait_ms})")
+    parser.add_argument("--onnx-dir", type=str, default=settings.embedding_onnx_dir, help=f"ONNX graph directory (default: {settings.embedding_onnx_dir})")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail if any embedding's cosine to torch is below this (default: 0.99)")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--backend", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--options", type=str, default="{}", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, backend, options in VARIANTS:
+            output = str(Path(tmp) / f"{label}.npy")
+            command = [
+                sys.executable, __file__, "--worker", label, "--backend", backend,
+                "--options", json.dumps(options), "--output", output,
+                "--model", args.model, "--texts", str(args.texts), "--batch-size", str(args.batch_size),
+                "--single", str(args.single), "--onnx-dir", args.onnx_dir,
+                "--concurrency", str(args.concurrency), "--max-wait-ms", str(args.max_wait_ms),
+            ]
+            if backend == "onnx":
+                # Export/quantize once up front, so timings reflect steady-state loads
+                subprocess.run(command + ["--prepare"], capture_output=True)
+            proc = subprocess.run(command, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{label}: failed\n{proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ''}")
+                continue
+            results[label] = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[label]["embeddings"] = np.load(output)
+
+    print(f"Model: {args.model}, {args.texts} texts, batch size {args.batch_size}, {args.concurrency} threads\n")
+    print(
+        f"{'backend':<10} {'load':>8} {'texts/s':>9} {'single':>10} "
+        f"{'conc/s':>9} {'batched/s':>10} {'peak RSS':>10}  torch imported"
+    )
+    for label, result in results.items():
+        print(
+            f"{label:<10} {result['load_s']:7.2f}s {result['texts_per_s']:9.1f} {result['single_ms']:8.2f}ms "
+            f"{result['concurrent_per_s']:9.1f} {result['batched_per_s']:10.1f} "
+            f"{result['peak_rss_mib']:7.0f}MiB  {result['torch_imported']}"
+        )
+
+    reference = results.get("torch")
+    if reference is None:
+        print("\nNo torch reference, skipping parity")
+        return
+
+    # Parity: per-text cosine to the torch embedding, and query-document score drift
+    print(f"\n{'backend':<10} {'min cos':>9} {'mean cos':>9} {'max |Δscore|':>13}")
+    ref = reference["embeddings"]
+    ref_scores = ref @ ref.T
+    failed = False
+    for label, result in results.items():
+        if label == "torch":
+            continue
+        cosines = cosine_rows(result["embeddings"], ref)
+        drift = np.abs(result["embeddings"] @ result["embeddings"].T - ref_scores).max()
+        print(f"{label:<10} {cosines.min():9.5f} {cosines.mean():9.5f} {drift:13.5f}")
+        failed |= bool(cosines.min() < args.min_cosine)
+
+    if failed:
+        print(f"\nParity check failed: cosine below {args.min_cosine}")
+        sys.exit(1)
+    print(f"\nParity check passed (min cosine >= {args.min_cosine})")
+
+
+if __name__ == "__main__":
+    main()
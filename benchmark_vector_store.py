@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy vector index against Qdrant in-memory mode.
+
+Both backends index the same embeddings and answer the same queries, so
+the numbers isolate index overhead from the embedding model. The NumPy
+index is also timed partitioned by zodiac sign (one sub-index per sign).
+
+Usage:
+    python benchmark_vector_store.py
+
+Or with a larger synthetic corpus and more queries:
+    python benchmark_vector_store.py --docs 10000 --queries 500
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from app.config.settings import get_settings
+from app.core.vector_store.numpy_index import NumpyVectorIndex, normalize_rows
+from app.core.vector_store.partitioned_index import PartitionedVectorIndex
+from app.core.zodiac.traits import ZODIAC_TRAITS
+
+CORPUS_PATH = Path(__file__).parent / "app" / "data" / "astrological_corpus.json"
+
+
+def load_embeddings(model_name: str, docs: int, seed: int):
+    """Embed the bundled corpus, padding with noisy copies up to ``docs`` rows."""
+    from sentence_transformers import SentenceTransformer
+
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        items = json.load(f)["corpus"]
+
+    encoder = SentenceTransformer(model_name)
+    vectors = encoder.encode([item["text"] for item in items], convert_to_numpy=True)
+    payloads = [{"zodiac": item["zodiac"], "category": item["category"], "text": item["text"]} for item in items]
+
+    if docs > len(items):
+        rng = np.random.default_rng(seed)
+        rows = rng.integers(len(items), size=docs - len(items))
+        vectors = np.vstack([vectors, vectors[rows] + rng.normal(0, 0.05, (len(rows), vectors.shape[1]))])
+        payloads.extend(dict(payloads[row]) for row in rows)
+    docs = docs or len(items)
+
+    queries = encoder.encode(
+        [f"Daily guidance and personality insights for {zodiac}" for zodiac in ZODIAC_TRAITS],
+        convert_to_numpy=True,
+    )
+    return normalize_rows(vectors[:docs]), payloads[:docs], normalize_rows(queries), list(ZODIAC_TRAITS)
+
+
+def timed(fn, repeat: int) -> list:
+    """Run ``fn`` ``repeat`` times, returning per-call latencies in ms."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies: list) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):8.3f} ms   p99 {p99:8.3f} ms"
+
+
+def build_numpy(vectors, payloads):
+    index = NumpyVectorIndex(vectors.shape[1])
+    index.add(vectors, payloads)
+    return index
+
+
+def build_partitioned(vectors, payloads):
+    index = PartitionedVectorIndex(vectors.shape[1], ZODIAC_TRAITS)
+    index.upsert([str(i) for i in range(len(payloads))], vectors, payloads, normalized=True)
+    return index
+
+
+def build_qdrant(vectors, payloads):
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+
+    client = QdrantClient(":memory:")
+    client.create_collection("bench", vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+    client.upsert(
+        "bench",
+        points=[PointStruct(id=i, vector=v.tolist(), payload=p) for i, (v, p) in enumerate(zip(vectors, payloads))],
+    )
+    return client
+
+
+def main():
+    """Run the benchmark and print a comparison."""
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Benchmark NumPy vs Qdrant in-memory vector search")
+    parser.add_argument("--model", type=str, default=settings.embedding_model, help=f"Embedding model (default: {settings.embedding_model})")
+    parser.add_argument("--docs", type=int, default=0, help="Corpus size; pads the bundled corpus with noisy copies (default: bundled size)")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per backend (default: 200)")
+    parser.add_argument("--top-k", type=int, default=3, help="Results per query (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic documents")
+    args = parser.parse_args()
+
+    vectors, payloads, queries, zodiacs = load_embeddings(args.model, args.docs, args.seed)
+    print(f"Corpus: {len(payloads)} documents, dim {vectors.shape[1]}, {args.queries} queries, top_k {args.top_k}\n")
+
+    # Import + build time and memory
+    start = time.perf_counter()
+    tracemalloc.start()
+    index = build_numpy(vectors, payloads)
+    numpy_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    numpy_build = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    tracemalloc.start()
+    client = build_qdrant(vectors, payloads)
+    qdrant_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    qdrant_build = (time.perf_counter() - start) * 1000
+
+    print(f"{'build (incl. import)':<24} numpy {numpy_build:9.1f} ms   qdrant {qdrant_build:9.1f} ms")
+    print(f"{'peak build memory':<24} numpy {numpy_memory / 1024:9.1f} KiB  qdrant {qdrant_memory / 1024:9.1f} KiB\n")
+
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    def qdrant_query(i):
+        return client.query_points(
+            "bench",
+            query=queries[i % len(queries)].tolist(),
+            limit=args.top_k,
+            query_filter=Filter(must=[FieldCondition(key="zodiac", match=MatchValue(value=zodiacs[i % len(zodiacs)]))]),
+        ).points
+
+    def numpy_query(i):
+        return index.search(queries[i % len(queries)], args.top_k, zodiacs[i % len(zodiacs)])
+
+    partitioned = build_partitioned(vectors, payloads)
+
+    def partitioned_query(i):
+        return partitioned.search(queries[i % len(queries)], args.top_k, zodiacs[i % len(zodiacs)])
+
+    counter = iter(range(sys.maxsize))
+    numpy_single = timed(lambda: numpy_query(next(counter)), args.queries)
+    counter = iter(range(sys.maxsize))
+    partitioned_single = timed(lambda: partitioned_query(next(counter)), args.queries)
+    counter = iter(range(sys.maxsize))
+    qdrant_single = timed(lambda: qdrant_query(next(counter)), args.queries)
+    numpy_batch = timed(lambda: index.search_batch(queries, args.top_k, zodiacs), max(1, args.queries // len(queries)))
+    partitioned_batch = timed(
+        lambda: partitioned.search_batch(queries, args.top_k, zodiacs), max(1, args.queries // len(queries))
+    )
+
+    print(f"{'single query':<16} numpy       {summarize(numpy_single)}")
+    print(f"{'single query':<16} partitioned {summarize(partitioned_single)}")
+    print(f"{'single query':<16} qdrant      {summarize(qdrant_single)}")
+    print(f"{'batch of ' + str(len(queries)):<16} numpy       {summarize(numpy_batch)}")
+    print(f"{'batch of ' + str(len(queries)):<16} partitioned {summarize(partitioned_batch)}")
+
+    # Result parity: both backends must return the same documents
+    mismatches = 0
+    for i in range(len(queries)):
+        numpy_texts = [payload["text"] for _, payload in numpy_query(i)]
+        partitioned_texts = [payload["text"] for _, payload in partitioned_query(i)]
+        qdrant_texts = [hit.payload["text"] for hit in qdrant_query(i)]
+        mismatches += numpy_texts != qdrant_texts or partitioned_texts != numpy_texts
+    print(f"\nTop-{args.top_k} parity: {len(queries) - mismatches}/{len(queries)} queries identical")
+
+
+if __name__ == "__main__":
+    main()
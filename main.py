@@ -11,6 +11,7 @@ from datetime import date
 from app.services.insight_service import InsightService
 from app.services.validator_service import ValidationError
 from app.config.settings import get_settings
+from app.core.llm.usage import set_endpoint
 
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -47,7 +48,7 @@ Examples:
     
     # Optional
     parser.add_argument("--language", type=str, default="en", choices=["en", "hi"], help="Output language (default: en)")
-    parser.add_argument("--provider", type=str, default=None, choices=["openai", "mock"], help="LLM provider (default: from config)")
+    parser.add_argument("--provider", type=str, default=None, choices=["openai", "mock", "local"], help="LLM provider (default: from config)")
     parser.add_argument("--zodiac-only", action="store_true", help="Only show zodiac information, don't generate insight")
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
@@ -111,6 +112,7 @@ def main():
 
     # Get settings
     settings = get_settings()
+    set_endpoint("cli")
     
     # Override provider if specified
     provider = args.provider or settings.get_effective_provider()
@@ -123,9 +125,13 @@ def main():
         insight_service = InsightService(
             llm_provider=provider,
             api_key=settings.openai_api_key if provider == "openai" else None,
-            model=settings.openai_model,
+            model=settings.get_model(provider),
             translation_enabled=settings.translation_enabled,
             translation_mock=settings.translation_mock,
+            provider_options=settings.get_provider_options(provider),
+            cassette_options=settings.get_cassette_options(),
+            prompt_layout=settings.prompt_layout,
+            generation_options=settings.get_generation_options(),
         )
     except Exception as e:
         print_colored(f"Error initializing service: {e}", "red")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script to run the shared embedding server.
+
+One process per node loads the embedding model and serves every API
+worker over a Unix socket, batching their texts into shared forward
+passes. Workers use it with EMBEDDING_BACKEND=remote and load no model.
+
+Usage:
+    python run_embedding_server.py
+
+Or with the ONNX backend and a custom socket:
+    python run_embedding_server.py --backend onnx --socket /run/astro/embeddings.sock
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from app.config.settings import get_settings
+from app.core.vector_store.encoders import EmbeddingServer, create_encoder
+
+
+def main():
+    """Run the embedding server until interrupted."""
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Serve the embedding model to local API workers")
+    parser.add_argument("--socket", type=str, default=settings.embedding_server_socket, help=f"Unix socket path (default: {settings.embedding_server_socket})")
+    parser.add_argument("--backend", type=str, default=settings.embedding_server_backend, choices=["torch", "onnx"], help=f"Encoder backend (default: {settings.embedding_server_backend})")
+    parser.add_argument("--model", type=str, default=settings.embedding_model, help=f"Embedding model (default: {settings.embedding_model})")
+    parser.add_argument("--max-batch-size", type=int, default=settings.embedding_server_max_batch_size, help=f"Texts per forward pass (default: {settings.embedding_server_max_batch_size})")
+    parser.add_argument("--max-wait-ms", type=float, default=settings.embedding_server_max_wait_ms, help=f"Max wait for a batch to fill (default: {settings.embedding_server_max_wait_ms})")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level.upper(),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    encoder = create_encoder(args.backend, args.model, **settings.get_encoder_options(args.backend))
+    server = EmbeddingServer(
+        encoder,
+        socket_path=args.socket,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+
+    # serve_forever blocks; shutdown must come from another thread
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving {encoder.cache_key} (dim {encoder.dimension}) on {args.socket}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Script to synchronize the vector store with the astrological corpus.
+
+Only new or edited documents are embedded and upserted; documents removed
+from the corpus are deleted. Useful after corpus edits in server mode,
+where the collection outlives the API process.
+
+Usage:
+    python sync_corpus.py
+
+Or with another corpus file:
+    python sync_corpus.py --corpus path/to/corpus.json
+
+Large corpora (JSON or JSONL) are streamed in chunks with bounded memory,
+resuming after the last committed chunk if a previous run was interrupted:
+    python sync_corpus.py --corpus passages.jsonl --stream --workers 4
+
+With VECTOR_VERSIONED_COLLECTIONS=true the corpus is published as a new
+version and swapped in atomically; the previous version can be restored:
+    python sync_corpus.py --rollback
+"""
+import argparse
+import logging
+import sys
+
+from app.config.settings import get_settings
+from app.core.vector_store import CorpusIngestor, VectorStoreService
+
+
+def main():
+    """Run the corpus synchronization."""
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Incrementally sync the corpus into the vector store")
+    parser.add_argument("--corpus", type=str, default=None, help="Corpus JSON file (default: bundled corpus)")
+    parser.add_argument("--stream", action="store_true", help="Stream the corpus in chunks (upserts only, no deletions)")
+    parser.add_argument("--chunk-size", type=int, default=settings.ingest_chunk_size, help=f"Items per upsert when streaming (default: {settings.ingest_chunk_size})")
+    parser.add_argument("--workers", type=int, default=settings.ingest_workers, help=f"Encoder processes when streaming (default: {settings.ingest_workers})")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the checkpoint of an interrupted streaming run")
+    parser.add_argument("--rollback", action="store_true", help="Swap the previous corpus version back in (versioned collections)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level.upper(),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    vector_store = VectorStoreService(**settings.get_vector_store_options())
+    if not vector_store.is_available():
+        print("Vector store not available (is VECTOR_STORE_ENABLED=true?)")
+        sys.exit(1)
+
+    if args.rollback:
+        if not settings.vector_versioned_collections:
+            parser.error("--rollback requires VECTOR_VERSIONED_COLLECTIONS=true")
+        version = vector_store.rollback_corpus()
+        if version is None:
+            print("Rollback failed: no previous corpus version")
+            sys.exit(1)
+        print(f"Rolled back to corpus version {version}")
+        return
+
+    if settings.vector_versioned_collections and not args.stream:
+        version = vector_store.publish_corpus(args.corpus)
+        if version is None:
+            print("Corpus publish failed; the live version was kept")
+            sys.exit(1)
+        print(f"Corpus version {version} is live")
+        return
+
+    if args.stream:
+        if args.corpus is None:
+            parser.error("--stream requires --corpus")
+        options = {**settings.get_ingestion_options(), "chunk_size": args.chunk_size, "workers": args.workers}
+        ingestor = CorpusIngestor(vector_store, **options)
+        counts = ingestor.ingest(
+            args.corpus,
+            resume=not args.no_resume,
+            progress=lambda committed: print(f"\r{committed} items committed", end="", flush=True),
+        )
+        print(
+            f"\nUpserted {counts['upserted']}, unchanged {counts['unchanged']}, "
+            f"resumed after {counts['resumed']}"
+        )
+        return
+
+    counts = vector_store.sync_corpus(args.corpus)
+    if counts is None:
+        print("Corpus synchronization failed")
+        sys.exit(1)
+
+    print(
+        f"Added {counts['added']}, updated {counts['updated']}, "
+        f"deleted {counts['deleted']}, unchanged {counts['unchanged']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
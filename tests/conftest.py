@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the vector store tests.
+"""
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from app.core.vector_store import vector_service
+from app.core.vector_store.encoders import BaseEncoder
+
+
+class HashingEncoder(BaseEncoder):
+    """Bag-of-words hashing encoder: texts sharing words get similar vectors."""
+
+    model_name = "hashing"
+    cache_key = "hashing"
+
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def dimension(self):
+        return 64
+
+    def encode(self, texts, batch_size=32, pool=None):
+        single = isinstance(texts, str)
+        self.calls.append([texts] if single else list(texts))
+        vectors = np.zeros((1 if single else len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate([texts] if single else texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+        return vectors[0] if single else vectors
+
+    @property
+    def encoded(self):
+        """Every text encoded so far, in order."""
+        return [text for call in self.calls for text in call]
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    """Make ``VectorStoreService`` embed with a ``HashingEncoder`` instead of a model."""
+    encoder = HashingEncoder()
+    monkeypatch.setattr(vector_service, "create_encoder", lambda *args, **kwargs: encoder)
+    return encoder
+
+
+@pytest.fixture
+def write_corpus(tmp_path):
+    """Function writing corpus items (dicts, or (zodiac, text) pairs) to a corpus file."""
+
+    def write(items, name="corpus.json"):
+        corpus = [
+            item if isinstance(item, dict)
+            else {"id": f"doc-{i}", "zodiac": item[0], "category": "general", "text": item[1]}
+            for i, item in enumerate(items)
+        ]
+        path = tmp_path / name
+        path.write_text(json.dumps({"corpus": corpus}), encoding="utf-8")
+        return str(path)
+
+    return write
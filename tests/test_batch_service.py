@@ -0,0 +1,62 @@
+"""
+End-to-end test of the batch pipeline against the local file-based backend.
+"""
+from datetime import date
+
+from app.core.llm.batch import LocalBatchBackend
+from app.core.llm.providers.mock_provider import MockProvider
+from app.services.batch_service import BatchInsightService
+from app.services.insight_service import InsightService
+from app.services.insight_store import InsightStore
+
+INSIGHT_DATE = date(2024, 11, 1)
+
+USERS = [
+    {"user_id": "u1", "name": "Ritika", "birth_date": "1995-08-20", "birth_time": "14:30", "birth_place": "Jaipur, India"},
+    {"user_id": "u2", "name": "Arjun", "birth_date": "1990-04-02", "birth_time": "06:15", "birth_place": "Pune, India"},
+    {"user_id": "u3", "name": "Broken", "birth_date": "1990-13-45", "birth_time": "06:15", "birth_place": "Pune, India"},
+]
+
+
+def make_batch_service(tmp_path, provider=None) -> BatchInsightService:
+    return BatchInsightService(
+        insight_service=InsightService(llm_provider="mock"),
+        backend=LocalBatchBackend(str(tmp_path / "jobs"), provider=provider),
+        store=InsightStore(str(tmp_path / "insights.json")),
+        work_dir=str(tmp_path / "work"),
+        poll_interval=0.0,
+    )
+
+
+def test_run_builds_submits_polls_and_ingests(tmp_path):
+    service = make_batch_service(tmp_path)
+
+    summary = service.run(USERS, current_date=INSIGHT_DATE, timeout=10)
+
+    assert summary["status"] == "completed"
+    assert summary["written"] == 2
+    assert summary["skipped"] == 1
+    assert summary["ingested"] == 2
+    assert summary["failed"] == 0
+
+    # Records survive a reload of the persisted store
+    store = InsightStore(str(tmp_path / "insights.json"))
+    assert len(store) == 2
+    leo = store.get("u1", INSIGHT_DATE.isoformat(), "en")
+    aries = store.get("u2", INSIGHT_DATE.isoformat(), "en")
+    assert leo["zodiac"] == "Leo"
+    assert leo["metadata"] == {"element": "Fire", "ruling_planet": "Sun", "modality": "Fixed"}
+    assert leo["insight"]
+    assert aries["zodiac"] == "Aries"
+    assert store.get("u3", INSIGHT_DATE.isoformat(), "en") is None
+
+
+def test_failed_requests_are_not_ingested(tmp_path):
+    service = make_batch_service(tmp_path, provider=MockProvider(error_rate=1.0))
+
+    summary = service.run(USERS[:2], current_date=INSIGHT_DATE, timeout=10)
+
+    assert summary["status"] == "completed"
+    assert summary["ingested"] == 0
+    assert summary["failed"] == 2
+    assert len(service.store) == 0
@@ -0,0 +1,89 @@
+"""
+Tests for the dynamic batcher.
+"""
+import threading
+import time
+
+import pytest
+
+from app.core.batching import DynamicBatcher
+
+
+class RecordingBatchFn:
+    """Batch function that doubles items and records every batch it gets."""
+
+    def __init__(self, fail_on=None, release=None):
+        self.batches = []
+        self.fail_on = fail_on
+        self.release = release
+
+    def __call__(self, items):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        self.batches.append(list(items))
+        if self.fail_on is not None and self.fail_on in items:
+            raise ValueError(f"bad item {self.fail_on}")
+        return [item * 2 for item in items]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    release = threading.Event()
+    process = RecordingBatchFn(release=release)
+    batcher = DynamicBatcher(process, max_batch_size=4, max_wait_ms=1000)
+    try:
+        futures = [batcher.submit(item) for item in range(10)]
+        release.set()
+        assert [future.result(timeout=5) for future in futures] == [item * 2 for item in range(10)]
+    finally:
+        batcher.close(timeout=5)
+
+    assert all(len(batch) <= 4 for batch in process.batches)
+    assert [item for batch in process.batches for item in batch] == list(range(10))
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    process = RecordingBatchFn()
+    batcher = DynamicBatcher(process, max_batch_size=8, max_wait_ms=50)
+    try:
+        start = time.monotonic()
+        assert batcher.submit(1).result(timeout=5) == 2
+        elapsed = time.monotonic() - start
+    finally:
+        batcher.close(timeout=5)
+
+    assert process.batches == [[1]]
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_batch_error_reaches_every_future_of_that_batch_only():
+    release = threading.Event()
+    process = RecordingBatchFn(fail_on=3, release=release)
+    batcher = DynamicBatcher(process, max_batch_size=2, max_wait_ms=1000)
+    try:
+        futures = [batcher.submit(item) for item in range(6)]
+        release.set()
+        outcomes = []
+        for future in futures:
+            error = future.exception(timeout=5)
+            outcomes.append(type(error) if error else future.result())
+    finally:
+        batcher.close(timeout=5)
+
+    assert outcomes == [0, 2, ValueError, ValueError, 8, 10]
+
+
+def test_wrong_result_count_fails_the_batch():
+    batcher = DynamicBatcher(lambda items: [], max_batch_size=1, max_wait_ms=0)
+    try:
+        with pytest.raises(RuntimeError, match="returned 0 results for 1 items"):
+            batcher.submit("item").result(timeout=5)
+    finally:
+        batcher.close(timeout=5)
+
+
+def test_submit_after_close_raises():
+    batcher = DynamicBatcher(lambda items: items)
+    batcher.close(timeout=5)
+
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("item")
@@ -0,0 +1,119 @@
+"""
+Tests for the micro-batching encoder front-end.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.metrics import get_metrics
+from app.core.vector_store.encoders import BatchingEncoder
+
+TEXTS = ["leo leads with warmth", "aries acts first", "taurus values patience", "gemini talks fast"]
+
+
+@pytest.fixture
+def batching(encoder):
+    batching = BatchingEncoder(encoder, max_batch_size=4, max_wait_ms=1000)
+    yield batching
+    batching.close()
+
+
+def encode_concurrently(batching, texts):
+    """Encode each text from its own thread; returns the embedding per text."""
+    results = {}
+    start = threading.Barrier(len(texts))
+
+    def encode(text):
+        start.wait()
+        results[text] = batching.encode(text)
+
+    threads = [threading.Thread(target=encode, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_calls_share_one_forward_pass(batching, encoder):
+    results = encode_concurrently(batching, TEXTS)
+
+    # A full batch is flushed at once, without waiting out max_wait_ms
+    assert len(encoder.calls) == 1 and sorted(encoder.calls[0]) == sorted(TEXTS)
+    for text in TEXTS:
+        assert results[text].shape == (64,)
+        assert np.array_equal(results[text], encoder.encode(text))
+
+
+def test_partial_batches_are_flushed_after_max_wait(encoder):
+    batching = BatchingEncoder(encoder, max_batch_size=8, max_wait_ms=10)
+    try:
+        embeddings = batching.encode(TEXTS[:3])
+    finally:
+        batching.close()
+
+    assert encoder.calls == [TEXTS[:3]]
+    assert embeddings.dtype == np.float32
+    assert np.array_equal(embeddings, encoder.encode(TEXTS[:3]))
+
+
+def test_full_batches_and_pools_bypass_the_queue(batching, encoder, monkeypatch):
+    monkeypatch.setattr(batching.batcher, "submit", lambda text: pytest.fail("queued"))
+    pool = object()
+    direct = []
+    encode = encoder.encode
+    monkeypatch.setattr(
+        encoder, "encode", lambda texts, batch_size=32, pool=None: direct.append((batch_size, pool)) or encode(texts)
+    )
+
+    assert batching.encode(TEXTS, batch_size=16).shape == (4, 64)
+    assert batching.encode(TEXTS[0], pool=pool).shape == (64,)
+    assert direct == [(16, None), (32, pool)]
+
+
+def test_empty_input_skips_the_encoder(batching, encoder):
+    assert batching.encode([]).shape == (0, 64)
+    assert encoder.calls == []
+
+
+def test_encoder_errors_reach_the_callers(encoder, monkeypatch):
+    batching = BatchingEncoder(encoder, max_batch_size=4, max_wait_ms=10)
+    def fail(texts, batch_size=32, pool=None):
+        raise ValueError("model crashed")
+
+    monkeypatch.setattr(encoder, "encode", fail)
+    try:
+        with pytest.raises(ValueError, match="model crashed"):
+            batching.encode(TEXTS[:3])
+    finally:
+        batching.close()
+
+
+def test_batch_sizes_and_queue_depths_are_recorded(encoder, monkeypatch):
+    monkeypatch.setattr(encoder, "cache_key", "batching-test")
+    batching = BatchingEncoder(encoder, max_batch_size=4, max_wait_ms=1000)
+    try:
+        encode_concurrently(batching, TEXTS)
+    finally:
+        batching.close()
+
+    histograms = get_metrics().snapshot()["histograms"]
+    (batch_sizes,) = [h for h in histograms["embedding_batch_size"] if h["labels"] == {"model": "batching-test"}]
+    (queue_depths,) = [h for h in histograms["embedding_queue_depth"] if h["labels"] == {"model": "batching-test"}]
+    assert batch_sizes["count"] == 1 and batch_sizes["sum"] == 4
+    # Each caller sees at most the texts queued before its own
+    assert queue_depths["count"] == 4 and queue_depths["sum"] <= 6
+
+
+def test_wrapper_presents_the_wrapped_encoder(batching, encoder):
+    assert (batching.model_name, batching.cache_key, batching.dimension) == ("hashing", "hashing", 64)
+    assert batching.start_pool(2) is None
+
+
+def test_closed_encoder_rejects_queued_work(encoder):
+    batching = BatchingEncoder(encoder)
+    batching.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        batching.encode(TEXTS[0])
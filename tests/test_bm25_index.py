@@ -0,0 +1,205 @@
+"""
+Tests for the BM25 keyword index and reciprocal rank fusion.
+"""
+import math
+from collections import Counter
+
+import pytest
+
+from app.core.vector_store.bm25_index import BM25Index, tokenize
+from app.core.vector_store.retrieval import reciprocal_rank_fusion
+
+DOCUMENTS = [
+    ("a", "Leo", "Leo leads with warmth and courage"),
+    ("b", "Leo", "The Sun rules Leo, and the Sun loves the stage"),
+    ("c", "Aries", "Mars rules Aries, the sign of courage"),
+    ("d", "Taurus", "Venus rules Taurus and its patience"),
+    ("e", "Fire Signs", "Fire signs share warmth, courage and drive"),
+]
+
+
+def make_index(documents=DOCUMENTS, **options):
+    index = BM25Index(**options)
+    upsert(index, documents)
+    return index
+
+
+def upsert(index, documents):
+    index.upsert(
+        [doc_id for doc_id, _, _ in documents],
+        [text for _, _, text in documents],
+        [{"doc_id": doc_id, "zodiac": zodiac, "text": text} for doc_id, zodiac, text in documents],
+    )
+
+
+def reference_scores(documents, query, k1=1.5, b=0.75):
+    """Okapi BM25, computed from scratch for every document."""
+    term_counts = {doc_id: Counter(tokenize(text)) for doc_id, _, text in documents}
+    average_length = sum(sum(counts.values()) for counts in term_counts.values()) / len(documents)
+    scores = {}
+    for doc_id, counts in term_counts.items():
+        score = 0.0
+        for term in set(tokenize(query)):
+            frequency = counts[term]
+            if not frequency:
+                continue
+            df = sum(1 for other in term_counts.values() if term in other)
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            length_norm = k1 * (1 - b + b * sum(counts.values()) / average_length)
+            score += idf * frequency * (k1 + 1) / (frequency + length_norm)
+        if score > 0:
+            scores[doc_id] = score
+    return scores
+
+
+def found(results):
+    return {payload["doc_id"]: score for score, payload in results}
+
+
+@pytest.mark.parametrize("query", ["courage", "warmth and courage", "sun stage", "rules patience", "pluto"])
+def test_scores_match_okapi_bm25(query):
+    results = make_index().search(query, limit=10)
+
+    assert found(results) == pytest.approx(reference_scores(DOCUMENTS, query))
+    assert [score for score, _ in results] == sorted((score for score, _ in results), reverse=True)
+
+
+def test_repeated_terms_saturate_and_long_documents_are_normalized():
+    index = make_index([
+        ("short", "Leo", "courage"),
+        ("repeated", "Leo", "courage courage courage courage"),
+        ("long", "Leo", "courage " + " ".join(f"filler{i}" for i in range(20))),
+    ])
+
+    scores = found(index.search("courage", limit=3))
+
+    assert scores["repeated"] > scores["short"] > scores["long"]
+    # Four occurrences score well under four times one
+    assert scores["repeated"] < 2 * scores["short"]
+
+
+def test_limit_keeps_the_best_matches():
+    results = make_index().search("courage warmth", limit=2)
+
+    assert [payload["doc_id"] for _, payload in results] == ["a", "e"]
+
+
+def test_zodiac_filter_matches_one_or_any_value():
+    index = make_index()
+
+    assert set(found(index.search("courage", limit=10, zodiac="Leo"))) == {"a"}
+    assert set(found(index.search("courage", limit=10, zodiac=["Leo", "Fire Signs"]))) == {"a", "e"}
+    assert index.search("courage", limit=10, zodiac="Virgo") == []
+
+
+def test_search_batch_filters_each_query():
+    index = make_index()
+
+    results = index.search_batch(["courage", "rules", "courage"], limit=10, zodiacs=["Aries", None, None])
+
+    assert set(found(results[0])) == {"c"}
+    assert set(found(results[1])) == {"b", "c", "d"}
+    assert results[2] == index.search("courage", limit=10)
+
+
+def test_upserts_update_scores_like_a_rebuilt_index():
+    index = make_index(DOCUMENTS[:3])
+    edited = [("b", "Leo", "Leo rules the stage with courage"), DOCUMENTS[3], DOCUMENTS[4]]
+
+    upsert(index, edited)
+
+    documents = [DOCUMENTS[0], edited[0], DOCUMENTS[2], DOCUMENTS[3], DOCUMENTS[4]]
+    assert index.count == 5
+    for query in ["courage", "sun stage", "rules"]:
+        assert found(index.search(query, limit=10)) == pytest.approx(reference_scores(documents, query))
+
+
+def test_upsert_moves_a_document_between_zodiac_values():
+    index = make_index()
+
+    upsert(index, [("a", "Aries", "Leo leads with warmth and courage")])
+
+    assert set(found(index.search("courage", limit=10, zodiac="Aries"))) == {"a", "c"}
+    assert "a" not in found(index.search("courage", limit=10, zodiac="Leo"))
+
+
+def test_duplicate_ids_in_one_upsert_keep_the_last():
+    index = BM25Index()
+
+    upsert(index, [("a", "Leo", "warmth"), ("a", "Aries", "courage")])
+
+    assert index.count == 1
+    assert index.search("warmth") == []
+    assert set(found(index.search("courage", zodiac="Aries"))) == {"a"}
+
+
+def test_deletes_update_scores_like_a_rebuilt_index():
+    index = make_index()
+
+    assert index.delete(["a", "c", "missing"]) == 2
+
+    documents = [DOCUMENTS[1], DOCUMENTS[3], DOCUMENTS[4]]
+    assert index.count == 3 and sorted(index.ids) == ["b", "d", "e"]
+    assert index.get(["a", "e"]) == {"e": {"doc_id": "e", "zodiac": "Fire Signs", "text": DOCUMENTS[4][2]}}
+    for query in ["courage", "rules", "warmth"]:
+        assert found(index.search(query, limit=10)) == pytest.approx(reference_scores(documents, query))
+    assert set(found(index.search("courage", limit=10, zodiac="Fire Signs"))) == {"e"}
+    assert index.delete(["a"]) == 0
+
+
+def test_writes_swap_in_a_new_state():
+    index = make_index(DOCUMENTS[:2])
+    state = index._state
+    ids, payloads, postings = state.ids, state.payloads, dict(state.postings)
+
+    upsert(index, [("b", "Leo", "replaced"), DOCUMENTS[2]])
+    index.delete(["a"])
+
+    # A reader holding the earlier state sees it unchanged
+    assert index._state is not state
+    assert ids == ["a", "b"] and [payload["text"] for payload in payloads] == [DOCUMENTS[0][2], DOCUMENTS[1][2]]
+    assert all(state.postings[term] is posting for term, posting in postings.items())
+    index._state = state
+    assert set(found(index.search("sun stage"))) == {"b"}
+
+
+def test_clear_and_empty_index():
+    index = make_index()
+
+    index.clear()
+
+    assert index.count == 0
+    assert index.search("courage") == []
+    assert make_index().search("courage", limit=0) == []
+
+
+def test_mismatched_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        BM25Index().upsert(["a"], ["text", "other"], [{}])
+
+
+def ranking(*doc_ids):
+    return [(1.0 / rank, {"doc_id": doc_id}) for rank, doc_id in enumerate(doc_ids, 1)]
+
+
+def test_rrf_sums_reciprocal_ranks():
+    fused = reciprocal_rank_fusion([ranking("a", "b", "c"), ranking("c", "a")], k=60)
+
+    assert [payload["doc_id"] for _, payload in fused] == ["a", "c", "b"]
+    assert [score for score, _ in fused] == pytest.approx([1 / 61 + 1 / 62, 1 / 63 + 1 / 61, 1 / 62])
+
+
+def test_rrf_ignores_score_scales():
+    dense = [(0.91, {"doc_id": "a"}), (0.90, {"doc_id": "b"})]
+    sparse = [(12.0, {"doc_id": "b"}), (0.1, {"doc_id": "a"})]
+
+    fused = reciprocal_rank_fusion([dense, sparse])
+
+    assert fused[0][0] == pytest.approx(fused[1][0])
+
+
+def test_rrf_limit_and_text_keys():
+    fused = reciprocal_rank_fusion([[(1.0, {"text": "x"}), (0.5, {"text": "y"})], [(3.0, {"text": "x"})]], limit=1)
+
+    assert [payload["text"] for _, payload in fused] == ["x"]
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,112 @@
+"""
+Tests for the precomputed per-sign retrieval context.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.core.llm.context import format_context
+from app.core.vector_store.vector_service import VectorStoreService
+from app.core.zodiac.traits import ZODIAC_TRAITS
+
+SIGNS = list(ZODIAC_TRAITS)
+
+
+def sign_corpus(extra=None):
+    """Two passages per sign that match its context query."""
+    items = []
+    for sign in SIGNS:
+        items.append((sign, f"daily guidance and personality insights for {sign} and warmth"))
+        items.append((sign, f"daily guidance and personality insights for {sign} and patience"))
+    return items + (extra or [])
+
+
+@pytest.fixture(params=["memory", "numpy"])
+def service(request, encoder):
+    return VectorStoreService(enabled=True, mode=request.param, embedding_cache_size=0, context_top_k=2)
+
+
+def test_loading_precomputes_every_sign_in_one_batch(service, encoder, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+
+    assert set(service._context_cache) == {(sign, 2) for sign in SIGNS}
+    # One encoder batch for the twelve context queries, after the corpus itself
+    assert len(encoder.calls) == 2 and len(encoder.calls[1]) == len(SIGNS)
+    passages, context = service._context_cache[("Leo", 2)]
+    assert {passage["zodiac"] for passage in passages} == {"Leo"}
+    assert context == format_context(passages)
+
+
+def test_cached_context_is_served_without_searching(service, encoder, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+    calls = len(encoder.calls)
+
+    passages = service.get_context_passages("Leo", top_k=2)
+    context = service.get_context_for_insight("Leo", "Arjun", "Jaipur, India", top_k=2)
+    async_passages = asyncio.run(service.aget_context_passages("Leo", top_k=2))
+
+    assert len(encoder.calls) == calls
+    assert passages == async_passages == service._context_cache[("Leo", 2)][0]
+    assert context == service._context_cache[("Leo", 2)][1]
+
+
+def test_callers_get_copies_of_cached_passages(service, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+
+    service.get_context_passages("Leo", top_k=2)[0]["text"] = "changed"
+
+    assert service.get_context_passages("Leo", top_k=2)[0]["text"] != "changed"
+
+
+def test_uncached_top_k_is_searched(service, encoder, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+    calls = len(encoder.calls)
+
+    assert len(service.get_context_passages("Leo", top_k=1)) == 1
+    assert len(encoder.calls) == calls + 1
+
+
+def test_reloading_the_same_corpus_keeps_the_cache(service, encoder, write_corpus):
+    corpus = write_corpus(sign_corpus())
+    service.load_corpus(corpus)
+    cache = service._context_cache
+    calls = len(encoder.calls)
+
+    service.load_corpus(corpus)
+
+    assert service._context_cache is cache
+    assert len(encoder.calls) == calls
+
+
+def test_changed_corpus_recomputes_the_context(service, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+    version = service.corpus_version
+
+    extra = ("Leo", "daily guidance and personality insights for Leo")
+    service.load_corpus(write_corpus(sign_corpus([extra])))
+
+    assert service.corpus_version != version
+    assert extra[1] in {passage["text"] for passage in service.get_context_passages("Leo", top_k=2)}
+
+
+def test_prefetch_searches_only_missing_signs_in_one_batch(service, encoder, write_corpus):
+    service.load_corpus(write_corpus(sign_corpus()))
+    calls = len(encoder.calls)
+
+    service.prefetch_context(["Leo", "Aries", "Leo"], top_k=1)
+    service.prefetch_context(["Leo", "Aries"], top_k=1)
+
+    assert encoder.calls[calls:] == [[service._context_query("Leo"), service._context_query("Aries")]]
+    assert {("Leo", 1), ("Aries", 1), ("Leo", 2)} <= set(service._context_cache)
+
+
+def test_disabled_cache_searches_every_time(encoder, write_corpus):
+    service = VectorStoreService(enabled=True, mode="numpy", embedding_cache_size=0, context_cache_enabled=False)
+    service.load_corpus(write_corpus(sign_corpus()))
+    calls = len(encoder.calls)
+
+    assert service._context_cache == {}
+    assert len(service.get_context_passages("Leo", top_k=2)) == 2
+    assert len(encoder.calls) == calls + 1
@@ -0,0 +1,109 @@
+"""
+Tests for hash-diffed corpus synchronization.
+"""
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.core.vector_store.vector_service import VectorStoreService, point_id
+
+TEXTS = [
+    ("Leo", "leo leads with warmth"),
+    ("Leo", "leo loves the stage"),
+    ("Aries", "aries acts first"),
+]
+
+
+@pytest.fixture(params=["memory", "numpy"])
+def service(request, encoder):
+    return VectorStoreService(enabled=True, mode=request.param, embedding_cache_size=0, context_cache_enabled=False)
+
+
+def stored_texts(service):
+    hits = service.search("leo aries warmth stage acts", top_k=10, score_threshold=0.0)
+    return {hit["text"] for hit in hits}
+
+
+def test_first_sync_adds_everything(service, write_corpus):
+    counts = service.sync_corpus(write_corpus(TEXTS))
+
+    assert counts == {"added": 3, "updated": 0, "deleted": 0, "unchanged": 0}
+    assert stored_texts(service) == {text for _, text in TEXTS}
+
+
+def test_unchanged_corpus_encodes_nothing(service, encoder, write_corpus):
+    corpus = write_corpus(TEXTS)
+    service.sync_corpus(corpus)
+    calls = len(encoder.calls)
+
+    assert service.sync_corpus(corpus) == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+    assert len(encoder.calls) == calls
+
+
+def test_only_changed_documents_are_reembedded(service, encoder, write_corpus):
+    service.sync_corpus(write_corpus(TEXTS))
+    encoded = len(encoder.encoded)
+
+    edited = [TEXTS[0], ("Leo", "leo shines on stage"), ("Virgo", "virgo plans ahead")]
+    edited = [{"id": doc_id, "zodiac": zodiac, "category": "general", "text": text}
+              for doc_id, (zodiac, text) in zip(["doc-0", "doc-1", "doc-9"], edited)]
+    counts = service.sync_corpus(write_corpus(edited))
+
+    assert counts == {"added": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+    assert sorted(encoder.encoded[encoded:]) == ["leo shines on stage", "virgo plans ahead"]
+    assert service._document_count() == 3
+    assert "aries acts first" not in stored_texts(service)
+    assert "leo loves the stage" not in stored_texts(service)
+
+
+def test_metadata_changes_count_as_updates(service, write_corpus):
+    service.sync_corpus(write_corpus(TEXTS))
+    moved = [
+        {"id": "doc-0", "zodiac": "Leo", "category": "career", "text": TEXTS[0][1]},
+        {"id": "doc-1", "zodiac": "Fire Signs", "category": "general", "text": TEXTS[1][1]},
+        {"id": "doc-2", "zodiac": "Aries", "category": "general", "text": TEXTS[2][1]},
+    ]
+
+    counts = service.sync_corpus(write_corpus(moved))
+
+    assert counts == {"added": 0, "updated": 2, "deleted": 0, "unchanged": 1}
+    def found(zodiac):
+        return {hit["text"] for hit in service.search(TEXTS[1][1], zodiac=zodiac, top_k=3, score_threshold=0.0)}
+
+    assert found("Leo") == {TEXTS[0][1]}
+    assert found("Fire Signs") == {TEXTS[1][1]}
+
+
+def test_points_without_a_content_hash_are_rewritten(service, write_corpus):
+    service.sync_corpus(write_corpus(TEXTS))
+    legacy_id = point_id("doc-0")
+    if service.index is not None:
+        payload = dict(service.index.get([legacy_id])[legacy_id])
+        del payload["content_hash"]
+        service.index.upsert([legacy_id], service.encode_documents([TEXTS[0][1]]), [payload])
+    else:
+        service.client.delete_payload(service.collection_name, keys=["content_hash"], points=[legacy_id])
+
+    assert service._stored_hashes([legacy_id]) == {legacy_id: None}
+    assert service.sync_corpus(write_corpus(TEXTS))["updated"] == 1
+    assert service._stored_hashes([legacy_id])[legacy_id] is not None
+
+
+@pytest.mark.parametrize("corpus", [
+    [{"id": "doc-0", "zodiac": "Leo", "category": "general", "text": "a"}] * 2,
+    [],
+])
+def test_invalid_corpora_are_rejected(service, write_corpus, corpus):
+    assert service.sync_corpus(write_corpus(corpus)) is None
+    assert service.sync_corpus("/nonexistent/corpus.json") is None
+
+
+def test_hybrid_mode_syncs_the_keyword_index(encoder, write_corpus):
+    service = VectorStoreService(enabled=True, mode="numpy", retrieval_mode="hybrid", context_cache_enabled=False)
+    service.sync_corpus(write_corpus(TEXTS))
+
+    counts = service.sync_corpus(write_corpus(TEXTS[:2]))
+
+    assert counts["deleted"] == 1
+    assert service.sparse_index.count == 2
+    assert {payload["text"] for payload in service.sparse_index.payloads} == {text for _, text in TEXTS[:2]}
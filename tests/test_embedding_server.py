@@ -0,0 +1,175 @@
+"""
+Tests for the embedding server and its RemoteEncoder client.
+"""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.vector_store.encoders import EmbeddingServer, RemoteEncoder
+from app.core.vector_store.encoders.embedding_server import _EmbeddingRequestHandler, read_reply, send_frame
+
+TEXTS = ["leo leads with warmth", "aries acts first", "taurus values patience"]
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, which pytest's tmp_path can exceed
+    directory = tempfile.mkdtemp(prefix="emb-")
+    yield os.path.join(directory, "server.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def start_server(encoder, socket_path):
+    server = EmbeddingServer(encoder, socket_path=socket_path, max_batch_size=8, max_wait_ms=1.0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    return server, thread
+
+
+def stop_server(server, thread):
+    server.shutdown()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def server(encoder, socket_path):
+    server, thread = start_server(encoder, socket_path)
+    yield server
+    stop_server(server, thread)
+
+
+def test_client_takes_the_servers_identity(server, socket_path):
+    remote = RemoteEncoder("other-model", socket_path=socket_path)
+
+    assert remote.model_name == "hashing"
+    assert remote.cache_key == "hashing"
+    assert remote.dimension == 64
+
+
+def test_remote_embeddings_match_the_served_encoder(server, encoder, socket_path):
+    remote = RemoteEncoder(socket_path=socket_path)
+
+    embeddings = remote.encode(TEXTS)
+    single = remote.encode(TEXTS[0])
+
+    expected = encoder.encode(TEXTS)
+    assert embeddings.dtype == np.float32 and np.array_equal(embeddings, expected)
+    assert single.shape == (64,) and np.array_equal(single, expected[0])
+    assert remote.encode([]).shape == (0, 64)
+
+
+def test_concurrent_clients_each_get_their_embeddings(server, encoder, socket_path):
+    remote = RemoteEncoder(socket_path=socket_path)
+    results = {}
+    start = threading.Barrier(len(TEXTS))
+
+    def search(text):
+        start.wait()
+        results[text] = remote.encode(text)
+
+    threads = [threading.Thread(target=search, args=(text,)) for text in TEXTS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each text was embedded once, whichever batches the server formed
+    assert sorted(encoder.encoded) == sorted(TEXTS)
+    for text in TEXTS:
+        assert np.array_equal(results[text], encoder.encode(text))
+
+
+def raw_request(socket_path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_frame(sock, json.dumps(request).encode("utf-8"))
+        return read_reply(sock)
+
+
+def test_unknown_ops_get_an_error_reply(server, socket_path):
+    with pytest.raises(RuntimeError, match="Unknown op: nope"):
+        raw_request(socket_path, {"op": "nope"})
+
+
+def test_encoder_failures_are_reported_and_the_client_recovers(server, encoder, socket_path, monkeypatch):
+    remote = RemoteEncoder(socket_path=socket_path)
+    encode = encoder.encode
+
+    def fail(texts, batch_size=32, pool=None):
+        raise ValueError("model crashed")
+
+    monkeypatch.setattr(encoder, "encode", fail)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        remote.encode(TEXTS)
+
+    monkeypatch.setattr(encoder, "encode", encode)
+    assert np.array_equal(remote.encode(TEXTS), encode(TEXTS))
+
+
+def test_client_reconnects_when_the_server_drops_the_connection(server, encoder, socket_path, monkeypatch):
+    connections = []
+    setup = _EmbeddingRequestHandler.setup
+    monkeypatch.setattr(
+        _EmbeddingRequestHandler, "setup", lambda handler: connections.append(handler.request) or setup(handler)
+    )
+    remote = RemoteEncoder(socket_path=socket_path)
+    remote.encode(TEXTS[0])
+
+    connections[0].shutdown(socket.SHUT_RDWR)
+
+    assert np.array_equal(remote.encode(TEXTS), encoder.encode(TEXTS))
+    assert len(connections) == 2
+
+
+def test_client_waits_for_a_starting_server(encoder, socket_path):
+    started = []
+
+    def start_later():
+        time.sleep(0.3)
+        started.append(start_server(encoder, socket_path))
+
+    starter = threading.Thread(target=start_later)
+    starter.start()
+    try:
+        remote = RemoteEncoder(socket_path=socket_path, connect_timeout=10.0)
+        assert remote.dimension == 64
+    finally:
+        starter.join()
+        stop_server(*started[0])
+
+
+def test_client_gives_up_without_a_server(socket_path):
+    with pytest.raises(FileNotFoundError):
+        RemoteEncoder(socket_path=socket_path, connect_timeout=0.0)
+
+
+def test_server_refuses_to_replace_a_live_socket(server, encoder, socket_path):
+    other = EmbeddingServer(encoder, socket_path=socket_path)
+    with pytest.raises(RuntimeError, match="already listening"):
+        other.serve_forever()
+    other.encoder.close()
+
+    assert os.path.exists(socket_path)
+    assert RemoteEncoder(socket_path=socket_path).dimension == 64
+
+
+def test_server_replaces_a_stale_socket_and_removes_its_own(encoder, socket_path):
+    # Bound but never listening, like the socket of a killed server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path)
+
+    server, thread = start_server(encoder, socket_path)
+    assert RemoteEncoder(socket_path=socket_path).dimension == 64
+    stop_server(server, thread)
+
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,113 @@
+"""
+Tests for the memory-mapped corpus embedding store.
+"""
+import numpy as np
+import pytest
+
+from app.core.vector_store.embedding_store import CorpusEmbeddingStore
+from app.core.vector_store.vector_service import VectorStoreService
+
+DIM = 8
+
+
+def vectors(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+def test_saved_embeddings_are_memory_mapped_normalized(tmp_path):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    saved = store.save("v1", "model", DIM, vectors(5), ["h0", "h1", "h2", "h3", "h4"])
+    loaded = store.load("v1", "model", DIM, 5)
+
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    assert np.array_equal(loaded, saved)
+    assert np.allclose(np.linalg.norm(loaded, axis=1), 1.0)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["model-8d-v1.json", "model-8d-v1.npy"]
+
+
+@pytest.mark.parametrize("corpus_hash, model, dim, count", [
+    ("v2", "model", DIM, 5),
+    ("v1", "other", DIM, 5),
+    ("v1", "model", DIM, 6),
+    ("v1", "model", 16, 5),
+])
+def test_artifacts_only_load_for_their_version_model_and_shape(tmp_path, corpus_hash, model, dim, count):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    store.save("v1", "model", DIM, vectors(5))
+
+    assert store.load(corpus_hash, model, dim, count) is None
+
+
+def test_unreadable_artifact_is_ignored(tmp_path):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    store.artifact_path("v1", "model", DIM).write_bytes(b"not an array")
+
+    assert store.load("v1", "model", DIM, 5) is None
+
+
+def test_saving_a_version_removes_stale_artifacts_of_the_model(tmp_path):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    store.save("v1", "model", DIM, vectors(5), ["h"] * 5)
+    store.save("v1", "other/model", DIM, vectors(5))
+
+    store.save("v2", "model", DIM, vectors(6), ["h"] * 6)
+
+    assert store.load("v1", "model", DIM, 5) is None
+    assert not store.artifact_path("v1", "model", DIM).with_suffix(".json").exists()
+    assert store.load("v2", "model", DIM, 6) is not None
+    # Other models keep theirs, and no temporary files are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "model-8d-v2.json", "model-8d-v2.npy", "other_model-8d-v1.npy",
+    ]
+
+
+def test_previous_artifact_comes_with_its_content_hashes(tmp_path):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    assert store.load_previous("model", DIM) is None
+
+    saved = store.save("v1", "model", DIM, vectors(3), ["a", "b", "c"])
+    embeddings, content_hashes = store.load_previous("model", DIM)
+
+    assert content_hashes == ["a", "b", "c"]
+    assert np.array_equal(embeddings, saved)
+    assert store.load_previous("model", 16) is None
+
+
+def test_previous_artifact_needs_its_sidecar(tmp_path):
+    store = CorpusEmbeddingStore(str(tmp_path))
+    store.save("v1", "model", DIM, vectors(3))
+
+    assert store.load_previous("model", DIM) is None
+
+
+def corpus_texts(n):
+    return [("Leo", f"leo passage number {i}") for i in range(n)]
+
+
+def test_service_reuses_the_artifact_across_processes(tmp_path, encoder, write_corpus):
+    options = dict(enabled=True, mode="numpy", embedding_cache_size=0, embedding_store_dir=str(tmp_path / "store"))
+    corpus = write_corpus(corpus_texts(4))
+    VectorStoreService(**options).load_corpus(corpus)
+    encoded = list(encoder.encoded)
+
+    restarted = VectorStoreService(**options)
+    restarted.load_corpus(corpus)
+
+    # The restarted service maps the artifact instead of encoding the corpus
+    assert [text for text in encoder.encoded[len(encoded):] if text.startswith("leo passage")] == []
+    assert isinstance(restarted.index.vectors, np.memmap)
+    assert restarted.index.count == 4
+
+
+def test_service_encodes_only_documents_changed_since_the_last_artifact(tmp_path, encoder, write_corpus):
+    options = dict(enabled=True, mode="numpy", embedding_cache_size=0, embedding_store_dir=str(tmp_path / "store"))
+    VectorStoreService(**options).load_corpus(write_corpus(corpus_texts(4)))
+    encoded = len(encoder.encoded)
+
+    edited = corpus_texts(4)
+    edited[2] = ("Leo", "leo passage rewritten")
+    VectorStoreService(**options).load_corpus(write_corpus(edited + [("Leo", "leo passage added")]))
+
+    corpus_encodes = [text for text in encoder.encoded[encoded:] if text.startswith("leo passage")]
+    assert corpus_encodes == ["leo passage rewritten", "leo passage added"]
+    assert len(list((tmp_path / "store").glob("*.npy"))) == 1
@@ -0,0 +1,90 @@
+"""
+Tests for streaming corpus parsing.
+"""
+import io
+import json
+
+import pytest
+
+from app.core.vector_store.ingestion import CorpusIngestor, _iter_json_array
+from app.core.vector_store.vector_service import VectorStoreService
+
+ITEMS = [{"id": f"doc-{i}", "zodiac": "Leo", "category": "general", "text": "x" * i} for i in range(20)]
+
+
+def parse(text, block_size=7, **kwargs):
+    return list(_iter_json_array(io.StringIO(text), "corpus", block_size, **kwargs))
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 16])
+def test_parses_top_level_arrays_across_block_boundaries(block_size):
+    assert parse(json.dumps(ITEMS, indent=2), block_size) == ITEMS
+
+
+def test_parses_the_keyed_array_of_an_object():
+    text = json.dumps({"version": 2, "corpus": ITEMS})
+
+    assert parse(text) == ITEMS
+
+
+@pytest.mark.parametrize("text", ["[]", " [ \n ] ", '{"corpus": []}'])
+def test_empty_arrays_yield_nothing(text):
+    assert parse(text) == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[{"id": 1} {"id": 2}]',
+        '[{"id": 1},, {"id": 2}]',
+        '[, {"id": 1}]',
+        '[{"id": 1},]',
+        '[{"id": 1}',
+    ],
+)
+def test_malformed_separators_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse(text)
+
+
+def test_items_larger_than_the_cap_are_rejected():
+    big = [{"id": "big", "text": "x" * 1000}]
+
+    assert parse(json.dumps(big), block_size=64, max_item_size=2000) == big
+    with pytest.raises(ValueError, match="exceeds 500 characters"):
+        parse(json.dumps(big), block_size=64, max_item_size=500)
+
+
+def test_unterminated_item_does_not_buffer_the_rest_of_the_file():
+    text = '{"corpus": [{"id": "open", "text": "' + "x" * 10_000
+
+    with pytest.raises(ValueError, match="exceeds"):
+        parse(text, block_size=64, max_item_size=1000)
+
+
+@pytest.fixture
+def hybrid_store(encoder):
+    pytest.importorskip("qdrant_client")
+    return VectorStoreService(
+        enabled=True, mode="memory", retrieval_mode="hybrid", embedding_cache_size=0, context_cache_enabled=False
+    )
+
+
+def test_hybrid_ingestion_fills_the_keyword_index(hybrid_store, write_corpus):
+    counts = CorpusIngestor(hybrid_store, chunk_size=6).ingest(write_corpus(ITEMS))
+
+    assert counts["upserted"] == len(ITEMS)
+    assert hybrid_store.sparse_index.count == len(ITEMS)
+    assert hybrid_store._document_count() == len(ITEMS)
+
+
+def test_keyword_index_gets_unchanged_items_it_lacks(hybrid_store, write_corpus):
+    corpus = write_corpus(ITEMS)
+    CorpusIngestor(hybrid_store, chunk_size=6).ingest(corpus)
+    # A new process: the dense store persists, the keyword index does not
+    hybrid_store.sparse_index.clear()
+
+    counts = CorpusIngestor(hybrid_store, chunk_size=6).ingest(corpus)
+
+    assert counts["upserted"] == 0 and counts["unchanged"] == len(ITEMS)
+    assert hybrid_store.sparse_index.count == len(ITEMS)
@@ -0,0 +1,100 @@
+"""
+Tests for the local CPU provider against a tiny randomly initialized model.
+"""
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from app.core.llm.providers.local_provider import LocalProvider
+
+VOCAB = ["<unk>", "<pad>", "<eos>"] + "a b c d e f g h i j k l m n o p q r s t u v w x y z".split()
+
+
+@pytest.fixture(scope="module")
+def tiny_model_path(tmp_path_factory):
+    """Save a two-layer GPT-2 and a character-level tokenizer to disk."""
+    path = tmp_path_factory.mktemp("tiny-lm")
+
+    backend = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel({token: i for i, token in enumerate(VOCAB)}, unk_token="<unk>")
+    )
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.Split("", "isolated")
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend, unk_token="<unk>", pad_token="<pad>", eos_token="<eos>"
+    )
+    tokenizer.save_pretrained(path)
+
+    config = transformers.GPT2Config(
+        vocab_size=len(VOCAB), n_positions=512, n_embd=32, n_layer=2, n_head=2,
+        pad_token_id=1, eos_token_id=2, bos_token_id=2,
+    )
+    transformers.GPT2LMHeadModel(config).save_pretrained(path)
+    return str(path)
+
+
+@pytest.fixture
+def provider(tiny_model_path):
+    provider = LocalProvider(model=tiny_model_path, max_batch_size=4, max_wait_ms=200, temperature=0)
+    yield provider
+    provider.batcher.close(timeout=5)
+
+
+def test_generate_result_respects_max_tokens(provider):
+    result = provider.generate_result("abc", max_tokens=5)
+
+    assert provider.is_available()
+    assert result.model == provider.model_name
+    assert result.prompt_tokens > 0
+    assert 0 < result.completion_tokens <= 5
+    assert result.latency > 0
+
+
+def test_concurrent_requests_share_a_batch(provider):
+    batches = []
+    generate_batch = provider.batcher.process_batch
+
+    def recording(items):
+        batches.append(len(items))
+        return generate_batch(items)
+
+    provider.batcher.process_batch = recording
+    results = [None] * 4
+
+    def call(index):
+        results[index] = provider.generate_result("ab" * (index + 1), max_tokens=2 + index)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sum(batches) == 4 and max(batches) > 1
+    assert [result.completion_tokens <= 2 + index for index, result in enumerate(results)] == [True] * 4
+
+
+def test_greedy_decoding_is_deterministic_across_sync_and_async(provider):
+    sync_text = provider.generate("hello", max_tokens=6)
+    async_text = asyncio.run(provider.agenerate("hello", max_tokens=6))
+
+    assert sync_text == async_text
+
+
+def test_stop_callback_trims_the_completion(provider):
+    result = provider.generate_result("abc", max_tokens=5, stop=lambda text: "trimmed")
+
+    assert result.text == "trimmed"
+    assert result.stopped_early
+
+
+def test_missing_model_is_unavailable(tmp_path):
+    provider = LocalProvider(model=str(tmp_path / "missing"))
+
+    assert not provider.is_available()
+    with pytest.raises(Exception, match="is not loaded"):
+        provider.generate("abc")
@@ -0,0 +1,98 @@
+"""
+Tests for sharing embedded Qdrant storage with read-only followers.
+"""
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.core.vector_store.local_storage import shared_copy, storage_version
+from app.core.vector_store.vector_service import VectorStoreService
+
+
+@pytest.fixture
+def storage(tmp_path, encoder, write_corpus):
+    """Qdrant storage path, plus a function writing corpus files of Leo texts."""
+    return str(tmp_path / "qdrant"), lambda texts: write_corpus([("Leo", text) for text in texts])
+
+
+def open_service(path, **options):
+    return VectorStoreService(
+        enabled=True,
+        mode="disk",
+        qdrant_path=path,
+        follower_timeout=2.0,
+        follower_refresh_interval=0,
+        embedding_cache_size=0,
+        **options,
+    )
+
+
+def texts_found(service, query):
+    return {hit["text"] for hit in service.search(query, zodiac="Leo", top_k=5, score_threshold=0.0)}
+
+
+@pytest.fixture
+def services(storage):
+    """A writer and a follower of the same storage, closed afterwards."""
+    path, write_corpus = storage
+    opened = []
+
+    def open_pair(**options):
+        writer = open_service(path, **options)
+        opened.append(writer)
+        follower = open_service(path, **options)
+        opened.append(follower)
+        return writer, follower
+
+    yield open_pair, write_corpus, path
+    for service in reversed(opened):
+        service._close_local_storage()
+
+
+def test_second_process_follows_the_writer(services):
+    open_pair, write_corpus, _ = services
+    writer, follower = open_pair()
+    corpus = write_corpus(["leo leads with warmth", "leo loves the stage"])
+
+    assert not writer.read_only and follower.read_only
+    assert writer.sync_corpus(corpus)["added"] == 2
+    assert follower.sync_corpus(corpus) == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 2}
+    assert texts_found(follower, "leo warmth") == {"leo leads with warmth", "leo loves the stage"}
+
+
+def test_followers_share_one_copy_per_storage_version(services):
+    open_pair, write_corpus, path = services
+    writer, follower = open_pair()
+    writer.sync_corpus(write_corpus(["leo leads with warmth"]))
+    copies = follower._follower_copies
+
+    version, first = shared_copy(path, copies)
+    assert shared_copy(path, copies) == (version, first)
+
+    writer.sync_corpus(write_corpus(["leo leads with warmth", "leo loves the stage"]))
+    assert storage_version(path) != version
+    assert shared_copy(path, copies)[1] != first
+
+
+def test_shared_copy_waits_for_storage(tmp_path):
+    assert storage_version(str(tmp_path / "missing")) is None
+    assert shared_copy(str(tmp_path / "missing"), str(tmp_path / "copies")) is None
+
+
+@pytest.mark.parametrize("versioned", [False, True])
+def test_follower_picks_up_later_writes(services, versioned):
+    open_pair, write_corpus, _ = services
+    writer, follower = open_pair(versioned_collections=versioned, retrieval_mode="hybrid")
+    first = write_corpus(["leo leads with warmth"])
+    writer.load_corpus(first)
+    follower.load_corpus(first)
+
+    assert not follower.refresh_follower()
+
+    writer.load_corpus(write_corpus(["leo leads with warmth", "leo rules the zodiac stage"]))
+
+    assert "leo rules the zodiac stage" not in texts_found(follower, "zodiac stage")
+    assert follower.refresh_follower()
+    assert "leo rules the zodiac stage" in texts_found(follower, "zodiac stage")
+    # The keyword index is rebuilt from the followed storage as well
+    assert "leo rules the zodiac stage" in {payload["text"] for payload in follower.sparse_index.payloads}
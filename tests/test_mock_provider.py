@@ -0,0 +1,132 @@
+"""
+Tests for the mock provider's simulated latency, streaming and failures.
+"""
+import asyncio
+import random
+import statistics
+
+import pytest
+
+from app.core.llm.client import LLMClient
+from app.core.llm.providers import mock_provider
+from app.core.llm.providers.base_provider import ProviderError, RateLimitError
+from app.core.llm.providers.mock_provider import LatencyModel, MockProvider, parse_percentiles
+
+CALLS = 2000
+
+
+def observed_failures(provider_options, errors):
+    """Fraction of calls, one fresh LLMClient per call, that raise ``errors``."""
+    failures = 0
+    for _ in range(CALLS):
+        client = LLMClient(provider_name="mock", provider_options=provider_options)
+        try:
+            client.provider.generate("Generate an insight for Arjun, a Aries.")
+        except errors:
+            failures += 1
+    return failures / CALLS
+
+
+def test_error_rate_holds_across_clients():
+    rate = observed_failures({"error_rate": 0.2, "seed": 1234}, ProviderError)
+
+    assert abs(rate - 0.2) < 0.03
+
+
+def test_rate_limit_rate_holds_across_clients():
+    rate = observed_failures({"rate_limit_rate": 0.1, "seed": 4321}, RateLimitError)
+
+    assert abs(rate - 0.1) < 0.03
+
+
+def test_clients_with_the_same_options_share_a_provider():
+    options = {"error_rate": 0.5, "seed": 99}
+
+    assert LLMClient("mock", provider_options=options).provider is LLMClient("mock", provider_options=options).provider
+
+
+def sample_ms(model, n=5000):
+    return sorted(model.sample() * 1000 for _ in range(n))
+
+
+def percentile(samples, p):
+    return samples[int(len(samples) * p / 100)]
+
+
+def test_fixed_latency_is_constant():
+    assert set(sample_ms(LatencyModel("fixed", latency_ms=250), 100)) == {250.0}
+    assert LatencyModel("none", latency_ms=250).sample() == 0.0
+
+
+def test_lognormal_latency_has_the_configured_median_and_spread():
+    samples = sample_ms(LatencyModel("lognormal", latency_ms=800, sigma=0.5, rng=random.Random(7)))
+
+    assert statistics.median(samples) == pytest.approx(800, rel=0.05)
+    # p90 of a lognormal is median * exp(1.2816 * sigma)
+    assert percentile(samples, 90) == pytest.approx(800 * 1.898, rel=0.07)
+    assert min(samples) > 0
+
+
+def test_percentile_latency_reproduces_recorded_percentiles():
+    model = LatencyModel("percentiles", percentiles="50:800,90:1500,99:3000", rng=random.Random(11))
+    samples = sample_ms(model, 20000)
+
+    assert percentile(samples, 50) == pytest.approx(800, rel=0.03)
+    assert percentile(samples, 90) == pytest.approx(1500, rel=0.03)
+    assert percentile(samples, 95) == pytest.approx(1500 + 1500 * 5 / 9, rel=0.03)
+    # Clamped to the lowest and highest recorded points
+    assert samples[0] == 800 and samples[-1] == 3000
+
+
+def test_latency_configuration_is_validated():
+    assert parse_percentiles({50: 800}) == {50.0: 800.0}
+    with pytest.raises(ValueError):
+        LatencyModel("gaussian")
+    with pytest.raises(ValueError):
+        LatencyModel("percentiles")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record (instead of sleeping) the delays of sync and async streaming."""
+    recorded = []
+
+    async def fake_async_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(mock_provider.time, "sleep", recorded.append)
+    monkeypatch.setattr(mock_provider.asyncio, "sleep", fake_async_sleep)
+    return recorded
+
+
+def test_stream_waits_for_first_token_then_between_tokens(sleeps):
+    provider = MockProvider(latency_mode="fixed", latency_ms=500, token_delay_ms=20, seed=3)
+
+    chunks = list(provider.stream("Generate an insight for a Leo."))
+
+    assert len(chunks) > 3
+    assert sleeps == [0.5] + [0.02] * (len(chunks) - 1)
+    assert "".join(chunks) == " ".join(chunk.strip() for chunk in chunks)
+
+
+def test_async_stream_matches_sync_stream(sleeps):
+    prompt = "Generate an insight for a Leo."
+    sync_chunks = list(MockProvider(latency_mode="fixed", latency_ms=500, token_delay_ms=20, seed=3).stream(prompt))
+    sync_sleeps = list(sleeps)
+    sleeps.clear()
+
+    async def collect():
+        provider = MockProvider(latency_mode="fixed", latency_ms=500, token_delay_ms=20, seed=3)
+        return [chunk async for chunk in provider.astream(prompt)]
+
+    assert asyncio.run(collect()) == sync_chunks
+    assert sleeps == sync_sleeps
+
+
+def test_max_tokens_caps_streamed_words(sleeps):
+    provider = MockProvider(seed=5)
+
+    assert len(list(provider.stream("Leo", max_tokens=4))) == 4
+    assert len(provider.generate("Leo", max_tokens=4).split()) == 4
+    assert len(asyncio.run(provider.agenerate("Leo", max_tokens=4)).split()) == 4
+    assert sleeps == []
@@ -0,0 +1,129 @@
+"""
+Tests for the ONNX Runtime embedding backend.
+
+The parity tests compare against sentence-transformers on PyTorch. They
+run on ``EMBEDDING_TEST_MODEL`` (a model name or local path; default
+all-MiniLM-L6-v2) and are skipped unless that model is available locally,
+as exporting it needs torch and transformers and downloading needs network.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.vector_store.encoders.onnx_encoder import OnnxEncoder
+
+MODEL = os.environ.get("EMBEDDING_TEST_MODEL", "all-MiniLM-L6-v2")
+
+# The fp32 graph computes the same function as PyTorch, up to float error
+FP32_SCORE_TOLERANCE = 1e-4
+# Dynamic int8 quantization of the weights shifts cosine scores; for
+# MiniLM-sized models by about 0.01-0.03, so 0.05 leaves some headroom
+INT8_SCORE_TOLERANCE = 0.05
+
+QUERIES = [
+    "Daily guidance and personality insights for Leo",
+    "Which planet rules Aries?",
+]
+DOCUMENTS = [
+    "Leo leads with warmth, generosity and a flair for the dramatic.",
+    "Mars, the planet of action, rules Aries.",
+    "Taurus finds patience rewarded in slow, steady work.",
+    "Water signs trust their intuition.",
+]
+
+
+def model_available(model):
+    if Path(model).is_dir():
+        return True
+    from huggingface_hub import try_to_load_from_cache
+
+    repo_id = model if "/" in model else f"sentence-transformers/{model}"
+    return isinstance(try_to_load_from_cache(repo_id, "config.json"), str)
+
+
+@pytest.fixture(scope="module")
+def encoders(tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("sentence_transformers")
+    if not model_available(MODEL):
+        pytest.skip(f"Embedding model {MODEL} is not available locally")
+
+    from app.core.vector_store.encoders import SentenceTransformerEncoder
+
+    export_dir = str(tmp_path_factory.mktemp("onnx"))
+    return {
+        "torch": SentenceTransformerEncoder(MODEL, device="cpu"),
+        "fp32": OnnxEncoder(MODEL, quantize=False, export_dir=export_dir),
+        "int8": OnnxEncoder(MODEL, quantize=True, export_dir=export_dir),
+    }
+
+
+def scores(encoder):
+    """Cosine scores of every query against every document."""
+    queries = encoder.encode(QUERIES)
+    documents = encoder.encode(DOCUMENTS, batch_size=2)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    documents /= np.linalg.norm(documents, axis=1, keepdims=True)
+    return queries @ documents.T
+
+
+def test_fp32_scores_match_sentence_transformers(encoders):
+    expected = scores(encoders["torch"])
+
+    assert encoders["fp32"].dimension == encoders["torch"].dimension
+    assert np.abs(scores(encoders["fp32"]) - expected).max() < FP32_SCORE_TOLERANCE
+
+
+def test_int8_scores_match_sentence_transformers_loosely(encoders):
+    expected = scores(encoders["torch"])
+
+    assert np.abs(scores(encoders["int8"]) - expected).max() < INT8_SCORE_TOLERANCE
+
+
+def test_single_text_encodes_like_a_batch(encoders):
+    encoder = encoders["fp32"]
+
+    single = encoder.encode(DOCUMENTS[0])
+    assert single.shape == (encoder.dimension,)
+    assert np.allclose(single, encoder.encode(DOCUMENTS)[0], atol=1e-6)
+
+
+def test_cache_keys_separate_backends_and_precisions(encoders):
+    keys = {encoder.cache_key for encoder in encoders.values()}
+
+    assert len(keys) == 3
+
+
+def pooling_encoder(mode):
+    """Encoder with only its pooling configured (no model, no session)."""
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder.pooling_mode = mode
+    return encoder
+
+
+# Two texts of 3 tokens; the second has one padding token, whose values
+# would win the max and skew the mean if it were not masked
+TOKENS = np.array([
+    [[1.0, -1.0], [3.0, 0.0], [2.0, 4.0]],
+    [[-2.0, 5.0], [0.0, 1.0], [9.0, 9.0]],
+], dtype=np.float32)
+MASK = np.array([[1, 1, 1], [1, 1, 0]], dtype=np.int64)
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("cls", [[1.0, -1.0], [-2.0, 5.0]]),
+    ("max", [[3.0, 4.0], [0.0, 5.0]]),
+    ("mean", [[2.0, 1.0], [-1.0, 3.0]]),
+])
+def test_pooling_ignores_padding(mode, expected):
+    pooled = pooling_encoder(mode)._pool(TOKENS, MASK)
+
+    assert np.allclose(pooled, expected)
+
+
+def test_mean_pooling_of_an_all_padding_row_is_zero():
+    pooled = pooling_encoder("mean")._pool(TOKENS[:1], np.zeros((1, 3), dtype=np.int64))
+
+    assert np.allclose(pooled, 0.0)
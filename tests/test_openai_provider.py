@@ -0,0 +1,155 @@
+"""
+Tests for the OpenAI provider lifecycle and usage accounting (no network calls are made).
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from app.config.settings import Settings
+from app.core.llm.client import LLMClient
+from app.core.llm.providers.base_provider import RateLimitError
+from app.core.llm.providers.openai_provider import (
+    SYSTEM_PROMPT,
+    OpenAIProvider,
+    close_openai_providers,
+    get_openai_provider,
+)
+
+
+def test_clients_share_one_provider_per_key_and_model():
+    first = LLMClient("openai", api_key="sk-test", model="gpt-4o-mini")
+    second = LLMClient("openai", api_key="sk-test", model="gpt-4o-mini")
+    other_model = LLMClient("openai", api_key="sk-test", model="gpt-4o")
+
+    assert first.provider is second.provider
+    assert first.provider is not other_model.provider
+    asyncio.run(close_openai_providers())
+
+
+def test_close_releases_clients_and_forgets_providers():
+    provider = get_openai_provider("sk-test", "gpt-4o-mini")
+    asyncio.run(close_openai_providers())
+
+    assert provider.client.is_closed()
+    assert provider.async_client.is_closed()
+    assert get_openai_provider("sk-test", "gpt-4o-mini") is not provider
+    asyncio.run(close_openai_providers())
+
+
+class FakeStream:
+    """Streamed chat completion: one content chunk per token, then usage."""
+
+    def __init__(self, tokens, usage):
+        self.chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            for token in tokens
+        ] + [SimpleNamespace(usage=usage, choices=[])]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def fake_provider(tokens, usage):
+    provider = OpenAIProvider(api_key="sk-test", model="gpt-4o-mini")
+    provider.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **request: FakeStream(tokens, usage)))
+    )
+    return provider
+
+
+REPORTED_USAGE = SimpleNamespace(
+    prompt_tokens=120, completion_tokens=6, prompt_tokens_details=SimpleNamespace(cached_tokens=64)
+)
+TOKENS = ["Today", " is", " bright.", " Stay", " calm.", " Rest."]
+
+
+def test_stream_read_to_the_end_uses_reported_usage():
+    result = fake_provider(TOKENS, REPORTED_USAGE).generate_result("prompt", stop=lambda chunk: None)
+
+    assert (result.prompt_tokens, result.completion_tokens, result.cached_tokens) == (120, 6, 64)
+    assert not result.estimated_usage
+
+
+def test_stopped_stream_estimates_usage_including_the_system_prompt():
+    provider = fake_provider(TOKENS, REPORTED_USAGE)
+    result = provider.generate_result(
+        "prompt", stop=lambda chunk: "Today is bright." if chunk.endswith(".") else None
+    )
+
+    assert result.stopped_early and result.estimated_usage
+    assert result.completion_tokens == 3
+    assert result.prompt_tokens > provider.token_counter.count(SYSTEM_PROMPT) + provider.token_counter.count("prompt")
+
+
+def test_mock_calls_are_labelled_mock_not_an_openai_model():
+    assert Settings(llm_provider="mock").get_model("mock") is None
+
+    result = LLMClient("mock", model=None).generate_result("Generate an insight for Arjun, a Aries.")
+    assert result.model == "mock"
+    assert result.estimated_usage
+
+    fallback = LLMClient("openai", api_key=None, model="gpt-4o-mini")
+    assert (fallback.provider_name, fallback.generate_result("prompt").model) == ("mock", "mock")
+
+
+def rate_limited(headers):
+    import openai
+
+    response = SimpleNamespace(status_code=429, headers=headers, request=None)
+    return openai.RateLimitError("Rate limit reached for gpt-4o-mini", response=response, body=None)
+
+
+def failing_provider(error):
+    def create(**request):
+        raise error
+
+    provider = OpenAIProvider(api_key="sk-test", model="gpt-4o-mini")
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return provider
+
+
+@pytest.mark.parametrize("stop", [None, lambda chunk: None])
+def test_rate_limit_responses_become_rate_limit_errors(stop):
+    error = rate_limited({"retry-after": "7"})
+
+    with pytest.raises(RateLimitError) as raised:
+        failing_provider(error).generate_result("prompt", stop=stop)
+
+    assert raised.value.retry_after == 7.0
+    assert raised.value.__cause__ is error
+
+
+def test_rate_limit_retry_after_prefers_milliseconds():
+    with pytest.raises(RateLimitError) as raised:
+        failing_provider(rate_limited({"retry-after-ms": "1500", "retry-after": "2"})).generate("prompt")
+
+    assert raised.value.retry_after == 1.5
+
+
+def test_rate_limit_reaches_llm_client_callers():
+    client = LLMClient("openai", api_key="sk-test", model="gpt-4o-mini")
+    client.provider = failing_provider(rate_limited({}))
+
+    with pytest.raises(RateLimitError) as raised:
+        client.generate_insight("prompt")
+    assert raised.value.retry_after is None
+    asyncio.run(close_openai_providers())
+
+
+def test_other_api_errors_stay_generic_failures():
+    error = ValueError("bad request")
+
+    with pytest.raises(Exception, match="Failed to generate insight: bad request") as raised:
+        failing_provider(error).generate("prompt")
+
+    assert not isinstance(raised.value, RateLimitError)
+    assert raised.value.__cause__ is error
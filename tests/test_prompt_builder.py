@@ -0,0 +1,151 @@
+"""
+Tests for insight prompt assembly.
+"""
+from datetime import date
+
+from app.core.llm.context import format_context
+from app.core.llm.prompt_builder import PromptBuilder, get_static_prefix
+from app.core.zodiac.traits import ZODIAC_TRAITS
+from app.services.insight_service import InsightService
+
+TODAY = date(2026, 10, 19)
+BIRTH_DATE = date(1995, 8, 20)
+
+PASSAGES = [
+    {"text": "mid passage about courage", "score": 0.6},
+    {"text": "best passage about leadership", "score": 0.9},
+    {"text": "worst passage about rest", "score": 0.2},
+]
+
+
+class WordCounter:
+    """Token counter stand-in: one token per whitespace-separated word."""
+
+    def count(self, text):
+        return len(text.split())
+
+
+def assemble(max_input_tokens=None, layout="standard", word_range=(30, 50), name="Arjun", sign="Leo", **kwargs):
+    builder = PromptBuilder(
+        token_counter=WordCounter(), max_input_tokens=max_input_tokens, layout=layout, word_range=word_range
+    )
+    return builder.assemble_insight_prompt(
+        name=name,
+        zodiac_sign=sign,
+        traits=ZODIAC_TRAITS[sign],
+        birth_date=BIRTH_DATE,
+        current_date=TODAY,
+        **kwargs,
+    )
+
+
+def test_lowest_scoring_passages_are_dropped_first():
+    untrimmed = assemble(context_passages=PASSAGES)
+    # Room for everything but the last passage line ("3. worst passage about rest")
+    result = assemble(max_input_tokens=untrimmed["total_tokens"] - 5, context_passages=PASSAGES)
+
+    assert result["dropped_passages"] == 1
+    assert "worst passage" not in result["prompt"]
+    assert "1. best passage about leadership" in result["prompt"]
+    assert "2. mid passage about courage" in result["prompt"]
+    assert result["total_tokens"] <= untrimmed["total_tokens"] - 5
+
+
+def test_dropping_every_passage_leaves_the_prompt_without_context():
+    bare = assemble()
+    result = assemble(max_input_tokens=bare["total_tokens"] - 1, context_passages=PASSAGES)
+
+    assert result["dropped_passages"] == len(PASSAGES)
+    assert result["prompt"] == bare["prompt"]
+    assert "Relevant Astrological Knowledge" not in result["prompt"]
+    assert result["token_counts"]["context"] == 0
+
+
+def test_prompt_without_context_is_never_trimmed():
+    bare = assemble()
+    result = assemble(max_input_tokens=5)
+
+    assert result["prompt"] == bare["prompt"]
+    assert result["dropped_passages"] == 0
+    assert result["prompt"].endswith("Generate the insight:")
+
+
+def test_additional_context_is_kept_or_dropped_whole():
+    context = format_context(PASSAGES)
+    bare = assemble()
+
+    kept = assemble(max_input_tokens=bare["total_tokens"] + 100, additional_context=context)
+    dropped = assemble(max_input_tokens=bare["total_tokens"] + 5, additional_context=context)
+
+    assert context in kept["prompt"] and kept["dropped_passages"] == 0
+    assert dropped["prompt"] == bare["prompt"] and dropped["dropped_passages"] == 1
+
+
+def test_no_budget_disables_trimming():
+    result = assemble(max_input_tokens=None, context_passages=PASSAGES * 50)
+
+    assert result["dropped_passages"] == 0
+    assert result["prompt"].count("worst passage about rest") == 50
+
+
+def test_prefix_layout_keeps_the_standard_content():
+    standard = assemble(context_passages=PASSAGES)["prompt"]
+    prefix = assemble(layout="prefix", context_passages=PASSAGES)["prompt"]
+    traits = ZODIAC_TRAITS["Leo"]
+
+    facts = [
+        "Arjun",
+        "- Sign: Leo",
+        f"- Element: {traits['element']}",
+        f"- Ruling Planet: {traits['ruling_planet']}",
+        f"- Key Traits: {', '.join(traits['positive_traits'][:3])}",
+        f"- Keywords: {', '.join(traits['keywords'][:3])}",
+        "October 19, 2026",
+        "(30-50 words)",
+        "3. Be positive and actionable",
+        "6. Avoid generic predictions",
+        format_context(sorted(PASSAGES, key=lambda p: p["score"], reverse=True)),
+    ]
+    for fact in facts:
+        assert fact in standard and fact in prefix, fact
+
+
+def test_prefix_layout_orders_static_content_first():
+    result = assemble(layout="prefix", context_passages=PASSAGES)
+    prompt = result["prompt"]
+
+    assert prompt.startswith(get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (30, 50)))
+    assert prompt.index("Relevant Astrological Knowledge") < prompt.index("Date:") < prompt.index("Name: Arjun")
+    assert set(result["token_counts"]) == {"prefix", "context", "suffix"}
+    assert result["name_slots"] == 2
+
+
+def test_users_of_a_sign_share_the_static_prefix():
+    first = assemble(layout="prefix", name="Arjun", context_passages=PASSAGES)["prompt"]
+    second = assemble(layout="prefix", name="Meera", context_passages=PASSAGES[:1])["prompt"]
+    prefix = get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (30, 50))
+
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert "Arjun" not in prefix
+
+
+def test_static_prefixes_are_keyed_by_sign_and_word_range():
+    leo = get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (30, 50))
+
+    assert get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (30, 50)) is leo
+    longer = get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (60, 80))
+    assert "(60-80 words)" in longer and "(30-50 words)" in leo
+    assert get_static_prefix("Aries", ZODIAC_TRAITS["Aries"], (30, 50)) != leo
+    assert assemble(layout="prefix", word_range=(60, 80))["prompt"].startswith(longer)
+
+
+def test_prompts_are_the_same_for_every_language():
+    service = InsightService(llm_provider="mock", prompt_layout="prefix", translation_enabled=True, translation_mock=True)
+    english = service.prepare_prompt("Arjun", "1995-08-20", "14:30", "Jaipur, India", "en")
+    hindi = service.prepare_prompt("Arjun", "1995-08-20", "14:30", "Jaipur, India", "hi")
+
+    # Insights are generated in English and translated afterwards, so the
+    # static prefix (and the whole prompt) does not depend on the language
+    assert hindi["language"] == "hi"
+    assert hindi["prompt"] == english["prompt"]
+    assert english["prompt"].startswith(get_static_prefix("Leo", ZODIAC_TRAITS["Leo"], (30, 50)))
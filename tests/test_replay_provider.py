@@ -0,0 +1,130 @@
+"""
+Tests for the record/replay cassette and provider wrapper.
+"""
+import asyncio
+
+import pytest
+
+from app.core.llm.providers import replay_provider
+from app.core.llm.providers.base_provider import ProviderError
+from app.core.llm.providers.mock_provider import MockProvider
+from app.core.llm.providers.replay_provider import Cassette, RecordReplayProvider
+
+PROMPT = "Generate an insight for Arjun, a Leo."
+
+
+def test_records_survive_reopening(tmp_path):
+    path = tmp_path / "calls.cassette"
+    key = Cassette.make_key("prompt", {"model": "m"})
+    Cassette(str(path)).put(key, {"text": "first"})
+    Cassette(str(path)).put(key, {"text": "second"})
+
+    cassette = Cassette(str(path))
+    assert len(cassette) == 1
+    assert cassette.get(key) == {"text": "second"}
+
+
+def test_partial_trailing_line_is_dropped_before_appending(tmp_path):
+    path = tmp_path / "calls.cassette"
+    kept = Cassette.make_key("kept", {})
+    Cassette(str(path)).put(kept, {"text": "kept"})
+    # Simulate a write interrupted mid-line
+    with open(path, "ab") as f:
+        f.write(Cassette.make_key("lost", {}).hex().encode("ascii") + b'\t{"text": "lo')
+
+    added = Cassette.make_key("added", {})
+    Cassette(str(path)).put(added, {"text": "added"})
+
+    cassette = Cassette(str(path))
+    assert len(cassette) == 2
+    assert cassette.get(kept) == {"text": "kept"}
+    assert cassette.get(added) == {"text": "added"}
+    assert Cassette.make_key("lost", {}) not in cassette
+
+
+def wrap(path, mode, **options):
+    return RecordReplayProvider(MockProvider(seed=1), Cassette(str(path)), mode=mode, **options)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record (instead of sleeping) the delays of replays."""
+    recorded = []
+
+    async def fake_async_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(replay_provider.time, "sleep", recorded.append)
+    monkeypatch.setattr(replay_provider.asyncio, "sleep", fake_async_sleep)
+    return recorded
+
+
+def test_replay_serves_what_record_recorded(tmp_path, sleeps):
+    path = tmp_path / "calls.cassette"
+    recorded = wrap(path, "record").generate_result(PROMPT, max_tokens=20)
+
+    replay = wrap(path, "replay", replay_timing=False)
+    replayed = replay.generate_result(PROMPT, max_tokens=20)
+
+    assert replayed.text == recorded.text
+    assert replayed.model == recorded.model
+    assert asyncio.run(replay.agenerate(PROMPT, max_tokens=20)) == recorded.text
+    assert sleeps == []
+
+
+def test_record_mode_always_calls_the_provider(tmp_path):
+    path = tmp_path / "calls.cassette"
+    provider = wrap(path, "record")
+    first = provider.generate(PROMPT)
+    second = provider.generate(PROMPT)
+
+    assert first != second
+    assert wrap(path, "replay", replay_timing=False).generate(PROMPT) == second
+
+
+def test_replay_miss_raises(tmp_path):
+    provider = wrap(tmp_path / "calls.cassette", "replay")
+    wrap(tmp_path / "calls.cassette", "record").generate(PROMPT, max_tokens=20)
+
+    with pytest.raises(ProviderError):
+        provider.generate("An unrecorded prompt")
+    with pytest.raises(ProviderError):
+        # Generation parameters are part of the key
+        provider.generate(PROMPT, max_tokens=10)
+    with pytest.raises(ProviderError):
+        asyncio.run(provider.agenerate("An unrecorded prompt"))
+
+
+def test_auto_mode_records_misses_and_replays_hits(tmp_path):
+    path = tmp_path / "calls.cassette"
+    provider = wrap(path, "auto", replay_timing=False)
+    first = provider.generate(PROMPT)
+
+    assert provider.generate(PROMPT) == first
+    assert asyncio.run(provider.agenerate(PROMPT)) == first
+    assert len(Cassette(str(path))) == 1
+
+
+def test_replay_sleeps_for_the_scaled_recorded_latency(tmp_path, sleeps):
+    path = tmp_path / "calls.cassette"
+    key = Cassette.make_key(PROMPT, {"max_tokens": None})
+    Cassette(str(path)).put(key, {"response": "Recorded insight.", "latency": 0.25})
+
+    result = wrap(path, "replay", timing_scale=2.0).generate_result(PROMPT)
+    asyncio.run(wrap(path, "replay", timing_scale=0.5).agenerate(PROMPT))
+    wrap(path, "replay", replay_timing=False).generate(PROMPT)
+
+    assert result.text == "Recorded insight."
+    assert result.latency == 0.5
+    assert sleeps == [0.5, 0.125]
+
+
+def test_stop_trims_replayed_completions(tmp_path, sleeps):
+    path = tmp_path / "calls.cassette"
+    key = Cassette.make_key(PROMPT, {"max_tokens": None})
+    Cassette(str(path)).put(key, {"response": "First sentence. Second sentence.", "latency": 0.0})
+
+    result = wrap(path, "replay").generate_result(PROMPT, stop=lambda text: text.split(" Second")[0])
+
+    assert result.text == "First sentence."
+    assert result.stopped_early
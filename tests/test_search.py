@@ -0,0 +1,301 @@
+"""
+Tests for vector store search: batched, async and zodiac-filtered.
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.core.vector_store.retrieval import zodiac_filter_values
+from app.core.vector_store.vector_service import VectorStoreService
+
+TEXTS = [
+    ("Leo", "leo leads with warmth and courage"),
+    ("Leo", "leo loves the stage and applause"),
+    ("Aries", "aries acts first with courage"),
+    ("Fire Signs", "fire signs share warmth and courage"),
+    ("Taurus", "taurus values patience and comfort"),
+]
+
+QUERIES = ["warmth and courage", "patience and comfort", "stage applause", "warmth and courage"]
+ZODIACS = ["Leo", None, "Leo", "Aries"]
+
+
+@pytest.fixture(params=["memory", "numpy"])
+def service(request, encoder, write_corpus):
+    service = VectorStoreService(
+        enabled=True, mode=request.param, embedding_cache_size=0, context_cache_enabled=False
+    )
+    service.load_corpus(write_corpus(TEXTS))
+    return service
+
+
+def texts(results):
+    return [hit["text"] for hit in results]
+
+
+def test_search_many_matches_one_search_per_query(service):
+    batched = service.search_many(QUERIES, ZODIACS, top_k=2, score_threshold=0.1)
+
+    assert len(batched) == len(QUERIES)
+    for query, zodiac, results in zip(QUERIES, ZODIACS, batched):
+        expected = service.search(query, zodiac=zodiac, top_k=2, score_threshold=0.1)
+        assert texts(results) == texts(expected)
+        assert [hit["score"] for hit in results] == pytest.approx([hit["score"] for hit in expected], abs=1e-5)
+    assert texts(batched[1])[0] == "taurus values patience and comfort"
+    assert {hit["zodiac"] for hit in batched[3]} == {"Aries"}
+
+
+def test_search_many_encodes_once_and_searches_once(service, encoder, monkeypatch):
+    searches = []
+    dense_hits = service._dense_hits
+    monkeypatch.setattr(
+        service, "_dense_hits", lambda *args: searches.append(len(args[0])) or dense_hits(*args)
+    )
+    calls = len(encoder.calls)
+
+    service.search_many(QUERIES, ZODIACS, top_k=2)
+
+    # The repeated query is encoded once
+    assert encoder.calls[calls:] == [list(dict.fromkeys(QUERIES))]
+    assert searches == [len(QUERIES)]
+
+
+def test_search_many_without_filters(service):
+    batched = service.search_many(["warmth and courage"], top_k=5, score_threshold=0.1)
+
+    assert {hit["zodiac"] for hit in batched[0]} >= {"Leo", "Aries", "Fire Signs"}
+
+
+def test_search_many_edge_cases(service):
+    assert service.search_many([]) == []
+    with pytest.raises(ValueError):
+        service.search_many(QUERIES, ["Leo"])
+
+
+def test_unavailable_store_returns_empty_lists():
+    service = VectorStoreService(enabled=False)
+
+    assert service.search_many(QUERIES) == [[], [], [], []]
+
+
+def test_async_search_matches_sync_search(service):
+    batched = asyncio.run(service.asearch_many(QUERIES, ZODIACS, top_k=2, score_threshold=0.1))
+    single = asyncio.run(service.asearch(QUERIES[0], zodiac="Leo", top_k=2, score_threshold=0.1))
+
+    assert [texts(results) for results in batched] == [
+        texts(results) for results in service.search_many(QUERIES, ZODIACS, top_k=2, score_threshold=0.1)
+    ]
+    assert texts(single) == texts(batched[0])
+
+
+def test_async_search_keeps_blocking_work_off_the_event_loop(service, encoder, monkeypatch):
+    threads = {}
+
+    def spy(name, function):
+        def call(*args, **kwargs):
+            threads[name] = threading.current_thread()
+            return function(*args, **kwargs)
+        return call
+
+    monkeypatch.setattr(encoder, "encode", spy("encode", encoder.encode))
+    monkeypatch.setattr(service, "_qdrant_search_batch", spy("search", service._qdrant_search_batch))
+
+    asyncio.run(service.asearch_many(QUERIES, ZODIACS))
+
+    assert threads["encode"] is not threading.main_thread()
+    if service.index is None:
+        # In-memory Qdrant has no async client: its search runs in a worker thread
+        assert threads["search"] is not threading.main_thread()
+    else:
+        # The NumPy index is searched in place
+        assert "search" not in threads
+
+
+class AsyncClientOverLocal:
+    """Stand-in for the async server client, serving the in-memory client's data."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+        self.closed = False
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            self.calls.append(name)
+            return method(*args, **kwargs)
+
+        return call
+
+    async def close(self):
+        self.closed = True
+
+
+def test_server_mode_reuses_one_async_client(encoder, write_corpus, monkeypatch):
+    import qdrant_client
+
+    service = VectorStoreService(enabled=True, mode="memory", embedding_cache_size=0, context_cache_enabled=False)
+    service.load_corpus(write_corpus(TEXTS))
+    created = []
+
+    def connect(**options):
+        created.append(options)
+        return AsyncClientOverLocal(service.client)
+
+    monkeypatch.setattr(qdrant_client, "AsyncQdrantClient", connect)
+    # As if connected to a server
+    service._client_options = {"url": "http://qdrant:6333", "prefer_grpc": True}
+
+    first = asyncio.run(service.asearch_many(QUERIES, ZODIACS, top_k=2, score_threshold=0.1))
+    second = asyncio.run(service.asearch("stage applause", zodiac="Leo", top_k=2, score_threshold=0.1))
+    client = service.async_client
+
+    assert created == [{"url": "http://qdrant:6333", "prefer_grpc": True}]
+    # One batched request per call
+    assert len(client.calls) == 2 and len(set(client.calls)) == 1
+    assert [texts(results) for results in first] == [
+        texts(results) for results in service.search_many(QUERIES, ZODIACS, top_k=2, score_threshold=0.1)
+    ]
+    assert texts(second) == texts(first[2])
+
+    asyncio.run(service.aclose())
+    assert client.closed and service.async_client is None
+
+
+def test_async_sparse_search_needs_no_encoder(write_corpus):
+    service = VectorStoreService(enabled=True, retrieval_mode="sparse", context_cache_enabled=False)
+    service.load_corpus(write_corpus(TEXTS))
+
+    results = asyncio.run(service.asearch_many(["patience", "courage"], ["Taurus", "Aries"]))
+
+    assert service.encoder is None
+    assert [texts(hits) for hits in results] == [["taurus values patience and comfort"], ["aries acts first with courage"]]
+
+
+def test_async_search_errors_return_empty_lists(service, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(service, "_encode_queries", fail)
+
+    assert asyncio.run(service.asearch_many(QUERIES[:2])) == [[], []]
+
+
+def test_zodiac_filter_values():
+    assert zodiac_filter_values("Leo") == ["Leo"]
+    assert zodiac_filter_values("Leo", include_groups=True) == ["Leo", "Fire Signs", "Fixed Signs"]
+    assert zodiac_filter_values("Unknown", include_groups=True) == ["Unknown"]
+
+
+def test_qdrant_filters_match_one_value_or_any_group(encoder):
+    from qdrant_client.models import MatchAny, MatchValue
+
+    plain = VectorStoreService(enabled=True, mode="memory", context_cache_enabled=False)
+    groups = VectorStoreService(enabled=True, mode="memory", context_cache_enabled=False, zodiac_filter_groups=True)
+
+    assert plain._qdrant_filter(None) is None
+    condition = plain._qdrant_filter("Leo").must[0]
+    assert condition.key == "zodiac" and condition.match == MatchValue(value="Leo")
+    condition = groups._qdrant_filter("Leo").must[0]
+    assert condition.match == MatchAny(any=["Leo", "Fire Signs", "Fixed Signs"])
+
+
+@pytest.mark.parametrize("mode", ["memory", "numpy"])
+def test_group_filters_include_the_signs_element_and_modality(mode, encoder, write_corpus):
+    corpus = write_corpus(TEXTS + [("Fixed Signs", "fixed signs hold warmth and courage steady")])
+    found = {}
+    for include_groups in (False, True):
+        service = VectorStoreService(
+            enabled=True, mode=mode, context_cache_enabled=False, zodiac_filter_groups=include_groups
+        )
+        service.load_corpus(corpus)
+        hits = service.search("warmth and courage", zodiac="Leo", top_k=10, score_threshold=0.0)
+        found[include_groups] = {hit["zodiac"] for hit in hits}
+
+    assert found[False] == {"Leo"}
+    assert found[True] == {"Leo", "Fire Signs", "Fixed Signs"}
+
+
+def payload_index_calls(service, monkeypatch, existing=None):
+    """Record the payload indexes a (server-mode) service creates."""
+    calls = []
+    monkeypatch.setattr(service, "_client_options", {"url": "http://qdrant:6333"})
+    monkeypatch.setattr(
+        service.client, "get_collection", lambda name: SimpleNamespace(payload_schema=dict(existing or {}))
+    )
+
+    def create_payload_index(**kwargs):
+        calls.append((kwargs["field_name"], kwargs["field_schema"]))
+
+    monkeypatch.setattr(service.client, "create_payload_index", create_payload_index)
+    service._create_payload_indexes()
+    return calls
+
+
+def test_server_collections_get_keyword_payload_indexes(encoder, monkeypatch):
+    from qdrant_client.models import PayloadSchemaType
+
+    service = VectorStoreService(enabled=True, mode="memory", context_cache_enabled=False)
+
+    assert payload_index_calls(service, monkeypatch) == [
+        ("zodiac", PayloadSchemaType.KEYWORD),
+        ("category", PayloadSchemaType.KEYWORD),
+    ]
+    # Existing indexes are left alone
+    assert payload_index_calls(service, monkeypatch, existing={"zodiac": "keyword"}) == [
+        ("category", PayloadSchemaType.KEYWORD),
+    ]
+
+
+def test_partitioned_collections_index_zodiac_as_tenant(encoder, monkeypatch):
+    service = VectorStoreService(enabled=True, mode="memory", context_cache_enabled=False, partition_by_zodiac=True)
+
+    (field, schema), _ = payload_index_calls(service, monkeypatch)
+
+    assert field == "zodiac" and schema.is_tenant
+
+
+def test_local_collections_skip_payload_indexes(encoder, monkeypatch):
+    service = VectorStoreService(enabled=True, mode="memory", context_cache_enabled=False)
+    monkeypatch.setattr(service.client, "create_payload_index", lambda **kwargs: pytest.fail("indexed locally"))
+
+    service._create_payload_indexes()
+
+
+def test_collection_tuning_reaches_qdrant(encoder, write_corpus, monkeypatch):
+    service = VectorStoreService(
+        enabled=True,
+        mode="memory",
+        context_cache_enabled=False,
+        collection_options={"hnsw_m": 8, "quantization": "int8", "search_ef": 64, "quantization_oversampling": 2.0},
+    )
+    created = []
+    create_collection = service.client.create_collection
+    monkeypatch.setattr(
+        service.client, "create_collection", lambda **kwargs: created.append(kwargs) or create_collection(**kwargs)
+    )
+    service.load_corpus(write_corpus(TEXTS))
+
+    # Local Qdrant accepts but ignores tuning, so check what it was given
+    (config,) = created
+    params = service._search_params()
+    assert config["hnsw_config"].m == 8 and config["hnsw_config"].ef_construct is None
+    assert config["quantization_config"].scalar.type == "int8"
+    assert params.hnsw_ef == 64 and params.quantization.oversampling == 2.0 and params.quantization.rescore
+    assert texts(service.search("patience and comfort", top_k=1)) == ["taurus values patience and comfort"]
+
+
+def test_default_collections_use_qdrant_search_defaults(service):
+    assert service._search_params() is None
+
+
+def test_invalid_quantization_is_rejected(encoder):
+    service = VectorStoreService(enabled=True, mode="memory", collection_options={"quantization": "int4"})
+
+    with pytest.raises(ValueError, match="Invalid quantization"):
+        service._collection_config()
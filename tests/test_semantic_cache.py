@@ -0,0 +1,105 @@
+"""
+Tests for the semantic response cache.
+"""
+import zlib
+
+import numpy as np
+import pytest
+
+from app.core.llm import semantic_cache as semantic_cache_module
+from app.core.llm.semantic_cache import SemanticResponseCache
+from app.services.insight_service import InsightService
+
+SCOPE = ("Leo", "2026-10-19", "en", (30, 50))
+
+
+def embed(text):
+    """Normalized bag-of-words hashing embedding: texts sharing words are similar."""
+    vector = np.zeros(256, dtype=np.float32)
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode("utf-8")) % len(vector)] += 1.0
+    return vector / np.linalg.norm(vector)
+
+
+class Clock:
+    """Stand-in for the time module with a settable clock."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(semantic_cache_module, "time", clock)
+    return clock
+
+
+def test_similar_prompt_hits_and_dissimilar_prompt_misses():
+    cache = SemanticResponseCache(embed, threshold=0.8)
+    cache.store("leo insight for today with warmth and courage", "cached", SCOPE)
+
+    assert cache.lookup("leo insight for today with warmth and courage", SCOPE) == "cached"
+    # 7 of 8 words shared: cosine 0.875
+    assert cache.lookup("leo insight for today with warmth and patience", SCOPE) == "cached"
+    # 4 of 8 words shared: cosine 0.5
+    assert cache.lookup("leo insight for today about money and travel", SCOPE) is None
+
+
+def test_threshold_is_inclusive():
+    vectors = {"a": np.array([1.0, 0.0]), "b": np.array([0.9, np.sqrt(1 - 0.81)])}
+    cache = SemanticResponseCache(lambda text: vectors[text], threshold=0.9)
+    cache.store("a", "cached", SCOPE)
+
+    assert cache.lookup("b", SCOPE) == "cached"
+    cache.threshold = 0.91
+    assert cache.lookup("b", SCOPE) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticResponseCache(embed, ttl=60)
+    cache.store("leo insight", "cached", SCOPE)
+
+    clock.now += 59
+    assert cache.lookup("leo insight", SCOPE) == "cached"
+    clock.now += 1
+    assert cache.lookup("leo insight", SCOPE) is None
+    assert len(cache) == 0
+
+
+def test_oldest_entries_are_evicted_at_max_entries():
+    cache = SemanticResponseCache(embed, max_entries=2)
+    cache.store("first prompt", "1", SCOPE)
+    cache.store("second prompt", "2", SCOPE)
+    cache.store("third prompt", "3", ("Aries",))
+
+    assert len(cache) == 2
+    assert cache.lookup("first prompt", SCOPE) is None
+    assert cache.lookup("second prompt", SCOPE) == "2"
+    assert cache.lookup("third prompt", ("Aries",)) == "3"
+
+
+def test_scopes_are_separate():
+    cache = SemanticResponseCache(embed)
+    cache.store("leo insight", "english", SCOPE)
+
+    assert cache.lookup("leo insight", ("Leo", "2026-10-19", "hi", (30, 50))) is None
+    assert cache.lookup("leo insight", ("Leo", "2026-10-19", "en", (60, 80))) is None
+    assert cache.lookup("leo insight", SCOPE) == "english"
+
+
+def test_services_with_different_word_ranges_do_not_share_insights():
+    cache = SemanticResponseCache(embed, threshold=0.5)
+    short = InsightService(llm_provider="mock", semantic_cache=cache)
+    long = InsightService(
+        llm_provider="mock", semantic_cache=cache, generation_options={"min_words": 60, "max_words": 80}
+    )
+
+    short.generate_insight("Arjun", "1995-08-20", "14:30", "Jaipur, India")
+    assert len(cache) == 1
+
+    long.generate_insight("Arjun", "1995-08-20", "14:30", "Jaipur, India")
+    assert len(cache) == 2
@@ -0,0 +1,47 @@
+"""
+Tests for masking user names out of semantic cache keys.
+"""
+from app.services.insight_service import NAME_PLACEHOLDER, InsightService
+
+
+class RecordingCache:
+    """Semantic cache stand-in that records what it is asked to store."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def lookup(self, prompt, scope):
+        return self.entries.get((prompt, scope))
+
+    def store(self, prompt, response, scope):
+        self.entries[(prompt, scope)] = response
+
+
+def make_service() -> InsightService:
+    return InsightService(llm_provider="mock", semantic_cache=RecordingCache())
+
+
+def test_name_inside_a_sign_is_masked_as_a_whole_word_only():
+    service = make_service()
+    service.generate_insight("Ari", "1990-04-02", "06:15", "Pune, India")
+
+    [(prompt, _)] = service.semantic_cache.entries
+    assert NAME_PLACEHOLDER in prompt
+    assert "Aries" in prompt
+    assert "Ari " not in prompt and "Ari," not in prompt
+
+
+def test_cached_insight_is_repersonalized():
+    service = make_service()
+    first = service.generate_insight("Arjun", "1990-04-02", "06:15", "Pune, India")
+    second = service.generate_insight("Meera", "1990-04-02", "06:15", "Pune, India")
+
+    assert len(service.semantic_cache.entries) == 1
+    assert second["insight"] == first["insight"].replace("Arjun", "Meera")
+
+
+def test_name_matching_a_sign_skips_the_cache():
+    service = make_service()
+    service.generate_insight("Leo", "1995-08-20", "14:30", "Jaipur, India")
+
+    assert service.semantic_cache.entries == {}
@@ -0,0 +1,160 @@
+"""
+Tests for the in-process NumPy vector indexes.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.vector_store.numpy_index import NumpyVectorIndex
+from app.core.vector_store.partitioned_index import GENERAL_PARTITION, PartitionedVectorIndex
+
+DIM = 16
+SIGNS = ["Aries", "Taurus", "Leo"]
+ZODIACS = SIGNS + ["Fire Signs"]
+
+
+def corpus(n, seed=0, prefix="doc"):
+    rng = np.random.default_rng(seed)
+    ids = [f"{prefix}-{i}" for i in range(n)]
+    payloads = [{"doc_id": doc_id, "zodiac": ZODIACS[i % len(ZODIACS)]} for i, doc_id in enumerate(ids)]
+    return ids, rng.standard_normal((n, DIM)).astype(np.float32), payloads
+
+
+@pytest.mark.parametrize("zodiac", [None, "Leo", ["Leo", "Fire Signs"], "Fire Signs"])
+def test_partitioned_search_matches_flat_search(zodiac):
+    ids, vectors, payloads = corpus(200)
+    flat = NumpyVectorIndex(DIM)
+    flat.upsert(ids, vectors, payloads)
+    partitioned = PartitionedVectorIndex(DIM, SIGNS)
+    partitioned.upsert(ids, vectors, payloads)
+    queries = np.random.default_rng(1).standard_normal((5, DIM))
+
+    for query in queries:
+        expected = flat.search(query, limit=5, zodiac=zodiac)
+        found = partitioned.search(query, limit=5, zodiac=zodiac)
+        assert [payload["doc_id"] for _, payload in found] == [payload["doc_id"] for _, payload in expected]
+        assert np.allclose([score for score, _ in found], [score for score, _ in expected])
+
+
+def test_upsert_moves_documents_between_partitions():
+    index = PartitionedVectorIndex(DIM, SIGNS)
+    ids, vectors, payloads = corpus(8)
+    index.upsert(ids, vectors, payloads)
+
+    index.upsert([ids[0]], vectors[:1], [{"doc_id": ids[0], "zodiac": "Taurus"}])
+
+    assert index.get([ids[0]]) == {ids[0]: {"doc_id": ids[0], "zodiac": "Taurus"}}
+    assert index.count == 8
+    assert index.partition_sizes() == {GENERAL_PARTITION: 2, "Aries": 1, "Leo": 2, "Taurus": 3}
+
+
+def test_copy_is_isolated_from_later_writes():
+    index = NumpyVectorIndex(DIM)
+    ids, vectors, payloads = corpus(10)
+    index.upsert(ids, vectors, payloads)
+    snapshot = index.copy()
+
+    index.delete(ids[:5])
+    index.upsert([ids[5]], vectors[:1], [{"doc_id": ids[5], "zodiac": "Aries"}])
+
+    assert snapshot.count == 10
+    assert snapshot.get([ids[5]])[ids[5]]["zodiac"] == payloads[5]["zodiac"]
+    assert index.count == 5
+
+
+def test_chunked_upserts_copy_the_matrix_logarithmically_often():
+    index = NumpyVectorIndex(DIM)
+    ids, vectors, payloads = corpus(1000)
+    storages = []
+
+    for start in range(0, 1000, 10):
+        index.upsert(ids[start:start + 10], vectors[start:start + 10], payloads[start:start + 10])
+        if not storages or index._state.storage is not storages[-1]:
+            storages.append(index._state.storage)
+
+    # Capacity doubles from 64: 64, 128, ..., 1024
+    assert [storage.capacity for storage in storages] == [64, 128, 256, 512, 1024]
+    whole = NumpyVectorIndex(DIM)
+    whole.upsert(ids, vectors, payloads)
+    assert np.array_equal(index.vectors, whole.vectors)
+    for zodiac in [None, "Leo", ["Aries", "Fire Signs"]]:
+        assert index.search(vectors[3], limit=10, zodiac=zodiac) == whole.search(vectors[3], limit=10, zodiac=zodiac)
+
+
+def test_appends_are_invisible_to_earlier_states_and_copies():
+    index = NumpyVectorIndex(DIM)
+    ids, vectors, payloads = corpus(20)
+    index.upsert(ids[:10], vectors[:10], payloads[:10])
+    before = index._state
+    snapshot = index.copy()
+
+    index.upsert(ids[10:15], vectors[10:15], payloads[10:15])
+    # The copy shares the storage but cannot claim the rows the index took
+    snapshot.upsert(ids[15:], vectors[15:], payloads[15:])
+
+    assert before.count == 10 and len(before.vectors) == 10
+    assert index.ids == ids[:15]
+    assert snapshot.ids == ids[:10] + ids[15:]
+    assert np.allclose(snapshot.vectors[10:], vectors[15:] / np.linalg.norm(vectors[15:], axis=1, keepdims=True))
+    assert {payload["doc_id"] for _, payload in snapshot.search(vectors[11], limit=20)} == set(snapshot.ids)
+
+
+def test_replacing_a_document_updates_its_zodiac_mask():
+    index = NumpyVectorIndex(DIM)
+    ids, vectors, payloads = corpus(8)
+    index.upsert(ids, vectors, payloads)
+    before = index._state
+
+    index.upsert([ids[0]], vectors[:1], [{"doc_id": ids[0], "zodiac": "Capricorn"}])
+
+    assert [payload["doc_id"] for _, payload in index.search(vectors[0], limit=8, zodiac="Capricorn")] == [ids[0]]
+    assert ids[0] not in {payload["doc_id"] for _, payload in index.search(vectors[0], limit=8, zodiac="Aries")}
+    # Searches still reading the earlier state see the old zodiac
+    assert before.zodiac_mask("Aries")[0] and before.zodiac_mask("Capricorn") is None
+
+
+def test_searches_see_whole_partition_reloads_while_writers_run():
+    index = PartitionedVectorIndex(DIM, SIGNS)
+    old_ids, old_vectors, old_payloads = corpus(40, seed=1, prefix="old")
+    new_ids, new_vectors, new_payloads = corpus(40, seed=2, prefix="new")
+    leo = lambda ids, vectors, payloads: (  # noqa: E731
+        [doc_id for doc_id, p in zip(ids, payloads) if p["zodiac"] == "Leo"],
+        vectors[[i for i, p in enumerate(payloads) if p["zodiac"] == "Leo"]],
+        [p for p in payloads if p["zodiac"] == "Leo"],
+    )
+    versions = [leo(old_ids, old_vectors, old_payloads), leo(new_ids, new_vectors, new_payloads)]
+    index.load_partition("Leo", *versions[0])
+    index.upsert(old_ids, old_vectors, old_payloads)
+
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        for round_ in range(200):
+            index.load_partition("Leo", *versions[round_ % 2])
+            index.upsert(new_ids[:2], new_vectors[:2], new_payloads[:2])
+            index.delete(new_ids[:2])
+        stop.set()
+
+    def read():
+        query = np.ones(DIM, dtype=np.float32)
+        while not stop.is_set():
+            try:
+                hits = index.search(query, limit=20, zodiac="Leo")
+                prefixes = {payload["doc_id"].split("-")[0] for _, payload in hits}
+                # A reload is seen entirely or not at all: never empty, never mixed
+                assert len(hits) == 10 and len(prefixes) == 1
+                index.search_batch(np.ones((3, DIM)), limit=5, zodiacs=[None, "Aries", ["Leo", "Fire Signs"]])
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    write()
+    for thread in readers:
+        thread.join(timeout=30)
+
+    assert errors == []
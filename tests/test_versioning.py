@@ -0,0 +1,169 @@
+"""
+Tests for blue/green corpus versions.
+"""
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.core.metrics import get_metrics
+from app.core.vector_store.vector_service import VectorStoreService
+
+FIRST = [
+    ("Leo", "leo leads with warmth"),
+    ("Aries", "aries acts first"),
+]
+SECOND = [
+    ("Leo", "leo loves the stage"),
+    ("Aries", "aries acts first"),
+    ("Taurus", "taurus values patience"),
+]
+THIRD = [
+    ("Leo", "leo shines at parties"),
+]
+
+
+@pytest.fixture(params=["memory", "numpy"])
+def service(request, encoder):
+    return VectorStoreService(
+        enabled=True, mode=request.param, retrieval_mode="hybrid", embedding_cache_size=0, versioned_collections=True
+    )
+
+
+def stored_texts(service):
+    hits = service.search("leo aries taurus warmth stage acts patience shines", top_k=10, score_threshold=0.0)
+    return {hit["text"] for hit in hits}
+
+
+def version_collections(service):
+    if service.client is None:
+        return set()
+    prefix = f"{service.collection_name}__"
+    return {c.name for c in service.client.get_collections().collections if c.name.startswith(prefix)}
+
+
+def publishes(result):
+    counters = get_metrics().snapshot()["counters"].get("corpus_publishes", [])
+    return sum(counter["value"] for counter in counters if counter["labels"] == {"result": result})
+
+
+def test_publishing_swaps_in_the_new_version(service, write_corpus):
+    first = service.publish_corpus(write_corpus(FIRST, "first.json"))
+    second = service.publish_corpus(write_corpus(SECOND, "second.json"))
+
+    assert first and second and first != second
+    assert service.active_version == second
+    assert stored_texts(service) == {text for _, text in SECOND}
+    assert {payload["text"] for payload in service.sparse_index.payloads} == {text for _, text in SECOND}
+    assert [hit["text"] for hit in service.get_context_passages("Taurus", top_k=1)] == ["taurus values patience"]
+    if service.index is None:
+        # The alias points at the new version; the replaced one is kept for rollback
+        assert service._alias_target() == service._version_collection(second)
+        assert version_collections(service) == {service._version_collection(v) for v in (first, second)}
+
+
+def test_republishing_the_live_corpus_changes_nothing(service, encoder, write_corpus):
+    corpus = write_corpus(FIRST)
+    version = service.publish_corpus(corpus)
+    calls = len(encoder.calls)
+    unchanged = publishes("unchanged")
+
+    assert service.publish_corpus(corpus) == version
+    assert len(encoder.calls) == calls
+    assert publishes("unchanged") == unchanged + 1
+
+
+def test_only_the_live_and_previous_versions_are_kept(service, write_corpus):
+    versions = [service.publish_corpus(write_corpus(items, f"{i}.json")) for i, items in enumerate([FIRST, SECOND, THIRD])]
+
+    if service.index is None:
+        assert version_collections(service) == {service._version_collection(v) for v in versions[1:]}
+    assert service.rollback_corpus() == versions[1]
+    # The first version is gone: rolling back again rolls forward
+    assert service.rollback_corpus() == versions[2]
+
+
+def test_rollback_restores_the_previous_version(service, write_corpus):
+    first = service.publish_corpus(write_corpus(FIRST, "first.json"))
+    second = service.publish_corpus(write_corpus(SECOND, "second.json"))
+
+    assert service.rollback_corpus() == first
+    assert service.active_version == first
+    assert stored_texts(service) == {text for _, text in FIRST}
+    assert {payload["text"] for payload in service.sparse_index.payloads} == {text for _, text in FIRST}
+    assert [hit["text"] for hit in service.get_context_passages("Leo", top_k=1)] == ["leo leads with warmth"]
+
+    assert service.rollback_corpus() == second
+    assert stored_texts(service) == {text for _, text in SECOND}
+
+
+def test_rollback_without_a_previous_version(service, write_corpus):
+    assert service.rollback_corpus() is None
+
+    version = service.publish_corpus(write_corpus(FIRST))
+
+    assert service.rollback_corpus() is None
+    assert service.active_version == version
+
+
+def fail_search(service, monkeypatch):
+    # Version views are copies of the service, so they inherit the patch
+    monkeypatch.setattr(service, "search_many", lambda queries, *args, **kwargs: [[] for _ in queries])
+
+
+def drop_documents(service, monkeypatch):
+    monkeypatch.setattr(service, "_document_count", lambda: 1)
+
+
+@pytest.mark.parametrize("break_version", [fail_search, drop_documents])
+def test_invalid_versions_never_go_live(service, write_corpus, monkeypatch, break_version):
+    version = service.publish_corpus(write_corpus(FIRST, "first.json"))
+    collections = version_collections(service)
+    invalid = publishes("invalid")
+
+    break_version(service, monkeypatch)
+    assert service.publish_corpus(write_corpus(SECOND, "second.json")) is None
+    monkeypatch.undo()
+
+    assert publishes("invalid") == invalid + 1
+    assert service.active_version == version
+    assert stored_texts(service) == {text for _, text in FIRST}
+    # The rejected version's collection is deleted
+    assert version_collections(service) == collections
+    assert service.rollback_corpus() is None
+
+
+def test_build_errors_keep_the_live_version(service, write_corpus, monkeypatch):
+    version = service.publish_corpus(write_corpus(FIRST, "first.json"))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("encoder down")
+
+    monkeypatch.setattr(service, "_corpus_embeddings", fail)
+
+    assert service.publish_corpus(write_corpus(SECOND, "second.json")) is None
+    assert service.active_version == version
+    assert stored_texts(service) == {text for _, text in FIRST}
+
+
+def test_invalid_corpora_are_not_published(service, write_corpus):
+    assert service.publish_corpus(write_corpus([])) is None
+    assert service.publish_corpus("/nonexistent/corpus.json") is None
+    assert service.active_version is None
+
+
+def test_load_corpus_publishes_when_versioned(service, write_corpus):
+    assert service.load_corpus(write_corpus(FIRST))
+
+    assert service.active_version is not None
+    assert stored_texts(service) == {text for _, text in FIRST}
+
+
+def test_unversioned_collection_is_replaced_by_the_alias(encoder, write_corpus):
+    service = VectorStoreService(enabled=True, mode="memory", embedding_cache_size=0)
+    service.load_corpus(write_corpus(FIRST, "first.json"))
+
+    service.versioned_collections = True
+    version = service.publish_corpus(write_corpus(SECOND, "second.json"))
+
+    assert service._alias_target() == service._version_collection(version)
+    assert stored_texts(service) == {text for _, text in SECOND}
@@ -0,0 +1,137 @@
+"""
+Tests for word budgets and early stopping of streamed insights.
+"""
+import asyncio
+
+import pytest
+
+from app.core.llm.client import LLMClient
+from app.core.llm.providers.base_provider import aconsume_stream, consume_stream
+from app.core.llm.word_budget import WordBudget, max_tokens_for_words
+
+PROMPT = "Generate a personalized daily astrological insight for Arjun, a Leo."
+
+
+def feed_all(budget, chunks):
+    """Feed chunks until the budget stops; returns (final text, chunks fed)."""
+    for fed, chunk in enumerate(chunks, 1):
+        final = budget.feed(chunk)
+        if final is not None:
+            return final, fed
+    return None, len(chunks)
+
+
+def test_stops_at_the_first_sentence_end_past_the_target():
+    chunks = ["One two.", " Three four five.", " Six seven.", " Eight."]
+
+    assert feed_all(WordBudget(3), chunks) == ("One two. Three four five.", 3)
+
+
+def test_target_words_own_period_counts():
+    assert feed_all(WordBudget(2), ["One two.", " Three."]) == ("One two.", 2)
+
+
+def test_no_stop_before_the_target_or_without_a_sentence_end():
+    assert feed_all(WordBudget(5), ["One two.", " Three four."]) == (None, 2)
+    assert feed_all(WordBudget(2), ["One two three", " four five"]) == (None, 2)
+
+
+def test_sentence_end_needs_following_whitespace():
+    budget = WordBudget(1)
+
+    # A period at the edge of a chunk may be a decimal or abbreviation
+    assert budget.feed("Pi is 3.") is None
+    assert budget.feed("14 today") is None
+    assert budget.feed(". Then more") == "Pi is 3.14 today."
+
+
+def test_closing_quotes_stay_with_the_sentence():
+    assert feed_all(WordBudget(2), ['He said "go now."', " Then left."]) == ('He said "go now."', 2)
+
+
+@pytest.mark.parametrize(
+    "max_words, limit, expected",
+    [
+        (50, None, 88),  # ceil(50 * 1.4 * 1.25) = ceil(87.5)
+        (40, None, 70),
+        (50, 150, 88),
+        (50, 60, 60),
+        (50, 0, 88),  # no limit
+    ],
+)
+def test_max_tokens_for_words(max_words, limit, expected):
+    assert max_tokens_for_words(max_words, limit) == expected
+
+
+def test_consume_stream_closes_the_stream_when_stopping():
+    closed = []
+
+    def chunks():
+        try:
+            yield from ["One two.", " Three.", " Four."]
+        finally:
+            closed.append(True)
+
+    text, first_token, stopped = consume_stream(chunks(), WordBudget(2).feed, 0.0)
+
+    assert (text, stopped) == ("One two.", True)
+    assert first_token is not None
+    assert closed == [True]
+
+
+def test_aconsume_stream_closes_the_stream_when_stopping():
+    closed = []
+
+    async def chunks():
+        try:
+            for chunk in ["One two.", " Three.", " Four."]:
+                yield chunk
+        finally:
+            closed.append(True)
+
+    text, _, stopped = asyncio.run(aconsume_stream(chunks(), WordBudget(2).feed, 0.0))
+
+    assert (text, stopped) == ("One two.", True)
+    assert closed == [True]
+
+
+def make_client(early_stop):
+    return LLMClient(
+        provider_name="mock",
+        provider_options={"seed": 21},
+        generation_options={"min_words": 5, "max_words": 50, "early_stop": early_stop},
+    )
+
+
+def test_client_stops_mock_stream_after_the_first_sentence():
+    client = make_client(early_stop=True)
+    result = client.generate_result(PROMPT)
+
+    assert result.stopped_early
+    # Every mock template opens with a sentence of at least five words
+    assert result.text.endswith((".", "!", "?"))
+    assert len(result.text.split()) >= 5
+    assert result.text.count(". ") == 0
+
+
+def test_stopped_streams_report_estimated_usage_of_the_cut_text():
+    client = make_client(early_stop=True)
+    result = client.generate_result(PROMPT)
+
+    assert result.estimated_usage
+    assert result.prompt_tokens == client.token_counter.count(PROMPT)
+    assert result.completion_tokens == client.token_counter.count(result.text)
+
+
+def test_async_client_stops_early_too():
+    result = asyncio.run(make_client(early_stop=True).agenerate_result(PROMPT))
+
+    assert result.stopped_early
+    assert result.completion_tokens == LLMClient("mock").token_counter.count(result.text)
+
+
+def test_without_early_stop_the_whole_completion_is_kept():
+    result = make_client(early_stop=False).generate_result(PROMPT)
+
+    assert not result.stopped_early
+    assert result.text.count(". ") >= 1